@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the in-process analytics engines.
+
+Generates synthetic food logs in memory and compares the local engine with
+what the code-execution path would send to Gemini. No model is called.
+
+Usage:
+    python scripts/bench_analytics.py stats [--logs 10000] [--repeat 20]
+    python scripts/bench_analytics.py patterns [--logs 10000] [--repeat 20]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fcp.services import eating_patterns  # noqa: E402
+from fcp.services.nutrition_stats import columns_from_logs, format_summary, summarize  # noqa: E402
+from fcp.tools.analytics import _sanitize_food_logs  # noqa: E402
+
+CUISINES = ["Japanese", "Italian", "Mexican", "Thai", "Indian", "French"]
+
+
+def _sample_logs(count: int) -> list[dict]:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return [
+        {
+            "id": f"log-{i}",
+            "dish_name": f"Dish {i % 300}",
+            "venue_name": f"Venue {i % 50}",
+            "cuisine": CUISINES[i % len(CUISINES)],
+            "created_at": (start + timedelta(minutes=53 * i)).isoformat(),
+            "nutrition": {"calories": 300 + i % 700, "protein_g": 10 + i % 40, "carbs_g": 30 + i % 90, "fat_g": i % 35},
+        }
+        for i in range(count)
+    ]
+
+
+def _timed_ms(fn, repeat: int) -> float:
+    """Median wall time of ``fn()`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_stats(logs: int, repeat: int) -> None:
+    food_logs = _sample_logs(logs)
+    safe_logs = _sanitize_food_logs(food_logs)
+
+    def local() -> str:
+        return format_summary(summarize(columns_from_logs(safe_logs)))
+
+    summary = local()
+    llm_prompt = json.dumps(safe_logs, indent=2)
+    sanitize_ms = _timed_ms(lambda: _sanitize_food_logs(food_logs), max(1, repeat // 4))
+    local_ms = _timed_ms(local, repeat)
+
+    print(f"calculate_nutrition_stats over {logs} logs")
+    print(f"{'step':<32}{'median ms':>12}")
+    print(f"{'sanitize logs (both modes)':<32}{sanitize_ms:>12.2f}")
+    print(f"{'local engine (columns+stats)':<32}{local_ms:>12.2f}")
+    print()
+    print(f"{'prompt':<32}{'chars':>12}{'~tokens':>10}")
+    print(f"{'llm: logs as indented JSON':<32}{len(llm_prompt):>12}{len(llm_prompt) // 4:>10}")
+    print(f"{'local: summary to narrate':<32}{len(summary):>12}{len(summary) // 4:>10}")
+
+
+def bench_patterns(logs: int, repeat: int) -> None:
+    food_logs = _sample_logs(logs)
+    safe_logs = _sanitize_food_logs(food_logs)
+
+    def local() -> str:
+        return eating_patterns.format_summary(eating_patterns.summarize(eating_patterns.columns_from_logs(safe_logs)))
+
+    summary = local()
+    llm_prompt = json.dumps(safe_logs, indent=2)
+    sanitize_ms = _timed_ms(lambda: _sanitize_food_logs(food_logs), max(1, repeat // 4))
+    local_ms = _timed_ms(local, repeat)
+
+    print(f"analyze_eating_patterns over {logs} logs")
+    print(f"{'step':<32}{'median ms':>12}")
+    print(f"{'sanitize logs (both modes)':<32}{sanitize_ms:>12.2f}")
+    print(f"{'local engine (columns+patterns)':<32}{local_ms:>12.2f}")
+    print()
+    print(f"{'prompt':<32}{'chars':>12}{'~tokens':>10}")
+    print(f"{'llm: logs as indented JSON':<32}{len(llm_prompt):>12}{len(llm_prompt) // 4:>10}")
+    print(f"{'local: summary to narrate':<32}{len(summary):>12}{len(summary) // 4:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats = sub.add_parser("stats", help="Nutrition statistics: local engine vs the code-execution prompt")
+    stats.add_argument("--logs", type=int, default=10_000)
+    stats.add_argument("--repeat", type=int, default=20)
+
+    patterns = sub.add_parser("patterns", help="Eating patterns: local engine vs the code-execution prompt")
+    patterns.add_argument("--logs", type=int, default=10_000)
+    patterns.add_argument("--repeat", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "stats":
+        bench_stats(args.logs, args.repeat)
+    elif args.command == "patterns":
+        bench_patterns(args.logs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the SQLite Database backend.
+
+Each benchmark seeds a throwaway database under a temp directory and prints
+a small table of results. Nothing here touches the real data directory.
+
+Usage:
+    python scripts/bench_database.py reads [--logs 5000] [--duration 2.0] [--with-writer]
+    python scripts/bench_database.py writes [--writes 2000]
+    python scripts/bench_database.py import [--items 500]
+    python scripts/bench_database.py projection [--logs 500] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fcp.services import database as database_module  # noqa: E402
+from fcp.services.database import Database  # noqa: E402
+from fcp.tools.profile import PROFILE_LOG_FIELDS  # noqa: E402
+
+USER_ID = "bench-user"
+CUISINES = ["Japanese", "Italian", "Mexican", "Thai", "Indian", "French"]
+
+
+def _sample_log(i: int) -> dict:
+    return {
+        "dish_name": f"Dish {i}",
+        "venue_name": f"Venue {i % 50}",
+        "cuisine": CUISINES[i % len(CUISINES)],
+        "notes": "Rich broth, springy noodles, would order again. " * 3,
+        "ingredients": ["pork", "noodles", "egg", "scallion", "garlic"],
+        "nutrition": {"calories": 600 + i % 400, "protein_g": 30, "carbs_g": 70, "fat_g": 20},
+        "analysis": {"dish_name": f"Dish {i}", "confidence": 0.9, "components": ["a", "b", "c"] * 10},
+        "spice_level": i % 5,
+    }
+
+
+async def _seed(db: Database, count: int) -> None:
+    for i in range(count):
+        await db.create_log(USER_ID, _sample_log(i))
+
+
+async def _read_throughput(db: Database, concurrency: int, duration: float) -> float:
+    """Return completed ``get_user_logs`` calls per second."""
+    done = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await db.get_user_logs(USER_ID, limit=100)
+            done += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / (time.perf_counter() - start)
+
+
+async def _background_writer(db: Database, stop: asyncio.Event) -> None:
+    i = 0
+    while not stop.is_set():
+        await db.create_log(USER_ID, _sample_log(i))
+        i += 1
+
+
+async def bench_reads(logs: int, duration: float, pool_size: int, with_writer: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        seed = Database(path, reader_pool_size=0)
+        await seed.connect()
+        await _seed(seed, logs)
+        await seed.close()
+
+        writer_note = " with a concurrent writer" if with_writer else ""
+        print(f"get_user_logs(limit=100) throughput over {logs} logs, {duration:.1f}s per run{writer_note}")
+        print(f"{'callers':>8} {'single conn/s':>14} {f'pool={pool_size} /s':>14} {'speedup':>8}")
+        for concurrency in (1, 8, 64):
+            results = []
+            for size in (0, pool_size):
+                db = Database(path, reader_pool_size=size)
+                await db.connect()
+                stop = asyncio.Event()
+                writer = asyncio.create_task(_background_writer(db, stop)) if with_writer else None
+                results.append(await _read_throughput(db, concurrency, duration))
+                stop.set()
+                if writer:
+                    await writer
+                await db.close()
+            single, pooled = results
+            print(f"{concurrency:>8} {single:>14.1f} {pooled:>14.1f} {pooled / single:>7.2f}x")
+
+
+async def bench_writes(writes: int) -> None:
+    batch_sizes: list[int] = []
+    original_record = database_module.record_db_commit
+
+    def record(batch_size: int, latency_seconds: float) -> None:
+        batch_sizes.append(batch_size)
+        original_record(batch_size, latency_seconds)
+
+    database_module.record_db_commit = record
+    print(f"add_pantry_item throughput for {writes} writes (group commit)")
+    print(f"{'writers':>8} {'writes/s':>10} {'commits':>8} {'avg batch':>10}")
+    try:
+        for concurrency in (1, 8, 64):
+            with tempfile.TemporaryDirectory() as tmp:
+                db = Database(Path(tmp) / "bench.db", reader_pool_size=0)
+                await db.connect()
+                batch_sizes.clear()
+                per_worker = writes // concurrency
+
+                async def worker(w: int, db: Database = db, per_worker: int = per_worker) -> None:
+                    for i in range(per_worker):
+                        await db.add_pantry_item(USER_ID, {"name": f"item-{w}-{i}", "quantity": 1})
+
+                start = time.perf_counter()
+                await asyncio.gather(*(worker(w) for w in range(concurrency)))
+                elapsed = time.perf_counter() - start
+                await db.close()
+            total = per_worker * concurrency
+            avg_batch = sum(batch_sizes) / len(batch_sizes)
+            print(f"{concurrency:>8} {total / elapsed:>10.1f} {len(batch_sizes):>8} {avg_batch:>10.2f}")
+    finally:
+        database_module.record_db_commit = original_record
+
+
+async def bench_import(items: int) -> None:
+    """Compare a per-row loop with the batch APIs for one sequential import."""
+    logs = [_sample_log(i) for i in range(items)]
+    pantry = [{"name": f"item-{i}", "quantity": 1, "unit": "pieces", "category": "produce"} for i in range(items)]
+
+    async def loop_logs(db: Database) -> None:
+        for log in logs:
+            await db.create_log(USER_ID, log)
+
+    async def loop_pantry(db: Database) -> None:
+        for item in pantry:
+            await db.add_pantry_item(USER_ID, dict(item))
+
+    async def loop_upsert(db: Database) -> None:
+        for item in pantry:
+            await db.update_pantry_item(USER_ID, dict(item))
+
+    cases = [
+        ("food logs", loop_logs, lambda db: db.create_logs_batch(USER_ID, logs)),
+        ("pantry add", loop_pantry, lambda db: db.add_pantry_items_batch(USER_ID, pantry)),
+        ("pantry upsert", loop_upsert, lambda db: db.update_pantry_items_batch(USER_ID, pantry)),
+    ]
+    print(f"Importing {items} rows in one call: per-row loop vs batch API")
+    print(f"{'rows':>14} {'loop ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for label, loop, batch in cases:
+        timings = []
+        for run in (loop, batch):
+            with tempfile.TemporaryDirectory() as tmp:
+                db = Database(Path(tmp) / "bench.db", reader_pool_size=0)
+                await db.connect()
+                start = time.perf_counter()
+                await run(db)
+                timings.append((time.perf_counter() - start) * 1000)
+                await db.close()
+        looped, batched = timings
+        print(f"{label:>14} {looped:>10.1f} {batched:>10.1f} {looped / batched:>7.1f}x")
+
+
+async def bench_projection(logs: int, repeat: int) -> None:
+    """Measure the taste-profile log read with and without a field projection."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db", reader_pool_size=0)
+        await db.connect()
+        await db.create_logs_batch(USER_ID, [_sample_log(i) for i in range(logs)])
+
+        print(f"get_user_logs(limit={logs}) for a taste profile, best of {repeat} runs")
+        print(f"{'fields':>10} {'ms':>8} {'peak KiB':>10} {'result KiB':>11}")
+        results = []
+        for label, fields in (("all", None), ("profile", PROFILE_LOG_FIELDS)):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await db.get_user_logs(USER_ID, limit=logs, fields=fields)
+                best = min(best, time.perf_counter() - start)
+
+            tracemalloc.start()
+            rows = await db.get_user_logs(USER_ID, limit=logs, fields=fields)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del rows
+            results.append((best, peak))
+            print(f"{label:>10} {best * 1000:>8.2f} {peak / 1024:>10.1f} {retained / 1024:>11.1f}")
+        await db.close()
+
+    (full_time, full_peak), (slim_time, slim_peak) = results
+    print(f"speedup {full_time / slim_time:.1f}x, peak allocation {full_peak / slim_peak:.1f}x smaller")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    reads = sub.add_parser("reads", help="Concurrent read throughput: single connection vs reader pool")
+    reads.add_argument("--logs", type=int, default=5000)
+    reads.add_argument("--duration", type=float, default=2.0)
+    reads.add_argument("--pool-size", type=int, default=4)
+    reads.add_argument("--with-writer", action="store_true", help="Run a create_log loop alongside the readers")
+
+    writes = sub.add_parser("writes", help="Concurrent write throughput and group-commit batch sizes")
+    writes.add_argument("--writes", type=int, default=2000)
+
+    bulk = sub.add_parser("import", help="Sequential import: per-row writes vs the batch APIs")
+    bulk.add_argument("--items", type=int, default=500)
+
+    projection = sub.add_parser("projection", help="Profile log read: SELECT * vs a fields= projection")
+    projection.add_argument("--logs", type=int, default=500)
+    projection.add_argument("--repeat", type=int, default=50)
+
+    args = parser.parse_args()
+    if args.command == "reads":
+        asyncio.run(bench_reads(args.logs, args.duration, args.pool_size, args.with_writer))
+    elif args.command == "writes":
+        asyncio.run(bench_writes(args.writes))
+    elif args.command == "import":
+        asyncio.run(bench_import(args.items))
+    elif args.command == "projection":
+        asyncio.run(bench_projection(args.logs, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
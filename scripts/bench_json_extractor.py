@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Time of ``extract_json`` on large malformed model output, old vs new.
+
+Runs the single-pass extractor and the regex fallback chain it replaced
+on adversarial inputs of growing size, up to 1 MB: unclosed keys, deep
+nesting, stray quotes and fences, a truncated response, and prose with
+the JSON at the very end. The old chain's last-resort regex grows at
+least quadratically, so it is skipped at sizes where that would take
+longer than ``--budget`` seconds. No model is called.
+
+Usage:
+    python scripts/bench_json_extractor.py [--max-kb 1024] [--budget 5]
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fcp.utils.json_extractor import extract_json  # noqa: E402
+
+ENTRY = {"dish_name": "Tonkotsu Ramen", "notes": 'Rich "paitan" broth {extra egg}', "calories": 720}
+
+
+def _repeat(piece: str, size: int) -> str:
+    return piece * (size // len(piece) + 1)
+
+
+INPUTS: dict[str, Callable[[int], str]] = {
+    "unclosed keys": lambda size: _repeat('{"a": ', size),
+    "deep nesting": lambda size: _repeat("[", size // 2) + _repeat("]", size // 2 - 2),
+    "stray quotes": lambda size: "{" + _repeat('"x\\" ', size),
+    "fence spam": lambda size: _repeat("``` {", size),
+    "truncated list": lambda size: "[" + _repeat(json.dumps(ENTRY) + ", ", size)[:size],
+    "prose then json": lambda size: _repeat("a { sentence } with [brackets] ", size) + json.dumps(ENTRY),
+}
+
+
+def _previous_extract_json(text: str):
+    """The regex fallback chain ``extract_json`` used before the single-pass scanner."""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, RecursionError):
+        pass
+    for pattern in (r"```json\s*([\s\S]*?)```", r"```\s*([\s\S]*?)```"):
+        if match := re.search(pattern, text, re.IGNORECASE):
+            try:
+                return json.loads(match[1].strip())
+            except (json.JSONDecodeError, RecursionError):
+                pass
+    for open_char, close_char in (("[", "]"), ("{", "}")):
+        if candidate := _previous_balanced(text, open_char, close_char):
+            try:
+                return json.loads(candidate)
+            except (json.JSONDecodeError, RecursionError):
+                pass
+    for pattern in (r'(\{[\s\S]*"[^"]+"\s*:[\s\S]*\})', r"(\[[\s\S]*\{[\s\S]*\}[\s\S]*\])"):
+        if match := re.search(pattern, text):
+            try:
+                return json.loads(match[1])
+            except (json.JSONDecodeError, RecursionError):
+                continue
+    return None
+
+
+def _previous_balanced(text: str, open_char: str, close_char: str) -> str | None:
+    start = text.find(open_char)
+    if start == -1:
+        return None
+    depth, in_string, escape_next = 0, False, False
+    for i in range(start, len(text)):
+        char = text[i]
+        if escape_next:
+            escape_next = False
+        elif char == "\\":
+            escape_next = True
+        elif char == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def _seconds(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-kb", type=int, default=1024, help="Largest input size")
+    parser.add_argument("--budget", type=float, default=5.0, help="Stop timing the old chain past this many seconds")
+    args = parser.parse_args()
+    # Every repaired input would log a warning
+    logging.disable(logging.WARNING)
+
+    sizes = [4 * 1024]
+    while sizes[-1] * 4 <= args.max_kb * 1024:
+        sizes.append(sizes[-1] * 4)
+
+    print(f"{'input':<18}{'size':>8}{'old s':>10}{'new s':>10}{'repair s':>10}")
+    for name, make in INPUTS.items():
+        old_too_slow = False
+        for size in sizes:
+            text = make(size)
+            old = "skipped"
+            if not old_too_slow:
+                elapsed = _seconds(lambda: _previous_extract_json(text))
+                old = f"{elapsed:.3f}"
+                # The next size is 4x larger
+                old_too_slow = elapsed * 16 > args.budget
+            new = _seconds(lambda: extract_json(text))
+            repaired = _seconds(lambda: extract_json(text, repair=True))
+            print(f"{name:<18}{size // 1024:>6}KB{old:>10}{new:>10.3f}{repaired:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
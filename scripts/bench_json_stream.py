@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Time to first field of a streamed analysis: incremental parsing vs buffering.
+
+Replays a typical ``analyze_meal`` JSON response as a stream of chunks
+arriving at a fixed interval, the way Gemini streams it, and measures when
+``dish_name`` becomes available: as soon as it is complete with
+``IncrementalJsonParser``, or only after the last chunk when the text is
+buffered and parsed with ``_parse_json_response``. Also reports the CPU
+cost of parsing each way. No model is called.
+
+Usage:
+    python scripts/bench_json_stream.py [--chunk 48] [--interval-ms 30] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fcp.services.gemini_helpers import _parse_json_response  # noqa: E402
+from fcp.utils.json_stream import IncrementalJsonParser  # noqa: E402
+
+RESPONSE = {
+    "dish_name": "Tonkotsu Ramen",
+    "cuisine": "Japanese",
+    "ingredients": ["wheat noodles", "pork belly chashu", "soft-boiled egg", "scallions", "nori", "pork bone broth"],
+    "nutrition": {"calories": 720, "protein_g": 34, "carbs_g": 78, "fat_g": 29},
+    "dietary_tags": ["high-protein"],
+    "allergens": ["wheat", "egg", "soy", "sesame"],
+    "spice_level": 1,
+    "cooking_method": "simmered",
+    "translations": {"en": "Tonkotsu Ramen", "ja": "豚骨ラーメン", "es": "Ramen tonkotsu", "zh": "豚骨拉面"},
+    "foodon": {
+        "dish_id": "FOODON_03305038",
+        "dish_label": "ramen dish",
+        "ingredient_ids": {"wheat noodles": "FOODON_03302862", "pork belly": "FOODON_03311146"},
+        "cuisine_id": "FOODON_03411105",
+    },
+    "description": "A rich, creamy pork bone broth with springy noodles, melt-in-the-mouth chashu "
+    "and a jammy marinated egg, finished with scallions and a sheet of nori.",
+}
+
+
+async def _chunks(text: str, size: int, interval: float) -> AsyncIterator[str]:
+    for i in range(0, len(text), size):
+        await asyncio.sleep(interval)
+        yield text[i : i + size]
+
+
+async def _first_field_incremental(text: str, size: int, interval: float) -> float:
+    started = time.perf_counter()
+    parser = IncrementalJsonParser()
+    async for chunk in _chunks(text, size, interval):
+        for event in parser.feed(chunk):
+            if event.kind == "field" and event.path == ("dish_name",):
+                return time.perf_counter() - started
+    raise AssertionError("dish_name never completed")
+
+
+async def _first_field_buffered(text: str, size: int, interval: float) -> float:
+    started = time.perf_counter()
+    buffer = [chunk async for chunk in _chunks(text, size, interval)]
+    _parse_json_response("".join(buffer))["dish_name"]
+    return time.perf_counter() - started
+
+
+def _cpu_us(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk", type=int, default=48, help="Characters per streamed chunk")
+    parser.add_argument("--interval-ms", type=float, default=30.0, help="Time between chunks")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = json.dumps(RESPONSE, ensure_ascii=False, indent=2)
+    pieces = [text[i : i + args.chunk] for i in range(0, len(text), args.chunk)]
+    interval = args.interval_ms / 1000
+
+    incremental = statistics.median(
+        asyncio.run(_first_field_incremental(text, args.chunk, interval)) for _ in range(max(1, args.repeat // 4))
+    )
+    buffered = statistics.median(
+        asyncio.run(_first_field_buffered(text, args.chunk, interval)) for _ in range(max(1, args.repeat // 4))
+    )
+
+    def feed_all() -> None:
+        stream = IncrementalJsonParser()
+        for piece in pieces:
+            stream.feed(piece)
+        stream.close()
+
+    def buffer_all() -> None:
+        _parse_json_response("".join(pieces))
+
+    print(f"analyze_meal response: {len(text)} chars in {len(pieces)} chunks, one every {args.interval_ms:g} ms")
+    print(f"{'':<28}{'first field ms':>16}{'parse cpu us':>14}")
+    print(f"{'incremental (events)':<28}{incremental * 1000:>16.1f}{_cpu_us(feed_all, args.repeat):>14.1f}")
+    print(f"{'buffered (_parse_json)':<28}{buffered * 1000:>16.1f}{_cpu_us(buffer_all, args.repeat):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
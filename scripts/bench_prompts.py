@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Prompt size of the food-log context before and after compact serialization.
+
+Builds each prompt in ``fcp.prompts.PROMPTS`` that carries food logs from
+synthetic logs, once with the logs as indented JSON (as they used to be
+sent) and once as the compact table, and reports estimated tokens per 100
+logs. No model is called.
+
+Usage:
+    python scripts/bench_prompts.py [--logs 100] [--budget 8000]
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fcp.agents.content_generator import _blog_post_rows  # noqa: E402
+from fcp.prompts import PROMPTS  # noqa: E402
+from fcp.services.prompt_context import estimate_text_tokens, format_logs  # noqa: E402
+from fcp.tools.profile import _prompt_rows as profile_rows  # noqa: E402
+from fcp.tools.search import _prompt_rows as search_rows  # noqa: E402
+
+CUISINES = ["Japanese", "Italian", "Mexican", "Thai", "Indian", "French"]
+
+
+def _sample_logs(count: int) -> list[dict]:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return [
+        {
+            "id": f"log-{i:06d}",
+            "dish_name": f"Dish {i % 300}",
+            "venue_name": f"Venue {i % 50}" if i % 3 else None,
+            "cuisine": CUISINES[i % len(CUISINES)],
+            "notes": "Rich broth, a bit too salty, would order again with extra egg." if i % 4 == 0 else "",
+            "ingredients": ["noodles", "pork", "egg", "scallion", "nori", "garlic"][: i % 7],
+            "spice_level": i % 5 or None,
+            "dietary_tags": ["high-protein"] if i % 5 == 0 else [],
+            "ai_description": "A steaming bowl with a glossy, savory broth." if i % 2 else None,
+            "created_at": (start + timedelta(minutes=53 * i)).isoformat(),
+            "nutrition": {"calories": 300 + i % 700, "protein_g": 10 + i % 40, "carbs_g": 30 + i % 90, "fat_g": i % 35},
+        }
+        for i in range(count)
+    ]
+
+
+# How each prompt lays out its log block: the rows it shows and the prompt around them
+PROMPT_BUILDERS: dict[str, tuple[Callable[[list[dict]], list[dict]], Callable[[str], str]]] = {
+    "search_meals": (search_rows, lambda logs: PROMPTS["search_meals"].format(logs=logs, query="spicy noodles")),
+    "taste_profile": (profile_rows, lambda logs: f"Food History:\n{logs}\n\n" + PROMPTS["taste_profile"].format()),
+    "generate_blog_post": (
+        _blog_post_rows,
+        lambda logs: PROMPTS["generate_blog_post"].format(logs=logs, theme="culinary_journey", style="casual"),
+    ),
+    "generate_weekly_digest_content": (
+        lambda logs: logs,
+        lambda logs: PROMPTS["generate_weekly_digest_content"].format(
+            logs=logs, user_name="Sam", date_range="Mar 1 - Mar 7"
+        ),
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=8000)
+    args = parser.parse_args()
+
+    logs = _sample_logs(args.logs)
+    per_100 = 100 / args.logs
+
+    print(f"estimated prompt tokens per 100 logs ({args.logs} synthetic logs)")
+    print(f"{'prompt':<34}{'json':>9}{'table':>9}{'saved':>8}   with --budget {args.budget}")
+    for name, (rows_of, prompt_for) in PROMPT_BUILDERS.items():
+        rows = rows_of(logs)
+        before = estimate_text_tokens(prompt_for(json.dumps(rows, indent=2)))
+        after = estimate_text_tokens(prompt_for(format_logs(rows)))
+        block = format_logs(rows, budget=args.budget)
+        kept = len(block.split("\n")) - 1 - block.endswith("not shown)")
+        budgeted = estimate_text_tokens(prompt_for(block))
+        print(
+            f"{name:<34}{before * per_100:>9.0f}{after * per_100:>9.0f}{1 - after / before:>8.0%}"
+            f"   {budgeted} tokens, {kept} logs"
+        )
+
+
+if __name__ == "__main__":
+    main()
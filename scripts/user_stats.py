@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Maintain the incrementally updated user stats aggregate in SQLite.
+
+``rebuild`` recomputes the aggregate from ``food_logs`` (use after restoring
+a backup or editing logs outside the app). ``check`` compares the maintained
+stats with a full recomputation and exits non-zero on any mismatch.
+
+Usage:
+    python scripts/user_stats.py rebuild [--user USER_ID] [--db PATH]
+    python scripts/user_stats.py check [--user USER_ID ...] [--days 30] [--db PATH]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fcp.services.database import Database  # noqa: E402
+
+
+async def rebuild(db: Database, user_id: str | None) -> int:
+    count = await db.rebuild_user_stats(user_id)
+    print(f"Rebuilt stats for {count} user(s)")
+    return 0
+
+
+async def check(db: Database, user_ids: list[str], days: int) -> int:
+    if not user_ids:
+        user_ids = [u["id"] for u in await db.get_active_users(days=days)]
+    inconsistent = 0
+    for user_id in user_ids:
+        mismatches = await db.check_user_stats(user_id)
+        if mismatches:
+            inconsistent += 1
+            for field, (maintained, recomputed) in sorted(mismatches.items()):
+                print(f"{user_id}: {field} maintained={maintained!r} recomputed={recomputed!r}")
+    print(f"Checked {len(user_ids)} user(s), {inconsistent} inconsistent")
+    return 1 if inconsistent else 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    db = Database(args.db) if args.db else Database()
+    await db.connect()
+    try:
+        if args.command == "rebuild":
+            return await rebuild(db, args.user)
+        return await check(db, args.user, args.days)
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite database path (defaults to the configured data directory)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = sub.add_parser("rebuild", help="Recompute the stats aggregate from food_logs")
+    rebuild_parser.add_argument("--user", help="Only rebuild this user (default: every user)")
+
+    check_parser = sub.add_parser("check", help="Compare maintained stats with a full recomputation")
+    check_parser.add_argument("--user", action="append", default=[], help="User to check (repeatable)")
+    check_parser.add_argument("--days", type=int, default=30, help="Without --user, check users active this recently")
+
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,27 @@ from typing import Any
 
 from fcp.prompts import PROMPTS
 from fcp.services.gemini import GeminiClient, gemini
+from fcp.services.gemini_context_cache import cached_prefix
+from fcp.services.prompt_context import format_logs
+from fcp.settings import settings
+
+
+def _blog_post_rows(food_logs: list[dict]) -> list[dict[str, Any]]:
+    """The fields of each log the blog post prompt shows.
+
+    Supports both field naming conventions for backwards compatibility.
+    """
+    return [
+        {
+            "dish": log.get("dish_name", "Unknown dish"),
+            "cuisine": log.get("cuisine", "Unknown"),
+            "date": log.get("created_at", ""),
+            "highlights": log.get("ai_description", ""),
+            "nutrition": log.get("nutrition") or log.get("nutrition_info", {}),
+            "venue": log.get("venue") or log.get("venue_name", ""),
+        }
+        for log in food_logs
+    ]
 
 
 class ContentGeneratorAgent:
@@ -44,10 +65,10 @@ class ContentGeneratorAgent:
         """
         name_context = f"for {user_name}" if user_name else ""
 
-        prompt = f"""Create an engaging weekly food digest {name_context}.
-
-THIS WEEK'S MEALS ({len(food_logs)} entries):
-{json.dumps(food_logs, indent=2)}
+        # The meals open the prompt so repeated calls can send them as a context cache
+        meals = format_logs(food_logs, budget=settings.prompt_log_token_budget)
+        history = f"THIS WEEK'S MEALS ({len(food_logs)} entries):\n{meals}\n\n"
+        prompt = f"""{history}Create an engaging weekly food digest {name_context} from the meals above.
 
 Generate a fun, shareable weekly digest that includes:
 
@@ -87,10 +108,11 @@ Return as JSON:
     "suggestion": "..."
 }}"""
 
-        result = await self._gemini_client().generate_json_with_thinking(
-            prompt=prompt,
-            thinking_level="high",
-        )
+        with cached_prefix(history, user_id=self.user_id):
+            result = await self._gemini_client().generate_json_with_thinking(
+                prompt=prompt,
+                thinking_level="high",
+            )
 
         return {
             "user_id": self.user_id,
@@ -187,7 +209,7 @@ Return as JSON:
         prompt = f"""Create a food story{theme_context} from these meals.
 
 MEALS TO INCLUDE:
-{json.dumps(food_logs, indent=2)}
+{format_logs(food_logs, budget=settings.prompt_log_token_budget)}
 
 Write an engaging narrative that:
 1. Connects the meals into a cohesive story
@@ -248,7 +270,7 @@ Reference this to highlight growth and patterns."""
         prompt = f"""Create a comprehensive monthly food review.
 
 THIS MONTH'S MEALS ({len(food_logs)} entries):
-{json.dumps(food_logs, indent=2)}
+{format_logs(food_logs, budget=settings.prompt_log_token_budget)}
 {profile_context}
 
 Generate a shareable monthly review:
@@ -376,22 +398,8 @@ Return as JSON formatted for a recipe card."""
         Returns:
             dict with title, slug, content, excerpt, metadata, and suggestions
         """
-        # Prepare log summaries for the prompt
-        # Support both field naming conventions for backwards compatibility
-        log_summaries = [
-            {
-                "dish": log.get("dish_name", "Unknown dish"),
-                "cuisine": log.get("cuisine", "Unknown"),
-                "date": log.get("created_at", ""),
-                "highlights": log.get("ai_description", ""),
-                "nutrition": log.get("nutrition") or log.get("nutrition_info", {}),
-                "venue": log.get("venue") or log.get("venue_name", ""),
-            }
-            for log in food_logs
-        ]
-
         prompt = PROMPTS["generate_blog_post"].format(
-            logs=json.dumps(log_summaries, indent=2),
+            logs=format_logs(_blog_post_rows(food_logs), budget=settings.prompt_log_token_budget),
             theme=theme,
             style=style,
         )
@@ -9,6 +9,7 @@ synced albums, or batch uploads. It uses:
 
 from typing import Any
 
+from fcp.services.firestore import firestore_client
 from fcp.services.gemini import GeminiClient, gemini
 from fcp.tools.function_definitions import MEDIA_PROCESSING_TOOLS
 
@@ -194,6 +195,7 @@ Use detect_food_in_image to report your finding."""
         self,
         image_urls: list[str],
         default_venue: str | None = None,
+        save: bool = False,
     ) -> list[dict[str, Any]]:
         """
         Process images and create food log entry drafts.
@@ -201,9 +203,10 @@ Use detect_food_in_image to report your finding."""
         Args:
             image_urls: List of food image URLs
             default_venue: Optional default venue for all entries
+            save: Persist the drafts for this agent's user in one batch write
 
         Returns:
-            list of food log entry drafts ready for saving
+            list of food log entry drafts ready for saving (with ``log_id`` when saved)
         """
         entries = []
 
@@ -223,6 +226,25 @@ Use detect_food_in_image to report your finding."""
                 }
                 entries.append(entry)
 
+        if save and entries:
+            if not self.user_id:
+                raise ValueError("user_id is required to save food log entries")
+            logs = [
+                {
+                    "dish_name": entry["dish_name"],
+                    "cuisine": entry["cuisine"],
+                    "ingredients": entry["ingredients"],
+                    "nutrition": entry["nutrition"],
+                    "venue_name": entry["venue"],
+                    "image_path": entry["image_url"],
+                    "processing_status": entry["status"],
+                }
+                for entry in entries
+            ]
+            log_ids = await firestore_client.create_logs_batch(self.user_id, logs)
+            for entry, log_id in zip(entries, log_ids, strict=True):
+                entry["log_id"] = log_id
+
         return entries
 
     async def analyze_meal_sequence(
@@ -10,6 +10,7 @@ import logfire
 from pydantic import BaseModel, Field
 
 from fcp.services.conversation_state import ConversationState
+from fcp.services.gemini_governor import gemini_governor
 
 
 class MealPlanDay(BaseModel):
@@ -201,7 +202,8 @@ class MealPlannerAgent:
             )
         ]
 
-        return await client.aio.models.generate_content(
+        return await gemini_governor.generate_content(
+            client,
             model=self.MODEL,
             contents=self.conversation.to_contents(),
             config=types.GenerateContentConfig(
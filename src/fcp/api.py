@@ -62,8 +62,11 @@ from fcp.security import (
     rate_limit_exceeded_handler,
 )
 from fcp.services.logfire_service import init_logfire, shutdown_logfire
+from fcp.settings import settings
+from fcp.tools.data_loader import user_data_scope
 from fcp.utils.audit import setup_audit_logging
 from fcp.utils.background_tasks import cancel_all_tasks
+from fcp.utils.deadline import deadline_scope
 from fcp.utils.errors import register_exception_handlers
 from fcp.utils.logging import request_id_ctx, setup_logging
 
@@ -134,6 +137,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Failed to close Gemini HTTP client during shutdown: %s", e)
 
+    try:
+        from fcp.services.result_cache import result_cache
+
+        await result_cache.close()
+    except Exception as e:
+        logger.warning("Failed to close result cache during shutdown: %s", e)
+
+    try:
+        from fcp.services.gemini_response_cache import gemini_response_cache
+
+        await gemini_response_cache.close()
+    except Exception as e:
+        logger.warning("Failed to close Gemini response cache during shutdown: %s", e)
+
+    try:
+        from fcp.services.media_cache import media_cache
+
+        await media_cache.close()
+    except Exception as e:
+        logger.warning("Failed to close media cache during shutdown: %s", e)
+
     shutdown_logfire()  # Flush any pending Logfire data
 
 
@@ -310,6 +334,45 @@ async def request_id_middleware(request: Request, call_next):
         request_id_ctx.reset(token)
 
 
+# --- Request Deadline ---
+# Interactive routes and their default deadline in seconds (0 = none)
+ROUTE_DEADLINE_SECONDS = {
+    "/analyze": settings.analyze_deadline_seconds,
+    "/analyze/v2": settings.analyze_deadline_seconds,
+    "/analyze/agentic-vision": settings.analyze_deadline_seconds,
+    "/search": settings.search_deadline_seconds,
+}
+
+
+@app.middleware("http")
+async def request_deadline_middleware(request: Request, call_next):
+    """Give the request an end-to-end deadline that Gemini calls, retries and media downloads respect.
+
+    - Accepts X-Request-Timeout (seconds) from the client, capped at REQUEST_DEADLINE_MAX_SECONDS
+    - Falls back to the route's default deadline, if it has one
+    - A request that runs out of time gets a 504
+    """
+    seconds = ROUTE_DEADLINE_SECONDS.get(request.url.path)
+    if header := request.headers.get("X-Request-Timeout"):
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = 0.0
+        if requested > 0:
+            seconds = min(requested, settings.request_deadline_max_seconds)
+
+    with deadline_scope(seconds):
+        return await call_next(request)
+
+
+# --- Request-Scoped User Data ---
+@app.middleware("http")
+async def user_data_scope_middleware(request: Request, call_next):
+    """Let handlers and the tools they call share one read of each user's data per request."""
+    with user_data_scope():
+        return await call_next(request)
+
+
 # --- User ID Middleware for Rate Limiting ---
 @app.middleware("http")
 async def user_id_middleware(request: Request, call_next):
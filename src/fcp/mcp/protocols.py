@@ -6,7 +6,8 @@ Using protocols allows for easy testing with mocks.
 
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Sequence
+from datetime import date, datetime
 from typing import Any, Protocol, runtime_checkable
 
 
@@ -26,8 +27,29 @@ class Database(Protocol):
         days: int | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        fields: Sequence[str] | None = None,
     ) -> list[dict[str, Any]]:
-        """Get user food logs."""
+        """Get user food logs, optionally projected to ``fields``."""
+        ...
+
+    async def get_user_logs_page(
+        self,
+        user_id: str,
+        page_size: int = 100,
+        cursor: str | None = None,
+        days: int | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Get one page of logs after an opaque cursor, plus the next cursor."""
+        ...
+
+    async def search_logs(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Full-text search over the user's logs, best match first."""
         ...
 
     async def get_log(self, user_id: str, log_id: str) -> dict[str, Any] | None:
@@ -42,6 +64,10 @@ class Database(Protocol):
         """Create a new log and return its ID."""
         ...
 
+    async def create_logs_batch(self, user_id: str, entries: list[dict[str, Any]]) -> list[str]:
+        """Create several logs in one write and return their IDs in input order."""
+        ...
+
     async def update_log(self, user_id: str, log_id: str, updates: dict[str, Any]) -> None:
         """Update an existing log."""
         ...
@@ -50,6 +76,22 @@ class Database(Protocol):
         """Delete a log (soft delete)."""
         ...
 
+    async def get_daily_rollups(self, user_id: str, start: date, end: date) -> list[dict[str, Any]]:
+        """Get per-day nutrition rollups from ``start`` to ``end`` inclusive, oldest first."""
+        ...
+
+    async def get_data_version(self, user_id: str) -> int:
+        """Get the user's data version, which changes on every log, pantry or preferences write."""
+        ...
+
+    async def get_taste_profile_snapshot(self, user_id: str, period: str) -> dict[str, Any] | None:
+        """Get the stored taste profile for a period and the watermark it was built at."""
+        ...
+
+    async def save_taste_profile_snapshot(self, user_id: str, period: str, snapshot: dict[str, Any]) -> None:
+        """Store a taste profile with its ``log_count``/``data_version``/``built_at`` watermark."""
+        ...
+
     async def get_pantry(self, user_id: str) -> list[dict[str, Any]]:
         """Get user's pantry items."""
         ...
@@ -58,6 +100,10 @@ class Database(Protocol):
         """Add item to pantry."""
         ...
 
+    async def add_pantry_items_batch(self, user_id: str, items: list[dict[str, Any]]) -> list[str]:
+        """Add several pantry items in one write and return their IDs in input order."""
+        ...
+
     async def update_pantry_item(self, user_id: str, item_id: str, updates: dict[str, Any]) -> None:
         """Update pantry item."""
         ...
@@ -77,10 +77,7 @@ Respond in JSON format:
     ...
   ]
 }}""",
-    "taste_profile": """Analyze this user's food journal history to build a taste profile.
-
-Food History:
-{logs}
+    "taste_profile": """Analyze this user's food journal history above to build a taste profile.
 
 Identify patterns in:
 1. Cuisine preferences (ranked by frequency)
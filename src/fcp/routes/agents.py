@@ -18,6 +18,7 @@ Autonomous AI agent endpoints:
 - /agents/recipe-card - Recipe cards
 """
 
+import asyncio
 from typing import Any
 
 from fastapi import Depends, HTTPException, Query, Request
@@ -27,7 +28,8 @@ from fcp.agents import ContentGeneratorAgent, FoodDiscoveryAgent, FreshnessAgent
 from fcp.auth import AuthenticatedUser, get_current_user, require_write_access
 from fcp.routes.router import APIRouter
 from fcp.security.rate_limit import RATE_LIMIT_ANALYZE, RATE_LIMIT_PROFILE, RATE_LIMIT_SUGGEST, limiter
-from fcp.tools import delegate_to_food_agent, get_meal, get_meals, get_taste_profile
+from fcp.tools import delegate_to_food_agent, get_meal, get_meals
+from fcp.tools.data_loader import user_data
 
 router = APIRouter()
 
@@ -86,6 +88,12 @@ class RecipeCardRequest(BaseModel):
 FilterPhotosRequest = FilterImagesRequest
 
 
+async def _taste_profile(user_id: str) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """The stored taste profile for agent context, and its staleness for the response."""
+    profile = await user_data(user_id).taste_profile()
+    return profile, profile.pop("staleness", None)
+
+
 # --- Routes ---
 
 
@@ -118,15 +126,16 @@ async def run_food_discovery(
     - Function calling for structured recommendations
     """
     # Get user's taste profile
-    profile = await get_taste_profile(user.user_id)
+    profile, staleness = await _taste_profile(user.user_id)
 
     agent = FoodDiscoveryAgent(user.user_id)
-    return await agent.run_discovery(
+    result = await agent.run_discovery(
         taste_profile=profile,
         location=discovery_request.location,
         discovery_type=discovery_request.discovery_type,
         count=discovery_request.count,
     )
+    return {**result, "profile_staleness": staleness}
 
 
 @router.post("/agents/discover/restaurants")
@@ -139,13 +148,14 @@ async def discover_restaurants(
     """
     Discover new restaurants matching user preferences.
     """
-    profile = await get_taste_profile(user.user_id)
+    profile, staleness = await _taste_profile(user.user_id)
     agent = FoodDiscoveryAgent(user.user_id)
-    return await agent.discover_restaurants(
+    result = await agent.discover_restaurants(
         taste_profile=profile,
         location=discovery_request.location,
         occasion=discovery_request.occasion,
     )
+    return {**result, "profile_staleness": staleness}
 
 
 @router.post("/agents/discover/recipes")
@@ -158,13 +168,14 @@ async def discover_recipes(
     """
     Discover new recipes based on preferences and available ingredients.
     """
-    profile = await get_taste_profile(user.user_id)
+    profile, staleness = await _taste_profile(user.user_id)
     agent = FoodDiscoveryAgent(user.user_id)
-    return await agent.discover_recipes(
+    result = await agent.discover_recipes(
         taste_profile=profile,
         available_ingredients=discovery_request.available_ingredients,
         dietary_restrictions=discovery_request.dietary_restrictions,
     )
+    return {**result, "profile_staleness": staleness}
 
 
 @router.get("/agents/daily-insight")
@@ -182,15 +193,18 @@ async def get_daily_insight(
     - Food holidays
     - Weather-appropriate suggestions
     """
-    profile = await get_taste_profile(user.user_id)
-    recent_logs = await get_meals(user.user_id, days=7)
+    (profile, staleness), recent_logs = await asyncio.gather(
+        _taste_profile(user.user_id),
+        get_meals(user.user_id, days=7),
+    )
 
     agent = FreshnessAgent(user.user_id)
-    return await agent.generate_daily_insight(
+    result = await agent.generate_daily_insight(
         taste_profile=profile,
         recent_logs=recent_logs,
         location=location,
     )
+    return {**result, "profile_staleness": staleness}
 
 
 @router.get("/agents/streak/{streak_days}")
@@ -222,9 +236,10 @@ async def get_food_tip(
 
     Uses grounding for fresh, relevant tips.
     """
-    profile = await get_taste_profile(user.user_id)
+    profile, staleness = await _taste_profile(user.user_id)
     agent = FreshnessAgent(user.user_id)
-    return await agent.generate_food_tip_of_day(taste_profile=profile)
+    result = await agent.generate_food_tip_of_day(taste_profile=profile)
+    return {**result, "profile_staleness": staleness}
 
 
 @router.get("/agents/seasonal-reminder")
@@ -237,12 +252,13 @@ async def get_seasonal_reminder(
     """
     Get seasonal food recommendations for a location.
     """
-    profile = await get_taste_profile(user.user_id)
+    profile, staleness = await _taste_profile(user.user_id)
     agent = FreshnessAgent(user.user_id)
-    return await agent.generate_seasonal_reminder(
+    result = await agent.generate_seasonal_reminder(
         location=location,
         taste_profile=profile,
     )
+    return {**result, "profile_staleness": staleness}
 
 
 @router.post("/agents/process-media")
@@ -362,14 +378,17 @@ async def generate_monthly_review(
     """
     Generate a comprehensive monthly food review.
     """
-    food_logs = await get_meals(user.user_id, days=30)
-    profile = await get_taste_profile(user.user_id)
+    food_logs, (profile, staleness) = await asyncio.gather(
+        get_meals(user.user_id, days=30),
+        _taste_profile(user.user_id),
+    )
 
     agent = ContentGeneratorAgent(user.user_id)
-    return await agent.generate_monthly_review(
+    result = await agent.generate_monthly_review(
         food_logs=food_logs,
         taste_profile=profile,
     )
+    return {**result, "profile_staleness": staleness}
 
 
 @router.post("/agents/recipe-card")
@@ -1,6 +1,9 @@
 """Analytics Routes.
 
-Nutrition analytics endpoints using Gemini code execution:
+Nutrition analytics endpoints using Gemini code execution (nutrition
+statistics, comparisons and eating patterns are computed in-process by
+default). Responses are cached until the user's data changes; see
+``fcp.services.result_cache``.
 - POST /analytics/nutrition - Calculate nutrition statistics
 - POST /analytics/patterns - Analyze eating patterns
 - POST /analytics/trends - Calculate nutrition trends
@@ -8,7 +11,7 @@ Nutrition analytics endpoints using Gemini code execution:
 - GET /analytics/report - Generate comprehensive nutrition report
 """
 
-from typing import Any
+from typing import Any, Literal
 
 from fastapi import Depends, Query, Request
 from pydantic import BaseModel, Field
@@ -16,7 +19,8 @@ from pydantic import BaseModel, Field
 from fcp.auth import AuthenticatedUser, get_current_user, require_write_access
 from fcp.routes.router import APIRouter
 from fcp.security.rate_limit import RATE_LIMIT_PROFILE, limiter
-from fcp.tools import get_meals
+from fcp.services.result_cache import result_cache
+from fcp.tools import get_daily_nutrition, get_data_version, get_meals
 from fcp.tools.analytics import (
     analyze_eating_patterns,
     calculate_nutrition_stats,
@@ -35,11 +39,29 @@ class AnalyticsRequest(BaseModel):
     days: int = Field(default=7, ge=1, le=365)
 
 
+class NutritionStatsRequest(AnalyticsRequest):
+    mode: Literal["local", "llm"] = Field(
+        default="local", description="Compute statistics in-process (local) or with Gemini code execution (llm)"
+    )
+    narrate: bool = Field(default=False, description="In local mode, also ask Gemini to summarize the statistics")
+
+
+class EatingPatternsRequest(AnalyticsRequest):
+    mode: Literal["local", "llm"] = Field(
+        default="local", description="Analyze patterns in-process (local) or with Gemini code execution (llm)"
+    )
+    narrate: bool = Field(default=False, description="In local mode, also ask Gemini to describe the patterns")
+
+
 class ComparePeriodsRequest(BaseModel):
     period1_start: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
     period1_end: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
     period2_start: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
     period2_end: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
+    mode: Literal["local", "llm"] = Field(
+        default="local", description="Compare in-process (local) or with Gemini code execution (llm)"
+    )
+    narrate: bool = Field(default=False, description="In local mode, also ask Gemini to describe the comparison")
 
 
 # --- Routes ---
@@ -49,40 +71,61 @@ class ComparePeriodsRequest(BaseModel):
 @limiter.limit(RATE_LIMIT_PROFILE)
 async def get_nutrition_analytics(
     request: Request,
-    analytics_request: AnalyticsRequest,
+    analytics_request: NutritionStatsRequest,
     user: AuthenticatedUser = Depends(require_write_access),
 ) -> dict[str, Any]:
     """
-    Calculate nutrition statistics using Gemini code execution.
+    Calculate nutrition statistics.
 
     Returns computed metrics:
     - Daily averages
     - Macronutrient ratios
     - Calorie trends
+
+    By default the numbers are computed in-process without calling Gemini;
+    ``narrate`` adds a short Gemini summary of them, and ``mode="llm"`` uses
+    Gemini code execution instead.
     """
-    meals = await get_meals(user.user_id, days=analytics_request.days, include_nutrition=True)
-    result = await calculate_nutrition_stats(meals)
-    return {"stats": result, "period_days": analytics_request.days, "meal_count": len(meals)}
+
+    async def compute() -> dict[str, Any]:
+        meals = await get_meals(user.user_id, days=analytics_request.days, include_nutrition=True)
+        result = await calculate_nutrition_stats(meals, mode=analytics_request.mode, narrate=analytics_request.narrate)
+        return {"stats": result, "period_days": analytics_request.days, "meal_count": len(meals)}
+
+    return await result_cache.get_or_compute(
+        "analytics.nutrition", user.user_id, analytics_request.model_dump(), compute, data_version=get_data_version
+    )
 
 
 @router.post("/analytics/patterns")
 @limiter.limit(RATE_LIMIT_PROFILE)
 async def get_eating_patterns(
     request: Request,
-    analytics_request: AnalyticsRequest,
+    analytics_request: EatingPatternsRequest,
     user: AuthenticatedUser = Depends(require_write_access),
 ) -> dict[str, Any]:
     """
-    Analyze eating patterns using code execution.
+    Analyze eating patterns.
 
     Identifies:
     - Meal timing patterns
-    - Cuisine preferences by day
+    - Cuisine preferences by week
     - Weekend vs weekday differences
+    - Home cooking vs restaurant ratio, top venues and food variety
+
+    By default the patterns are computed in-process without calling Gemini;
+    ``narrate`` adds a short Gemini description of them, and ``mode="llm"``
+    uses Gemini code execution instead.
     """
-    meals = await get_meals(user.user_id, days=analytics_request.days, include_nutrition=True)
-    result = await analyze_eating_patterns(meals)
-    return {"patterns": result, "period_days": analytics_request.days}
+
+    async def compute() -> dict[str, Any]:
+        meals = await get_meals(user.user_id, days=analytics_request.days, include_nutrition=True)
+        result = await analyze_eating_patterns(meals, mode=analytics_request.mode, narrate=analytics_request.narrate)
+        return {"patterns": result, "period_days": analytics_request.days}
+
+    return await result_cache.get_or_compute(
+        "analytics.patterns", user.user_id, analytics_request.model_dump(), compute, data_version=get_data_version
+    )
 
 
 @router.post("/analytics/trends")
@@ -99,10 +142,18 @@ async def get_nutrition_trends(
     - Week-over-week changes
     - Rolling averages
     - Trend direction
+
+    Works from daily nutrition rollups (one row per day) rather than raw logs.
     """
-    meals = await get_meals(user.user_id, days=analytics_request.days, include_nutrition=True)
-    result = await calculate_trend_report(meals)
-    return {"trends": result, "period_days": analytics_request.days}
+
+    async def compute() -> dict[str, Any]:
+        daily = await get_daily_nutrition(user.user_id, days=analytics_request.days)
+        result = await calculate_trend_report(daily)
+        return {"trends": result, "period_days": analytics_request.days}
+
+    return await result_cache.get_or_compute(
+        "analytics.trends", user.user_id, analytics_request.model_dump(), compute, data_version=get_data_version
+    )
 
 
 @router.post("/analytics/compare")
@@ -119,6 +170,10 @@ async def compare_nutrition_periods(
     - Before/after diet changes
     - Seasonal comparisons
     - Progress tracking
+
+    By default both periods are summarized in-process without calling
+    Gemini; ``narrate`` adds a short Gemini description of the comparison,
+    and ``mode="llm"`` uses Gemini code execution instead.
     """
     from datetime import UTC, datetime
 
@@ -132,21 +187,28 @@ async def compare_nutrition_periods(
         hour=23, minute=59, second=59, microsecond=999999, tzinfo=UTC
     )
 
-    # Get meals for both periods separately
-    period1_logs = await get_meals(
-        user.user_id, limit=1000, include_nutrition=True, start_date=p1_start, end_date=p1_end
-    )
-    period2_logs = await get_meals(
-        user.user_id, limit=1000, include_nutrition=True, start_date=p2_start, end_date=p2_end
-    )
-
-    result = await compare_periods(
-        period1_logs,
-        period2_logs,
-        period1_name=f"{compare_request.period1_start} to {compare_request.period1_end}",
-        period2_name=f"{compare_request.period2_start} to {compare_request.period2_end}",
+    async def compute() -> dict[str, Any]:
+        # Get meals for both periods separately
+        period1_logs = await get_meals(
+            user.user_id, limit=1000, include_nutrition=True, start_date=p1_start, end_date=p1_end
+        )
+        period2_logs = await get_meals(
+            user.user_id, limit=1000, include_nutrition=True, start_date=p2_start, end_date=p2_end
+        )
+
+        result = await compare_periods(
+            period1_logs,
+            period2_logs,
+            period1_name=f"{compare_request.period1_start} to {compare_request.period1_end}",
+            period2_name=f"{compare_request.period2_start} to {compare_request.period2_end}",
+            mode=compare_request.mode,
+            narrate=compare_request.narrate,
+        )
+        return {"comparison": result}
+
+    return await result_cache.get_or_compute(
+        "analytics.compare", user.user_id, compare_request.model_dump(), compute, data_version=get_data_version
     )
-    return {"comparison": result}
 
 
 @router.get("/analytics/report")
@@ -161,6 +223,12 @@ async def get_nutrition_report(
 
     Combines multiple analyses into a single report.
     """
-    meals = await get_meals(user.user_id, days=days, include_nutrition=True)
-    result = await generate_nutrition_report(meals)
-    return {"report": result, "period_days": days, "meal_count": len(meals)}
+
+    async def compute() -> dict[str, Any]:
+        meals = await get_meals(user.user_id, days=days, include_nutrition=True)
+        result = await generate_nutrition_report(meals)
+        return {"report": result, "period_days": days, "meal_count": len(meals)}
+
+    return await result_cache.get_or_compute(
+        "analytics.report", user.user_id, {"days": days}, compute, data_version=get_data_version
+    )
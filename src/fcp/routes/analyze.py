@@ -2,11 +2,13 @@
 
 Food image analysis endpoints:
 - POST /analyze - Basic image analysis
-- POST /analyze/stream - Streaming analysis for real-time UI
+- POST /analyze/stream - Streaming analysis for real-time UI (text, or fields as they complete)
 - POST /analyze/v2 - Function calling version
 - POST /analyze/thinking - Extended thinking for complex dishes
 """
 
+import json
+
 from fastapi import Depends, Query, Request
 from fastapi.responses import StreamingResponse
 
@@ -51,6 +53,7 @@ async def analyze_image_stream(
     analyze_request: AnalyzeRequest,
     user: AuthenticatedUser = Depends(require_write_access),
     gemini: GeminiClient = Depends(get_gemini),
+    events: bool = Query(default=False, description="Send each field as it completes instead of raw text"),
 ):
     """
     Stream food image analysis for real-time UI updates. Requires authentication.
@@ -58,6 +61,13 @@ async def analyze_image_stream(
     Returns Server-Sent Events (SSE) with analysis chunks as they're generated.
     Perfect for showing AI "thinking" in the Flutter app.
 
+    With ``?events=true`` the analysis is parsed while it streams and each
+    event names its kind, with ``{"path": [...], "value": ...}`` as data:
+    ``partial`` for more text of a string still being written, ``field`` and
+    ``item`` for each completed value (``dish_name`` typically arrives well
+    before the rest), ``done`` for the whole analysis and ``error`` if the
+    response was not valid JSON.
+
     Usage (Flutter):
         final client = http.Client();
         final request = http.Request('POST', Uri.parse('$baseUrl/analyze/stream'));
@@ -66,9 +76,18 @@ async def analyze_image_stream(
             setState(() { _analysisText += chunk; });
         }
     """
+    prompt = PROMPTS.get("analyze_meal", "Analyze this food image and describe it in detail.")
+
+    async def generate_events():
+        try:
+            async for event in gemini.generate_json_events(prompt, image_url=analyze_request.image_url):
+                data = json.dumps({"path": list(event.path), "value": event.value})
+                yield f"event: {event.kind}\ndata: {data}\n\n"
+        except ValueError:
+            yield f"event: error\ndata: {json.dumps({'message': 'Analysis was not valid JSON'})}\n\n"
+        yield "data: [DONE]\n\n"
 
     async def generate():
-        prompt = PROMPTS.get("analyze_meal", "Analyze this food image and describe it in detail.")
         async for chunk in gemini.generate_content_stream(prompt, image_url=analyze_request.image_url):
             # SSE format: "data: <content>\n\n"
             # Escape newlines in chunk to maintain SSE protocol
@@ -78,7 +97,7 @@ async def analyze_image_stream(
         yield "data: [DONE]\n\n"
 
     return StreamingResponse(
-        generate(),
+        generate_events() if events else generate(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -21,7 +21,7 @@ from fcp.routes.schemas import ActionResponse, MealDetailResponse, MealListRespo
 from fcp.security.input_sanitizer import sanitize_user_input
 from fcp.security.rate_limit import RATE_LIMIT_CRUD, limiter
 from fcp.services.storage import get_storage_client, is_storage_configured
-from fcp.tools import add_meal, delete_meal, get_meal, get_meals, update_meal
+from fcp.tools import add_meal, delete_meal, get_meal, get_meals_page, update_meal
 from fcp.tools.analyze import analyze_meal, analyze_meal_from_bytes
 
 # Constants for image upload validation
@@ -192,16 +192,25 @@ async def list_meals(
     limit: int = Query(default=10, ge=1, le=100),
     days: int | None = Query(default=None, ge=1, le=365),
     include_nutrition: bool = Query(default=False),
+    cursor: str | None = Query(default=None, max_length=512),
     user: AuthenticatedUser = Depends(get_current_user),
 ) -> MealListResponse:
-    """Get user's food logs."""
-    meals = await get_meals(
-        user.user_id,
-        limit=limit,
-        days=days,
-        include_nutrition=include_nutrition,
-    )
-    return MealListResponse(meals=meals, count=len(meals))
+    """Get user's food logs, newest first.
+
+    Pass the ``next_cursor`` from a previous response as ``cursor`` to fetch the
+    following page; a null ``next_cursor`` means there are no more meals.
+    """
+    try:
+        meals, next_cursor = await get_meals_page(
+            user.user_id,
+            limit=limit,
+            days=days,
+            include_nutrition=include_nutrition,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return MealListResponse(meals=meals, count=len(meals), next_cursor=next_cursor)
 
 
 @router.get("/meals/{log_id}", response_model=MealDetailResponse)
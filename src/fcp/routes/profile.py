@@ -15,7 +15,8 @@ import time
 from typing import Any
 
 from fastapi import Depends, HTTPException, Query, Request
-from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 
 from fcp.auth import AuthenticatedUser, get_current_user
 from fcp.routes.router import APIRouter
@@ -23,6 +24,7 @@ from fcp.security.input_sanitizer import sanitize_user_input
 from fcp.security.rate_limit import RATE_LIMIT_PROFILE, limiter
 from fcp.services.firestore import firestore_client
 from fcp.services.gemini import GeminiClient, get_gemini
+from fcp.services.log_row import LogRow, dumps
 from fcp.tools import get_meals, get_taste_profile
 
 # Valid period values for profile endpoints
@@ -166,7 +168,18 @@ Food History:
     )
 
 
-@router.get("/profile/lifetime")
+def _meals_page_response(meals: list[dict[str, Any]], payload: dict[str, Any]) -> Response:
+    """JSON response of ``{"meals": meals, **payload}``.
+
+    SQLite logs are written with ``LogRow.to_json`` so their stored JSON
+    columns go into the body without being decoded and re-encoded.
+    """
+    encoded = ",".join(meal.to_json() if isinstance(meal, LogRow) else dumps(jsonable_encoder(meal)) for meal in meals)
+    rest = dumps(jsonable_encoder(payload))[1:]
+    return Response(content=f'{{"meals":[{encoded}],{rest}', media_type="application/json")
+
+
+@router.get("/profile/lifetime", response_model=None)
 @limiter.limit(RATE_LIMIT_PROFILE)
 async def get_lifetime_profile(
     request: Request,
@@ -175,7 +188,7 @@ async def get_lifetime_profile(
     page_size: int = Query(default=100, ge=10, le=500, description="Items per page"),
     refresh: bool = Query(default=False, description="Bypass cache and re-analyze"),
     gemini: GeminiClient = Depends(get_gemini),
-) -> dict[str, Any]:
+) -> dict[str, Any] | Response:
     """
     Analyze user's complete food history using 1M context window.
 
@@ -219,17 +232,19 @@ async def get_lifetime_profile(
 
     if page != 1 and not refresh:
         # For subsequent pages, just return the paginated data without re-analysis
-        return {
-            "meals": meals,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total_count": total_count,
-                "total_pages": total_pages,
-                "has_more": has_more,
+        return _meals_page_response(
+            meals,
+            {
+                "pagination": {
+                    "page": page,
+                    "page_size": page_size,
+                    "total_count": total_count,
+                    "total_pages": total_pages,
+                    "has_more": has_more,
+                },
+                "note": "Analysis is only performed on page 1. Use page=1 or refresh=true to get analysis.",
             },
-            "note": "Analysis is only performed on page 1. Use page=1 or refresh=true to get analysis.",
-        }
+        )
     all_meals = await firestore_client.get_all_user_logs(user.user_id, limit=_ANALYSIS_LIMIT)
     analyzed_count = len(all_meals)
     is_capped = total_count > _ANALYSIS_LIMIT
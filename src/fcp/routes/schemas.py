@@ -81,6 +81,7 @@ class MealListResponse(BaseModel):
 
     meals: list[MealLog]
     count: int
+    next_cursor: str | None = None
 
 
 class MealDetailResponse(BaseModel):
@@ -13,6 +13,7 @@ from apscheduler.triggers.cron import CronTrigger
 
 from fcp.agents import ContentGeneratorAgent, FreshnessAgent
 from fcp.services.firestore import firestore_client, get_firestore_status
+from fcp.services.gemini_governor import Priority, gemini_priority
 from fcp.tools import get_meals, get_taste_profile
 
 logger = logging.getLogger(__name__)
@@ -94,6 +95,7 @@ async def generate_daily_insight_for_user(user_id: str) -> dict[str, Any] | None
         return None
 
 
+@gemini_priority(Priority.BACKGROUND)
 async def run_daily_insights_job():
     """Run daily insights for all active users."""
     ready, reason = _firestore_ready()
@@ -184,6 +186,7 @@ async def generate_weekly_digest_for_user(user_id: str) -> dict[str, Any] | None
         return None
 
 
+@gemini_priority(Priority.BACKGROUND)
 async def run_weekly_digests_job():
     """Run weekly digests for all active users."""
     ready, reason = _firestore_ready()
@@ -275,6 +278,7 @@ async def check_and_celebrate_streak(user_id: str) -> dict[str, Any] | None:
         return None
 
 
+@gemini_priority(Priority.BACKGROUND)
 async def run_streak_checks_job():
     """Check streaks for all active users."""
     ready, reason = _firestore_ready()
@@ -359,6 +363,7 @@ async def generate_seasonal_reminder_for_user(user_id: str) -> dict[str, Any] |
         return None
 
 
+@gemini_priority(Priority.BACKGROUND)
 async def run_seasonal_reminders_job():
     """Run seasonal reminders for all active users."""
     ready, reason = _firestore_ready()
@@ -437,6 +442,7 @@ async def generate_food_tip_for_user(user_id: str) -> dict[str, Any] | None:
         return None
 
 
+@gemini_priority(Priority.BACKGROUND)
 async def run_food_tips_job():
     """Run food tips for all active users."""
     ready, reason = _firestore_ready()
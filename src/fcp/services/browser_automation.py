@@ -10,6 +10,7 @@ from typing import Any
 from pydantic import BaseModel
 
 from fcp.security.url_validator import validate_browser_url
+from fcp.services.gemini_governor import gemini_governor
 
 
 class BrowserAction(BaseModel):
@@ -213,7 +214,8 @@ Current page screenshot is attached."""
             ),
         ]
 
-        return await self.client.aio.models.generate_content(
+        return await gemini_governor.generate_content(
+            self.client,
             model=self.MODEL,
             contents=history,
             config=types.GenerateContentConfig(
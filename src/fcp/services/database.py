@@ -1,15 +1,36 @@
 """SQLite database backend for FCP."""
 
+import asyncio
 import json
 import logging
+import math
 import os
-from datetime import UTC, datetime, timedelta
+import sqlite3
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, timedelta
+from itertools import groupby
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
 import aiosqlite
 
+from fcp.services.log_row import LogRow
+from fcp.services.log_search import FIELD_WEIGHTS, fts_match_expression
+from fcp.services.nutrition_rollups import (
+    NUTRIENTS,
+    ROLLUP_LOG_FIELDS,
+    cuisine_key,
+    empty_rollup,
+    log_day,
+    rollups_from_logs,
+)
+from fcp.services.pagination import decode_log_cursor, encode_log_cursor
+from fcp.settings import settings
+from fcp.utils.metrics import record_db_commit
+
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(os.environ.get("FCP_DATA_DIR", "data"))
@@ -122,6 +143,422 @@ CREATE TABLE IF NOT EXISTS receipts (
 );
 """
 
+# How a log's created_at and cuisine map onto the stats aggregates. A log
+# counts towards the calendar day written in its timestamp (only when that
+# prefix is a real date) and cuisines compare case-insensitively. Kept in
+# step with ``log_day`` and ``cuisine_key`` in ``fcp.services.nutrition_rollups``.
+_LOG_DAY_SQL = "CASE WHEN date(substr({col}, 1, 10)) = substr({col}, 1, 10) THEN substr({col}, 1, 10) END"
+_CUISINE_KEY_SQL = "NULLIF(lower({col}), '')"
+# How a log's nutrition and venue map onto the daily rollups, kept in step
+# with ``rollups_from_logs``: only numeric values of a nutrition object count.
+_HAS_NUTRITION_SQL = "CASE WHEN json_valid({col}) THEN json_type({col}) = 'object' ELSE 0 END"
+_NUTRIENT_SQL = (
+    "CASE WHEN json_valid({col}) THEN "
+    "CASE WHEN json_type({col}, '$.{key}') IN ('integer', 'real') THEN json_extract({col}, '$.{key}') END END"
+)
+_VENUE_KEY_SQL = "NULLIF({col}, '')"
+
+
+def _rollup_event_sql(prefix: str) -> str:
+    """Select list of a ``daily_nutrition_events`` row for a ``food_logs`` row (minus ``delta``)."""
+    nutrients = ", ".join(_NUTRIENT_SQL.format(col=f"{prefix}nutrition", key=key) for key in NUTRIENTS)
+    return (
+        f"{prefix}user_id, {_LOG_DAY_SQL.format(col=f'{prefix}created_at')}, "
+        f"{_CUISINE_KEY_SQL.format(col=f'{prefix}cuisine')}, {_VENUE_KEY_SQL.format(col=f'{prefix}venue_name')}, "
+        f"{_HAS_NUTRITION_SQL.format(col=f'{prefix}nutrition')}, {nutrients}"
+    )
+
+
+# Versioned schema migrations, tracked through ``PRAGMA user_version``.
+# Each entry is applied exactly once, in order, on top of ``_CREATE_TABLES``.
+# Never edit a released entry; append a new version instead.
+_MIGRATIONS: tuple[tuple[int, str], ...] = (
+    (
+        1,
+        """
+CREATE INDEX IF NOT EXISTS idx_food_logs_user_deleted_created
+    ON food_logs (user_id, deleted, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_pantry_user
+    ON pantry (user_id);
+CREATE INDEX IF NOT EXISTS idx_recipes_user_archived_favorite_created
+    ON recipes (user_id, is_archived, is_favorite, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_drafts_user_created
+    ON drafts (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_published_user_published
+    ON published (user_id, published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+    ON notifications (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+    ON notifications (user_id, created_at DESC) WHERE read = 0;
+CREATE INDEX IF NOT EXISTS idx_users_last_active
+    ON users (last_active);
+""",
+    ),
+    (
+        2,
+        """
+DROP INDEX IF EXISTS idx_food_logs_user_deleted_created;
+CREATE INDEX IF NOT EXISTS idx_food_logs_user_deleted_created_id
+    ON food_logs (user_id, deleted, created_at DESC, id DESC);
+""",
+    ),
+    (
+        3,
+        # External-content FTS5 index keyed on food_logs.rowid. The triggers keep
+        # it in sync; anything that renumbers rowids (e.g. VACUUM) must be
+        # followed by INSERT INTO food_logs_fts(food_logs_fts) VALUES ('rebuild').
+        """
+CREATE VIRTUAL TABLE IF NOT EXISTS food_logs_fts USING fts5(
+    dish_name, venue_name, cuisine, notes, ingredients,
+    content='food_logs', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS food_logs_fts_insert AFTER INSERT ON food_logs BEGIN
+    INSERT INTO food_logs_fts (rowid, dish_name, venue_name, cuisine, notes, ingredients)
+    VALUES (new.rowid, new.dish_name, new.venue_name, new.cuisine, new.notes, new.ingredients);
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_fts_delete AFTER DELETE ON food_logs BEGIN
+    INSERT INTO food_logs_fts (food_logs_fts, rowid, dish_name, venue_name, cuisine, notes, ingredients)
+    VALUES ('delete', old.rowid, old.dish_name, old.venue_name, old.cuisine, old.notes, old.ingredients);
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_fts_update
+AFTER UPDATE OF dish_name, venue_name, cuisine, notes, ingredients ON food_logs BEGIN
+    INSERT INTO food_logs_fts (food_logs_fts, rowid, dish_name, venue_name, cuisine, notes, ingredients)
+    VALUES ('delete', old.rowid, old.dish_name, old.venue_name, old.cuisine, old.notes, old.ingredients);
+    INSERT INTO food_logs_fts (rowid, dish_name, venue_name, cuisine, notes, ingredients)
+    VALUES (new.rowid, new.dish_name, new.venue_name, new.cuisine, new.notes, new.ingredients);
+END;
+INSERT INTO food_logs_fts (food_logs_fts) VALUES ('rebuild');
+""",
+    ),
+    (
+        4,
+        # Incrementally maintained user stats. Every live log contributes one
+        # event (user_id, day, cuisine, +1) and removing it contributes -1; the
+        # INSTEAD OF trigger on user_stats_events folds an event into per-day
+        # counts, per-cuisine counts, a total and the consecutive-day runs
+        # (user_streaks) with a constant number of key lookups. Because the
+        # food_logs triggers run inside the writing statement, the aggregate
+        # always commits atomically with the log change.
+        """
+CREATE TABLE IF NOT EXISTS user_log_totals (
+    user_id TEXT PRIMARY KEY,
+    total_logs INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_log_days (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    log_count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_cuisines (
+    user_id TEXT NOT NULL,
+    cuisine TEXT NOT NULL,
+    log_count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, cuisine)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_streaks (
+    user_id TEXT NOT NULL,
+    start_day TEXT NOT NULL,
+    end_day TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (user_id, start_day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_streaks_user_end ON user_streaks (user_id, end_day);
+CREATE INDEX IF NOT EXISTS idx_user_streaks_user_length ON user_streaks (user_id, length);
+
+CREATE VIEW IF NOT EXISTS user_stats_events (user_id, day, cuisine, delta) AS
+    SELECT NULL, NULL, NULL, NULL WHERE 0;
+
+CREATE TRIGGER IF NOT EXISTS user_stats_events_apply INSTEAD OF INSERT ON user_stats_events BEGIN
+    INSERT INTO user_log_totals (user_id, total_logs) VALUES (NEW.user_id, NEW.delta)
+        ON CONFLICT (user_id) DO UPDATE SET total_logs = total_logs + NEW.delta;
+
+    INSERT INTO user_cuisines (user_id, cuisine, log_count)
+        SELECT NEW.user_id, NEW.cuisine, NEW.delta WHERE NEW.cuisine IS NOT NULL
+        ON CONFLICT (user_id, cuisine) DO UPDATE SET log_count = log_count + NEW.delta;
+    DELETE FROM user_cuisines WHERE user_id = NEW.user_id AND cuisine = NEW.cuisine AND log_count <= 0;
+
+    INSERT INTO user_log_days (user_id, day, log_count)
+        SELECT NEW.user_id, NEW.day, NEW.delta WHERE NEW.day IS NOT NULL
+        ON CONFLICT (user_id, day) DO UPDATE SET log_count = log_count + NEW.delta;
+
+    -- A day that just gained its first log extends the run ending the day
+    -- before (or starts a new run) and absorbs the run starting the day after.
+    UPDATE user_streaks
+        SET end_day = COALESCE(
+                (SELECT r.end_day FROM user_streaks AS r
+                 WHERE r.user_id = NEW.user_id AND r.start_day = date(NEW.day, '+1 day')),
+                NEW.day),
+            length = CAST(julianday(COALESCE(
+                (SELECT r.end_day FROM user_streaks AS r
+                 WHERE r.user_id = NEW.user_id AND r.start_day = date(NEW.day, '+1 day')),
+                NEW.day)) - julianday(start_day) AS INTEGER) + 1
+        WHERE user_id = NEW.user_id AND end_day = date(NEW.day, '-1 day')
+          AND NEW.delta > 0
+          AND (SELECT log_count FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day) = 1;
+    INSERT INTO user_streaks (user_id, start_day, end_day, length)
+        SELECT NEW.user_id, NEW.day, e, CAST(julianday(e) - julianday(NEW.day) AS INTEGER) + 1
+        FROM (SELECT COALESCE(
+                (SELECT r.end_day FROM user_streaks AS r
+                 WHERE r.user_id = NEW.user_id AND r.start_day = date(NEW.day, '+1 day')),
+                NEW.day) AS e)
+        WHERE NEW.delta > 0
+          AND (SELECT log_count FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day) = 1
+          AND NOT EXISTS (SELECT 1 FROM user_streaks AS r
+                          WHERE r.user_id = NEW.user_id AND r.end_day = e AND r.start_day < NEW.day);
+    DELETE FROM user_streaks
+        WHERE user_id = NEW.user_id AND start_day = date(NEW.day, '+1 day')
+          AND NEW.delta > 0
+          AND (SELECT log_count FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day) = 1;
+
+    -- A day that lost its last log splits the run containing it in two.
+    INSERT INTO user_streaks (user_id, start_day, end_day, length)
+        SELECT user_id, date(NEW.day, '+1 day'), end_day, CAST(julianday(end_day) - julianday(NEW.day) AS INTEGER)
+        FROM user_streaks
+        WHERE user_id = NEW.user_id
+          AND start_day = (SELECT MAX(start_day) FROM user_streaks WHERE user_id = NEW.user_id AND start_day <= NEW.day)
+          AND end_day > NEW.day
+          AND NEW.delta < 0
+          AND (SELECT log_count FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day) = 0;
+    UPDATE user_streaks
+        SET end_day = date(NEW.day, '-1 day'),
+            length = CAST(julianday(NEW.day) - julianday(start_day) AS INTEGER)
+        WHERE user_id = NEW.user_id
+          AND start_day = (SELECT MAX(start_day) FROM user_streaks WHERE user_id = NEW.user_id AND start_day <= NEW.day)
+          AND start_day < NEW.day
+          AND NEW.delta < 0
+          AND (SELECT log_count FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day) = 0;
+    DELETE FROM user_streaks
+        WHERE user_id = NEW.user_id AND start_day = NEW.day
+          AND NEW.delta < 0
+          AND (SELECT log_count FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day) = 0;
+    DELETE FROM user_log_days WHERE user_id = NEW.user_id AND day = NEW.day AND log_count <= 0;
+END;
+
+CREATE VIEW IF NOT EXISTS user_stats_rebuilds (user_id) AS SELECT NULL WHERE 0;
+
+CREATE TRIGGER IF NOT EXISTS user_stats_rebuilds_apply INSTEAD OF INSERT ON user_stats_rebuilds BEGIN
+    DELETE FROM user_log_totals WHERE user_id = NEW.user_id;
+    DELETE FROM user_log_days WHERE user_id = NEW.user_id;
+    DELETE FROM user_cuisines WHERE user_id = NEW.user_id;
+    DELETE FROM user_streaks WHERE user_id = NEW.user_id;
+    INSERT INTO user_stats_events (user_id, day, cuisine, delta)
+        SELECT user_id, {day}, {cuisine}, 1 FROM food_logs WHERE user_id = NEW.user_id AND deleted = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS food_logs_stats_insert AFTER INSERT ON food_logs WHEN NEW.deleted = 0 BEGIN
+    INSERT INTO user_stats_events (user_id, day, cuisine, delta)
+        VALUES (NEW.user_id, {new_day}, {new_cuisine}, 1);
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_stats_delete AFTER DELETE ON food_logs WHEN OLD.deleted = 0 BEGIN
+    INSERT INTO user_stats_events (user_id, day, cuisine, delta)
+        VALUES (OLD.user_id, {old_day}, {old_cuisine}, -1);
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_stats_update AFTER UPDATE OF user_id, created_at, cuisine, deleted ON food_logs
+WHEN OLD.user_id IS NOT NEW.user_id OR OLD.created_at IS NOT NEW.created_at
+  OR OLD.cuisine IS NOT NEW.cuisine OR OLD.deleted IS NOT NEW.deleted BEGIN
+    INSERT INTO user_stats_events (user_id, day, cuisine, delta)
+        SELECT OLD.user_id, {old_day}, {old_cuisine}, -1 WHERE OLD.deleted = 0;
+    INSERT INTO user_stats_events (user_id, day, cuisine, delta)
+        SELECT NEW.user_id, {new_day}, {new_cuisine}, 1 WHERE NEW.deleted = 0;
+END;
+
+INSERT INTO user_stats_rebuilds (user_id) SELECT DISTINCT user_id FROM food_logs;
+""".format(
+            day=_LOG_DAY_SQL.format(col="created_at"),
+            cuisine=_CUISINE_KEY_SQL.format(col="cuisine"),
+            new_day=_LOG_DAY_SQL.format(col="NEW.created_at"),
+            new_cuisine=_CUISINE_KEY_SQL.format(col="NEW.cuisine"),
+            old_day=_LOG_DAY_SQL.format(col="OLD.created_at"),
+            old_cuisine=_CUISINE_KEY_SQL.format(col="OLD.cuisine"),
+        ),
+    ),
+    (
+        5,
+        # LogRow.to_json embeds stored JSON columns verbatim, so every value
+        # must be valid JSON. Older rows could hold plain text (stored as-is
+        # by _encode_json); quoting it keeps the decoded value unchanged.
+        """
+UPDATE food_logs SET tags = json_quote(tags) WHERE tags IS NOT NULL AND NOT json_valid(tags);
+UPDATE food_logs SET analysis = json_quote(analysis) WHERE analysis IS NOT NULL AND NOT json_valid(analysis);
+UPDATE food_logs SET nutrition = json_quote(nutrition) WHERE nutrition IS NOT NULL AND NOT json_valid(nutrition);
+UPDATE food_logs SET ingredients = json_quote(ingredients) WHERE ingredients IS NOT NULL AND NOT json_valid(ingredients);
+UPDATE food_logs SET dietary_tags = json_quote(dietary_tags) WHERE dietary_tags IS NOT NULL AND NOT json_valid(dietary_tags);
+UPDATE food_logs SET allergens = json_quote(allergens) WHERE allergens IS NOT NULL AND NOT json_valid(allergens);
+UPDATE food_logs SET foodon = json_quote(foodon) WHERE foodon IS NOT NULL AND NOT json_valid(foodon);
+""",
+    ),
+    (
+        6,
+        # Daily nutrition rollups for the analytics routes, maintained the same
+        # way as the stats aggregates in migration 4: every live log contributes
+        # one event per (user, day) with its nutrients, cuisine and venue, and
+        # removing it contributes the same event with delta -1.
+        """
+CREATE TABLE IF NOT EXISTS daily_nutrition (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    meal_count INTEGER NOT NULL,
+    logs_with_nutrition INTEGER NOT NULL,
+    calories NUMERIC NOT NULL,
+    protein_g NUMERIC NOT NULL,
+    carbs_g NUMERIC NOT NULL,
+    fat_g NUMERIC NOT NULL,
+    fiber_g NUMERIC NOT NULL,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_cuisines (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    cuisine TEXT NOT NULL,
+    log_count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day, cuisine)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_venues (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    log_count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day, venue)
+) WITHOUT ROWID;
+
+CREATE VIEW IF NOT EXISTS daily_nutrition_events
+    (user_id, day, cuisine, venue, has_nutrition, calories, protein_g, carbs_g, fat_g, fiber_g, delta) AS
+    SELECT NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL WHERE 0;
+
+CREATE TRIGGER IF NOT EXISTS daily_nutrition_events_apply INSTEAD OF INSERT ON daily_nutrition_events
+WHEN NEW.day IS NOT NULL BEGIN
+    INSERT INTO daily_nutrition
+        (user_id, day, meal_count, logs_with_nutrition, calories, protein_g, carbs_g, fat_g, fiber_g)
+        VALUES (
+            NEW.user_id, NEW.day, NEW.delta, NEW.delta * NEW.has_nutrition,
+            NEW.delta * COALESCE(NEW.calories, 0), NEW.delta * COALESCE(NEW.protein_g, 0),
+            NEW.delta * COALESCE(NEW.carbs_g, 0), NEW.delta * COALESCE(NEW.fat_g, 0),
+            NEW.delta * COALESCE(NEW.fiber_g, 0)
+        )
+        ON CONFLICT (user_id, day) DO UPDATE SET
+            meal_count = meal_count + excluded.meal_count,
+            logs_with_nutrition = logs_with_nutrition + excluded.logs_with_nutrition,
+            calories = calories + excluded.calories,
+            protein_g = protein_g + excluded.protein_g,
+            carbs_g = carbs_g + excluded.carbs_g,
+            fat_g = fat_g + excluded.fat_g,
+            fiber_g = fiber_g + excluded.fiber_g;
+    DELETE FROM daily_nutrition WHERE user_id = NEW.user_id AND day = NEW.day AND meal_count <= 0;
+
+    INSERT INTO daily_cuisines (user_id, day, cuisine, log_count)
+        SELECT NEW.user_id, NEW.day, NEW.cuisine, NEW.delta WHERE NEW.cuisine IS NOT NULL
+        ON CONFLICT (user_id, day, cuisine) DO UPDATE SET log_count = log_count + NEW.delta;
+    DELETE FROM daily_cuisines
+        WHERE user_id = NEW.user_id AND day = NEW.day AND cuisine = NEW.cuisine AND log_count <= 0;
+
+    INSERT INTO daily_venues (user_id, day, venue, log_count)
+        SELECT NEW.user_id, NEW.day, NEW.venue, NEW.delta WHERE NEW.venue IS NOT NULL
+        ON CONFLICT (user_id, day, venue) DO UPDATE SET log_count = log_count + NEW.delta;
+    DELETE FROM daily_venues
+        WHERE user_id = NEW.user_id AND day = NEW.day AND venue = NEW.venue AND log_count <= 0;
+END;
+
+CREATE VIEW IF NOT EXISTS daily_nutrition_rebuilds (user_id) AS SELECT NULL WHERE 0;
+
+CREATE TRIGGER IF NOT EXISTS daily_nutrition_rebuilds_apply INSTEAD OF INSERT ON daily_nutrition_rebuilds BEGIN
+    DELETE FROM daily_nutrition WHERE user_id = NEW.user_id;
+    DELETE FROM daily_cuisines WHERE user_id = NEW.user_id;
+    DELETE FROM daily_venues WHERE user_id = NEW.user_id;
+    INSERT INTO daily_nutrition_events
+        SELECT {row}, 1 FROM food_logs WHERE user_id = NEW.user_id AND deleted = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS food_logs_rollup_insert AFTER INSERT ON food_logs WHEN NEW.deleted = 0 BEGIN
+    INSERT INTO daily_nutrition_events SELECT {new_row}, 1;
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_rollup_delete AFTER DELETE ON food_logs WHEN OLD.deleted = 0 BEGIN
+    INSERT INTO daily_nutrition_events SELECT {old_row}, -1;
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_rollup_update
+AFTER UPDATE OF user_id, created_at, cuisine, venue_name, nutrition, deleted ON food_logs
+WHEN OLD.user_id IS NOT NEW.user_id OR OLD.created_at IS NOT NEW.created_at OR OLD.cuisine IS NOT NEW.cuisine
+  OR OLD.venue_name IS NOT NEW.venue_name OR OLD.nutrition IS NOT NEW.nutrition OR OLD.deleted IS NOT NEW.deleted BEGIN
+    INSERT INTO daily_nutrition_events SELECT {old_row}, -1 WHERE OLD.deleted = 0;
+    INSERT INTO daily_nutrition_events SELECT {new_row}, 1 WHERE NEW.deleted = 0;
+END;
+
+INSERT INTO daily_nutrition_rebuilds (user_id) SELECT DISTINCT user_id FROM food_logs;
+""".format(
+            row=_rollup_event_sql(""),
+            new_row=_rollup_event_sql("NEW."),
+            old_row=_rollup_event_sql("OLD."),
+        ),
+    ),
+    (
+        7,
+        # Per-user data version for the result cache: every write to a user's
+        # food logs, pantry or preferences bumps it inside the writing
+        # statement, so a cached result keyed on the version it was computed
+        # from can never outlive the data it describes. Users without a row
+        # are at version 0.
+        """
+CREATE TABLE IF NOT EXISTS user_data_versions (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE VIEW IF NOT EXISTS user_data_changes (user_id) AS SELECT NULL WHERE 0;
+
+CREATE TRIGGER IF NOT EXISTS user_data_changes_apply INSTEAD OF INSERT ON user_data_changes BEGIN
+    INSERT INTO user_data_versions (user_id, version) VALUES (NEW.user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS food_logs_version_insert AFTER INSERT ON food_logs BEGIN
+    INSERT INTO user_data_changes (user_id) VALUES (NEW.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_version_delete AFTER DELETE ON food_logs BEGIN
+    INSERT INTO user_data_changes (user_id) VALUES (OLD.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS food_logs_version_update AFTER UPDATE ON food_logs BEGIN
+    INSERT INTO user_data_changes (user_id) SELECT NEW.user_id UNION SELECT OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS pantry_version_insert AFTER INSERT ON pantry BEGIN
+    INSERT INTO user_data_changes (user_id) VALUES (NEW.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS pantry_version_delete AFTER DELETE ON pantry BEGIN
+    INSERT INTO user_data_changes (user_id) VALUES (OLD.user_id);
+END;
+CREATE TRIGGER IF NOT EXISTS pantry_version_update AFTER UPDATE ON pantry BEGIN
+    INSERT INTO user_data_changes (user_id) SELECT NEW.user_id UNION SELECT OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_version_insert AFTER INSERT ON users WHEN NEW.preferences IS NOT NULL BEGIN
+    INSERT INTO user_data_changes (user_id) VALUES (NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS users_version_update AFTER UPDATE OF preferences ON users
+WHEN OLD.preferences IS NOT NEW.preferences BEGIN
+    INSERT INTO user_data_changes (user_id) VALUES (NEW.id);
+END;
+""",
+    ),
+    (
+        8,
+        # Materialized taste profiles, one per (user, period), with the log
+        # count and data version they were built from. Writing one is not a
+        # data change, so it does not bump the user's data version.
+        """
+CREATE TABLE IF NOT EXISTS taste_profiles (
+    user_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    log_count INTEGER NOT NULL,
+    data_version INTEGER NOT NULL,
+    built_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, period)
+) WITHOUT ROWID;
+""",
+    ),
+)
+
 _JSON_FIELDS_LOGS = frozenset(
     {
         "tags",
@@ -134,6 +571,38 @@ _JSON_FIELDS_LOGS = frozenset(
     }
 )
 _JSON_FIELDS_RECIPES = frozenset({"ingredients", "instructions", "tags", "nutrition"})
+
+# Columns a caller may project with ``fields=``; matches the food_logs schema.
+_LOG_COLUMNS = frozenset(
+    {
+        "id",
+        "user_id",
+        "dish_name",
+        "venue_name",
+        "notes",
+        "rating",
+        "tags",
+        "image_path",
+        "analysis",
+        "nutrition",
+        "cuisine",
+        "ingredients",
+        "spice_level",
+        "dietary_tags",
+        "allergens",
+        "processing_status",
+        "processing_error",
+        "occasion",
+        "ai_notes",
+        "foodon",
+        "donated",
+        "donation_organization",
+        "public",
+        "created_at",
+        "updated_at",
+        "deleted",
+    }
+)
 _JSON_FIELDS_DRAFTS = frozenset({"content", "source_log_ids"})
 _JSON_FIELDS_PUBLISHED = frozenset({"content", "platforms", "external_urls"})
 _JSON_FIELDS_NOTIFICATIONS = frozenset({"content"})
@@ -149,13 +618,43 @@ def _new_id() -> str:
     return uuid4().hex
 
 
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def _finite(value: Any) -> Any:
+    """``value`` with NaN and infinite floats replaced by None, which JSON can represent."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [_finite(v) for v in value]
+    return value
+
+
 def _encode_json(data: dict[str, Any], json_fields: frozenset[str]) -> dict[str, Any]:
-    """Encode JSON fields in a dict for storage."""
+    """Encode JSON fields in a dict for storage.
+
+    Strings that already hold JSON are stored as-is; any other string is
+    stored as a JSON string literal, so JSON columns always hold valid JSON
+    and decode back to the value that was written. ``NaN`` and ``Infinity``
+    are not JSON: strings using them count as plain text, and non-finite
+    floats in other values are stored as null.
+    """
     out = dict(data)
     for k in json_fields:
         if k in out and out[k] is not None:
             if not isinstance(out[k], str):
-                out[k] = json.dumps(out[k])
+                try:
+                    out[k] = json.dumps(out[k], allow_nan=False)
+                except ValueError:
+                    out[k] = json.dumps(_finite(out[k]))
+            else:
+                try:
+                    json.loads(out[k], parse_constant=_reject_constant)
+                except ValueError:
+                    out[k] = json.dumps(out[k])
     return out
 
 
@@ -176,27 +675,168 @@ def _decode_json(row: dict[str, Any], json_fields: frozenset[str]) -> dict[str,
     return out
 
 
+def _empty_stats() -> dict[str, Any]:
+    return {
+        "current_streak": 0,
+        "longest_streak": 0,
+        "total_logs": 0,
+        "cuisines_tried": 0,
+        "first_log_date": None,
+        "last_log_date": None,
+    }
+
+
+def _stats_from_logs(logs: list[tuple[str | None, str | None]], today: date) -> dict[str, Any]:
+    """Compute user stats from scratch from ``(created_at, cuisine)`` pairs of live logs.
+
+    This is the reference the trigger-maintained aggregate is checked against.
+    """
+    if not logs:
+        return _empty_stats()
+    days = {d for d in (log_day(created_at) for created_at, _ in logs) if d}
+    log_dates = {date.fromisoformat(d) for d in days}
+    cuisines = {c for c in (cuisine_key(cuisine) for _, cuisine in logs) if c}
+
+    current_streak = 0
+    check_date = today if today in log_dates else today - timedelta(days=1)
+    while check_date in log_dates:
+        current_streak += 1
+        check_date -= timedelta(days=1)
+
+    longest_streak = 0
+    run = 0
+    previous = None
+    for d in sorted(log_dates):
+        run = run + 1 if previous is not None and (d - previous).days == 1 else 1
+        longest_streak = max(longest_streak, run)
+        previous = d
+
+    return {
+        "current_streak": current_streak,
+        "longest_streak": max(longest_streak, current_streak),
+        "total_logs": len(logs),
+        "cuisines_tried": len(cuisines),
+        "first_log_date": min(days) if days else None,
+        "last_log_date": max(days) if days else None,
+    }
+
+
+def _log_columns(fields: Sequence[str] | None, prefix: str = "") -> str:
+    """Return the SELECT column list for a log projection.
+
+    ``None`` selects every column. Otherwise ``id`` is always included so
+    callers can still address the rows they get back.
+    """
+    if fields is None:
+        return f"{prefix}*"
+    unknown = set(fields) - _LOG_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown food log fields: {', '.join(sorted(unknown))}")
+    return ", ".join(f"{prefix}{col}" for col in dict.fromkeys(("id", *fields)))
+
+
 def _row_to_dict(row: aiosqlite.Row) -> dict[str, Any]:
     """Convert a sqlite Row to a plain dict."""
     return dict(row)
 
 
+def _run_batch(conn: sqlite3.Connection, statements: list[tuple[str, list[list[Any]]]]) -> None:
+    """Run ``statements`` under a savepoint: either all of them take effect or none does.
+
+    The savepoint sits inside the open transaction, so a successful batch is
+    left for the group commit like any other write.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute("SAVEPOINT batch")
+    try:
+        for sql, rows in statements:
+            conn.executemany(sql, rows)
+    except BaseException:
+        conn.execute("ROLLBACK TO batch")
+        conn.execute("RELEASE batch")
+        raise
+    conn.execute("RELEASE batch")
+
+
 class Database:
-    """Async SQLite database backend."""
+    """Async SQLite database backend.
+
+    File-backed databases run in WAL mode with one writer connection and a
+    pool of read-only connections, so reads never queue behind a commit.
+    In-memory databases are private to a single connection and therefore
+    always use the writer for everything.
+    """
 
-    def __init__(self, db_path: str | Path | None = None):
+    def __init__(self, db_path: str | Path | None = None, reader_pool_size: int | None = None):
         self._db_path = str(db_path) if db_path else str(DB_PATH)
         self._db: aiosqlite.Connection | None = None
+        if reader_pool_size is None:
+            reader_pool_size = settings.sqlite_reader_connections
+        self._reader_pool_size = 0 if self._is_memory else max(reader_pool_size, 0)
+        self._readers: list[aiosqlite.Connection] = []
+        self._idle_readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._connect_lock = asyncio.Lock()
+        self._pending_commits: list[asyncio.Future[None]] = []
+        self._commit_task: asyncio.Task[None] | None = None
+        self._batch_full = asyncio.Event()
+
+    @property
+    def _is_memory(self) -> bool:
+        return self._db_path == ":memory:"
 
     async def connect(self) -> None:
         """Initialize DB and create tables."""
-        if self._db_path != ":memory:":
+        if not self._is_memory:
             Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
         self._db = await aiosqlite.connect(self._db_path)
         self._db.row_factory = aiosqlite.Row
+        await self._configure_connection(self._db)
         await self._db.executescript(_CREATE_TABLES)
         await self._migrate_food_logs_columns()
         await self._db.commit()
+        await self._apply_migrations()
+        await self._open_readers()
+
+    async def _configure_connection(self, conn: aiosqlite.Connection, *, read_only: bool = False) -> None:
+        """Apply per-connection pragmas (values are trusted ints from settings)."""
+        if not self._is_memory and not read_only:
+            # journal_mode is persistent in the database file, so the writer sets it once.
+            await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        await conn.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+        await conn.execute(f"PRAGMA cache_size = {-int(settings.sqlite_cache_size_kib)}")
+        await conn.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size_bytes)}")
+        if read_only:
+            await conn.execute("PRAGMA query_only = ON")
+
+    async def _open_readers(self) -> None:
+        for _ in range(self._reader_pool_size):
+            conn = await aiosqlite.connect(self._db_path)
+            conn.row_factory = aiosqlite.Row
+            await self._configure_connection(conn, read_only=True)
+            self._readers.append(conn)
+            self._idle_readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a pooled read-only connection, or the writer when pooling is off."""
+        if not self._readers:
+            yield self.db
+            return
+        conn = await self._idle_readers.get()
+        try:
+            yield conn
+        finally:
+            self._idle_readers.put_nowait(conn)
+
+    async def _fetchall(self, sql: str, params: Sequence[Any] = ()) -> list[aiosqlite.Row]:
+        async with self._reader() as conn, conn.execute(sql, params) as cursor:
+            return list(await cursor.fetchall())
+
+    async def _fetchone(self, sql: str, params: Sequence[Any] = ()) -> aiosqlite.Row | None:
+        async with self._reader() as conn, conn.execute(sql, params) as cursor:
+            return await cursor.fetchone()
 
     async def _migrate_food_logs_columns(self) -> None:
         """Ensure newer food_logs columns exist on pre-existing databases."""
@@ -210,8 +850,103 @@ class Database:
         if "donation_organization" not in columns:
             await self.db.execute("ALTER TABLE food_logs ADD COLUMN donation_organization TEXT")
 
+    async def _schema_version(self) -> int:
+        async with self.db.execute("PRAGMA user_version") as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def _apply_migrations(self) -> None:
+        """Apply pending entries from ``_MIGRATIONS`` and bump ``user_version``."""
+        current = await self._schema_version()
+        for version, script in _MIGRATIONS:
+            if version <= current:
+                continue
+            await self.db.executescript(script)
+            # PRAGMA does not accept bound parameters; version is a trusted int literal.
+            await self.db.execute(f"PRAGMA user_version = {int(version)}")
+            await self.db.commit()
+            logger.info("Applied database migration v%d", version)
+
+    @staticmethod
+    def _insert_statements(
+        table: str, rows: list[dict[str, Any]], upsert: bool = False
+    ) -> list[tuple[str, list[list[Any]]]]:
+        """One ``INSERT`` and its parameter rows per run of ``rows`` sharing the same columns.
+
+        With ``upsert`` an existing row with the same ``id`` is overwritten
+        column by column.
+        """
+        statements = []
+        for cols, group in groupby(rows, key=lambda row: tuple(row)):
+            placeholders = ", ".join("?" for _ in cols)
+            sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders})"  # noqa: S608
+            if upsert:
+                sql += " ON CONFLICT(id) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in cols if c != "id")
+            statements.append((sql, [list(row.values()) for row in group]))
+        return statements
+
+    async def _write_batch(self, statements: list[tuple[str, list[list[Any]]]]) -> None:
+        """Run ``statements`` atomically on the writer connection; the caller commits.
+
+        Every writer shares one open transaction, so a failed batch has to
+        undo its own rows or the next writer's commit would keep them. The
+        batch runs as a single call on the connection's worker thread, which
+        also keeps other writers' statements from landing inside its
+        savepoint and being rolled back with it.
+        """
+        await self.db._execute(_run_batch, self.db._conn, statements)
+
+    async def _commit(self) -> None:
+        """Commit the caller's writes, sharing one commit with concurrent writers.
+
+        Every mutator shares the writer connection, so statements from callers
+        that have not committed yet already sit in the same open transaction.
+        Callers register a future here; a single commit task commits the whole
+        transaction and resolves every waiting future once it is durable.
+        """
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pending_commits.append(future)
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._run_group_commits())
+        elif len(self._pending_commits) >= settings.sqlite_group_commit_max_batch:
+            self._batch_full.set()
+        await future
+
+    async def _run_group_commits(self) -> None:
+        window = settings.sqlite_group_commit_window_ms / 1000
+        while self._pending_commits:
+            if window and len(self._pending_commits) < settings.sqlite_group_commit_max_batch:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), window)
+                except TimeoutError:
+                    pass
+            else:
+                # Let writers that are already runnable reach _commit() and join this batch.
+                await asyncio.sleep(0)
+
+            batch, self._pending_commits = self._pending_commits, []
+            start = time.perf_counter()
+            try:
+                await self.db.commit()
+            except Exception as exc:
+                for future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            record_db_commit(len(batch), time.perf_counter() - start)
+
     async def close(self) -> None:
-        """Close DB connection."""
+        """Close the writer and every pooled reader connection."""
+        if self._commit_task is not None and not self._commit_task.done():
+            await self._commit_task
+        readers, self._readers = self._readers, []
+        self._idle_readers = asyncio.Queue()
+        for conn in readers:
+            await conn.close()
         if self._db:
             await self._db.close()
             self._db = None
@@ -225,7 +960,9 @@ class Database:
     async def _ensure_connected(self) -> None:
         """Auto-connect if not yet connected."""
         if self._db is None:
-            await self.connect()
+            async with self._connect_lock:
+                if self._db is None:
+                    await self.connect()
 
     # =========================================================================
     # Food Logs
@@ -238,8 +975,15 @@ class Database:
         days: int | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        fields: Sequence[str] | None = None,
     ) -> list[dict[str, Any]]:
+        """Return the user's most recent logs, newest first.
+
+        ``fields`` limits the columns read (``id`` is always included), so
+        callers that only need a few fields skip decoding the JSON columns.
+        """
         await self._ensure_connected()
+        columns = _log_columns(fields)
         clauses = ["user_id = ?", "deleted = 0"]
         params: list[Any] = [user_id]
 
@@ -256,22 +1000,20 @@ class Database:
             params.append(end_date.isoformat())
 
         where = " AND ".join(clauses)
-        sql = f"SELECT * FROM food_logs WHERE {where} ORDER BY created_at DESC LIMIT ?"  # noqa: S608
+        sql = f"SELECT {columns} FROM food_logs WHERE {where} ORDER BY created_at DESC, id DESC LIMIT ?"  # noqa: S608
         params.append(limit)
 
-        async with self.db.execute(sql, params) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, params)
 
-        return [_decode_json(_row_to_dict(r), _JSON_FIELDS_LOGS) for r in rows]
+        return [LogRow(r, _JSON_FIELDS_LOGS) for r in rows]
 
     async def get_log(self, user_id: str, log_id: str) -> dict[str, Any] | None:
         await self._ensure_connected()
         sql = "SELECT * FROM food_logs WHERE id = ? AND user_id = ?"
-        async with self.db.execute(sql, (log_id, user_id)) as cursor:
-            row = await cursor.fetchone()
+        row = await self._fetchone(sql, (log_id, user_id))
         if row is None:
             return None
-        return _decode_json(_row_to_dict(row), _JSON_FIELDS_LOGS)
+        return LogRow(row, _JSON_FIELDS_LOGS)
 
     async def get_logs_by_ids(self, user_id: str, log_ids: list[str]) -> list[dict[str, Any]]:
         await self._ensure_connected()
@@ -280,9 +1022,8 @@ class Database:
         placeholders = ",".join("?" for _ in log_ids)
         sql = f"SELECT * FROM food_logs WHERE user_id = ? AND id IN ({placeholders})"  # noqa: S608
         params = [user_id, *log_ids]
-        async with self.db.execute(sql, params) as cursor:
-            rows = await cursor.fetchall()
-        return [_decode_json(_row_to_dict(r), _JSON_FIELDS_LOGS) for r in rows]
+        rows = await self._fetchall(sql, params)
+        return [LogRow(r, _JSON_FIELDS_LOGS) for r in rows]
 
     async def create_log(self, user_id: str, data: dict[str, Any]) -> str:
         await self._ensure_connected()
@@ -305,10 +1046,37 @@ class Database:
             "INSERT INTO users (id, last_active) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET last_active = ?",
             (user_id, now, now),
         )
-        await self.db.commit()
-        await self.invalidate_user_stats(user_id)
+        await self._commit()
         return log_id
 
+    async def create_logs_batch(self, user_id: str, entries: list[dict[str, Any]]) -> list[str]:
+        """Create several logs in one transaction and return their IDs in input order."""
+        await self._ensure_connected()
+        if not entries:
+            return []
+        now = _now()
+        rows = []
+        for entry in entries:
+            data = _encode_json(entry, _JSON_FIELDS_LOGS)
+            data["id"] = _new_id()
+            data["user_id"] = user_id
+            data["created_at"] = now
+            data["updated_at"] = now
+            data.setdefault("deleted", 0)
+            rows.append(data)
+
+        await self._write_batch(
+            [
+                *self._insert_statements("food_logs", rows),
+                (
+                    "INSERT INTO users (id, last_active) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET last_active = ?",
+                    [[user_id, now, now]],
+                ),
+            ]
+        )
+        await self._commit()
+        return [row["id"] for row in rows]
+
     async def update_log(self, user_id: str, log_id: str, data: dict[str, Any]) -> bool:
         await self._ensure_connected()
         existing = await self.get_log(user_id, log_id)
@@ -320,8 +1088,7 @@ class Database:
         params = [*data.values(), log_id, user_id]
         sql = f"UPDATE food_logs SET {sets} WHERE id = ? AND user_id = ?"  # noqa: S608
         await self.db.execute(sql, params)
-        await self.db.commit()
-        await self.invalidate_user_stats(user_id)
+        await self._commit()
         return True
 
     async def delete_log(self, user_id: str, log_id: str) -> bool:
@@ -330,21 +1097,24 @@ class Database:
         if existing is None:
             return False
         await self.db.execute("DELETE FROM food_logs WHERE id = ? AND user_id = ?", (log_id, user_id))
-        await self.db.commit()
-        await self.invalidate_user_stats(user_id)
+        await self._commit()
         return True
 
-    async def get_all_user_logs(self, user_id: str, limit: int | None = None) -> list[dict[str, Any]]:
+    async def get_all_user_logs(
+        self,
+        user_id: str,
+        limit: int | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
         await self._ensure_connected()
+        columns = _log_columns(fields)
+        sql = f"SELECT {columns} FROM food_logs WHERE user_id = ? AND deleted = 0 ORDER BY created_at DESC, id DESC"  # noqa: S608
+        params: list[Any] = [user_id]
         if limit is not None:
-            sql = "SELECT * FROM food_logs WHERE user_id = ? AND deleted = 0 ORDER BY created_at DESC LIMIT ?"
-            params: list[Any] = [user_id, limit]
-        else:
-            sql = "SELECT * FROM food_logs WHERE user_id = ? AND deleted = 0 ORDER BY created_at DESC"
-            params = [user_id]
-        async with self.db.execute(sql, params) as cursor:
-            rows = await cursor.fetchall()
-        return [_decode_json(_row_to_dict(r), _JSON_FIELDS_LOGS) for r in rows]
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = await self._fetchall(sql, params)
+        return [LogRow(r, _JSON_FIELDS_LOGS) for r in rows]
 
     async def get_user_logs_paginated(
         self,
@@ -357,17 +1127,91 @@ class Database:
         page = max(page, 1)
         total = await self.count_user_logs(user_id)
         offset = (page - 1) * page_size
-        sql = "SELECT * FROM food_logs WHERE user_id = ? AND deleted = 0 ORDER BY created_at DESC LIMIT ? OFFSET ?"
-        async with self.db.execute(sql, (user_id, page_size, offset)) as cursor:
-            rows = await cursor.fetchall()
-        logs = [_decode_json(_row_to_dict(r), _JSON_FIELDS_LOGS) for r in rows]
+        sql = (
+            "SELECT * FROM food_logs WHERE user_id = ? AND deleted = 0 "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+        )
+        rows = await self._fetchall(sql, (user_id, page_size, offset))
+        logs = [LogRow(r, _JSON_FIELDS_LOGS) for r in rows]
         return logs, total
 
+    async def get_user_logs_page(
+        self,
+        user_id: str,
+        page_size: int = 100,
+        cursor: str | None = None,
+        days: int | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Return one page of logs after ``cursor`` and the cursor for the next page.
+
+        Unlike ``get_user_logs_paginated`` this seeks straight to the cursor
+        position through the log index, so deep pages cost the same as the
+        first one. Raises ``ValueError`` for a malformed cursor.
+        """
+        await self._ensure_connected()
+        page_size = max(min(page_size, 500), 1)
+        clauses = ["user_id = ?", "deleted = 0"]
+        params: list[Any] = [user_id]
+
+        if days:
+            cutoff = (datetime.now(UTC) - timedelta(days=days)).isoformat()
+            clauses.append("created_at >= ?")
+            params.append(cutoff)
+
+        if cursor:
+            after_created_at, after_id = decode_log_cursor(cursor)
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend([after_created_at, after_id])
+
+        where = " AND ".join(clauses)
+        sql = f"SELECT * FROM food_logs WHERE {where} ORDER BY created_at DESC, id DESC LIMIT ?"  # noqa: S608
+        params.append(page_size + 1)
+
+        rows = await self._fetchall(sql, params)
+        logs = [LogRow(r, _JSON_FIELDS_LOGS) for r in rows[:page_size]]
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = encode_log_cursor(logs[-1]["created_at"], logs[-1]["id"])
+        return logs, next_cursor
+
+    async def search_logs(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Full-text search over the user's logs, best BM25 match first.
+
+        Matches any word of ``query`` against dish, venue, cuisine, notes and
+        ingredients across the user's entire history. Each hit carries a
+        ``search_score`` (higher is better). ``fields`` projects the returned
+        columns as in ``get_user_logs``.
+        """
+        await self._ensure_connected()
+        columns = _log_columns(fields, prefix="f.")
+        match = fts_match_expression(query)
+        if match is None:
+            return []
+        weights = ", ".join(str(w) for w in FIELD_WEIGHTS)
+        sql = (
+            f"SELECT {columns}, bm25(food_logs_fts, {weights}) AS search_rank "  # noqa: S608
+            "FROM food_logs_fts JOIN food_logs AS f ON f.rowid = food_logs_fts.rowid "
+            "WHERE food_logs_fts MATCH ? AND f.user_id = ? AND f.deleted = 0 "
+            "ORDER BY search_rank LIMIT ?"
+        )
+        rows = await self._fetchall(sql, (match, user_id, limit))
+        hits = []
+        for r in rows:
+            log = LogRow(r, _JSON_FIELDS_LOGS)
+            log["search_score"] = -log.pop("search_rank")
+            hits.append(log)
+        return hits
+
     async def count_user_logs(self, user_id: str) -> int:
         await self._ensure_connected()
         sql = "SELECT COUNT(*) FROM food_logs WHERE user_id = ? AND deleted = 0"
-        async with self.db.execute(sql, (user_id,)) as cursor:
-            row = await cursor.fetchone()
+        row = await self._fetchone(sql, (user_id,))
         return row[0] if row else 0
 
     # =========================================================================
@@ -377,8 +1221,7 @@ class Database:
     async def get_pantry(self, user_id: str) -> list[dict[str, Any]]:
         await self._ensure_connected()
         sql = "SELECT * FROM pantry WHERE user_id = ?"
-        async with self.db.execute(sql, (user_id,)) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, (user_id,))
         return [_row_to_dict(r) for r in rows]
 
     async def update_pantry_item(self, user_id: str, item_data: dict[str, Any]) -> str:
@@ -401,21 +1244,29 @@ class Database:
         update_vals = [v for k, v in item_data.items() if k != "id"]
         sql = f"INSERT INTO pantry ({cols}) VALUES ({placeholders}) ON CONFLICT(id) DO UPDATE SET {updates}"  # noqa: S608
         await self.db.execute(sql, [*item_data.values(), *update_vals])
-        await self.db.commit()
+        await self._commit()
         return item_id
 
     async def update_pantry_items_batch(self, user_id: str, items_data: list[dict[str, Any]]) -> list[str]:
+        """Upsert several pantry items in one transaction; items without a name are skipped."""
         await self._ensure_connected()
-        if not items_data:
-            return []
-        ids = []
+        now = _now()
+        rows = []
         for item in items_data:
             name = item.get("name")
             if not name:
                 continue
-            item_id = await self.update_pantry_item(user_id, item)
-            ids.append(item_id)
-        return ids
+            row = dict(item)
+            row["id"] = item.get("id") or name.lower().replace(" ", "_")
+            row["user_id"] = user_id
+            row["updated_at"] = now
+            row.setdefault("created_at", now)
+            rows.append(row)
+        if not rows:
+            return []
+        await self._write_batch(self._insert_statements("pantry", rows, upsert=True))
+        await self._commit()
+        return [row["id"] for row in rows]
 
     async def add_pantry_item(self, user_id: str, item: dict[str, Any]) -> str:
         await self._ensure_connected()
@@ -429,9 +1280,27 @@ class Database:
         placeholders = ", ".join("?" for _ in item)
         sql = f"INSERT INTO pantry ({cols}) VALUES ({placeholders})"  # noqa: S608
         await self.db.execute(sql, list(item.values()))
-        await self.db.commit()
+        await self._commit()
         return item_id
 
+    async def add_pantry_items_batch(self, user_id: str, items: list[dict[str, Any]]) -> list[str]:
+        """Insert several pantry items in one transaction and return their IDs in input order."""
+        await self._ensure_connected()
+        if not items:
+            return []
+        now = _now()
+        rows = []
+        for item in items:
+            row = dict(item)
+            row["id"] = _new_id()
+            row["user_id"] = user_id
+            row["created_at"] = now
+            row.setdefault("updated_at", now)
+            rows.append(row)
+        await self._write_batch(self._insert_statements("pantry", rows))
+        await self._commit()
+        return [row["id"] for row in rows]
+
     async def delete_pantry_item(self, user_id: str, item_id: str) -> bool:
         await self._ensure_connected()
         sql = "SELECT id FROM pantry WHERE id = ? AND user_id = ?"
@@ -440,7 +1309,7 @@ class Database:
         if row is None:
             return False
         await self.db.execute("DELETE FROM pantry WHERE id = ? AND user_id = ?", (item_id, user_id))
-        await self.db.commit()
+        await self._commit()
         return True
 
     # =========================================================================
@@ -464,15 +1333,13 @@ class Database:
         where = " AND ".join(clauses)
         sql = f"SELECT * FROM recipes WHERE {where} ORDER BY created_at DESC LIMIT ?"  # noqa: S608
         params.append(limit)
-        async with self.db.execute(sql, params) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, params)
         return [_decode_json(_row_to_dict(r), _JSON_FIELDS_RECIPES) for r in rows]
 
     async def get_recipe(self, user_id: str, recipe_id: str) -> dict[str, Any] | None:
         await self._ensure_connected()
         sql = "SELECT * FROM recipes WHERE id = ? AND user_id = ?"
-        async with self.db.execute(sql, (recipe_id, user_id)) as cursor:
-            row = await cursor.fetchone()
+        row = await self._fetchone(sql, (recipe_id, user_id))
         if row is None:
             return None
         return _decode_json(_row_to_dict(row), _JSON_FIELDS_RECIPES)
@@ -492,7 +1359,7 @@ class Database:
         placeholders = ", ".join("?" for _ in recipe_data)
         sql = f"INSERT INTO recipes ({cols}) VALUES ({placeholders})"  # noqa: S608
         await self.db.execute(sql, list(recipe_data.values()))
-        await self.db.commit()
+        await self._commit()
         return recipe_id
 
     async def update_recipe(self, user_id: str, recipe_id: str, updates: dict[str, Any]) -> bool:
@@ -506,7 +1373,7 @@ class Database:
         params = [*updates.values(), recipe_id, user_id]
         sql = f"UPDATE recipes SET {sets} WHERE id = ? AND user_id = ?"  # noqa: S608
         await self.db.execute(sql, params)
-        await self.db.commit()
+        await self._commit()
         return True
 
     async def delete_recipe(self, user_id: str, recipe_id: str) -> bool:
@@ -515,7 +1382,7 @@ class Database:
         if existing is None:
             return False
         await self.db.execute("DELETE FROM recipes WHERE id = ? AND user_id = ?", (recipe_id, user_id))
-        await self.db.commit()
+        await self._commit()
         return True
 
     # =========================================================================
@@ -528,7 +1395,7 @@ class Database:
         now = _now()
         sql = "INSERT INTO receipts (id, user_id, data, parsed_at) VALUES (?, ?, ?, ?)"
         await self.db.execute(sql, (receipt_id, user_id, json.dumps(receipt_data), now))
-        await self.db.commit()
+        await self._commit()
         return receipt_id
 
     # =========================================================================
@@ -539,8 +1406,7 @@ class Database:
         await self._ensure_connected()
         cutoff = (datetime.now(UTC) - timedelta(days=days)).isoformat()
         sql = "SELECT * FROM users WHERE last_active >= ?"
-        async with self.db.execute(sql, (cutoff,)) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, (cutoff,))
         users = []
         for r in rows:
             d = _decode_json(_row_to_dict(r), _JSON_FIELDS_USERS)
@@ -568,8 +1434,7 @@ class Database:
             "notification_hour": 8,
         }
         sql = "SELECT * FROM users WHERE id = ?"
-        async with self.db.execute(sql, (user_id,)) as cursor:
-            row = await cursor.fetchone()
+        row = await self._fetchone(sql, (user_id,))
         if row is None:
             return defaults
         data = _decode_json(_row_to_dict(row), _JSON_FIELDS_USERS)
@@ -595,133 +1460,189 @@ class Database:
             "ON CONFLICT(id) DO UPDATE SET preferences = ?, last_active = ?",
             (user_id, prefs_json, now, prefs_json, now),
         )
-        await self.db.commit()
+        await self._commit()
 
     async def invalidate_user_stats(self, user_id: str) -> None:
-        await self._ensure_connected()
-        await self.db.execute(
-            "UPDATE users SET stats = NULL WHERE id = ?",
-            (user_id,),
-        )
-        await self.db.commit()
+        """Resynchronise the user's stats aggregate with their food logs."""
+        await self.rebuild_user_stats(user_id)
 
     async def get_user_stats(self, user_id: str) -> dict[str, Any]:
+        """Return streaks, totals and cuisine variety from the maintained aggregate.
+
+        The aggregate is kept current by triggers on ``food_logs``, so this is a
+        handful of primary-key lookups regardless of how many logs the user has.
+        """
         await self._ensure_connected()
-        # Check cache first
-        sql = "SELECT stats FROM users WHERE id = ?"
-        async with self.db.execute(sql, (user_id,)) as cursor:
-            row = await cursor.fetchone()
-        if row and row[0]:
-            stats = json.loads(row[0])
-            if last_log_iso := stats.get("last_log_date"):
-                try:
-                    last_log_date = datetime.fromisoformat(last_log_iso).date()
-                    today = datetime.now(UTC).date()
-                    if (today - last_log_date).days > 1:
-                        stats["current_streak"] = 0
-                except ValueError:
-                    # If the cached last_log_date is invalid, ignore it and leave the streak unchanged
-                    pass
-            return stats
-
-        total_logs = await self.count_user_logs(user_id)
-        if total_logs == 0:
-            stats = {
-                "current_streak": 0,
-                "longest_streak": 0,
-                "total_logs": 0,
-                "cuisines_tried": 0,
-                "first_log_date": None,
-                "last_log_date": None,
-            }
-            await self._cache_stats(user_id, stats)
-            return stats
-
-        # Get recent logs for streak calc (90 days)
-        now = datetime.now(UTC)
-        today = now.date()
-        window = (now - timedelta(days=90)).isoformat()
-        sql = "SELECT created_at, cuisine FROM food_logs WHERE user_id = ? AND deleted = 0 AND created_at >= ? ORDER BY created_at DESC"
-        async with self.db.execute(sql, (user_id, window)) as cursor:
-            rows = await cursor.fetchall()
-
-        log_dates: set = set()
-        cuisines: set = set()
-        for r in rows:
-            created = r[0]
-            if created:
-                try:
-                    log_dates.add(datetime.fromisoformat(created).date())
-                except ValueError:
-                    # Skip logs with invalid created_at timestamps
-                    pass
-            cuisine_val = r[1]
-            if cuisine_val:
-                cuisines.add(cuisine_val.lower())
-
-        # First and last log dates
-        sql_first = "SELECT created_at FROM food_logs WHERE user_id = ? AND deleted = 0 ORDER BY created_at ASC LIMIT 1"
-        sql_last = "SELECT created_at FROM food_logs WHERE user_id = ? AND deleted = 0 ORDER BY created_at DESC LIMIT 1"
-        first_date = None
-        last_date = None
-        async with self.db.execute(sql_first, (user_id,)) as cursor:
-            r = await cursor.fetchone()
-            if r and r[0]:
-                first_date = datetime.fromisoformat(r[0])
-            else:
-                first_date = None  # Explicitly set to None when no valid timestamp
-        async with self.db.execute(sql_last, (user_id,)) as cursor:
-            r = await cursor.fetchone()
-            if r and r[0]:
-                last_date = datetime.fromisoformat(r[0])
-            else:
-                last_date = None  # Explicitly set to None when no valid timestamp
+        today = datetime.now(UTC).date()
+        sql = """
+            SELECT
+                (SELECT total_logs FROM user_log_totals WHERE user_id = ?),
+                (SELECT MIN(day) FROM user_log_days WHERE user_id = ?),
+                (SELECT MAX(day) FROM user_log_days WHERE user_id = ?),
+                (SELECT COUNT(*) FROM user_cuisines WHERE user_id = ?),
+                (SELECT MAX(length) FROM user_streaks WHERE user_id = ?),
+                (SELECT start_day || '/' || end_day FROM user_streaks
+                 WHERE user_id = ? AND start_day <= ? ORDER BY start_day DESC LIMIT 1)
+        """
+        row = await self._fetchone(sql, (*[user_id] * 6, today.isoformat()))
+        total_logs, first_day, last_day, cuisines_tried, longest_run, latest_run = row or (None,) * 6
+        if not total_logs:
+            return _empty_stats()
 
-        # Calculate streaks
         current_streak = 0
-        check_date = today
-        while check_date in log_dates:
-            current_streak += 1
-            check_date -= timedelta(days=1)
-        if current_streak == 0:
-            check_date = today - timedelta(days=1)
-            while check_date in log_dates:
-                current_streak += 1
-                check_date -= timedelta(days=1)
-
-        if log_dates:
-            sorted_dates = sorted(log_dates)
-            longest_streak = 1
-            current_run = 1
-            for i in range(1, len(sorted_dates)):
-                if (sorted_dates[i] - sorted_dates[i - 1]).days == 1:
-                    current_run += 1
-                    longest_streak = max(longest_streak, current_run)
-                else:
-                    current_run = 1
-        else:
-            longest_streak = 0
+        if latest_run:
+            start_iso, end_iso = latest_run.split("/")
+            start, end = date.fromisoformat(start_iso), date.fromisoformat(end_iso)
+            if end >= today:
+                current_streak = (today - start).days + 1
+            elif end == today - timedelta(days=1):
+                current_streak = (end - start).days + 1
 
-        stats = {
+        return {
             "current_streak": current_streak,
-            "longest_streak": max(longest_streak, current_streak),
+            "longest_streak": max(longest_run or 0, current_streak),
             "total_logs": total_logs,
-            "cuisines_tried": len(cuisines),
-            "first_log_date": first_date.date().isoformat() if first_date else None,
-            "last_log_date": last_date.date().isoformat() if last_date else None,
+            "cuisines_tried": cuisines_tried,
+            "first_log_date": first_day,
+            "last_log_date": last_day,
         }
-        await self._cache_stats(user_id, stats)
-        return stats
 
-    async def _cache_stats(self, user_id: str, stats: dict[str, Any]) -> None:
-        stats_json = json.dumps(stats)
-        now = _now()
+    async def rebuild_user_stats(self, user_id: str | None = None) -> int:
+        """Rebuild stats aggregates from ``food_logs`` and return how many users were rebuilt.
+
+        With no ``user_id`` every user with logs or an existing aggregate is
+        rebuilt, which reads the whole ``food_logs`` table; use it for backfills.
+        """
+        await self._ensure_connected()
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            rows = await self._fetchall(
+                "SELECT user_id FROM user_log_totals UNION SELECT DISTINCT user_id FROM food_logs", ()
+            )
+            user_ids = [r[0] for r in rows]
+        if user_ids:
+            await self.db.executemany("INSERT INTO user_stats_rebuilds (user_id) VALUES (?)", [(u,) for u in user_ids])
+            await self._commit()
+        return len(user_ids)
+
+    async def check_user_stats(self, user_id: str) -> dict[str, tuple[Any, Any]]:
+        """Compare the maintained stats with a full recomputation from ``food_logs``.
+
+        Returns ``{field: (maintained, recomputed)}`` for every field that
+        disagrees; an empty dict means the aggregate is consistent.
+        """
+        await self._ensure_connected()
+        maintained = await self.get_user_stats(user_id)
+        rows = await self._fetchall(
+            "SELECT created_at, cuisine FROM food_logs WHERE user_id = ? AND deleted = 0", (user_id,)
+        )
+        recomputed = _stats_from_logs([(r[0], r[1]) for r in rows], datetime.now(UTC).date())
+        return {k: (maintained.get(k), v) for k, v in recomputed.items() if maintained.get(k) != v}
+
+    async def get_data_version(self, user_id: str) -> int:
+        """The user's data version: bumped by every food log, pantry or preferences write."""
+        await self._ensure_connected()
+        row = await self._fetchone("SELECT version FROM user_data_versions WHERE user_id = ?", (user_id,))
+        return row[0] if row else 0
+
+    async def get_taste_profile_snapshot(self, user_id: str, period: str) -> dict[str, Any] | None:
+        """The stored taste profile for ``period`` and the watermark it was built at, if any."""
+        await self._ensure_connected()
+        row = await self._fetchone(
+            "SELECT profile, log_count, data_version, built_at FROM taste_profiles WHERE user_id = ? AND period = ?",
+            (user_id, period),
+        )
+        if row is None:
+            return None
+        return {"profile": json.loads(row[0]), "log_count": row[1], "data_version": row[2], "built_at": row[3]}
+
+    async def save_taste_profile_snapshot(self, user_id: str, period: str, snapshot: dict[str, Any]) -> None:
+        """Store a taste profile with its ``log_count``/``data_version``/``built_at`` watermark."""
+        await self._ensure_connected()
         await self.db.execute(
-            "INSERT INTO users (id, stats, last_active) VALUES (?, ?, ?) "
-            "ON CONFLICT(id) DO UPDATE SET stats = ?, last_active = ?",
-            (user_id, stats_json, now, stats_json, now),
+            "INSERT OR REPLACE INTO taste_profiles (user_id, period, profile, log_count, data_version, built_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user_id,
+                period,
+                json.dumps(snapshot["profile"]),
+                snapshot["log_count"],
+                snapshot["data_version"],
+                snapshot["built_at"],
+            ),
         )
-        await self.db.commit()
+        await self._commit()
+
+    async def get_daily_rollups(self, user_id: str, start: date, end: date) -> list[dict[str, Any]]:
+        """Return the user's daily nutrition rollups from ``start`` to ``end`` inclusive, oldest first.
+
+        Rollups are kept current by triggers on ``food_logs``; days without
+        live logs are omitted. Nutrient sums are rounded to two decimals.
+        """
+        await self._ensure_connected()
+        params = (user_id, start.isoformat(), end.isoformat())
+        rows = await self._fetchall(
+            f"SELECT day, meal_count, logs_with_nutrition, {', '.join(NUTRIENTS)} FROM daily_nutrition "  # noqa: S608
+            "WHERE user_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+            params,
+        )
+        rollups: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            rollup = empty_rollup(row[0])
+            rollup["meal_count"], rollup["logs_with_nutrition"] = row[1], row[2]
+            rollup.update({key: round(value, 2) for key, value in zip(NUTRIENTS, row[3:], strict=True)})
+            rollups[row[0]] = rollup
+        for table, column, key in (("daily_cuisines", "cuisine", "cuisines"), ("daily_venues", "venue", "venues")):
+            counts = await self._fetchall(
+                f"SELECT day, {column}, log_count FROM {table} "  # noqa: S608
+                f"WHERE user_id = ? AND day BETWEEN ? AND ? ORDER BY day, {column}",
+                params,
+            )
+            for day, name, count in counts:
+                rollups[day][key][name] = count
+        return list(rollups.values())
+
+    async def rebuild_daily_rollups(self, user_id: str | None = None) -> int:
+        """Rebuild daily rollups from ``food_logs`` and return how many users were rebuilt.
+
+        With no ``user_id`` every user with logs or existing rollups is rebuilt,
+        which reads the whole ``food_logs`` table; use it for backfills.
+        """
+        await self._ensure_connected()
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            rows = await self._fetchall(
+                "SELECT user_id FROM daily_nutrition UNION SELECT DISTINCT user_id FROM food_logs", ()
+            )
+            user_ids = [r[0] for r in rows]
+        if user_ids:
+            await self.db.executemany(
+                "INSERT INTO daily_nutrition_rebuilds (user_id) VALUES (?)", [(u,) for u in user_ids]
+            )
+            await self._commit()
+        return len(user_ids)
+
+    async def check_daily_rollups(self, user_id: str) -> dict[str, tuple[Any, Any]]:
+        """Compare the maintained rollups with a full recomputation from ``food_logs``.
+
+        Returns ``{day: (maintained, recomputed)}`` for every day that
+        disagrees (either side is ``None`` for a day only the other has); an
+        empty dict means the rollups are consistent.
+        """
+        await self._ensure_connected()
+        rows = await self._fetchall(
+            f"SELECT {', '.join(ROLLUP_LOG_FIELDS)} FROM food_logs WHERE user_id = ? AND deleted = 0",  # noqa: S608
+            (user_id,),
+        )
+        recomputed = {r["day"]: r for r in rollups_from_logs(LogRow(row, _JSON_FIELDS_LOGS) for row in rows)}
+        maintained = {r["day"]: r for r in await self.get_daily_rollups(user_id, date.min, date.max)}
+        return {
+            day: (maintained.get(day), recomputed.get(day))
+            for day in sorted(maintained.keys() | recomputed.keys())
+            if maintained.get(day) != recomputed.get(day)
+        }
 
     # =========================================================================
     # Notifications
@@ -738,7 +1659,7 @@ class Database:
         now = _now()
         sql = "INSERT INTO notifications (id, user_id, type, content, read, delivered, created_at) VALUES (?, ?, ?, ?, 0, 0, ?)"
         await self.db.execute(sql, (nid, user_id, notification_type, json.dumps(content), now))
-        await self.db.commit()
+        await self._commit()
         return nid
 
     async def get_user_notifications(
@@ -755,8 +1676,7 @@ class Database:
         where = " AND ".join(clauses)
         sql = f"SELECT * FROM notifications WHERE {where} ORDER BY created_at DESC LIMIT ?"  # noqa: S608
         params.append(limit)
-        async with self.db.execute(sql, params) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, params)
         return [_decode_json(_row_to_dict(r), _JSON_FIELDS_NOTIFICATIONS) for r in rows]
 
     async def mark_notification_read(self, user_id: str, notification_id: str) -> bool:
@@ -771,7 +1691,7 @@ class Database:
             "UPDATE notifications SET read = 1, read_at = ? WHERE id = ? AND user_id = ?",
             (now, notification_id, user_id),
         )
-        await self.db.commit()
+        await self._commit()
         return True
 
     # =========================================================================
@@ -791,21 +1711,19 @@ class Database:
         placeholders = ", ".join("?" for _ in draft)
         sql = f"INSERT INTO drafts ({cols}) VALUES ({placeholders})"  # noqa: S608
         await self.db.execute(sql, list(draft.values()))
-        await self.db.commit()
+        await self._commit()
         return draft_id
 
     async def get_drafts(self, user_id: str, limit: int = 50) -> list[dict[str, Any]]:
         await self._ensure_connected()
         sql = "SELECT * FROM drafts WHERE user_id = ? ORDER BY created_at DESC LIMIT ?"
-        async with self.db.execute(sql, (user_id, limit)) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, (user_id, limit))
         return [_decode_json(_row_to_dict(r), _JSON_FIELDS_DRAFTS) for r in rows]
 
     async def get_draft(self, user_id: str, draft_id: str) -> dict[str, Any] | None:
         await self._ensure_connected()
         sql = "SELECT * FROM drafts WHERE id = ? AND user_id = ?"
-        async with self.db.execute(sql, (draft_id, user_id)) as cursor:
-            row = await cursor.fetchone()
+        row = await self._fetchone(sql, (draft_id, user_id))
         if row is None:
             return None
         return _decode_json(_row_to_dict(row), _JSON_FIELDS_DRAFTS)
@@ -821,7 +1739,7 @@ class Database:
         params = [*updates.values(), draft_id, user_id]
         sql = f"UPDATE drafts SET {sets} WHERE id = ? AND user_id = ?"  # noqa: S608
         await self.db.execute(sql, params)
-        await self.db.commit()
+        await self._commit()
         return True
 
     async def delete_draft(self, user_id: str, draft_id: str) -> bool:
@@ -830,7 +1748,7 @@ class Database:
         if existing is None:
             return False
         await self.db.execute("DELETE FROM drafts WHERE id = ? AND user_id = ?", (draft_id, user_id))
-        await self.db.commit()
+        await self._commit()
         return True
 
     # =========================================================================
@@ -849,21 +1767,19 @@ class Database:
         placeholders = ", ".join("?" for _ in content)
         sql = f"INSERT INTO published ({cols}) VALUES ({placeholders})"  # noqa: S608
         await self.db.execute(sql, list(content.values()))
-        await self.db.commit()
+        await self._commit()
         return content_id
 
     async def get_published_content(self, user_id: str, limit: int = 50) -> list[dict[str, Any]]:
         await self._ensure_connected()
         sql = "SELECT * FROM published WHERE user_id = ? ORDER BY published_at DESC LIMIT ?"
-        async with self.db.execute(sql, (user_id, limit)) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self._fetchall(sql, (user_id, limit))
         return [_decode_json(_row_to_dict(r), _JSON_FIELDS_PUBLISHED) for r in rows]
 
     async def get_published_content_item(self, user_id: str, content_id: str) -> dict[str, Any] | None:
         await self._ensure_connected()
         sql = "SELECT * FROM published WHERE id = ? AND user_id = ?"
-        async with self.db.execute(sql, (content_id, user_id)) as cursor:
-            row = await cursor.fetchone()
+        row = await self._fetchone(sql, (content_id, user_id))
         if row is None:
             return None
         return _decode_json(_row_to_dict(row), _JSON_FIELDS_PUBLISHED)
@@ -875,7 +1791,7 @@ class Database:
         params = [*updates.values(), content_id, user_id]
         sql = f"UPDATE published SET {sets} WHERE id = ? AND user_id = ?"  # noqa: S608
         await self.db.execute(sql, params)
-        await self.db.commit()
+        await self._commit()
 
     async def publish_draft(
         self,
@@ -0,0 +1,255 @@
+"""Deterministic eating-pattern analysis for the analytics tools.
+
+One pass over the food logs fills fixed-size typed ``array`` histograms
+(meals by hour of day and by weekday) and a few counters; every pattern is
+then derived from those: meal timing, weekday vs weekend eating, cuisine
+distribution per ISO week, home cooking vs eating out, favourite venues and
+a food variety score. Hours are read from the stored timestamps as they are
+(UTC for logs written by the app).
+"""
+
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+from fcp.services.nutrition_rollups import cuisine_key, log_day
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+WEEKEND = frozenset({5, 6})
+TOP_VENUES = 5
+TOP_CUISINES = 10
+
+# Meal window for each hour of the day.
+MEAL_WINDOWS = ("breakfast", "lunch", "afternoon", "dinner", "late_night")
+_HOUR_WINDOW = tuple(
+    "late_night" if h < 5 or h >= 22 else
+    "breakfast" if h < 11 else
+    "lunch" if h < 15 else
+    "afternoon" if h < 17 else
+    "dinner"
+    for h in range(24)
+)  # fmt: skip
+
+# Venue names that mean the meal was eaten at home; logs without a venue count as home too.
+HOME_VENUES = frozenset({"home", "homemade", "home cooked", "home-cooked"})
+
+
+def _zeros(typecode: str, size: int) -> array:
+    return array(typecode, bytes(array(typecode).itemsize * size))
+
+
+@dataclass(slots=True)
+class PatternColumns:
+    """Histograms and counters collected from one pass over the logs."""
+
+    hours: array = field(default_factory=lambda: _zeros("l", 24))
+    weekday_meals: array = field(default_factory=lambda: _zeros("l", 7))
+    weekday_calories: array = field(default_factory=lambda: _zeros("d", 7))
+    weekday_days: array = field(default_factory=lambda: _zeros("l", 7))
+    entry_count: int = 0
+    undated_entries: int = 0
+    untimed_entries: int = 0
+    home_meals: int = 0
+    dish_entries: int = 0
+    dishes: Counter[str] = field(default_factory=Counter)
+    venues: Counter[str] = field(default_factory=Counter)
+    cuisines: Counter[str] = field(default_factory=Counter)
+    cuisine_names: dict[str, str] = field(default_factory=dict)
+    cuisines_by_week: dict[str, Counter[str]] = field(default_factory=dict)
+
+
+def _day_info(day: str) -> tuple[int, str]:
+    """Weekday (Monday is 0) and ISO week label of a valid ISO day."""
+    year, week, weekday = date.fromisoformat(day).isocalendar()
+    return weekday - 1, f"{year}-W{week:02d}"
+
+
+def _hour(created_at: str) -> int | None:
+    """Hour of an ISO timestamp string, or None for a bare date."""
+    if len(created_at) >= 13 and created_at[10] in "T " and created_at[11:13].isdigit():
+        hour = int(created_at[11:13])
+        return hour if hour < 24 else None
+    return None
+
+
+def columns_from_logs(logs: Iterable[Mapping[str, Any]]) -> PatternColumns:
+    """Collect pattern histograms from food logs in one pass.
+
+    Logs without a usable ``created_at`` count towards venue, dish and
+    overall cuisine totals only; logs with a date but no time of day are
+    left out of the meal-time histogram.
+    """
+    columns = PatternColumns()
+    hours = columns.hours
+    weekday_meals = columns.weekday_meals
+    weekday_calories = columns.weekday_calories
+    # date prefix -> (day, weekday, ISO week), or None when not a real date
+    seen: dict[str, tuple[str, int, str] | None] = {}
+    days: set[str] = set()
+
+    for log in logs:
+        columns.entry_count += 1
+        if dish := log.get("dish_name"):
+            columns.dish_entries += 1
+            columns.dishes[dish] += 1
+        venue = log.get("venue_name")
+        if not venue or venue.strip().lower() in HOME_VENUES:
+            columns.home_meals += 1
+        else:
+            columns.venues[venue] += 1
+        cuisine = cuisine_key(log.get("cuisine"))
+        if cuisine:
+            columns.cuisines[cuisine] += 1
+            columns.cuisine_names.setdefault(cuisine, log["cuisine"])
+
+        created_at = log.get("created_at")
+        hour: int | None
+        if isinstance(created_at, str):
+            prefix = created_at[:10]
+            if prefix not in seen:
+                day = log_day(prefix)
+                seen[prefix] = (day, *_day_info(day)) if day else None
+            info = seen[prefix]
+            hour = _hour(created_at)
+        elif isinstance(created_at, datetime):
+            day = created_at.date().isoformat()
+            info = (day, *_day_info(day))
+            hour = created_at.hour
+        elif isinstance(created_at, date):
+            day = created_at.isoformat()
+            info = (day, *_day_info(day))
+            hour = None
+        else:
+            info = hour = None
+
+        if info is None:
+            columns.undated_entries += 1
+            continue
+        day, weekday, week = info
+        if hour is None:
+            columns.untimed_entries += 1
+        else:
+            hours[hour] += 1
+        weekday_meals[weekday] += 1
+        nutrition = log.get("nutrition")
+        if isinstance(nutrition, dict):
+            calories = nutrition.get("calories")
+            # type() rather than isinstance() so booleans are not counted as numbers
+            if type(calories) in (int, float):
+                weekday_calories[weekday] += calories
+        if day not in days:
+            days.add(day)
+            columns.weekday_days[weekday] += 1
+        if cuisine:
+            by_week = columns.cuisines_by_week.get(week)
+            if by_week is None:
+                by_week = columns.cuisines_by_week[week] = Counter()
+            by_week[cuisine] += 1
+    return columns
+
+
+def _round(value: float, digits: int = 2) -> float:
+    return round(value, digits)
+
+
+def _pct(part: float, whole: float) -> float | None:
+    return _round(100 * part / whole) if whole else None
+
+
+def _split(columns: PatternColumns, weekdays: Iterable[int]) -> dict[str, Any]:
+    weekdays = list(weekdays)
+    meals = sum(columns.weekday_meals[d] for d in weekdays)
+    days = sum(columns.weekday_days[d] for d in weekdays)
+    calories = sum(columns.weekday_calories[d] for d in weekdays)
+    return {
+        "meals": meals,
+        "days_tracked": days,
+        "meals_per_day": _round(meals / days) if days else 0,
+        "avg_daily_calories": _round(calories / days) if days else 0,
+    }
+
+
+def summarize(columns: PatternColumns) -> dict[str, Any]:
+    """Compute the eating patterns for a set of collected histograms.
+
+    Percentages and averages are rounded to two decimals and are ``None``
+    (or zero) when there is nothing to divide by.
+    """
+    timed = sum(columns.hours)
+    windows = dict.fromkeys(MEAL_WINDOWS, 0)
+    for hour, count in enumerate(columns.hours):
+        windows[_HOUR_WINDOW[hour]] += count
+    peak_hour = max(range(24), key=columns.hours.__getitem__) if timed else None
+
+    cuisine_total = sum(columns.cuisines.values())
+    names = columns.cuisine_names
+    restaurant_meals = columns.entry_count - columns.home_meals
+
+    return {
+        "entry_count": columns.entry_count,
+        "undated_entries": columns.undated_entries,
+        "meal_timing": {
+            "timed_entries": timed,
+            "by_hour": list(columns.hours),
+            "by_window": windows,
+            "peak_hour": peak_hour,
+        },
+        "day_of_week": {
+            "by_weekday": dict(zip(WEEKDAYS, columns.weekday_meals, strict=True)),
+            "weekday": _split(columns, (d for d in range(7) if d not in WEEKEND)),
+            "weekend": _split(columns, sorted(WEEKEND)),
+        },
+        "cuisines": {
+            "distribution": [
+                {"cuisine": names[key], "count": count, "pct": _pct(count, cuisine_total)}
+                for key, count in columns.cuisines.most_common(TOP_CUISINES)
+            ],
+            "by_week": [
+                {"week": week, "cuisines": {names[key]: count for key, count in by_week.most_common()}}
+                for week, by_week in sorted(columns.cuisines_by_week.items())
+            ],
+        },
+        "home_vs_restaurant": {
+            "home": columns.home_meals,
+            "restaurant": restaurant_meals,
+            "home_pct": _pct(columns.home_meals, columns.entry_count),
+        },
+        "top_venues": [{"venue_name": v, "count": c} for v, c in columns.venues.most_common(TOP_VENUES)],
+        "variety": {
+            "unique_dishes": len(columns.dishes),
+            "meals_with_dish": columns.dish_entries,
+            "score": _round(len(columns.dishes) / columns.dish_entries, 3) if columns.dish_entries else None,
+        },
+    }
+
+
+def format_summary(patterns: Mapping[str, Any]) -> str:
+    """Plain-text rendering of a ``summarize`` result."""
+    if not patterns["entry_count"]:
+        return "No entries to analyze."
+    timing = patterns["meal_timing"]
+    days = patterns["day_of_week"]
+    home = patterns["home_vs_restaurant"]
+    variety = patterns["variety"]
+    lines = [f"Entries: {patterns['entry_count']}"]
+    if timing["peak_hour"] is not None:
+        windows = ", ".join(f"{name} {count}" for name, count in timing["by_window"].items() if count)
+        lines.append(f"Meal times: {windows}; busiest hour {timing['peak_hour']:02d}:00")
+    for split in ("weekday", "weekend"):
+        s = days[split]
+        if s["days_tracked"]:
+            lines.append(
+                f"{split.capitalize()}s: {s['meals_per_day']} meals/day, {s['avg_daily_calories']} kcal/day"
+                f" over {s['days_tracked']} days"
+            )
+    if distribution := patterns["cuisines"]["distribution"]:
+        lines.append("Cuisines: " + ", ".join(f"{c['cuisine']} {c['pct']}%" for c in distribution))
+    lines.append(f"Home vs restaurant: {home['home']} vs {home['restaurant']} ({home['home_pct']}% at home)")
+    if patterns["top_venues"]:
+        lines.append("Top venues: " + ", ".join(f"{v['venue_name']} ({v['count']})" for v in patterns["top_venues"]))
+    if variety["score"] is not None:
+        lines.append(f"Variety: {variety['unique_dishes']} unique dishes, score {variety['score']}")
+    return "\n".join(lines)
@@ -6,6 +6,8 @@ from typing import Any
 
 import httpx
 
+from fcp.utils.circuit_breaker import call_with_circuit_breaker, is_server_error
+
 logger = logging.getLogger(__name__)
 
 FDA_API_KEY = os.environ.get("FDA_API_KEY", "")
@@ -43,10 +45,10 @@ async def search_food_recalls(food_name: str, limit: int = 5) -> dict[str, Any]:
 
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{FDA_BASE_URL}/food/enforcement.json",
-                params=params,
-                timeout=FDA_TIMEOUT,
+            response = await call_with_circuit_breaker(
+                "openfda",
+                lambda: client.get(f"{FDA_BASE_URL}/food/enforcement.json", params=params, timeout=FDA_TIMEOUT),
+                failed=is_server_error,
             )
             if response.status_code == 404:
                 return {"results": [], "meta": {"total": 0}}
@@ -87,10 +89,10 @@ async def search_drug_food_interactions(drug_name: str, limit: int = 3) -> dict[
 
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{FDA_BASE_URL}/drug/label.json",
-                params=params,
-                timeout=FDA_TIMEOUT,
+            response = await call_with_circuit_breaker(
+                "openfda",
+                lambda: client.get(f"{FDA_BASE_URL}/drug/label.json", params=params, timeout=FDA_TIMEOUT),
+                failed=is_server_error,
             )
             if response.status_code == 404:
                 return {"interactions": [], "drug_name": drug_name}
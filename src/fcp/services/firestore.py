@@ -12,7 +12,8 @@ Backend selection is controlled by DATABASE_BACKEND environment variable:
 import logging
 import os
 import threading
-from datetime import datetime
+from collections.abc import Sequence
+from datetime import date, datetime
 from functools import lru_cache
 from typing import Any
 
@@ -71,8 +72,11 @@ class FirestoreClient:
         days: int | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        fields: Sequence[str] | None = None,
     ) -> list[dict[str, Any]]:
-        return await self._db.get_user_logs(user_id, limit=limit, days=days, start_date=start_date, end_date=end_date)
+        return await self._db.get_user_logs(
+            user_id, limit=limit, days=days, start_date=start_date, end_date=end_date, fields=fields
+        )
 
     async def get_log(self, user_id: str, log_id: str) -> dict[str, Any] | None:
         return await self._db.get_log(user_id, log_id)
@@ -83,20 +87,35 @@ class FirestoreClient:
     async def create_log(self, user_id: str, data: dict[str, Any]) -> str:
         return await self._db.create_log(user_id, data)
 
+    async def create_logs_batch(self, user_id: str, entries: list[dict[str, Any]]) -> list[str]:
+        return await self._db.create_logs_batch(user_id, entries)
+
     async def update_log(self, user_id: str, log_id: str, data: dict[str, Any]) -> bool:
         return await self._db.update_log(user_id, log_id, data)
 
     async def delete_log(self, user_id: str, log_id: str) -> bool:
         return await self._db.delete_log(user_id, log_id)
 
-    async def get_all_user_logs(self, user_id: str, limit: int | None = None) -> list[dict[str, Any]]:
-        return await self._db.get_all_user_logs(user_id, limit=limit)
+    async def get_all_user_logs(
+        self, user_id: str, limit: int | None = None, fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return await self._db.get_all_user_logs(user_id, limit=limit, fields=fields)
 
     async def get_user_logs_paginated(
         self, user_id: str, page: int = 1, page_size: int = 100
     ) -> tuple[list[dict[str, Any]], int]:
         return await self._db.get_user_logs_paginated(user_id, page=page, page_size=page_size)
 
+    async def get_user_logs_page(
+        self, user_id: str, page_size: int = 100, cursor: str | None = None, days: int | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        return await self._db.get_user_logs_page(user_id, page_size=page_size, cursor=cursor, days=days)
+
+    async def search_logs(
+        self, user_id: str, query: str, limit: int = 20, fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return await self._db.search_logs(user_id, query, limit=limit, fields=fields)
+
     async def count_user_logs(self, user_id: str) -> int:
         return await self._db.count_user_logs(user_id)
 
@@ -114,6 +133,9 @@ class FirestoreClient:
     async def add_pantry_item(self, user_id: str, item: dict[str, Any]) -> str:
         return await self._db.add_pantry_item(user_id, item)
 
+    async def add_pantry_items_batch(self, user_id: str, items: list[dict[str, Any]]) -> list[str]:
+        return await self._db.add_pantry_items_batch(user_id, items)
+
     async def delete_pantry_item(self, user_id: str, item_id: str) -> bool:
         return await self._db.delete_pantry_item(user_id, item_id)
 
@@ -160,6 +182,18 @@ class FirestoreClient:
     async def get_user_stats(self, user_id: str) -> dict[str, Any]:
         return await self._db.get_user_stats(user_id)
 
+    async def get_daily_rollups(self, user_id: str, start: date, end: date) -> list[dict[str, Any]]:
+        return await self._db.get_daily_rollups(user_id, start, end)
+
+    async def get_data_version(self, user_id: str) -> int:
+        return await self._db.get_data_version(user_id)
+
+    async def get_taste_profile_snapshot(self, user_id: str, period: str) -> dict[str, Any] | None:
+        return await self._db.get_taste_profile_snapshot(user_id, period)
+
+    async def save_taste_profile_snapshot(self, user_id: str, period: str, snapshot: dict[str, Any]) -> None:
+        await self._db.save_taste_profile_snapshot(user_id, period, snapshot)
+
     # --- Notifications ---
 
     async def store_notification(self, user_id: str, notification_type: str, content: dict[str, Any]) -> str:
@@ -6,10 +6,15 @@ Used in production (Cloud Run) when DATABASE_BACKEND=firestore.
 
 import logging
 import os
-from datetime import UTC, datetime, timedelta
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, timedelta
 from typing import Any
 from uuid import uuid4
 
+from fcp.services.log_search import SEARCH_FIELDS, fts_match_expression, rank_logs
+from fcp.services.nutrition_rollups import ROLLUP_LOG_FIELDS, rollups_from_logs
+from fcp.services.pagination import decode_log_cursor, encode_log_cursor
+
 logger = logging.getLogger(__name__)
 
 # Import firestore at module level for easier mocking in tests
@@ -21,6 +26,9 @@ except ImportError:
     firestore = None  # type: ignore[assignment]
     FIRESTORE_AVAILABLE = False
 
+# Firestore rejects write batches with more than 500 operations.
+MAX_BATCH_WRITES = 500
+
 
 class FirestoreBackend:
     """Async Firestore backend that matches the Database interface."""
@@ -74,6 +82,35 @@ class FirestoreBackend:
     def _new_id(self) -> str:
         return uuid4().hex
 
+    @staticmethod
+    def _data_version_increment() -> Any:
+        """The write value that moves the users document's data version on by one.
+
+        ``Increment`` is a server-side transform: it is applied atomically in a
+        ``set(..., merge=True)`` and inside a ``WriteBatch`` alike, so concurrent
+        writers on any instance each move the version forward.
+        """
+        return firestore.Increment(1)
+
+    async def _bump_data_version(self, user_id: str) -> None:
+        await (
+            self.db.collection("users")
+            .document(user_id)
+            .set({"data_version": self._data_version_increment()}, merge=True)
+        )
+
+    async def _set_in_batches(self, writes: list[tuple[Any, dict[str, Any], bool]]) -> None:
+        """Apply ``(document_ref, data, merge)`` sets through chunked ``WriteBatch`` commits.
+
+        Each chunk of up to ``MAX_BATCH_WRITES`` documents commits atomically;
+        larger imports are split across several commits.
+        """
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for ref, data, merge in writes[start : start + MAX_BATCH_WRITES]:
+                batch.set(ref, data, merge=merge)
+            await batch.commit()
+
     # =========================================================================
     # Food Logs
     # =========================================================================
@@ -85,9 +122,12 @@ class FirestoreBackend:
         days: int | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        fields: Sequence[str] | None = None,
     ) -> list[dict[str, Any]]:
         await self._ensure_connected()
         query = self.db.collection("food_logs").where("user_id", "==", user_id).where("deleted", "==", False)
+        if fields is not None:
+            query = query.select(list(fields))
 
         if start_date:
             query = query.where("created_at", ">=", start_date.isoformat())
@@ -144,10 +184,40 @@ class FirestoreBackend:
         await self.db.collection("food_logs").document(log_id).set(data)
 
         # Update user last_active
-        await self.db.collection("users").document(user_id).set({"last_active": now}, merge=True)
+        await (
+            self.db.collection("users")
+            .document(user_id)
+            .set({"last_active": now, "data_version": self._data_version_increment()}, merge=True)
+        )
         await self.invalidate_user_stats(user_id)
         return log_id
 
+    async def create_logs_batch(self, user_id: str, entries: list[dict[str, Any]]) -> list[str]:
+        await self._ensure_connected()
+        if not entries:
+            return []
+        now = self._now()
+        logs = self.db.collection("food_logs")
+        ids = []
+        writes = []
+        for entry in entries:
+            data = {**entry, "user_id": user_id, "created_at": now, "updated_at": now}
+            data.setdefault("deleted", False)
+            log_id = self._new_id()
+            ids.append(log_id)
+            writes.append((logs.document(log_id), data, False))
+        writes.append(
+            (
+                self.db.collection("users").document(user_id),
+                {"last_active": now, "data_version": self._data_version_increment()},
+                True,
+            )
+        )
+
+        await self._set_in_batches(writes)
+        await self.invalidate_user_stats(user_id)
+        return ids
+
     async def update_log(self, user_id: str, log_id: str, data: dict[str, Any]) -> bool:
         await self._ensure_connected()
         existing = await self.get_log(user_id, log_id)
@@ -156,6 +226,7 @@ class FirestoreBackend:
 
         data["updated_at"] = self._now()
         await self.db.collection("food_logs").document(log_id).update(data)
+        await self._bump_data_version(user_id)
         await self.invalidate_user_stats(user_id)
         return True
 
@@ -166,10 +237,16 @@ class FirestoreBackend:
             return False
 
         await self.db.collection("food_logs").document(log_id).delete()
+        await self._bump_data_version(user_id)
         await self.invalidate_user_stats(user_id)
         return True
 
-    async def get_all_user_logs(self, user_id: str, limit: int | None = None) -> list[dict[str, Any]]:
+    async def get_all_user_logs(
+        self,
+        user_id: str,
+        limit: int | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
         await self._ensure_connected()
         query = (
             self.db.collection("food_logs")
@@ -177,6 +254,8 @@ class FirestoreBackend:
             .where("deleted", "==", False)
             .order_by("created_at", direction="DESCENDING")
         )
+        if fields is not None:
+            query = query.select(list(fields))
         if limit:
             query = query.limit(limit)
 
@@ -219,16 +298,80 @@ class FirestoreBackend:
 
         return logs, total
 
+    async def get_user_logs_page(
+        self,
+        user_id: str,
+        page_size: int = 100,
+        cursor: str | None = None,
+        days: int | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Return one page of logs after ``cursor`` and the cursor for the next page.
+
+        Uses ``start_after`` on ``(created_at, __name__)`` instead of ``offset``
+        so skipped documents are never read or billed, and skips the
+        ``count_user_logs`` aggregation. Raises ``ValueError`` for a malformed cursor.
+        """
+        await self._ensure_connected()
+        page_size = max(min(page_size, 500), 1)
+        query = self.db.collection("food_logs").where("user_id", "==", user_id).where("deleted", "==", False)
+
+        if days:
+            cutoff = (datetime.now(UTC) - timedelta(days=days)).isoformat()
+            query = query.where("created_at", ">=", cutoff)
+
+        query = query.order_by("created_at", direction="DESCENDING").order_by("__name__", direction="DESCENDING")
+        if cursor:
+            after_created_at, after_id = decode_log_cursor(cursor)
+            query = query.start_after({"created_at": after_created_at, "__name__": after_id})
+
+        logs = []
+        async for doc in query.limit(page_size + 1).stream():
+            data = doc.to_dict()
+            data["id"] = doc.id
+            logs.append(data)
+
+        next_cursor = None
+        if len(logs) > page_size:
+            logs = logs[:page_size]
+            next_cursor = encode_log_cursor(logs[-1]["created_at"], logs[-1]["id"])
+        return logs, next_cursor
+
+    async def search_logs(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Full-text search over the user's logs, best BM25 match first.
+
+        Firestore has no full-text index, so this streams the user's logs and
+        ranks them in process with the same field weights as the SQLite FTS5
+        index. Each hit carries a ``search_score`` (higher is better).
+        """
+        await self._ensure_connected()
+        if fts_match_expression(query) is None:
+            return []
+        query_ref = self.db.collection("food_logs").where("user_id", "==", user_id).where("deleted", "==", False)
+        if fields is not None:
+            query_ref = query_ref.select(list(dict.fromkeys((*SEARCH_FIELDS, *fields))))
+        logs = []
+        async for doc in query_ref.stream():
+            data = doc.to_dict()
+            data["id"] = doc.id
+            logs.append(data)
+        hits = rank_logs(logs, query, limit)
+        if fields is not None:
+            keep = {"id", "search_score", *fields}
+            hits = [{k: v for k, v in hit.items() if k in keep} for hit in hits]
+        return hits
+
     async def count_user_logs(self, user_id: str) -> int:
         await self._ensure_connected()
         query = self.db.collection("food_logs").where("user_id", "==", user_id).where("deleted", "==", False)
-        # Firestore doesn't have efficient COUNT, so we have to fetch all docs
-        # For production, consider maintaining a counter in a separate document
-        docs = query.stream()
-        count = 0
-        async for _ in docs:
-            count += 1
-        return count
+        # A server-side COUNT aggregation reads index entries, not the log documents
+        results = await query.count(alias="count").get()
+        return int(results[0][0].value) if results and results[0] else 0
 
     # =========================================================================
     # Pantry
@@ -260,20 +403,28 @@ class FirestoreBackend:
         item_data.setdefault("created_at", now)
 
         await self.db.collection("pantry").document(item_id).set(item_data, merge=True)
+        await self._bump_data_version(user_id)
         return item_id
 
     async def update_pantry_items_batch(self, user_id: str, items_data: list[dict[str, Any]]) -> list[str]:
         await self._ensure_connected()
-        if not items_data:
-            return []
-
+        now = self._now()
+        pantry = self.db.collection("pantry")
         ids = []
+        writes = []
         for item in items_data:
             name = item.get("name")
             if not name:
                 continue
-            item_id = await self.update_pantry_item(user_id, item)
+            item_id = item.get("id") or name.lower().replace(" ", "_")
+            data = {**item, "user_id": user_id, "updated_at": now}
+            data.setdefault("created_at", now)
             ids.append(item_id)
+            writes.append((pantry.document(item_id), data, True))
+
+        await self._set_in_batches(writes)
+        if writes:
+            await self._bump_data_version(user_id)
         return ids
 
     async def add_pantry_item(self, user_id: str, item: dict[str, Any]) -> str:
@@ -286,8 +437,27 @@ class FirestoreBackend:
         item.setdefault("updated_at", now)
 
         await self.db.collection("pantry").document(item_id).set(item)
+        await self._bump_data_version(user_id)
         return item_id
 
+    async def add_pantry_items_batch(self, user_id: str, items: list[dict[str, Any]]) -> list[str]:
+        await self._ensure_connected()
+        now = self._now()
+        pantry = self.db.collection("pantry")
+        ids = []
+        writes = []
+        for item in items:
+            data = {**item, "user_id": user_id, "created_at": now}
+            data.setdefault("updated_at", now)
+            item_id = self._new_id()
+            ids.append(item_id)
+            writes.append((pantry.document(item_id), data, False))
+
+        await self._set_in_batches(writes)
+        if writes:
+            await self._bump_data_version(user_id)
+        return ids
+
     async def delete_pantry_item(self, user_id: str, item_id: str) -> bool:
         await self._ensure_connected()
         doc = await self.db.collection("pantry").document(item_id).get()
@@ -299,6 +469,7 @@ class FirestoreBackend:
             return False
 
         await self.db.collection("pantry").document(item_id).delete()
+        await self._bump_data_version(user_id)
         return True
 
     # =========================================================================
@@ -452,6 +623,7 @@ class FirestoreBackend:
                 {
                     "preferences": preferences,
                     "last_active": now,
+                    "data_version": self._data_version_increment(),
                 },
                 merge=True,
             )
@@ -468,6 +640,50 @@ class FirestoreBackend:
             )
         )
 
+    async def get_data_version(self, user_id: str) -> int:
+        """The user's data version: changes on every food log, pantry or preferences write."""
+        await self._ensure_connected()
+        doc = await self.db.collection("users").document(user_id).get()
+        data = doc.to_dict() if doc.exists else None
+        return (data or {}).get("data_version") or 0
+
+    async def get_taste_profile_snapshot(self, user_id: str, period: str) -> dict[str, Any] | None:
+        """The stored taste profile for ``period`` and the watermark it was built at, if any."""
+        await self._ensure_connected()
+        doc = await self.db.collection("taste_profiles").document(f"{user_id}_{period}").get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        if data.get("user_id") != user_id:
+            return None
+        return {key: data.get(key) for key in ("profile", "log_count", "data_version", "built_at")}
+
+    async def save_taste_profile_snapshot(self, user_id: str, period: str, snapshot: dict[str, Any]) -> None:
+        """Store a taste profile outside the user document, so saving it does not change the data version."""
+        await self._ensure_connected()
+        await (
+            self.db.collection("taste_profiles")
+            .document(f"{user_id}_{period}")
+            .set({**snapshot, "user_id": user_id, "period": period})
+        )
+
+    async def get_daily_rollups(self, user_id: str, start: date, end: date) -> list[dict[str, Any]]:
+        """Daily nutrition rollups from ``start`` to ``end`` inclusive, oldest first.
+
+        Firestore has no triggers to maintain rollups, so they are computed on
+        read from a query projected to the fields a rollup needs.
+        """
+        await self._ensure_connected()
+        query = (
+            self.db.collection("food_logs")
+            .where("user_id", "==", user_id)
+            .where("deleted", "==", False)
+            .where("created_at", ">=", start.isoformat())
+            .where("created_at", "<", (end + timedelta(days=1)).isoformat())
+            .select(list(ROLLUP_LOG_FIELDS))
+        )
+        return rollups_from_logs([doc.to_dict() async for doc in query.stream()])
+
     async def get_user_stats(self, user_id: str) -> dict[str, Any]:
         await self._ensure_connected()
         # Check cache first
@@ -14,7 +14,7 @@ from google.genai import types
 
 from fcp.security import validate_image_url
 from fcp.services.gemini_async_ops import GeminiCacheMixin, GeminiDeepResearchMixin, GeminiVideoMixin
-from fcp.services.gemini_base import GeminiBase
+from fcp.services.gemini_base import GeminiBase, gemini_circuit_open
 from fcp.services.gemini_constants import GEMINI_API_KEY, MAX_IMAGE_SIZE, MODEL_NAME
 from fcp.services.gemini_constants import RETRYABLE_EXCEPTIONS as _RETRYABLE_EXCEPTIONS
 from fcp.services.gemini_generation import (
@@ -49,6 +49,7 @@ __all__ = [
     "RETRYABLE_EXCEPTIONS",
     "gemini_retry",
     "GeminiClient",
+    "gemini_circuit_open",
     "_parse_json_response",
     "_get_thinking_budget",
     "types",
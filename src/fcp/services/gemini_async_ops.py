@@ -12,7 +12,8 @@ from google.genai import types
 
 from fcp.config import Config
 from fcp.services.gemini_constants import MODEL_NAME
-from fcp.services.gemini_helpers import _log_token_usage, gemini_retry
+from fcp.services.gemini_context_cache import CACHE_MISS_CODES
+from fcp.services.gemini_helpers import gemini_retry
 
 logger = logging.getLogger(__name__)
 
@@ -46,32 +47,23 @@ class GeminiCacheMixin:
         cache_name: str,
         fallback_to_uncached: bool = True,
     ) -> str:
-        client = self._require_client()
+        self._require_client()
 
         config = types.GenerateContentConfig(
             cached_content=cache_name,
         )
 
         try:
-            response = await client.aio.models.generate_content(
-                model=MODEL_NAME,
-                contents=prompt,
-                config=config,
-            )
-            _log_token_usage(response, "generate_with_cache")
+            response = await self._generate_content("generate_with_cache", prompt, config)
             return response.text or ""
         except genai_errors.ClientError as e:
-            if e.code in (400, 404, 410) and fallback_to_uncached:
+            if e.code in CACHE_MISS_CODES and fallback_to_uncached:
                 logger.warning(
                     "Cache error (code=%s): %s. Falling back to uncached generation.",
                     e.code,
                     e.message or "Unknown error",
                 )
-                response = await client.aio.models.generate_content(
-                    model=MODEL_NAME,
-                    contents=prompt,
-                )
-                _log_token_usage(response, "generate_with_cache_fallback")
+                response = await self._generate_content("generate_with_cache_fallback", prompt)
                 return response.text or ""
             raise
 
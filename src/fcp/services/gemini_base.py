@@ -2,21 +2,57 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from collections.abc import AsyncIterator
+import time
+from collections.abc import AsyncIterator, Sequence
 
 import httpx
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
 from fcp.config import Config
 from fcp.security import ImageURLError
 from fcp.security.url_validator import validate_content_type
-from fcp.services.gemini_constants import MAX_IMAGE_SIZE
-from fcp.services.gemini_helpers import gemini_retry
+from fcp.services.gemini_constants import MAX_IMAGE_SIZE, MODEL_NAME
+from fcp.services.gemini_context_cache import CACHE_MISS_CODES, gemini_context_cache
+from fcp.services.gemini_governor import Priority, current_priority, gemini_governor
+from fcp.services.gemini_helpers import _log_token_usage, gemini_retry
+from fcp.services.gemini_response_cache import response_key
+from fcp.services.media_cache import media_cache
+from fcp.settings import settings
+from fcp.utils.circuit_breaker import call_with_circuit_breaker, is_circuit_open
+from fcp.utils.deadline import DeadlineExceededError, expired, timeout_within_deadline, within_deadline
+from fcp.utils.hedging import LatencyTracker, hedged
+from fcp.utils.metrics import record_gemini_coalesced_call, record_gemini_hedge
 
 logger = logging.getLogger(__name__)
 
+# Interactive calls still running at this quantile of their method's recent latency are hedged
+HEDGE_QUANTILE = 0.95
+
+# Recent latency of each client method, shared by every client in the process
+_latencies: dict[str, LatencyTracker] = {}
+
+
+def gemini_breaker_name(model: str = MODEL_NAME) -> str:
+    """Name of the circuit breaker guarding calls to ``model``."""
+    return f"gemini:{model}"
+
+
+def gemini_circuit_open(model: str = MODEL_NAME) -> bool:
+    """Whether calls to ``model`` currently fail fast; tools with a local fallback skip straight to it."""
+    return is_circuit_open(gemini_breaker_name(model))
+
+
+class _Flight:
+    """One model call shared by every concurrent caller that made the same request."""
+
+    def __init__(self, task: asyncio.Task[types.GenerateContentResponse]):
+        self.task = task
+        self.waiters = 0
+
 
 class GeminiBase:
     """Base Gemini client utilities shared across feature modules."""
@@ -29,12 +65,125 @@ class GeminiBase:
         gemini_module = importlib.import_module("fcp.services.gemini")
         api_key = gemini_module.GEMINI_API_KEY
         self.client = genai.Client(api_key=api_key) if api_key else None
+        self._in_flight: dict[str, _Flight] = {}
 
     def _require_client(self) -> genai.Client:
         if not self.client:
             raise RuntimeError("GEMINI_API_KEY not configured")
         return self.client
 
+    async def _generate_content(
+        self,
+        method: str,
+        contents: str | Sequence[types.Part],
+        config: types.GenerateContentConfig | None = None,
+    ) -> types.GenerateContentResponse:
+        """Call ``generate_content``, sending a declared prompt prefix as a context cache when one is due.
+
+        See ``gemini_context_cache``. A cache the API no longer accepts is
+        dropped and the call made again with the prefix inline.
+        """
+        client = self._require_client()
+        cached = await gemini_context_cache.prepare(client, MODEL_NAME, contents, config)
+        if cached is not None:
+            try:
+                response = await self._generate_coalesced(method, cached.contents, cached.config)
+            except genai_errors.ClientError as e:
+                if e.code not in CACHE_MISS_CODES:
+                    raise
+                gemini_context_cache.forget(method, cached.handle)
+            else:
+                gemini_context_cache.record_use(method, cached.handle, response)
+                return response
+        return await self._generate_coalesced(method, contents, config)
+
+    async def _generate_coalesced(
+        self,
+        method: str,
+        contents: str | Sequence[types.Part],
+        config: types.GenerateContentConfig | None = None,
+    ) -> types.GenerateContentResponse:
+        """Call ``generate_content``, sharing one call between identical concurrent requests.
+
+        During a burst many callers send the same request at once (the same
+        popular dish, the same recall check). The first starts the API call;
+        the rest await it and get the same response, whether or not the
+        response cache is on. Token usage is recorded once, for the call that
+        was made. A caller that is cancelled, or whose request deadline passes,
+        stops waiting; the call itself is cancelled only when no caller is left
+        waiting for it.
+        """
+        client = self._require_client()
+        try:
+            key = response_key(method, MODEL_NAME, contents, config)
+        except (AttributeError, TypeError):
+            # Contents other than text and Parts are sent as they are
+            async with within_deadline():
+                return await self._call_model(client, method, contents, config)
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._call_model(client, method, contents, config)))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+        else:
+            record_gemini_coalesced_call(method)
+
+        flight.waiters += 1
+        try:
+            async with within_deadline():
+                return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                self._land(key, flight)
+                flight.task.cancel()
+
+    async def _call_model(
+        self,
+        client: genai.Client,
+        method: str,
+        contents: str | Sequence[types.Part],
+        config: types.GenerateContentConfig | None,
+    ) -> types.GenerateContentResponse:
+        """Call the model, hedging interactive calls that run past ``method``'s p95 when enabled."""
+        latency = _latencies.get(method)
+        if latency is None:
+            latency = _latencies[method] = LatencyTracker(min_samples=settings.gemini_hedge_min_samples)
+        delay = None
+        if settings.gemini_hedging_enabled and current_priority() is Priority.INTERACTIVE:
+            delay = latency.quantile(HEDGE_QUANTILE)
+
+        started = time.monotonic()
+        response = await hedged(
+            lambda: self._attempt(client, contents, config),
+            delay,
+            on_hedge=lambda winner: record_gemini_hedge(method, winner),
+        )
+        latency.record(time.monotonic() - started)
+        _log_token_usage(response, method)
+        return response
+
+    async def _attempt(
+        self,
+        client: genai.Client,
+        contents: str | Sequence[types.Part],
+        config: types.GenerateContentConfig | None,
+    ) -> types.GenerateContentResponse:
+        # While the model's breaker is open this raises CircuitBreakerError at once,
+        # which gemini_retry does not retry. A call over GEMINI_TIMEOUT_SECONDS raises
+        # TimeoutError, which counts against the breaker and is retried.
+        return await call_with_circuit_breaker(
+            gemini_breaker_name(MODEL_NAME),
+            lambda: gemini_governor.generate_content(
+                client, model=MODEL_NAME, contents=contents, config=config, timeout=Config.GEMINI_TIMEOUT_SECONDS
+            ),
+        )
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        """Stop handing out ``flight`` to new callers."""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
     @classmethod
     def _get_http_client(cls) -> httpx.AsyncClient:
         """Get or create the shared HTTP client with connection pooling."""
@@ -86,7 +235,7 @@ class GeminiBase:
 
     @gemini_retry
     async def _fetch_media(self, url: str, expected_type: str = "image") -> tuple[bytes, str]:
-        """Fetch media data from URL with security checks."""
+        """Fetch media data from URL with security checks, through the media cache."""
         try:
             import importlib
 
@@ -96,21 +245,33 @@ class GeminiBase:
             raise ValueError(f"Invalid media URL: {e}") from e
 
         http_client = self._get_http_client()
-        response = await http_client.get(
-            validated_url,
-            follow_redirects=True,
-        )
-        response.raise_for_status()
 
-        content_type = response.headers.get("content-type", "")
+        async def download(headers: dict[str, str]) -> httpx.Response:
+            try:
+                response = await http_client.get(
+                    validated_url,
+                    headers=headers,
+                    follow_redirects=True,
+                    timeout=timeout_within_deadline(Config.HTTP_TIMEOUT_SECONDS),
+                )
+            except httpx.TimeoutException as e:
+                if expired():
+                    raise DeadlineExceededError("Request deadline passed while fetching media") from e
+                raise
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return response
+            response.raise_for_status()
+
+            content_length = response.headers.get("content-length")
+            if content_length and int(content_length) > MAX_IMAGE_SIZE:
+                raise ValueError(f"Media too large: {content_length} bytes.")
+            return response
+
+        data, content_type = await media_cache.fetch(validated_url, download)
         if expected_type == "image" and not validate_content_type(content_type):
             raise ValueError(f"Invalid content type: {content_type}. Expected an image.")
 
-        content_length = response.headers.get("content-length")
-        if content_length and int(content_length) > MAX_IMAGE_SIZE:
-            raise ValueError(f"Media too large: {content_length} bytes.")
-
-        return response.content, content_type.split(";")[0].strip()
+        return data, content_type.split(";")[0].strip()
 
 
 class GeminiStreamingMixin:
@@ -52,4 +52,5 @@ RETRYABLE_EXCEPTIONS = (
     httpx.ConnectError,
     httpx.TimeoutException,
     httpx.HTTPStatusError,  # Includes 429 rate limit, 503 service unavailable
+    TimeoutError,  # One attempt ran past GEMINI_TIMEOUT_SECONDS
 )
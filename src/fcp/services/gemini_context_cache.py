@@ -0,0 +1,268 @@
+"""Gemini context caches for large prompt prefixes that repeat.
+
+The taste profile, dietitian report, weekly digest and analytics prompts
+open with the same serialized food history of one user, and the same
+history is often sent again within minutes. Sent inline, every call pays for
+those input tokens in full. A tool declares the block its prompts open with
+using ``cached_prefix``; from the block's second use, calls whose prompt
+starts with it send the rest of the prompt against a Gemini cached content
+holding the block, and the cached tokens are billed at the reduced rate.
+
+Handles to the cached contents live in a local registry, keyed on the model,
+the block and any system instruction or tools (which the API requires to be
+part of the cached content). The block is the user's history as of their
+current data, so a write gives the next call a new key. Each cache is
+created once, refreshed when used near the end of its TTL, and deleted when
+it falls out of the registry. A cache the API no longer knows answers
+400/404/410; the call is then made again with the block inline.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, NamedTuple
+
+from google.genai import types
+
+from fcp.services.gemini_governor import estimate_tokens
+from fcp.settings import settings
+from fcp.utils.background_tasks import create_tracked_task
+from fcp.utils.metrics import record_gemini_context_cache
+
+logger = logging.getLogger(__name__)
+
+# Errors the API answers for a cached content that expired or was deleted
+CACHE_MISS_CODES = (400, 404, 410)
+
+# A block sent only once is not worth the cost of creating a cache for it
+MIN_USES = 2
+
+# Config fields a cached content must carry; requests that use it leave them out
+CACHED_CONFIG_FIELDS = ("system_instruction", "tools", "tool_config")
+
+# Blocks whose uses are counted before they are cached
+MAX_TRACKED_PREFIXES = 4096
+
+
+class _Prefix:
+    """The block the prompts in the current context open with."""
+
+    def __init__(self, text: str, user_id: str | None):
+        self.text = text
+        self.user_id = user_id
+
+
+_prefix: ContextVar[_Prefix | None] = ContextVar("gemini_context_prefix", default=None)
+
+
+@contextmanager
+def cached_prefix(text: str, *, user_id: str | None = None) -> Iterator[None]:
+    """Declare that the Gemini prompts sent in this block start with ``text``.
+
+    Args:
+        text: Stable block at the start of the prompt, such as the user's serialized history
+        user_id: Whose data the block holds; names the cached content
+    """
+    token = _prefix.set(_Prefix(text, user_id))
+    try:
+        yield
+    finally:
+        _prefix.reset(token)
+
+
+class ContextCacheHandle:
+    """One cached content the API holds for a prefix."""
+
+    def __init__(self, name: str, key: str, tokens: int, expires_at: float):
+        self.name = name
+        self.key = key
+        self.tokens = tokens
+        self.expires_at = expires_at
+
+
+class CachedRequest(NamedTuple):
+    """A request rewritten to use a cached prefix."""
+
+    handle: ContextCacheHandle
+    contents: list[types.Part]
+    config: types.GenerateContentConfig
+
+
+def _without_prefix(contents: str | Sequence[types.Part | str], prefix: str) -> list[types.Part] | None:
+    """``contents`` minus ``prefix`` at the start of its first part; None when it does not start with it."""
+    parts = [types.Part(text=contents)] if isinstance(contents, str) else list(contents)
+    if not parts:
+        return None
+    first = parts[0]
+    text = first if isinstance(first, str) else getattr(first, "text", None)
+    if not isinstance(text, str) or not text.startswith(prefix):
+        return None
+    rest = text[len(prefix) :].strip()
+    remaining = [types.Part(text=rest)] if rest else []
+    remaining += [types.Part(text=part) if isinstance(part, str) else part for part in parts[1:]]
+    return remaining or None
+
+
+def _prefix_key(model: str, text: str, carried: dict[str, Any]) -> str:
+    config = types.GenerateContentConfig(**carried).model_dump(mode="json", exclude_none=True)
+    payload = json.dumps([model, text, config], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GeminiContextCache:
+    """Registry of the cached contents created for declared prompt prefixes."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool | None = None,
+        min_tokens: int | None = None,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ):
+        self.enabled = settings.gemini_context_cache_enabled if enabled is None else enabled
+        self.min_tokens = settings.gemini_context_cache_min_tokens if min_tokens is None else min_tokens
+        self.ttl_seconds = settings.gemini_context_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.max_entries = settings.gemini_context_cache_max_entries if max_entries is None else max_entries
+        self._handles: OrderedDict[str, ContextCacheHandle] = OrderedDict()
+        self._uses: OrderedDict[str, int] = OrderedDict()
+        self._creating: dict[str, asyncio.Task[ContextCacheHandle | None]] = {}
+        self._stats = {"cached": 0, "created": 0, "fallback": 0, "tokens_saved": 0}
+
+    async def prepare(
+        self,
+        client: Any,
+        model: str,
+        contents: str | Sequence[types.Part | str],
+        config: types.GenerateContentConfig | None,
+    ) -> CachedRequest | None:
+        """Rewrite the request to use the cached declared prefix, creating the cache when due.
+
+        Returns None when the request should be sent as it is: no prefix was
+        declared, the prompt does not start with it, it is too small, it has
+        not been used often enough yet, or the cache could not be created.
+        """
+        prefix = _prefix.get()
+        if not self.enabled or prefix is None:
+            return None
+        rest = _without_prefix(contents, prefix.text)
+        if rest is None or estimate_tokens(prefix.text) < self.min_tokens:
+            return None
+
+        carried = {
+            field: getattr(config, field)
+            for field in CACHED_CONFIG_FIELDS
+            if config is not None and getattr(config, field) is not None
+        }
+        key = _prefix_key(model, prefix.text, carried)
+        handle = await self._handle(client, model, key, prefix, carried)
+        if handle is None:
+            return None
+        request_config = (config or types.GenerateContentConfig()).model_copy(
+            update={"cached_content": handle.name, **dict.fromkeys(carried)}
+        )
+        return CachedRequest(handle, rest, request_config)
+
+    def record_use(self, method: str, handle: ContextCacheHandle, response: Any) -> None:
+        """Count the input tokens ``response`` was served from ``handle`` instead of inline."""
+        usage = getattr(response, "usage_metadata", None)
+        reported = getattr(usage, "cached_content_token_count", None)
+        tokens = reported if isinstance(reported, int) else handle.tokens
+        self._stats["cached"] += 1
+        self._stats["tokens_saved"] += tokens
+        record_gemini_context_cache(method, "cached", tokens)
+
+    def forget(self, method: str, handle: ContextCacheHandle) -> None:
+        """Drop a handle the API no longer accepts; the call is retried with the prefix inline."""
+        if self._handles.get(handle.key) is handle:
+            del self._handles[handle.key]
+        logger.warning("Gemini context cache %s is gone; sending the prefix inline", handle.name)
+        self._stats["fallback"] += 1
+        record_gemini_context_cache(method, "fallback")
+
+    def stats(self) -> dict[str, int]:
+        return {**self._stats, "handles": len(self._handles)}
+
+    async def _handle(
+        self, client: Any, model: str, key: str, prefix: _Prefix, carried: dict[str, Any]
+    ) -> ContextCacheHandle | None:
+        now = time.monotonic()
+        handle = self._handles.get(key)
+        if handle is not None:
+            if handle.expires_at > now:
+                self._handles.move_to_end(key)
+                if handle.expires_at - now < self.ttl_seconds / 2:
+                    handle.expires_at = now + self.ttl_seconds
+                    create_tracked_task(self._refresh(client, handle), name="gemini-context-cache-refresh")
+                return handle
+            del self._handles[key]
+
+        if key not in self._creating:
+            uses = self._uses.pop(key, 0) + 1
+            self._uses[key] = uses
+            while len(self._uses) > MAX_TRACKED_PREFIXES:
+                self._uses.popitem(last=False)
+            if uses < MIN_USES:
+                return None
+            self._creating[key] = asyncio.ensure_future(self._create(client, model, key, prefix, carried))
+            self._creating[key].add_done_callback(lambda _: self._creating.pop(key, None))
+        return await asyncio.shield(self._creating[key])
+
+    async def _create(
+        self, client: Any, model: str, key: str, prefix: _Prefix, carried: dict[str, Any]
+    ) -> ContextCacheHandle | None:
+        try:
+            cache = await client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"fcp-{prefix.user_id or 'shared'}"[:128],
+                    contents=[types.Content(role="user", parts=[types.Part(text=prefix.text)])],
+                    ttl=f"{int(self.ttl_seconds)}s",
+                    **carried,
+                ),
+            )
+        except Exception as e:
+            # Counted from zero again before the next attempt
+            self._uses.pop(key, None)
+            logger.warning("Could not create Gemini context cache, sending the prefix inline: %s", e)
+            return None
+
+        total = getattr(getattr(cache, "usage_metadata", None), "total_token_count", None)
+        handle = ContextCacheHandle(
+            cache.name,
+            key,
+            total if isinstance(total, int) else estimate_tokens(prefix.text),
+            time.monotonic() + self.ttl_seconds,
+        )
+        self._stats["created"] += 1
+        self._remember(client, key, handle)
+        return handle
+
+    def _remember(self, client: Any, key: str, handle: ContextCacheHandle) -> None:
+        self._handles[key] = handle
+        while len(self._handles) > self.max_entries:
+            _, oldest = self._handles.popitem(last=False)
+            create_tracked_task(self._delete(client, oldest.name), name="gemini-context-cache-delete")
+
+    async def _refresh(self, client: Any, handle: ContextCacheHandle) -> None:
+        try:
+            await client.aio.caches.update(
+                name=handle.name, config=types.UpdateCachedContentConfig(ttl=f"{int(self.ttl_seconds)}s")
+            )
+        except Exception as e:
+            logger.warning("Could not extend Gemini context cache %s: %s", handle.name, e)
+
+    async def _delete(self, client: Any, name: str) -> None:
+        try:
+            await client.aio.caches.delete(name=name)
+        except Exception as e:
+            logger.debug("Could not delete Gemini context cache %s: %s", name, e)
+
+
+gemini_context_cache = GeminiContextCache()
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import inspect
 import logging
 from collections.abc import AsyncIterator
-from typing import Any, cast
+from typing import Any
 
 from google.genai import types
 
 from fcp.services.gemini_constants import MODEL_NAME
-from fcp.services.gemini_helpers import _log_token_usage, _parse_json_response, gemini_retry
+from fcp.services.gemini_governor import gemini_governor
+from fcp.services.gemini_helpers import _hit_token_limit, _parse_json_response, gemini_retry
+from fcp.services.gemini_response_cache import gemini_response_cache
+from fcp.utils.json_stream import JsonEvent, iter_json_events
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +23,7 @@ class GeminiGenerationMixin:
 
     @gemini_retry
     async def generate_content(self, prompt: str, image_url: str | None = None, media_url: str | None = None) -> str:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_content] START prompt=%r image_url=%s media_url=%s",
@@ -28,12 +32,12 @@ class GeminiGenerationMixin:
             media_url,
         )
         parts = await self._prepare_parts(prompt, image_url, media_url)
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-        )
-        _log_token_usage(response, "generate_content")
-        result = response.text or ""
+
+        async def generate() -> str:
+            response = await self._generate_content("generate_content", parts)
+            return response.text or ""
+
+        result = await gemini_response_cache.get_or_generate("generate_content", MODEL_NAME, parts, None, generate)
         logger.debug("[generate_content] END response_len=%d", len(result))
         return result
 
@@ -46,15 +50,16 @@ class GeminiGenerationMixin:
             f"{prompt[:100]}..." if len(prompt) > 100 else prompt,
         )
         parts = await self._prepare_parts(prompt, image_url)
-        stream = await client.aio.models.generate_content_stream(
-            model=MODEL_NAME,
-            contents=parts,
-        )
         chunk_count = 0
-        async for chunk in stream:
-            if chunk.text:
-                chunk_count += 1
-                yield chunk.text
+        async with gemini_governor.slot(MODEL_NAME, parts, timed=False):
+            stream = await client.aio.models.generate_content_stream(
+                model=MODEL_NAME,
+                contents=parts,
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    chunk_count += 1
+                    yield chunk.text
         logger.debug("[generate_content_stream] END chunks=%d", chunk_count)
 
     @gemini_retry
@@ -66,7 +71,7 @@ class GeminiGenerationMixin:
         image_bytes: bytes | None = None,
         image_mime_type: str | None = None,
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_json] START prompt=%r image_url=%s",
@@ -77,18 +82,17 @@ class GeminiGenerationMixin:
         config = types.GenerateContentConfig(
             response_mime_type="application/json",
         )
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_json")
 
-        response_text = response.text or ""
-        text = response_text.strip()
-        result = _parse_json_response(text)
-        logger.debug("[generate_json] END keys=%s", list(result.keys()) if isinstance(result, dict) else "list")
-        return {"items": result} if isinstance(result, list) else result
+        async def generate() -> dict[str, Any]:
+            response = await self._generate_content("generate_json", parts, config)
+
+            response_text = response.text or ""
+            text = response_text.strip()
+            result = _parse_json_response(text, truncated=_hit_token_limit(response))
+            logger.debug("[generate_json] END keys=%s", list(result.keys()) if isinstance(result, dict) else "list")
+            return {"items": result} if isinstance(result, list) else result
+
+        return await gemini_response_cache.get_or_generate("generate_json", MODEL_NAME, parts, config, generate)
 
     @gemini_retry
     async def generate_json_stream(self, prompt: str, image_url: str | None = None) -> AsyncIterator[str]:
@@ -98,17 +102,27 @@ class GeminiGenerationMixin:
         config = types.GenerateContentConfig(
             response_mime_type="application/json",
         )
-        stream = cast(
-            AsyncIterator[types.GenerateContentResponse],
-            client.aio.models.generate_content_stream(
+        async with gemini_governor.slot(MODEL_NAME, parts, timed=False):
+            stream = client.aio.models.generate_content_stream(
                 model=MODEL_NAME,
                 contents=parts,
                 config=config,
-            ),
-        )
-        async for chunk in stream:
-            if chunk.text:
-                yield chunk.text
+            )
+            # The SDK's async client returns the stream from a coroutine
+            if inspect.isawaitable(stream):
+                stream = await stream
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+
+    async def generate_json_events(self, prompt: str, image_url: str | None = None) -> AsyncIterator[JsonEvent]:
+        """Stream a JSON response as parse events: each field as soon as it is complete.
+
+        See ``fcp.utils.json_stream`` for the events. Raises ``ValueError`` if
+        the response is not valid JSON or ends before the document does.
+        """
+        async for event in iter_json_events(self.generate_json_stream(prompt, image_url)):
+            yield event
 
 
 class GeminiToolingMixin:
@@ -122,7 +136,7 @@ class GeminiToolingMixin:
         image_url: str | None = None,
         media_url: str | None = None,
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_with_tools] START prompt=%r tools=%s",
@@ -144,12 +158,7 @@ class GeminiToolingMixin:
             tools=[types.Tool(function_declarations=function_declarations)],
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_with_tools")
+        response = await self._generate_content("generate_with_tools", parts, config)
 
         function_calls: list[dict[str, Any]] = []
 
@@ -180,7 +189,7 @@ class GeminiGroundingMixin:
 
     @gemini_retry
     async def generate_with_grounding(self, prompt: str) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_with_grounding] START prompt=%r",
@@ -190,12 +199,7 @@ class GeminiGroundingMixin:
             tools=[types.Tool(google_search=types.GoogleSearch())],
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt,
-            config=config,
-        )
-        _log_token_usage(response, "generate_with_grounding")
+        response = await self._generate_content("generate_with_grounding", prompt, config)
         sources = _extract_grounding_sources(response)
         logger.debug(
             "[generate_with_grounding] END response_len=%d sources=%d",
@@ -206,7 +210,7 @@ class GeminiGroundingMixin:
 
     @gemini_retry
     async def generate_json_with_grounding(self, prompt: str) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_json_with_grounding] START prompt=%r",
@@ -217,22 +221,22 @@ class GeminiGroundingMixin:
             response_mime_type="application/json",
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt,
-            config=config,
-        )
-        _log_token_usage(response, "generate_json_with_grounding")
-        sources = _extract_grounding_sources(response)
-        if response.text is None:
-            raise ValueError("Gemini returned empty response")
-        data = _parse_json_response(response.text)
-        logger.debug(
-            "[generate_json_with_grounding] END keys=%s sources=%d",
-            list(data.keys()) if isinstance(data, dict) else "list",
-            len(sources),
+        async def generate() -> dict[str, Any]:
+            response = await self._generate_content("generate_json_with_grounding", prompt, config)
+            sources = _extract_grounding_sources(response)
+            if response.text is None:
+                raise ValueError("Gemini returned empty response")
+            data = _parse_json_response(response.text, truncated=_hit_token_limit(response))
+            logger.debug(
+                "[generate_json_with_grounding] END keys=%s sources=%d",
+                list(data.keys()) if isinstance(data, dict) else "list",
+                len(sources),
+            )
+            return {"data": data, "sources": sources}
+
+        return await gemini_response_cache.get_or_generate(
+            "generate_json_with_grounding", MODEL_NAME, prompt, config, generate
         )
-        return {"data": data, "sources": sources}
 
 
 class GeminiThinkingMixin:
@@ -246,7 +250,7 @@ class GeminiThinkingMixin:
         image_url: str | None = None,
         media_url: str | None = None,
     ) -> str:
-        client = self._require_client()
+        self._require_client()
 
         parts = await self._prepare_parts(prompt, image_url, media_url)
         config = types.GenerateContentConfig(
@@ -256,14 +260,13 @@ class GeminiThinkingMixin:
             ),
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_with_thinking")
+        async def generate() -> str:
+            response = await self._generate_content("generate_with_thinking", parts, config)
+            return response.text or ""
 
-        return response.text or "" or ""
+        return await gemini_response_cache.get_or_generate(
+            "generate_with_thinking", MODEL_NAME, parts, config, generate
+        )
 
     @gemini_retry
     async def generate_json_with_thinking(
@@ -274,7 +277,7 @@ class GeminiThinkingMixin:
         media_url: str | None = None,
         include_thinking_output: bool = False,
     ) -> dict[str, Any] | list[Any] | GeminiThinkingResult:
-        client = self._require_client()
+        self._require_client()
 
         parts = await self._prepare_parts(prompt, image_url, media_url)
         config = types.GenerateContentConfig(
@@ -285,15 +288,10 @@ class GeminiThinkingMixin:
             ),
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_json_with_thinking")
+        response = await self._generate_content("generate_json_with_thinking", parts, config)
 
         response_text = response.text or ""
-        analysis = _parse_json_response(response_text.strip())
+        analysis = _parse_json_response(response_text.strip(), truncated=_hit_token_limit(response))
 
         if include_thinking_output:
             thinking = _extract_thinking_content(response)
@@ -307,7 +305,7 @@ class GeminiThinkingMixin:
         prompt: str,
         thinking_level: str = "high",
     ) -> str:
-        client = self._require_client()
+        self._require_client()
 
         config = types.GenerateContentConfig(
             thinking_config=types.ThinkingConfig(
@@ -316,12 +314,7 @@ class GeminiThinkingMixin:
             ),
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt,
-            config=config,
-        )
-        _log_token_usage(response, "generate_with_large_context")
+        response = await self._generate_content("generate_with_large_context", prompt, config)
 
         return response.text or "" or ""
 
@@ -333,7 +326,7 @@ class GeminiThinkingMixin:
         image_url: str | None = None,
         media_url: str | None = None,
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         parts = await self._prepare_parts(prompt, image_url, media_url)
         config = types.GenerateContentConfig(
@@ -344,16 +337,11 @@ class GeminiThinkingMixin:
             ),
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_json_with_large_context")
+        response = await self._generate_content("generate_json_with_large_context", parts, config)
 
         if response.text is None:
             raise ValueError("Gemini returned empty response")
-        parsed = _parse_json_response(response.text.strip())
+        parsed = _parse_json_response(response.text.strip(), truncated=_hit_token_limit(response))
         return {"items": parsed} if isinstance(parsed, list) else parsed
 
 
@@ -362,7 +350,7 @@ class GeminiCodeExecutionMixin:
 
     @gemini_retry
     async def generate_with_code_execution(self, prompt: str) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_with_code_execution] START prompt=%r",
@@ -372,12 +360,7 @@ class GeminiCodeExecutionMixin:
             tools=[types.Tool(code_execution=types.ToolCodeExecution())],
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt,
-            config=config,
-        )
-        _log_token_usage(response, "generate_with_code_execution")
+        response = await self._generate_content("generate_with_code_execution", prompt, config)
 
         result = {"text": response.text, "code": None, "execution_result": None}
 
@@ -403,7 +386,7 @@ class GeminiCodeExecutionMixin:
         prompt: str,
         image_url: str,
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         parts = await self._prepare_parts(prompt, image_url=image_url)
         config = types.GenerateContentConfig(
@@ -411,12 +394,7 @@ class GeminiCodeExecutionMixin:
             response_mime_type="application/json",
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_json_with_agentic_vision")
+        response = await self._generate_content("generate_json_with_agentic_vision", parts, config)
 
         code = None
         execution_result = None
@@ -437,7 +415,7 @@ class GeminiCodeExecutionMixin:
 
         if response.text is None:
             raise ValueError("Gemini returned empty response")
-        analysis = _parse_json_response(response.text.strip())
+        analysis = _parse_json_response(response.text.strip(), truncated=_hit_token_limit(response))
 
         return {
             "analysis": analysis,
@@ -456,7 +434,7 @@ class GeminiMediaMixin:
         image_url: str,
         resolution: str = "high",
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_json_with_media_resolution] START resolution=%s image_url=%s",
@@ -476,16 +454,11 @@ class GeminiMediaMixin:
             media_resolution=media_res,
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, f"generate_json_with_media_resolution({resolution})")
+        response = await self._generate_content(f"generate_json_with_media_resolution({resolution})", parts, config)
 
         response_text = response.text or ""
         text = response_text.strip()
-        result = _parse_json_response(text)
+        result = _parse_json_response(text, truncated=_hit_token_limit(response))
         logger.debug(
             "[generate_json_with_media_resolution] END keys=%s",
             list(result.keys()) if isinstance(result, dict) else "list",
@@ -498,7 +471,7 @@ class GeminiMediaMixin:
         prompt: str,
         urls: list[str],
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         parts: list[types.Part] = [types.Part(text=prompt)]
         parts.extend(types.Part(file_data=types.FileData(file_uri=url)) for url in urls)
@@ -506,16 +479,11 @@ class GeminiMediaMixin:
             response_mime_type="application/json",
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_json_with_url_context")
+        response = await self._generate_content("generate_json_with_url_context", parts, config)
 
         response_text = response.text or ""
         text = response_text.strip()
-        data = _parse_json_response(text)
+        data = _parse_json_response(text, truncated=_hit_token_limit(response))
 
         return {
             "data": data,
@@ -543,14 +511,15 @@ class GeminiImageMixin:
             aspect_ratio,
             number_of_images,
         )
-        response = await client.aio.models.generate_images(
-            model="imagen-3.0-generate-002",
-            prompt=prompt,
-            config=types.GenerateImagesConfig(
-                aspect_ratio=aspect_ratio,
-                number_of_images=number_of_images,
-            ),
-        )
+        async with gemini_governor.slot("imagen-3.0-generate-002", prompt):
+            response = await client.aio.models.generate_images(
+                model="imagen-3.0-generate-002",
+                prompt=prompt,
+                config=types.GenerateImagesConfig(
+                    aspect_ratio=aspect_ratio,
+                    number_of_images=number_of_images,
+                ),
+            )
 
         images = []
         if response.generated_images:
@@ -653,7 +622,7 @@ class GeminiCombinedToolsMixin:
         image_url: str | None = None,
         media_url: str | None = None,
     ) -> dict[str, Any]:
-        client = self._require_client()
+        self._require_client()
 
         logger.debug(
             "[generate_with_all_tools] START prompt=%r grounding=%s code_exec=%s thinking=%s",
@@ -678,12 +647,7 @@ class GeminiCombinedToolsMixin:
             ),
         )
 
-        response = await client.aio.models.generate_content(
-            model=MODEL_NAME,
-            contents=parts,
-            config=config,
-        )
-        _log_token_usage(response, "generate_with_all_tools")
+        response = await self._generate_content("generate_with_all_tools", parts, config)
 
         function_calls, sources, code, execution_result = self._extract_combined_tool_response(response)
 
@@ -0,0 +1,339 @@
+"""Adaptive admission control for every call made to the Gemini API.
+
+Without it nothing bounds how many requests a burst sends at once, and a
+429 only makes each caller back off and retry on its own, so the retries
+arrive together and hit the quota again. The governor keeps one gate per
+model that every call passes through, including the clients the image,
+portion, live-data and browser services construct themselves:
+
+- Concurrency: at most ``limit`` calls to a model are in flight. The limit
+  adapts AIMD-style: it grows by about one per ``limit`` successful calls and
+  is cut multiplicatively on a 429 or when a call runs over the latency
+  target. Only calls started after the last cut can cut it again, so one
+  burst of failures counts as one signal.
+- Budgets: requests and estimated tokens started in the last minute are kept
+  under ``gemini_rpm_limit`` and ``gemini_tpm_limit``. Estimates are replaced
+  by the usage the API reports once a call finishes.
+- Priority: callers wait in one queue per model ordered by priority, then
+  arrival. HTTP requests and MCP tool calls run at ``INTERACTIVE``; scheduler
+  jobs declare ``@gemini_priority(Priority.BACKGROUND)`` and only get a slot
+  when no interactive caller is waiting.
+"""
+
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, ParamSpec, TypeVar
+
+from google.genai import types
+
+from fcp.settings import settings
+from fcp.utils.metrics import record_gemini_admission, record_gemini_concurrency_limit
+
+logger = logging.getLogger(__name__)
+
+# Budgets are enforced over a sliding window of this many seconds
+WINDOW_SECONDS = 60.0
+# Multiplicative cuts applied to the concurrency limit
+RATE_LIMITED_BACKOFF = 0.5
+SLOW_CALL_BACKOFF = 0.9
+# Rough token cost of one image, audio or video part when estimating a request
+MEDIA_PART_TOKENS = 258
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Queue order for Gemini calls; lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Priority] = ContextVar("gemini_priority", default=Priority.INTERACTIVE)
+
+
+def gemini_priority(priority: Priority) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Run a coroutine function's Gemini calls at ``priority``."""
+
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            token = _priority.set(priority)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _priority.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+def current_priority() -> Priority:
+    """The priority Gemini calls made from the current context run at."""
+    return _priority.get()
+
+
+def estimate_tokens(contents: Any) -> int:
+    """Rough input token count of ``contents``: four characters per token, a flat cost per media part."""
+    if isinstance(contents, str):
+        return len(contents) // 4 + 1
+    if isinstance(contents, types.Part):
+        if contents.text is not None:
+            return len(contents.text) // 4 + 1
+        return MEDIA_PART_TOKENS if contents.inline_data or contents.file_data else 0
+    if isinstance(contents, types.Content):
+        return estimate_tokens(contents.parts or [])
+    if isinstance(contents, list | tuple):
+        return sum(estimate_tokens(item) for item in contents)
+    return 0
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether ``error`` is a 429 from the Gemini API (google-genai or httpx)."""
+    if getattr(error, "code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _reported_tokens(response: Any) -> int | None:
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    return total if isinstance(total, int) else None
+
+
+class _Waiter:
+    def __init__(self, priority: Priority, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+
+class Permit:
+    """One admitted call; report how it went with ``finish``."""
+
+    def __init__(self, governor: "ModelGovernor", usage: list[float], timed: bool):
+        self._governor = governor
+        self._usage = usage
+        self.started = time.monotonic()
+        # Streams stay open as long as the consumer reads, so their duration says nothing about load
+        self.timed = timed
+        self._finished = False
+
+    def finish(self, response: Any = None, error: BaseException | None = None) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self._governor._finish(self, response, error)
+
+
+class ModelGovernor:
+    """Concurrency limit, request/token budgets and priority queue for one model."""
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        initial_concurrency: int | None = None,
+        min_concurrency: int | None = None,
+        max_concurrency: int | None = None,
+        rpm_limit: int | None = None,
+        tpm_limit: int | None = None,
+        latency_target_seconds: float | None = None,
+        expected_output_tokens: int | None = None,
+    ):
+        self.model = model
+        self.min_concurrency = settings.gemini_min_concurrency if min_concurrency is None else min_concurrency
+        self.max_concurrency = settings.gemini_max_concurrency if max_concurrency is None else max_concurrency
+        initial = settings.gemini_initial_concurrency if initial_concurrency is None else initial_concurrency
+        self.limit = float(min(max(initial, self.min_concurrency), self.max_concurrency))
+        self.rpm_limit = settings.gemini_rpm_limit if rpm_limit is None else rpm_limit
+        self.tpm_limit = settings.gemini_tpm_limit if tpm_limit is None else tpm_limit
+        self.latency_target_seconds = (
+            settings.gemini_latency_target_seconds if latency_target_seconds is None else latency_target_seconds
+        )
+        self.expected_output_tokens = (
+            settings.gemini_expected_output_tokens if expected_output_tokens is None else expected_output_tokens
+        )
+        self.in_flight = 0
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._order = itertools.count()
+        # [started_at, tokens] of each call started within the window
+        self._window: deque[list[float]] = deque()
+        self._window_tokens = 0.0
+        self._last_cut = 0.0
+        self._wakeup: asyncio.TimerHandle | None = None
+        record_gemini_concurrency_limit(model, self.limit)
+
+    @asynccontextmanager
+    async def slot(self, contents: Any = None, *, timed: bool = True) -> AsyncIterator[Permit]:
+        """Wait for a slot for one call with ``contents``; reports errors as the call's outcome."""
+        permit = await self.acquire(estimate_tokens(contents) + self.expected_output_tokens, timed=timed)
+        try:
+            yield permit
+        except BaseException as e:
+            permit.finish(error=e)
+            raise
+        permit.finish()
+
+    async def acquire(self, tokens: int, *, timed: bool = True) -> Permit:
+        """Wait until the limit, the budgets and the callers ahead in the queue allow one more call."""
+        priority = _priority.get()
+        waiter = _Waiter(priority, tokens)
+        heapq.heappush(self._queue, (priority, next(self._order), waiter))
+        queued_at = time.monotonic()
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller gave up: hand the slot back
+                self.in_flight -= 1
+                self._dispatch()
+            else:
+                waiter.future.cancel()
+            raise
+        record_gemini_admission(self.model, priority.name.lower(), time.monotonic() - queued_at)
+        usage = [time.monotonic(), float(tokens)]
+        self._window.append(usage)
+        self._window_tokens += tokens
+        return Permit(self, usage, timed)
+
+    def stats(self) -> dict[str, Any]:
+        self._expire(time.monotonic())
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": sum(1 for _, _, waiter in self._queue if not waiter.future.done()),
+            "requests_in_window": len(self._window),
+            "tokens_in_window": int(self._window_tokens),
+        }
+
+    def _finish(self, permit: Permit, response: Any, error: BaseException | None) -> None:
+        self.in_flight -= 1
+        reported = _reported_tokens(response)
+        if reported is not None:
+            self._window_tokens += reported - permit._usage[1]
+            permit._usage[1] = reported
+
+        if error is not None and is_rate_limited(error):
+            self._cut(permit, RATE_LIMITED_BACKOFF, "rate limited")
+        elif error is None and permit.timed and time.monotonic() - permit.started > self.latency_target_seconds:
+            self._cut(permit, SLOW_CALL_BACKOFF, "over latency target")
+        elif error is None:
+            self._set_limit(self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def _cut(self, permit: Permit, factor: float, reason: str) -> None:
+        # Calls started before the last cut were admitted under the old limit
+        if permit.started < self._last_cut:
+            return
+        self._last_cut = time.monotonic()
+        self._set_limit(self.limit * factor)
+        logger.info("Gemini %s %s; concurrency limit now %.1f", self.model, reason, self.limit)
+
+    def _set_limit(self, limit: float) -> None:
+        self.limit = min(max(limit, float(self.min_concurrency)), float(self.max_concurrency))
+        record_gemini_concurrency_limit(self.model, self.limit)
+
+    def _dispatch(self) -> None:
+        """Admit queued callers in order while the limit and budgets allow."""
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.future.done():
+                heapq.heappop(self._queue)
+                continue
+            if self.in_flight >= int(self.limit):
+                return
+            wait = self._budget_wait(waiter.tokens)
+            if wait > 0:
+                self._wake_in(wait)
+                return
+            heapq.heappop(self._queue)
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    def _budget_wait(self, tokens: int) -> float:
+        """Seconds until a call of ``tokens`` fits the budgets (0 when it fits now)."""
+        now = time.monotonic()
+        self._expire(now)
+        if not self._window:
+            return 0.0
+        over_rpm = self.rpm_limit and len(self._window) >= self.rpm_limit
+        over_tpm = self.tpm_limit and self._window_tokens + tokens > self.tpm_limit
+        if not over_rpm and not over_tpm:
+            return 0.0
+        return max(self._window[0][0] + WINDOW_SECONDS - now, 0.001)
+
+    def _expire(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _wake_in(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+class GeminiGovernor:
+    """The ``ModelGovernor`` of each model, created on first use."""
+
+    def __init__(self, enabled: bool | None = None):
+        self.enabled = settings.gemini_governor_enabled if enabled is None else enabled
+        self._models: dict[str, ModelGovernor] = {}
+
+    def model(self, model: str) -> ModelGovernor:
+        if model not in self._models:
+            self._models[model] = ModelGovernor(model)
+        return self._models[model]
+
+    @asynccontextmanager
+    async def slot(self, model: str, contents: Any = None, *, timed: bool = True) -> AsyncIterator[Permit | None]:
+        """Hold one of ``model``'s slots for the duration of the block.
+
+        Pass ``timed=False`` for streams, whose duration does not count
+        towards the latency signal.
+        """
+        if not self.enabled:
+            yield None
+            return
+        async with self.model(model).slot(contents, timed=timed) as permit:
+            yield permit
+
+    async def generate_content(
+        self,
+        client: Any,
+        *,
+        model: str,
+        contents: Any,
+        config: types.GenerateContentConfig | None = None,
+        timeout: float | None = None,
+    ) -> types.GenerateContentResponse:
+        """``client.aio.models.generate_content`` once ``model`` has a slot free.
+
+        ``timeout`` bounds the call itself, not the wait for a slot.
+        """
+        kwargs = {"config": config} if config is not None else {}
+        async with self.slot(model, contents) as permit:
+            async with asyncio.timeout(timeout):
+                response = await client.aio.models.generate_content(model=model, contents=contents, **kwargs)
+            if permit is not None:
+                permit.finish(response)
+            return response
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: governor.stats() for name, governor in self._models.items()}
+
+
+gemini_governor = GeminiGovernor()
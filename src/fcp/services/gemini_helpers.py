@@ -5,10 +5,12 @@ import logging
 from typing import Any, TypedDict
 
 from tenacity import (
+    RetryCallState,
     before_sleep_log,
     retry,
     retry_if_exception_type,
     stop_after_attempt,
+    stop_any,
     wait_exponential,
 )
 
@@ -19,6 +21,7 @@ from fcp.services.gemini_constants import (
     RETRYABLE_EXCEPTIONS,
     THINKING_BUDGETS,
 )
+from fcp.utils.deadline import remaining
 from fcp.utils.json_extractor import extract_json
 from fcp.utils.metrics import record_gemini_usage
 
@@ -32,6 +35,16 @@ class GeminiThinkingResult(TypedDict):
     thinking: str | None
 
 
+def _deadline_too_close(backoff: wait_exponential):
+    """Stop condition: the request's deadline passes before the backoff and the next attempt start."""
+
+    def stop(retry_state: RetryCallState) -> bool:
+        left = remaining()
+        return left is not None and left <= backoff(retry_state)
+
+    return stop
+
+
 def _create_retry_decorator():
     """Create retry decorator for Gemini API calls.
 
@@ -42,15 +55,17 @@ def _create_retry_decorator():
     Strategy:
     - Max attempts from config
     - Exponential backoff: min/max from config
+    - No retry once the request's deadline would pass during the backoff
     - Logs retry attempts at WARNING level
     """
+    backoff = wait_exponential(
+        multiplier=1,
+        min=Config.RETRY_MIN_WAIT_SECONDS,
+        max=Config.RETRY_MAX_WAIT_SECONDS,
+    )
     return retry(
-        stop=stop_after_attempt(Config.RETRY_MAX_ATTEMPTS),
-        wait=wait_exponential(
-            multiplier=1,
-            min=Config.RETRY_MIN_WAIT_SECONDS,
-            max=Config.RETRY_MAX_WAIT_SECONDS,
-        ),
+        stop=stop_any(stop_after_attempt(Config.RETRY_MAX_ATTEMPTS), _deadline_too_close(backoff)),
+        wait=backoff,
         retry=retry_if_exception_type(RETRYABLE_EXCEPTIONS),
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
@@ -103,7 +118,16 @@ def _extract_thinking_content(response) -> str | None:
     return "\n".join(thinking_parts) if thinking_parts else None
 
 
-def _parse_json_response(text: str) -> dict[str, Any] | list[Any]:
+def _hit_token_limit(response: Any) -> bool:
+    """Whether a Gemini response was cut off by the output token limit."""
+    candidates = getattr(response, "candidates", None)
+    if not candidates:
+        return False
+    # FinishReason is a str enum
+    return getattr(candidates[0], "finish_reason", None) == "MAX_TOKENS"
+
+
+def _parse_json_response(text: str, *, truncated: bool = False) -> dict[str, Any] | list[Any]:
     """Parse JSON from Gemini response with robust fallback handling.
 
     While JSON mode (response_mime_type="application/json") usually guarantees
@@ -115,6 +139,8 @@ def _parse_json_response(text: str) -> dict[str, Any] | list[Any]:
 
     Args:
         text: The raw response text from Gemini
+        truncated: The response hit the output token limit; close whatever
+            strings, arrays and objects it left open rather than failing
 
     Returns:
         Parsed JSON as dict or list
@@ -132,11 +158,11 @@ def _parse_json_response(text: str) -> dict[str, Any] | list[Any]:
     # Strategy 1: Direct JSON parsing (expected path for JSON mode)
     try:
         return json.loads(stripped_text)
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, RecursionError):
         pass
 
-    # Strategy 2: Use robust extractor for edge cases (markdown, embedded JSON)
-    result = extract_json(stripped_text)
+    # Strategy 2: Use robust extractor for edge cases (markdown, embedded JSON, truncation)
+    result = extract_json(stripped_text, repair=truncated)
     if result is not None:
         return result
 
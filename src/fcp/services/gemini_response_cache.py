@@ -0,0 +1,323 @@
+"""Opt-in cache of Gemini responses keyed on the exact request.
+
+Many tools send Gemini the same request over and over: flavor pairings for
+a common ingredient, related foods for a popular dish, the same recipe text
+to standardize. When a tool's output depends only on its prompt, it can
+declare so with ``@cache_gemini_responses()``; the ``generate_json``,
+``generate_content``, ``generate_json_with_grounding`` and
+``generate_with_thinking`` calls it makes are then served from this cache.
+Calls made outside a declaring tool always go to the API.
+
+Responses are keyed on a hash of the method, model, content parts (images
+and other media by the SHA-256 of their bytes) and generation config, and
+live for a per-method TTL: grounded answers cite live search results, so
+they expire sooner than plain generations.
+
+Two tiers, both bounded by size: an in-memory LRU per process and a SQLite
+file under ``FCP_DATA_DIR`` shared by the workers on the host. Both are best
+effort; a failing SQLite tier only costs misses.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+import aiosqlite
+from google.genai import types
+
+from fcp.services.database import DATA_DIR
+from fcp.settings import settings
+from fcp.utils.metrics import record_gemini_response_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB_PATH = DATA_DIR / "gemini_response_cache.db"
+
+# How long each method's responses are reused unless the tool sets its own TTL.
+METHOD_TTL_SECONDS: dict[str, float] = {
+    "generate_content": 7 * 24 * 3600,
+    "generate_json": 7 * 24 * 3600,
+    "generate_with_thinking": 7 * 24 * 3600,
+    # Grounded answers summarize live search results
+    "generate_json_with_grounding": 6 * 3600,
+}
+
+# The SQLite tier is trimmed back under its size limit once every this many stores.
+PRUNE_EVERY = 50
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_responses_stored ON responses (stored_at);
+CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at);
+"""
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class _Policy:
+    """What the tool currently running declared about caching its Gemini calls."""
+
+    def __init__(self, ttl_seconds: float | None):
+        self.ttl_seconds = ttl_seconds
+
+
+_policy: ContextVar[_Policy | None] = ContextVar("gemini_response_cache_policy", default=None)
+
+
+def cache_gemini_responses(
+    ttl_seconds: float | None = None,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Declare that a tool's Gemini responses depend only on the request and may be reused.
+
+    Args:
+        ttl_seconds: Overrides the per-method TTL for the calls this tool makes
+    """
+
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            token = _policy.set(_Policy(ttl_seconds))
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _policy.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+def response_key(
+    method: str,
+    model: str,
+    contents: str | Sequence[types.Part | str],
+    config: types.GenerateContentConfig | None = None,
+) -> str:
+    """Stable hash of one Gemini request; media is keyed by the digest of its bytes."""
+    if isinstance(contents, str):
+        contents = [types.Part(text=contents)]
+    parts: list[Any] = []
+    for part in contents:
+        if isinstance(part, str):
+            part = types.Part(text=part)
+        if part.inline_data is not None:
+            data = part.inline_data.data or b""
+            parts.append(["blob", part.inline_data.mime_type, hashlib.sha256(data).hexdigest()])
+        else:
+            parts.append(["part", part.model_dump(mode="json", exclude_none=True)])
+    config_data = config.model_dump(mode="json", exclude_none=True) if config is not None else None
+    payload = json.dumps([method, model, parts, config_data], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GeminiResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of Gemini responses, bounded by size."""
+
+    def __init__(
+        self,
+        db_path: str | Path | None = None,
+        *,
+        enabled: bool | None = None,
+        max_memory_bytes: int | None = None,
+        persist: bool | None = None,
+        max_disk_bytes: int | None = None,
+    ):
+        self._db_path = Path(db_path) if db_path else CACHE_DB_PATH
+        self.enabled = settings.gemini_response_cache_enabled if enabled is None else enabled
+        self._max_memory_bytes = (
+            settings.gemini_response_cache_max_memory_bytes if max_memory_bytes is None else max_memory_bytes
+        )
+        self._persist = settings.gemini_response_cache_persist if persist is None else persist
+        self._max_disk_bytes = (
+            settings.gemini_response_cache_max_disk_bytes if max_disk_bytes is None else max_disk_bytes
+        )
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._memory_bytes = 0
+        self._db: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+        self._stores = 0
+        self._stats = {"memory": 0, "sqlite": 0, "miss": 0, "bytes_saved": 0}
+
+    async def get_or_generate(
+        self,
+        method: str,
+        model: str,
+        contents: str | Sequence[types.Part],
+        config: types.GenerateContentConfig | None,
+        generate: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Return the cached response for this request, calling ``generate`` on a miss.
+
+        Only caches when the running tool declared ``@cache_gemini_responses``.
+        Responses that are not JSON-serializable are returned but not stored.
+        """
+        policy = _policy.get()
+        if not self.enabled or policy is None:
+            return await generate()
+
+        key = response_key(method, model, contents, config)
+        cached = await self._get(key)
+        if cached is not None:
+            tier, value = cached
+            self._record(method, tier, len(value))
+            return json.loads(value)
+        self._record(method, "miss")
+
+        response = await generate()
+        try:
+            value = json.dumps(response)
+        except (TypeError, ValueError):
+            logger.debug("%s response is not JSON-serializable; not caching", method)
+            return response
+        ttl = policy.ttl_seconds if policy.ttl_seconds is not None else METHOD_TTL_SECONDS.get(method, 3600)
+        await self._set(key, method, value, ttl)
+        return response
+
+    def stats(self) -> dict[str, int]:
+        """Lookups served from each tier, misses and bytes served from cache since startup."""
+        return {**self._stats, "memory_entries": len(self._memory), "memory_bytes": self._memory_bytes}
+
+    async def clear(self) -> None:
+        """Drop every cached response from both tiers."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        db = await self._connection()
+        if db is not None:
+            await db.execute("DELETE FROM responses")
+            await db.commit()
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _record(self, method: str, result: str, size: int = 0) -> None:
+        self._stats[result] += 1
+        self._stats["bytes_saved"] += size
+        record_gemini_response_cache_lookup(method, result, size)
+
+    async def _get(self, key: str) -> tuple[str, str] | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                return "memory", value
+            self._forget(key)
+
+        db = await self._connection()
+        if db is None:
+            return None
+        try:
+            async with db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ) as cursor:
+                row = await cursor.fetchone()
+        except aiosqlite.Error as e:
+            logger.warning("Gemini response cache read failed: %s", e)
+            return None
+        if row is None:
+            return None
+        self._remember(key, row[1], row[0])
+        return "sqlite", row[0]
+
+    async def _set(self, key: str, method: str, value: str, ttl: float) -> None:
+        now = time.time()
+        self._remember(key, now + ttl, value)
+        db = await self._connection()
+        if db is None:
+            return
+        # json.dumps escapes non-ASCII, so characters are bytes
+        size = len(value)
+        if size > self._max_disk_bytes:
+            return
+        try:
+            await db.execute(
+                "INSERT OR REPLACE INTO responses (key, method, value, size, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, method, value, size, now, now + ttl),
+            )
+            self._stores += 1
+            if self._stores % PRUNE_EVERY == 0:
+                await self._prune(db, now)
+            await db.commit()
+        except aiosqlite.Error as e:
+            logger.warning("Gemini response cache write failed: %s", e)
+
+    async def _prune(self, db: aiosqlite.Connection, now: float) -> None:
+        """Drop expired responses, then the oldest ones until the file is under its size limit."""
+        await db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        async with db.execute("SELECT COALESCE(SUM(size), 0) FROM responses") as cursor:
+            row = await cursor.fetchone()
+        excess = (row[0] if row else 0) - self._max_disk_bytes
+        if excess <= 0:
+            return
+        # Oldest first, as many as it takes to free ``excess`` bytes
+        await db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY stored_at, key) - size AS freed_before "
+            "FROM responses) WHERE freed_before < ?)",
+            (excess,),
+        )
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        size = len(value)
+        if size > self._max_memory_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = (expires_at, value)
+        self._memory_bytes += size
+        while self._memory_bytes > self._max_memory_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    async def _connection(self) -> aiosqlite.Connection | None:
+        """The SQLite tier, opened on first use; None when persistence is off or unavailable."""
+        if not self._persist:
+            return None
+        if self._db is None:
+            async with self._connect_lock:
+                # Opened by another caller while this one waited, or opened here
+                self._db = self._db or await self._open()
+        return self._db
+
+    async def _open(self) -> aiosqlite.Connection | None:
+        db = None
+        try:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            db = await aiosqlite.connect(self._db_path)
+            await db.execute("PRAGMA journal_mode = WAL")
+            await db.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+            await db.executescript(_CREATE_TABLE)
+            await db.commit()
+        except (OSError, aiosqlite.Error) as e:
+            logger.warning("Gemini response cache SQLite tier unavailable, using memory only: %s", e)
+            if db is not None:
+                await db.close()
+            self._persist = False
+            return None
+        return db
+
+
+gemini_response_cache = GeminiResponseCache()
@@ -10,6 +10,8 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel
 
+from fcp.services.gemini_governor import gemini_governor
+
 
 class AspectRatio(StrEnum):
     """Supported aspect ratios for image generation."""
@@ -85,7 +87,8 @@ class ImageGenerationService:
         # Handle both enum and string values for aspect_ratio
         ar_value = aspect_ratio.value if hasattr(aspect_ratio, "value") else str(aspect_ratio)
 
-        response = await self.client.aio.models.generate_content(
+        response = await gemini_governor.generate_content(
+            self.client,
             model=self.MODEL,
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -150,7 +153,8 @@ Style: Modern minimalist recipe card with:
 - Warm, inviting colors
 """
 
-        response = await self.client.aio.models.generate_content(
+        response = await gemini_governor.generate_content(
+            self.client,
             model=self.MODEL,
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -187,7 +191,8 @@ Style: Modern minimalist recipe card with:
         Returns:
             GeneratedImage with the variation
         """
-        response = await self.client.aio.models.generate_content(
+        response = await gemini_governor.generate_content(
+            self.client,
             model=self.MODEL,
             contents=[
                 types.Part.from_uri(file_uri=original_image_url, mime_type="image/jpeg"),
@@ -11,6 +11,8 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel, Field
 
+from fcp.services.gemini_governor import gemini_governor
+
 
 class RestaurantLiveData(BaseModel):
     """Live data about a restaurant from Google Search."""
@@ -63,7 +65,8 @@ async def get_live_restaurant_data(
     """
     client = genai.Client()
 
-    response = await client.aio.models.generate_content(
+    response = await gemini_governor.generate_content(
+        client,
         model="gemini-3-flash-preview",
         contents=f"Get current information about {restaurant_name} in {location}",
         config=types.GenerateContentConfig(
@@ -96,7 +99,8 @@ async def check_food_recalls(
     if brand:
         query += f" {brand}"
 
-    response = await client.aio.models.generate_content(
+    response = await gemini_governor.generate_content(
+        client,
         model="gemini-3-flash-preview",
         contents=f"Check for active food recalls: {query}. Return as JSON array.",
         config=types.GenerateContentConfig(
@@ -129,7 +133,8 @@ async def get_ingredient_prices(
     """
     client = genai.Client()
 
-    response = await client.aio.models.generate_content(
+    response = await gemini_governor.generate_content(
+        client,
         model="gemini-3-flash-preview",
         contents=f"Get current grocery prices in {location} for: {', '.join(ingredients)}",
         config=types.GenerateContentConfig(
@@ -174,7 +179,8 @@ async def get_restaurant_recommendations(
     if price_range:
         query += f", {price_range} price range"
 
-    response = await client.aio.models.generate_content(
+    response = await gemini_governor.generate_content(
+        client,
         model="gemini-3-flash-preview",
         contents=query,
         config=types.GenerateContentConfig(
@@ -0,0 +1,153 @@
+"""Lazily decoded food log rows for the SQLite backend.
+
+SQLite stores a log's structured fields (analysis, nutrition, ingredients,
+...) as JSON text. ``LogRow`` is a ``dict`` that keeps that text as read and
+parses a field only the first time it is accessed, so callers that never
+look at ``analysis`` never pay for parsing it. ``to_json`` writes fields
+that were never accessed straight into the output as stored.
+"""
+
+import json
+from collections.abc import ItemsView, Iterator, Mapping, ValuesView
+from functools import partial
+from typing import Any
+
+from pydantic_core import SchemaSerializer, core_schema
+
+# Matches the encoding FastAPI's JSONResponse uses.
+dumps = partial(json.dumps, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+_MISSING = object()
+
+
+class LogRow(dict[str, Any]):
+    """A food log ``dict`` whose JSON columns are decoded on first access.
+
+    Undecoded values sit in the underlying dict storage as JSON text, so every
+    accessor that could expose them is overridden to decode first. Overriding
+    ``__iter__`` makes ``dict(row)``, ``{**row}`` and ``f(**row)`` go through
+    ``keys()`` and ``__getitem__``; ``json.dumps`` uses ``items()``; pydantic's
+    serializer, which would otherwise read the storage directly, is pointed at
+    ``items()`` by ``__pydantic_serializer__``. Copies and pickles are plain dicts.
+    """
+
+    __slots__ = ("_pending",)
+
+    def __init__(self, row: Mapping[str, Any], json_fields: frozenset[str]) -> None:
+        super().__init__(row)
+        self._pending = {k for k in json_fields if isinstance(dict.get(self, k), str)}
+
+    def _decode(self, key: str) -> Any:
+        self._pending.discard(key)
+        value = dict.__getitem__(self, key)
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, ValueError):
+            # Same as _decode_json: leave text that is not JSON unchanged
+            return value
+        dict.__setitem__(self, key, value)
+        return value
+
+    def _decode_all(self) -> None:
+        for key in list(self._pending):
+            self._decode(key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._pending:
+            return self._decode(key)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._pending.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._pending.discard(key)
+        dict.__delitem__(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return dict.__iter__(self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def items(self) -> ItemsView[str, Any]:  # type: ignore[override]
+        return ItemsView(self)
+
+    def values(self) -> ValuesView[Any]:  # type: ignore[override]
+        return ValuesView(self)
+
+    def pop(self, key: str, default: Any = _MISSING) -> Any:
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self) -> tuple[str, Any]:
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(dict.keys(self)))
+        return key, self.pop(key)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other: Any) -> "LogRow":  # type: ignore[override,misc]
+        self.update(other)
+        return self
+
+    def __or__(self, other: Any) -> dict[str, Any]:  # type: ignore[override]
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        merged = self.copy()
+        merged.update(other)
+        return merged
+
+    def __eq__(self, other: object) -> bool:
+        self._decode_all()
+        if isinstance(other, LogRow):
+            other._decode_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        self._decode_all()
+        return dict.__repr__(self)
+
+    def copy(self) -> dict[str, Any]:  # type: ignore[override]
+        return dict(self.items())
+
+    __copy__ = copy
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return dict, (dict(self.items()),)
+
+    def to_json(self) -> str:
+        """Serialize as compact JSON, embedding never-accessed JSON columns as stored.
+
+        Relies on the database only ever holding valid JSON in JSON columns,
+        which ``Database`` guarantees on write and migrated for older rows.
+        """
+        parts = [f"{dumps(key)}:{value if key in self._pending else dumps(value)}" for key, value in dict.items(self)]
+        return "{" + ",".join(parts) + "}"
+
+
+LogRow.__pydantic_serializer__ = SchemaSerializer(  # type: ignore[attr-defined]
+    core_schema.any_schema(
+        serialization=core_schema.plain_serializer_function_ser_schema(lambda row: dict(row.items()))
+    )
+)
@@ -0,0 +1,85 @@
+"""Full-text ranking helpers shared by the food log search backends.
+
+SQLite ranks with its FTS5 ``bm25()`` function over ``food_logs_fts``.
+Firestore has no full-text index, so ``rank_logs`` applies the same
+field-weighted BM25 formula in process. Both produce a ``search_score``
+on each hit where higher is better.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from typing import Any
+
+# Indexed fields and their BM25 weights; the order matches the FTS5 columns.
+SEARCH_FIELDS: tuple[str, ...] = ("dish_name", "venue_name", "cuisine", "notes", "ingredients")
+FIELD_WEIGHTS: tuple[float, ...] = (10.0, 3.0, 3.0, 1.0, 2.0)
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def fts_match_expression(query: str) -> str | None:
+    """Build an FTS5 MATCH expression that ORs the query's words together.
+
+    Each word is quoted so FTS5 operators and column filters in user input
+    are treated as plain text. Returns None when the query has no words.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return None
+    return " OR ".join(f'"{token}"' for token in tokens)
+
+
+def _field_text(log: dict[str, Any], field: str) -> str:
+    value = log.get(field)
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def rank_logs(logs: list[dict[str, Any]], query: str, limit: int) -> list[dict[str, Any]]:
+    """Rank logs against ``query`` with field-weighted BM25.
+
+    Returns up to ``limit`` copies of the matching logs, best first, each
+    with a ``search_score``. Logs that share no word with the query are
+    dropped.
+    """
+    terms = set(tokenize(query))
+    if not terms or not logs:
+        return []
+
+    docs = []
+    for log in logs:
+        fields = [Counter(tokenize(_field_text(log, f))) for f in SEARCH_FIELDS]
+        docs.append((log, fields, [sum(c.values()) for c in fields]))
+
+    avg_lengths = [max(sum(d[2][i] for d in docs) / len(docs), 1.0) for i in range(len(SEARCH_FIELDS))]
+    doc_freq = {t: sum(1 for _, fields, _ in docs if any(t in c for c in fields)) for t in terms}
+
+    scored = []
+    for log, fields, lengths in docs:
+        score = 0.0
+        for term in terms:
+            if not doc_freq[term]:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            for i, weight in enumerate(FIELD_WEIGHTS):
+                tf = fields[i][term]
+                if tf:
+                    norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * lengths[i] / avg_lengths[i])
+                    score += weight * idf * tf * (_BM25_K1 + 1) / (tf + norm)
+        if score > 0:
+            scored.append((score, log))
+
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [{**log, "search_score": score} for score, log in scored[:limit]]
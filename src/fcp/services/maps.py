@@ -8,6 +8,8 @@ from typing import Any
 
 import httpx
 
+from fcp.utils.circuit_breaker import call_with_circuit_breaker, is_server_error
+
 logger = logging.getLogger(__name__)
 
 MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
@@ -52,7 +54,11 @@ async def geocode_address(address: str) -> GeocodingResult | None:
     try:
         logger.info("Geocoding address: %s", address)
         async with httpx.AsyncClient() as client:
-            response = await client.get(GEOCODING_API_URL, params=params, timeout=10.0)
+            response = await call_with_circuit_breaker(
+                "google_maps",
+                lambda: client.get(GEOCODING_API_URL, params=params, timeout=10.0),
+                failed=is_server_error,
+            )
 
         response.raise_for_status()
         data = response.json()
@@ -162,7 +168,11 @@ async def find_nearby_places(
         )
 
         async with httpx.AsyncClient() as client:
-            response = await client.post(PLACES_API_URL, headers=headers, json=body, timeout=10.0)
+            response = await call_with_circuit_breaker(
+                "google_maps",
+                lambda: client.post(PLACES_API_URL, headers=headers, json=body, timeout=10.0),
+                failed=is_server_error,
+            )
 
         response.raise_for_status()
         data = response.json()
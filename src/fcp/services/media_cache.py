@@ -0,0 +1,396 @@
+"""Cache of the images and audio fetched for Gemini, keyed by URL.
+
+The same meal photo is fetched by ``analyze_meal``, again by the thinking
+or agentic vision analysis, by the portion analyzer and recipe extractor,
+and once more whenever the media processor reprocesses a batch.
+``MediaCache.fetch`` serves it from the cache while it is fresh by the
+server's ``Cache-Control`` (or ``Expires``) headers, revalidates it with
+``If-None-Match`` / ``If-Modified-Since`` once stale, and shares one
+download between concurrent fetches of the same URL. Responses marked
+``no-store`` are never kept.
+
+Bytes are stored by their SHA-256, so URLs serving the same file share
+one copy. Two tiers, both bounded by size: an in-memory LRU per process,
+and files under ``FCP_DATA_DIR/media_cache`` indexed in SQLite, shared by
+the workers on the host. The disk tier is best effort; when it fails the
+cache only costs misses.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import aiosqlite
+import httpx
+
+from fcp.services.database import DATA_DIR
+from fcp.settings import settings
+from fcp.utils.metrics import record_media_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = DATA_DIR / "media_cache"
+
+# The disk tier is trimmed back under its size limit once every this many stores.
+PRUNE_EVERY = 20
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS media (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fresh_until REAL NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_media_digest ON media (digest);
+CREATE INDEX IF NOT EXISTS idx_media_stored ON media (stored_at);
+"""
+
+# Sends a GET with the given extra headers and returns the response; raises for errors other than 304
+Download = Callable[[dict[str, str]], Awaitable[httpx.Response]]
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    """What is known about the media at one URL."""
+
+    digest: str
+    content_type: str
+    etag: str | None
+    last_modified: str | None
+    fresh_until: float
+    size: int
+
+    def validators(self) -> dict[str, str]:
+        """Headers that make a GET conditional on the media having changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def fresh_until(headers: Mapping[str, str], now: float, default_ttl: float) -> float | None:
+    """Until when a response may be reused without revalidating; None if it must not be stored.
+
+    ``max-age`` (less the response's ``Age``) takes precedence over
+    ``Expires``; ``no-cache`` allows storing but not reuse without
+    revalidation. A response with neither is reused for ``default_ttl``.
+    """
+    directives: dict[str, str] = {}
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return now
+    if "max-age" in directives:
+        try:
+            max_age = int(directives["max-age"])
+            age = int(headers.get("age") or 0)
+        except ValueError:
+            return now
+        return now + max(0, max_age - age)
+    if expires := headers.get("expires"):
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            # An invalid date means already expired
+            return now
+    return now + default_ttl
+
+
+class MediaCache:
+    """Two-tier (memory LRU + disk) cache of fetched media, bounded by size."""
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        *,
+        enabled: bool | None = None,
+        max_memory_bytes: int | None = None,
+        persist: bool | None = None,
+        max_disk_bytes: int | None = None,
+        default_ttl_seconds: float | None = None,
+    ):
+        self._dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.enabled = settings.media_cache_enabled if enabled is None else enabled
+        self._max_memory_bytes = settings.media_cache_max_memory_bytes if max_memory_bytes is None else max_memory_bytes
+        self._persist = settings.media_cache_persist if persist is None else persist
+        self._max_disk_bytes = settings.media_cache_max_disk_bytes if max_disk_bytes is None else max_disk_bytes
+        self._default_ttl = (
+            settings.media_cache_default_ttl_seconds if default_ttl_seconds is None else default_ttl_seconds
+        )
+        # URL -> entry in LRU order; bytes by digest, with how many URLs hold them
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._blobs: dict[str, bytes] = {}
+        self._blob_refs: Counter[str] = Counter()
+        self._memory_bytes = 0
+        self._in_flight: dict[str, asyncio.Task[tuple[bytes, str]]] = {}
+        self._db: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+        self._stores = 0
+        self._stats = {"memory": 0, "disk": 0, "revalidated": 0, "miss": 0, "bytes_saved": 0}
+
+    async def fetch(self, url: str, download: Download) -> tuple[bytes, str]:
+        """The bytes and ``Content-Type`` header of the media at ``url``, from the cache when fresh.
+
+        Concurrent fetches of the same URL share one call to ``download``,
+        and its errors.
+        """
+        if not self.enabled:
+            response = await download({})
+            return response.content, response.headers.get("content-type", "")
+
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url, download))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda done: self._landed(url, done))
+        # A caller giving up does not cancel the download the others wait on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """Fetches served from each tier, revalidated, missed, and bytes not downloaded since startup."""
+        return {**self._stats, "memory_entries": len(self._entries), "memory_bytes": self._memory_bytes}
+
+    async def clear(self) -> None:
+        """Drop all cached media from both tiers."""
+        self._entries.clear()
+        self._blobs.clear()
+        self._blob_refs.clear()
+        self._memory_bytes = 0
+        db = await self._connection()
+        if db is None:
+            return
+        async with db.execute("SELECT DISTINCT digest FROM media") as cursor:
+            digests = [row[0] for row in await cursor.fetchall()]
+        await db.execute("DELETE FROM media")
+        await db.commit()
+        for digest in digests:
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _landed(self, url: str, task: asyncio.Task[tuple[bytes, str]]) -> None:
+        if self._in_flight.get(url) is task:
+            del self._in_flight[url]
+        if not task.cancelled():
+            # Retrieved here too, in case every caller gave up before it finished
+            task.exception()
+
+    async def _fetch(self, url: str, download: Download) -> tuple[bytes, str]:
+        now = time.time()
+        cached = await self._get(url)
+        if cached is not None:
+            tier, entry, data = cached
+            if entry.fresh_until > now:
+                self._record(tier, entry.size)
+                return data, entry.content_type
+
+        response = await download(cached[1].validators() if cached is not None else {})
+        if cached is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+            _, entry, data = cached
+            until = fresh_until(response.headers, now, self._default_ttl)
+            entry = replace(
+                entry,
+                etag=response.headers.get("etag") or entry.etag,
+                last_modified=response.headers.get("last-modified") or entry.last_modified,
+                fresh_until=until if until is not None else now,
+            )
+            await self._set(url, entry, data)
+            self._record("revalidated", entry.size)
+            return data, entry.content_type
+
+        self._record("miss")
+        data = response.content
+        content_type = response.headers.get("content-type", "")
+        until = fresh_until(response.headers, now, self._default_ttl)
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if until is None or (until <= now and not etag and not last_modified):
+            # Not reusable without downloading it again
+            await self._forget(url)
+        else:
+            digest = hashlib.sha256(data).hexdigest()
+            await self._set(url, _Entry(digest, content_type, etag, last_modified, until, len(data)), data)
+        return data, content_type
+
+    def _record(self, result: str, size: int = 0) -> None:
+        self._stats[result] += 1
+        self._stats["bytes_saved"] += size
+        record_media_cache_lookup(result, size)
+
+    async def _get(self, url: str) -> tuple[str, _Entry, bytes] | None:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+            return "memory", entry, self._blobs[entry.digest]
+
+        db = await self._connection()
+        if db is None:
+            return None
+        try:
+            async with db.execute(
+                "SELECT digest, content_type, etag, last_modified, fresh_until, size FROM media WHERE url = ?", (url,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        except aiosqlite.Error as e:
+            logger.warning("Media cache read failed: %s", e)
+            return None
+        if row is None:
+            return None
+        entry = _Entry(*row)
+        try:
+            data = await asyncio.to_thread(self._blob_path(entry.digest).read_bytes)
+        except OSError:
+            # Pruned by another worker since the row was read
+            return None
+        self._remember(url, entry, data)
+        return "disk", entry, data
+
+    async def _set(self, url: str, entry: _Entry, data: bytes) -> None:
+        self._remember(url, entry, data)
+        if entry.size > self._max_disk_bytes:
+            return
+        db = await self._connection()
+        if db is None:
+            return
+        try:
+            path = self._blob_path(entry.digest)
+            if not path.exists():
+                await asyncio.to_thread(_write_atomically, path, data)
+            await db.execute(
+                "INSERT OR REPLACE INTO media "
+                "(url, digest, content_type, etag, last_modified, fresh_until, size, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    entry.digest,
+                    entry.content_type,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.fresh_until,
+                    entry.size,
+                    time.time(),
+                ),
+            )
+            self._stores += 1
+            if self._stores % PRUNE_EVERY == 0:
+                await self._prune(db)
+            await db.commit()
+        except (OSError, aiosqlite.Error) as e:
+            logger.warning("Media cache write failed: %s", e)
+
+    async def _forget(self, url: str) -> None:
+        self._drop(url)
+        db = await self._connection()
+        if db is None:
+            return
+        try:
+            await db.execute("DELETE FROM media WHERE url = ?", (url,))
+            await db.commit()
+        except aiosqlite.Error as e:
+            logger.warning("Media cache write failed: %s", e)
+
+    async def _prune(self, db: aiosqlite.Connection) -> None:
+        """Drop the oldest URLs, and files no URL uses any more, until the disk tier is under its size limit."""
+        async with db.execute("SELECT digest, url, size FROM media ORDER BY stored_at") as cursor:
+            rows = list(await cursor.fetchall())
+        refs = Counter(digest for digest, _, _ in rows)
+        sizes = {digest: size for digest, _, size in rows}
+        excess = sum(sizes.values()) - self._max_disk_bytes
+        dropped: list[str] = []
+        unused: list[str] = []
+        # Dropping every row frees all of it, so this stops before running out of rows
+        oldest_first = iter(rows)
+        while excess > 0:
+            digest, url, size = next(oldest_first)
+            dropped.append(url)
+            refs[digest] -= 1
+            if not refs[digest]:
+                unused.append(digest)
+                excess -= size
+        if not dropped:
+            return
+        await db.executemany("DELETE FROM media WHERE url = ?", [(url,) for url in dropped])
+        for digest in unused:
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def _remember(self, url: str, entry: _Entry, data: bytes) -> None:
+        if entry.size > self._max_memory_bytes:
+            return
+        self._drop(url)
+        self._entries[url] = entry
+        if not self._blob_refs[entry.digest]:
+            self._blobs[entry.digest] = data
+            self._memory_bytes += entry.size
+        self._blob_refs[entry.digest] += 1
+        while self._memory_bytes > self._max_memory_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is None:
+            return
+        self._blob_refs[entry.digest] -= 1
+        if not self._blob_refs[entry.digest]:
+            del self._blob_refs[entry.digest]
+            del self._blobs[entry.digest]
+            self._memory_bytes -= entry.size
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._dir / digest[:2] / digest
+
+    async def _connection(self) -> aiosqlite.Connection | None:
+        """The disk tier's index, opened on first use; None when persistence is off or unavailable."""
+        if not self._persist:
+            return None
+        if self._db is None:
+            async with self._connect_lock:
+                # Opened by another caller while this one waited, or opened here
+                self._db = self._db or await self._open()
+        return self._db
+
+    async def _open(self) -> aiosqlite.Connection | None:
+        db = None
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            db = await aiosqlite.connect(self._dir / "index.db")
+            await db.execute("PRAGMA journal_mode = WAL")
+            await db.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+            await db.executescript(_CREATE_TABLE)
+            await db.commit()
+        except (OSError, aiosqlite.Error) as e:
+            logger.warning("Media cache disk tier unavailable, using memory only: %s", e)
+            if db is not None:
+                await db.close()
+            self._persist = False
+            return None
+        return db
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    """Write a file other workers never see half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    partial.write_bytes(data)
+    os.replace(partial, path)
+
+
+media_cache = MediaCache()
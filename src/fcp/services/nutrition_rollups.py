@@ -0,0 +1,99 @@
+"""Per-day nutrition rollups shared by the database backends.
+
+A rollup summarises one user's live food logs for one calendar day: meal
+count, summed calories and macros, and how often each cuisine and venue
+appeared. SQLite maintains rollups with triggers as logs change; Firestore
+computes them on read with ``rollups_from_logs``, which is also the reference
+the SQLite aggregate is checked against.
+"""
+
+import string
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from datetime import date
+from typing import Any
+
+# Nutrition keys summed per day, as written by the analysis tools.
+NUTRIENTS = ("calories", "protein_g", "carbs_g", "fat_g", "fiber_g")
+
+# Log fields a rollup is computed from.
+ROLLUP_LOG_FIELDS = ("created_at", "cuisine", "venue_name", "nutrition")
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def log_day(created_at: str | None) -> str | None:
+    """The ISO day a log counts towards: its timestamp's date prefix, if that is a real date."""
+    if not created_at:
+        return None
+    day = created_at[:10]
+    try:
+        return day if date.fromisoformat(day).isoformat() == day else None
+    except ValueError:
+        return None
+
+
+def cuisine_key(cuisine: str | None) -> str | None:
+    """Case-insensitive cuisine key (folds ASCII only, like SQLite's ``lower()``)."""
+    return cuisine.translate(_ASCII_LOWER) if cuisine else None
+
+
+def nutrient_value(nutrition: Any, key: str) -> int | float | None:
+    """A numeric nutrient from a log's nutrition object; anything else counts as missing."""
+    if not isinstance(nutrition, Mapping):
+        return None
+    value = nutrition.get(key)
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return None
+    return value
+
+
+def empty_rollup(day: str) -> dict[str, Any]:
+    return {
+        "day": day,
+        "meal_count": 0,
+        "logs_with_nutrition": 0,
+        **dict.fromkeys(NUTRIENTS, 0),
+        "cuisines": {},
+        "venues": {},
+    }
+
+
+def rollups_from_logs(logs: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    """Compute daily rollups from scratch from live logs, oldest day first.
+
+    Logs whose ``created_at`` has no valid date are left out. Nutrient sums
+    are rounded to two decimals.
+    """
+    days: dict[str, dict[str, Any]] = {}
+    cuisines: dict[str, Counter[str]] = {}
+    venues: dict[str, Counter[str]] = {}
+    for log in logs:
+        day = log_day(log.get("created_at"))
+        if day is None:
+            continue
+        rollup = days.get(day)
+        if rollup is None:
+            rollup = days[day] = empty_rollup(day)
+            cuisines[day] = Counter()
+            venues[day] = Counter()
+        rollup["meal_count"] += 1
+        nutrition = log.get("nutrition")
+        if isinstance(nutrition, Mapping):
+            rollup["logs_with_nutrition"] += 1
+            for key in NUTRIENTS:
+                rollup[key] += nutrient_value(nutrition, key) or 0
+        if cuisine := cuisine_key(log.get("cuisine")):
+            cuisines[day][cuisine] += 1
+        if venue := log.get("venue_name"):
+            venues[day][venue] += 1
+
+    result = []
+    for day in sorted(days):
+        rollup = days[day]
+        for key in NUTRIENTS:
+            rollup[key] = round(rollup[key], 2)
+        rollup["cuisines"] = dict(sorted(cuisines[day].items()))
+        rollup["venues"] = dict(sorted(venues[day].items()))
+        result.append(rollup)
+    return result
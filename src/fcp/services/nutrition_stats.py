@@ -0,0 +1,201 @@
+"""Deterministic nutrition statistics for the analytics tools.
+
+Food logs are reduced in one pass to per-day columns stored in typed
+``array`` buffers, and every statistic is computed from those columns:
+totals, daily averages, macro ratios, the standard deviation of daily
+calories and the highest and lowest days. This replaces asking Gemini to
+write and run the same arithmetic; the model only narrates the summary.
+"""
+
+import math
+import statistics
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+from fcp.services.nutrition_rollups import cuisine_key, log_day
+
+MACROS = ("protein_g", "carbs_g", "fat_g")
+# Energy per gram, used for the share of calories each macro provides.
+MACRO_KCAL_PER_G = {"protein_g": 4, "carbs_g": 4, "fat_g": 9}
+TOP_DISHES = 5
+
+
+@dataclass(slots=True)
+class DailyColumns:
+    """Per-day nutrition columns, one element per tracked day in ``days`` order."""
+
+    days: list[str] = field(default_factory=list)
+    meals: array = field(default_factory=lambda: array("l"))
+    calories: array = field(default_factory=lambda: array("d"))
+    protein_g: array = field(default_factory=lambda: array("d"))
+    carbs_g: array = field(default_factory=lambda: array("d"))
+    fat_g: array = field(default_factory=lambda: array("d"))
+    entry_count: int = 0
+    undated_entries: int = 0
+    undated_calories: float = 0.0
+    dishes: Counter[str] = field(default_factory=Counter)
+    cuisines: Counter[str] = field(default_factory=Counter)
+
+
+_COLUMN_KEYS = ("calories", *MACROS)
+_NO_NUTRITION = (0, 0, 0, 0)
+
+
+def _entry_day(created_at: Any, seen: dict[str, str | None]) -> str | None:
+    """The day a log counts towards; ``seen`` caches the validation of date prefixes."""
+    if isinstance(created_at, str):
+        prefix = created_at[:10]
+        if prefix not in seen:
+            seen[prefix] = log_day(prefix)
+        return seen[prefix]
+    if isinstance(created_at, datetime):
+        return created_at.date().isoformat()
+    if isinstance(created_at, date):
+        return created_at.isoformat()
+    return None
+
+
+def columns_from_logs(logs: Iterable[Mapping[str, Any]]) -> DailyColumns:
+    """Group food logs into per-day columns in one pass, oldest day first.
+
+    Only numeric nutrient values count (as in ``nutrient_value``). Logs
+    without a usable ``created_at`` contribute to totals and dish counts but
+    not to any per-day statistic.
+    """
+    columns = DailyColumns()
+    seen: dict[str, str | None] = {}
+    rows: dict[str, list[float]] = {}
+    for log in logs:
+        columns.entry_count += 1
+        nutrition = log.get("nutrition")
+        if isinstance(nutrition, dict):
+            # type() rather than isinstance() so booleans are not counted as numbers
+            values = [v if type(v) in (int, float) else 0 for v in map(nutrition.get, _COLUMN_KEYS)]
+        else:
+            values = _NO_NUTRITION
+        if dish := log.get("dish_name"):
+            columns.dishes[dish] += 1
+        if cuisine := cuisine_key(log.get("cuisine")):
+            columns.cuisines[cuisine] += 1
+        day = _entry_day(log.get("created_at"), seen)
+        if day is None:
+            columns.undated_entries += 1
+            columns.undated_calories += values[0]
+            continue
+        row = rows.get(day)
+        if row is None:
+            row = rows[day] = [0, 0.0, 0.0, 0.0, 0.0]
+        row[0] += 1
+        row[1] += values[0]
+        row[2] += values[1]
+        row[3] += values[2]
+        row[4] += values[3]
+
+    for day in sorted(rows):
+        meals, calories, protein, carbs, fat = rows[day]
+        columns.days.append(day)
+        columns.meals.append(int(meals))
+        columns.calories.append(calories)
+        columns.protein_g.append(protein)
+        columns.carbs_g.append(carbs)
+        columns.fat_g.append(fat)
+    return columns
+
+
+def _round(value: float) -> float:
+    return round(value, 2)
+
+
+def _day(columns: DailyColumns, i: int) -> dict[str, Any]:
+    return {"day": columns.days[i], "calories": _round(columns.calories[i])}
+
+
+def summarize(columns: DailyColumns) -> dict[str, Any]:
+    """Compute the nutrition statistics for a set of per-day columns.
+
+    Values are rounded to two decimals; per-day statistics are ``None`` (or
+    zero for averages) when no day is tracked.
+    """
+    n = len(columns.days)
+    daily_calories = math.fsum(columns.calories)
+    macro_totals = {key: math.fsum(getattr(columns, key)) for key in MACROS}
+    macro_kcal = {key: total * MACRO_KCAL_PER_G[key] for key, total in macro_totals.items()}
+    macro_kcal_total = math.fsum(macro_kcal.values())
+
+    highest = lowest = None
+    if n:
+        highest = max(range(n), key=columns.calories.__getitem__)
+        lowest = min(range(n), key=columns.calories.__getitem__)
+
+    return {
+        "entry_count": columns.entry_count,
+        "days_tracked": n,
+        "undated_entries": columns.undated_entries,
+        "meals_per_day": _round(math.fsum(columns.meals) / n) if n else 0,
+        "total_calories": _round(daily_calories + columns.undated_calories),
+        "avg_daily_calories": _round(daily_calories / n) if n else 0,
+        "avg_daily_macros": {key: _round(total / n) if n else 0 for key, total in macro_totals.items()},
+        "macro_ratio_pct": {
+            key.removesuffix("_g"): _round(100 * kcal / macro_kcal_total) if macro_kcal_total else None
+            for key, kcal in macro_kcal.items()
+        },
+        "daily_calories_stddev": _round(statistics.pstdev(columns.calories)) if n else None,
+        "highest_day": _day(columns, highest) if highest is not None else None,
+        "lowest_day": _day(columns, lowest) if lowest is not None else None,
+        "top_dishes": [{"dish_name": d, "count": c} for d, c in columns.dishes.most_common(TOP_DISHES)],
+        "unique_dishes": len(columns.dishes),
+        "cuisines_tried": len(columns.cuisines),
+    }
+
+
+def _change_pct(before: float | None, after: float | None) -> float | None:
+    if before is None or after is None or before == 0:
+        return None
+    return _round(100 * (after - before) / before)
+
+
+def compare(first: Mapping[str, Any], second: Mapping[str, Any]) -> dict[str, Any]:
+    """Side-by-side comparison of two ``summarize`` results, with % change from first to second."""
+    metrics = {
+        "avg_daily_calories": (first["avg_daily_calories"], second["avg_daily_calories"]),
+        **{f"avg_daily_{key}": (first["avg_daily_macros"][key], second["avg_daily_macros"][key]) for key in MACROS},
+        "meals_per_day": (first["meals_per_day"], second["meals_per_day"]),
+        "unique_dishes": (first["unique_dishes"], second["unique_dishes"]),
+        "cuisines_tried": (first["cuisines_tried"], second["cuisines_tried"]),
+    }
+    return {name: {"period1": a, "period2": b, "change_pct": _change_pct(a, b)} for name, (a, b) in metrics.items()}
+
+
+def format_summary(stats: Mapping[str, Any]) -> str:
+    """Plain-text rendering of a ``summarize`` result."""
+    if not stats["days_tracked"]:
+        return f"{stats['entry_count']} entries, no dated entries to compute daily statistics."
+    macros = stats["avg_daily_macros"]
+    ratio = stats["macro_ratio_pct"]
+    lines = [
+        f"Days tracked: {stats['days_tracked']} ({stats['entry_count']} entries, {stats['meals_per_day']} per day)",
+        f"Total calories: {stats['total_calories']}",
+        f"Average daily calories: {stats['avg_daily_calories']} (std dev {stats['daily_calories_stddev']})",
+        f"Average daily macros: protein {macros['protein_g']} g, carbs {macros['carbs_g']} g, fat {macros['fat_g']} g",
+    ]
+    if ratio["protein"] is not None:
+        lines.append(f"Macro ratio: protein {ratio['protein']}%, carbs {ratio['carbs']}%, fat {ratio['fat']}%")
+    lines.append(f"Highest day: {stats['highest_day']['day']} ({stats['highest_day']['calories']} kcal)")
+    lines.append(f"Lowest day: {stats['lowest_day']['day']} ({stats['lowest_day']['calories']} kcal)")
+    if stats["top_dishes"]:
+        lines.append("Most frequent: " + ", ".join(f"{d['dish_name']} ({d['count']})" for d in stats["top_dishes"]))
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: Mapping[str, Any], period1_name: str, period2_name: str) -> str:
+    """Plain-text rendering of a ``compare`` result."""
+    lines = [f"{period1_name} vs {period2_name}"]
+    for name, values in comparison.items():
+        change = values["change_pct"]
+        suffix = f" ({change:+}%)" if change is not None else ""
+        lines.append(f"{name}: {values['period1']} -> {values['period2']}{suffix}")
+    return "\n".join(lines)
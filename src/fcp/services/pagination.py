@@ -0,0 +1,33 @@
+"""Opaque keyset cursors for food log pagination.
+
+A cursor encodes the ``(created_at, id)`` of the last log on a page. Both
+backends order logs by ``created_at DESC, id DESC`` and resume strictly
+after the cursor position, so every page costs the same regardless of how
+deep into a user's history it is.
+"""
+
+import base64
+import binascii
+import json
+
+
+def encode_log_cursor(created_at: str, log_id: str) -> str:
+    """Encode a log position as an opaque, URL-safe cursor string."""
+    raw = json.dumps([created_at, log_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_log_cursor(cursor: str) -> tuple[str, str]:
+    """Decode a cursor produced by ``encode_log_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed or was not issued by this server.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not (isinstance(value, list) and len(value) == 2 and isinstance(value[0], str) and isinstance(value[1], str)):
+        raise ValueError("Invalid pagination cursor")
+    return value[0], value[1]
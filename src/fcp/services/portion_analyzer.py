@@ -11,6 +11,8 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel
 
+from fcp.services.gemini_governor import gemini_governor
+
 
 class PortionMeasurement(BaseModel):
     """Measurement of a portion on a plate."""
@@ -65,7 +67,8 @@ class PortionAnalyzerService:
         with logfire.span("portion_analyzer.analyze", image_url=image_url):
             prompt = self._build_analysis_prompt(reference_object)
 
-            response = await self.client.aio.models.generate_content(
+            response = await gemini_governor.generate_content(
+                self.client,
                 model=self.MODEL,
                 contents=[
                     types.Part.from_uri(file_uri=image_url, mime_type="image/jpeg"),
@@ -112,7 +115,8 @@ Return a JSON with:
 }
 """
 
-        response = await self.client.aio.models.generate_content(
+        response = await gemini_governor.generate_content(
+            self.client,
             model=self.MODEL,
             contents=[
                 types.Part(text="Before eating:"),
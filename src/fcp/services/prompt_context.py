@@ -0,0 +1,162 @@
+"""Compact serialization of food logs and pantry items for prompts.
+
+Prompts used to carry their context as ``json.dumps(..., indent=2)``. The
+indentation, the keys repeated on every entry and the null and empty fields
+all cost input tokens and tell the model nothing. Here entries become a
+table: one header line naming the columns, then one tab-separated line per
+entry. Nested objects are flattened into dotted columns (``nutrition.calories``),
+columns empty in every row are left out, and long free text is cut short.
+
+With a token budget, the rows kept are the most recent ones up to half the
+budget, then the rest is filled with one more meal per cuisine in turn, so a
+long history still shows its range. A last line says how many entries were
+left out.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime
+from typing import Any
+
+# Longest text kept in one cell; notes past this are cut
+MAX_CELL_CHARS = 160
+
+# Share of a budget given to the most recent entries before cuisines are rotated
+RECENT_SHARE = 0.5
+
+# Tokens held back for the line counting entries left out
+_NOTE_TOKENS = 12
+
+# Fields that date an entry, in order of preference
+_DATE_FIELDS = ("created_at", "date", "timestamp")
+
+# The pieces a subword tokenizer splits text into at least: runs of letters,
+# groups of up to three digits, runs of whitespace and any other character
+_PIECES = re.compile(r"[A-Za-z]+|\d{1,3}|\s+|.", re.DOTALL)
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Approximate Gemini token count of ``text``, without calling the API.
+
+    A word is one token per six letters, a number one per three digits, a
+    whitespace run one unless it is a single space, and any other character one.
+    """
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            tokens += (len(piece) + 5) // 6
+        elif first.isspace():
+            tokens += piece != " "
+        else:
+            tokens += 1
+    return tokens
+
+
+def _cell(value: Any, max_chars: int) -> str:
+    """``value`` as the text of one cell; empty for None and empty values."""
+    if value is None or (isinstance(value, str | list | tuple | set | dict) and not value):
+        return ""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="minutes")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Mapping):
+        cells = ((key, _cell(item, max_chars)) for key, item in value.items())
+        return ", ".join(f"{key}={text}" for key, text in cells if text)
+    if isinstance(value, list | tuple | set):
+        return ", ".join(text for text in (_cell(item, max_chars) for item in value) if text)
+    text = " ".join(str(value).split())
+    return text if len(text) <= max_chars else text[: max_chars - 1].rstrip() + "…"
+
+
+def _flatten(entry: Mapping[str, Any]) -> dict[str, Any]:
+    """``entry`` with nested objects spread into ``parent.child`` fields, one level deep."""
+    flat: dict[str, Any] = {}
+    for key, value in entry.items():
+        if isinstance(value, Mapping):
+            for child, item in value.items():
+                flat[f"{key}.{child}"] = item
+        else:
+            flat[key] = value
+    return flat
+
+
+def _render(rows: Sequence[dict[str, str]]) -> list[str]:
+    """Header line and one line per row, leaving out columns empty in every row."""
+    columns = list(dict.fromkeys(key for row in rows for key, text in row.items() if text))
+    return ["\t".join(columns)] + ["\t".join(row.get(column, "") for column in columns) for row in rows]
+
+
+def format_table(entries: Sequence[Mapping[str, Any]], *, max_chars: int = MAX_CELL_CHARS) -> str:
+    """Serialize ``entries`` as a header line and one tab-separated line each."""
+    if not entries:
+        return "(none)"
+    rows = [{key: _cell(value, max_chars) for key, value in _flatten(entry).items()} for entry in entries]
+    return "\n".join(_render(rows))
+
+
+def _when(entry: Mapping[str, Any]) -> str:
+    for field in _DATE_FIELDS:
+        value = entry.get(field)
+        if value:
+            return value.isoformat() if isinstance(value, date) else str(value)
+    return ""
+
+
+def _priority(entries: Sequence[Mapping[str, Any]], costs: Sequence[int], budget: int) -> list[int]:
+    """Indices of the entries that fit ``budget``: most recent first, then cuisines in turn."""
+    by_recency = sorted(range(len(entries)), key=lambda i: _when(entries[i]), reverse=True)
+    kept: list[int] = []
+    used = 0
+    position = 0
+    while position < len(by_recency) and used + costs[by_recency[position]] <= budget * RECENT_SHARE:
+        used += costs[by_recency[position]]
+        kept.append(by_recency[position])
+        position += 1
+
+    # Each remaining entry ranks by how many of its cuisine come before it
+    shown = Counter(str(entries[i].get("cuisine") or "").lower() for i in kept)
+    ranked = []
+    for order, i in enumerate(by_recency[position:]):
+        cuisine = str(entries[i].get("cuisine") or "").lower()
+        ranked.append((shown[cuisine], order, i))
+        shown[cuisine] += 1
+    for _, _, i in sorted(ranked):
+        if used + costs[i] <= budget:
+            used += costs[i]
+            kept.append(i)
+    return sorted(kept)
+
+
+def format_logs(
+    logs: Sequence[Mapping[str, Any]],
+    *,
+    budget: int | None = None,
+    max_chars: int = MAX_CELL_CHARS,
+) -> str:
+    """Serialize food logs as a table, keeping to ``budget`` estimated tokens (None or 0 = no limit).
+
+    Entries stay in the order given. When they do not all fit, the most
+    recent are kept first, then one more per cuisine in turn, and a last
+    line counts those left out.
+    """
+    if not logs:
+        return "(none)"
+    rows = [{key: _cell(value, max_chars) for key, value in _flatten(log).items()} for log in logs]
+    lines = _render(rows)
+    text = "\n".join(lines)
+    if not budget or estimate_text_tokens(text) <= budget:
+        return text
+
+    # Rows are costed against the full set of columns; the kept ones only get shorter
+    available = budget - estimate_text_tokens(lines[0]) - _NOTE_TOKENS
+    costs = [estimate_text_tokens(line) + 1 for line in lines[1:]]
+    kept = _priority(logs, costs, available)
+    note = f"({len(logs) - len(kept)} more entries not shown)"
+    return "\n".join([*_render([rows[i] for i in kept]), note]) if kept else note
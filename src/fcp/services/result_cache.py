@@ -0,0 +1,260 @@
+"""Versioned cache for expensive per-user results.
+
+Analytics, taste profiles and reports are pure functions of a user's data
+plus the request arguments, but computing them costs a Gemini round trip.
+Results are cached under ``(endpoint, user, data version, UTC day, args)``:
+the data version changes on every write to the user's logs, pantry or
+preferences (see ``get_data_version`` on the database backends), so a
+cached result is reused only while the data it was computed from is
+unchanged. The UTC day in the key rolls results over relative windows such
+as "the last 7 days" at midnight, and a TTL bounds how long anything is
+reused.
+
+Two tiers: an in-memory LRU per process and a SQLite file under
+``FCP_DATA_DIR`` shared by every worker on the host and kept across
+restarts. Both are best effort; a failing SQLite tier only costs misses.
+After restoring a database backup, delete the cache file as well.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+import aiosqlite
+
+from fcp.services.database import DATA_DIR
+from fcp.settings import settings
+from fcp.utils.metrics import record_result_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB_PATH = DATA_DIR / "result_cache.db"
+
+# Expired SQLite entries are pruned once every this many stores.
+PRUNE_EVERY = 100
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    data_version INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_user_endpoint_version ON results (user_id, endpoint, data_version);
+CREATE INDEX IF NOT EXISTS idx_results_expires ON results (expires_at);
+"""
+
+T = TypeVar("T")
+
+_skip: ContextVar[bool] = ContextVar("result_cache_skip", default=False)
+
+
+def skip_result_cache() -> None:
+    """Keep the result currently being computed out of the cache (e.g. a degraded fallback)."""
+    _skip.set(True)
+
+
+def _cacheable(value: Any) -> bool:
+    """Error payloads are returned but never cached."""
+    return not (isinstance(value, dict) and "error" in value)
+
+
+def result_key(endpoint: str, user_id: str, data_version: int, args: Mapping[str, Any]) -> str:
+    """Cache key for one result; ``args`` must be JSON-serializable."""
+    day = datetime.now(UTC).date().isoformat()
+    payload = json.dumps([endpoint, user_id, data_version, day, args], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + SQLite) cache of JSON results keyed on the user's data version."""
+
+    def __init__(
+        self,
+        db_path: str | Path | None = None,
+        *,
+        enabled: bool | None = None,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+        persist: bool | None = None,
+    ):
+        self._db_path = Path(db_path) if db_path else CACHE_DB_PATH
+        self.enabled = settings.result_cache_enabled if enabled is None else enabled
+        self._ttl = settings.result_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._max_entries = settings.result_cache_max_entries if max_entries is None else max_entries
+        self._persist = settings.result_cache_persist if persist is None else persist
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._db: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+        self._stores = 0
+        self._stats = {"memory": 0, "sqlite": 0, "miss": 0}
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        user_id: str,
+        args: Mapping[str, Any],
+        compute: Callable[[], Awaitable[T]],
+        *,
+        data_version: Callable[[str], Awaitable[int]],
+        ttl_seconds: float | None = None,
+    ) -> T:
+        """Return the cached result for these arguments, computing and storing it on a miss.
+
+        Args:
+            endpoint: Name of the cached operation, part of the key and the metric label
+            user_id: Whose data the result describes
+            args: Every argument that changes the result (JSON-serializable)
+            compute: Produces the result on a miss
+            data_version: Looks up the user's current data version
+            ttl_seconds: Overrides the configured TTL for this entry
+
+        Results that are not JSON-serializable, that carry an ``error`` key or
+        whose computation called ``skip_result_cache()`` are returned but not
+        stored.
+        """
+        if not self.enabled:
+            return await compute()
+
+        version = await data_version(user_id)
+        key = result_key(endpoint, user_id, version, args)
+        cached = await self._get(key)
+        if cached is not None:
+            tier, value = cached
+            self._record(endpoint, tier)
+            return json.loads(value)
+        self._record(endpoint, "miss")
+
+        token = _skip.set(False)
+        try:
+            result = await compute()
+            skipped = _skip.get()
+        finally:
+            _skip.reset(token)
+        if skipped or not _cacheable(result):
+            return result
+        try:
+            value = json.dumps(result)
+        except (TypeError, ValueError):
+            logger.debug("Result for %s is not JSON-serializable; not caching", endpoint)
+            return result
+        await self._set(key, endpoint, user_id, version, value, self._ttl if ttl_seconds is None else ttl_seconds)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """Lookups served from each tier and misses since startup, plus the memory tier size."""
+        return {**self._stats, "memory_entries": len(self._memory)}
+
+    async def clear(self) -> None:
+        """Drop every cached result from both tiers."""
+        self._memory.clear()
+        db = await self._connection()
+        if db is not None:
+            await db.execute("DELETE FROM results")
+            await db.commit()
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _record(self, endpoint: str, result: str) -> None:
+        self._stats[result] += 1
+        record_result_cache_lookup(endpoint, result)
+
+    async def _get(self, key: str) -> tuple[str, str] | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                return "memory", value
+            del self._memory[key]
+
+        db = await self._connection()
+        if db is None:
+            return None
+        try:
+            async with db.execute(
+                "SELECT value, expires_at FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ) as cursor:
+                row = await cursor.fetchone()
+        except aiosqlite.Error as e:
+            logger.warning("Result cache read failed: %s", e)
+            return None
+        if row is None:
+            return None
+        self._remember(key, row[1], row[0])
+        return "sqlite", row[0]
+
+    async def _set(self, key: str, endpoint: str, user_id: str, version: int, value: str, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, value)
+        db = await self._connection()
+        if db is None:
+            return
+        try:
+            await db.execute(
+                "INSERT OR REPLACE INTO results (key, user_id, endpoint, data_version, value, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, user_id, endpoint, version, value, expires_at),
+            )
+            # Results computed from older data can never be hit again.
+            await db.execute(
+                "DELETE FROM results WHERE user_id = ? AND endpoint = ? AND data_version < ?",
+                (user_id, endpoint, version),
+            )
+            self._stores += 1
+            if self._stores % PRUNE_EVERY == 0:
+                await db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            await db.commit()
+        except aiosqlite.Error as e:
+            logger.warning("Result cache write failed: %s", e)
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        if self._max_entries <= 0:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    async def _connection(self) -> aiosqlite.Connection | None:
+        """The SQLite tier, opened on first use; None when persistence is off or unavailable."""
+        if not self._persist:
+            return None
+        if self._db is None:
+            async with self._connect_lock:
+                # Opened by another caller while this one waited, or opened here
+                self._db = self._db or await self._open()
+        return self._db
+
+    async def _open(self) -> aiosqlite.Connection | None:
+        db = None
+        try:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            db = await aiosqlite.connect(self._db_path)
+            await db.execute("PRAGMA journal_mode = WAL")
+            await db.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+            await db.executescript(_CREATE_TABLE)
+            await db.commit()
+        except (OSError, aiosqlite.Error) as e:
+            logger.warning("Result cache SQLite tier unavailable, using memory only: %s", e)
+            if db is not None:
+                await db.close()
+            self._persist = False
+            return None
+        return db
+
+
+result_cache = ResultCache()
@@ -57,10 +57,117 @@ class Settings(BaseSettings):
     fcp_data_dir: str = Field("data", description="Data directory path")
     database_url: str | None = Field(None, description="SQLite database URL")
 
+    # SQLite tuning (file-backed databases only; ":memory:" always uses one connection)
+    sqlite_reader_connections: int = Field(
+        4, ge=0, description="Read-only SQLite connections in the reader pool (0 = single connection)"
+    )
+    sqlite_cache_size_kib: int = Field(64 * 1024, ge=0, description="SQLite page cache size per connection in KiB")
+    sqlite_mmap_size_bytes: int = Field(256 * 1024 * 1024, ge=0, description="SQLite memory-mapped I/O size in bytes")
+    sqlite_busy_timeout_ms: int = Field(5000, ge=0, description="How long SQLite waits on a locked database")
+    sqlite_group_commit_window_ms: float = Field(
+        0.0, ge=0, description="Extra time a commit waits for more writers to join it (0 = only join in-flight writers)"
+    )
+    sqlite_group_commit_max_batch: int = Field(64, ge=1, description="Writers that force a group commit immediately")
+
     # Cloud Firestore (only needed if database_backend=firestore)
     google_cloud_project: str | None = Field(None, description="GCP project ID")
     google_application_credentials: str | None = Field(None, description="Path to service account JSON")
 
+    # ==========================================================================
+    # Result Cache (analytics, taste profile and report results per data version)
+    # ==========================================================================
+    result_cache_enabled: bool = Field(True, description="Reuse results while the user's data is unchanged")
+    result_cache_ttl_seconds: float = Field(24 * 3600, gt=0, description="Longest time a cached result is reused")
+    result_cache_max_entries: int = Field(1024, ge=0, description="Results kept in the in-memory LRU tier")
+    result_cache_persist: bool = Field(True, description="Also keep results in SQLite under FCP_DATA_DIR")
+
+    # ==========================================================================
+    # Gemini Response Cache (only for tools declaring @cache_gemini_responses)
+    # ==========================================================================
+    gemini_response_cache_enabled: bool = Field(True, description="Reuse responses for tools that allow it")
+    gemini_response_cache_max_memory_bytes: int = Field(
+        32 * 1024 * 1024, ge=0, description="Size of the in-memory LRU tier (0 = SQLite tier only)"
+    )
+    gemini_response_cache_persist: bool = Field(True, description="Also keep responses in SQLite under FCP_DATA_DIR")
+    gemini_response_cache_max_disk_bytes: int = Field(
+        256 * 1024 * 1024, ge=0, description="Size the SQLite tier is trimmed back to, oldest responses first"
+    )
+
+    # ==========================================================================
+    # Media Cache (images and audio fetched for Gemini)
+    # ==========================================================================
+    media_cache_enabled: bool = Field(True, description="Reuse fetched media while the server says it is fresh")
+    media_cache_max_memory_bytes: int = Field(
+        64 * 1024 * 1024, ge=0, description="Size of the in-memory LRU tier (0 = disk tier only)"
+    )
+    media_cache_persist: bool = Field(True, description="Also keep media on disk under FCP_DATA_DIR")
+    media_cache_max_disk_bytes: int = Field(
+        512 * 1024 * 1024, ge=0, description="Size the disk tier is trimmed back to, oldest media first"
+    )
+    media_cache_default_ttl_seconds: float = Field(
+        3600.0, ge=0, description="How long media is reused when the server sends no Cache-Control or Expires"
+    )
+
+    # ==========================================================================
+    # Gemini Context Caches (large prompt prefixes declared by tools)
+    # ==========================================================================
+    gemini_context_cache_enabled: bool = Field(True, description="Send repeated declared prefixes as cached content")
+    gemini_context_cache_min_tokens: int = Field(
+        2048, ge=0, description="Estimated tokens a prefix needs before it is worth caching"
+    )
+    gemini_context_cache_ttl_seconds: float = Field(
+        600.0, gt=0, description="Lifetime of a context cache, extended while it is in use"
+    )
+    gemini_context_cache_max_entries: int = Field(
+        256, ge=1, description="Context caches kept before the oldest is deleted"
+    )
+
+    # ==========================================================================
+    # Prompt Context (food logs serialized into prompts)
+    # ==========================================================================
+    prompt_log_token_budget: int = Field(
+        8000, ge=0, description="Estimated tokens of food logs one prompt may carry (0 = no limit)"
+    )
+
+    # ==========================================================================
+    # Gemini Governor (per-model concurrency, RPM/TPM budgets, priorities)
+    # ==========================================================================
+    gemini_governor_enabled: bool = Field(True, description="Queue Gemini calls behind per-model limits")
+    gemini_initial_concurrency: int = Field(8, ge=1, description="Concurrent calls per model before adapting")
+    gemini_min_concurrency: int = Field(1, ge=1, description="Floor the adaptive limit is never cut below")
+    gemini_max_concurrency: int = Field(64, ge=1, description="Ceiling the adaptive limit never grows past")
+    gemini_rpm_limit: int = Field(1000, ge=0, description="Requests per minute per model (0 = no limit)")
+    gemini_tpm_limit: int = Field(1_000_000, ge=0, description="Estimated tokens per minute per model (0 = no limit)")
+    gemini_latency_target_seconds: float = Field(
+        30.0, gt=0, description="Calls slower than this cut the concurrency limit"
+    )
+    gemini_expected_output_tokens: int = Field(
+        1024, ge=0, description="Output tokens assumed per call until the API reports usage"
+    )
+
+    # ==========================================================================
+    # Request Deadlines and Hedging
+    # ==========================================================================
+    analyze_deadline_seconds: float = Field(45.0, ge=0, description="Deadline for image analysis requests (0 = none)")
+    search_deadline_seconds: float = Field(15.0, ge=0, description="Deadline for search requests (0 = none)")
+    request_deadline_max_seconds: float = Field(
+        120.0, gt=0, description="Longest deadline a client may ask for with X-Request-Timeout"
+    )
+    gemini_hedging_enabled: bool = Field(False, description="Send a second attempt for calls running past their p95")
+    gemini_hedge_min_samples: int = Field(
+        20, ge=1, description="Calls of a method observed before its p95 is used to hedge"
+    )
+
+    # ==========================================================================
+    # Materialized Taste Profiles (served to agent routes and meal suggestions)
+    # ==========================================================================
+    taste_profile_refresh_after_logs: int = Field(
+        10, ge=1, description="New logs since the stored profile was built that trigger a background refresh"
+    )
+    taste_profile_max_age_seconds: float = Field(
+        24 * 3600, gt=0, description="Age after which a stored profile is refreshed if the user's data changed"
+    )
+
     # ==========================================================================
     # Server Configuration
     # ==========================================================================
@@ -18,9 +18,12 @@ from .crud import (
     add_meal,
     delete_meal,
     donate_meal,
+    get_daily_nutrition,
+    get_data_version,
     get_meal,
     get_meals,
     get_meals_by_ids,
+    get_meals_page,
     get_recent_meals_tool,
     update_meal,
 )
@@ -41,7 +44,12 @@ from .knowledge_graph import (
     search_knowledge,
 )
 from .parser import parse_menu, parse_receipt
-from .profile import get_taste_profile, get_taste_profile_tool
+from .profile import (
+    get_stored_taste_profile,
+    get_taste_profile,
+    get_taste_profile_tool,
+    refresh_taste_profile,
+)
 from .recipe_crud import (
     archive_recipe,
     delete_recipe,
@@ -91,6 +99,8 @@ __all__ = [
     "search_meals",
     "enrich_entry",
     "get_taste_profile",
+    "get_stored_taste_profile",
+    "refresh_taste_profile",
     "suggest_meal",
     "standardize_recipe",
     "generate_image_prompt",
@@ -139,6 +149,9 @@ __all__ = [
     "get_meals",
     "get_recent_meals_tool",
     "get_meals_by_ids",
+    "get_meals_page",
+    "get_daily_nutrition",
+    "get_data_version",
     "get_meal",
     "add_meal",
     "update_meal",
@@ -7,16 +7,29 @@ code execution feature. Gemini writes and runs Python code to:
 - Generate trend reports
 - Create data visualizations
 
+Nutrition statistics, period comparisons and eating patterns also have a
+``mode="local"`` that computes the numbers in-process (see
+``fcp.services.nutrition_stats`` and ``fcp.services.eating_patterns``) and
+only asks Gemini to narrate a compact summary.
+
 Security: User-provided text fields in food logs (dish_name, cuisine, venue,
 notes, cooking_method) are sanitized before inclusion in prompts to prevent
 prompt injection attacks. Numeric and structured fields pass through unchanged.
 """
 
 import json
+import logging
 from typing import Any
 
 from fcp.security.input_sanitizer import sanitize_user_input
+from fcp.services import eating_patterns
 from fcp.services.gemini import gemini
+from fcp.services.gemini_context_cache import cached_prefix
+from fcp.services.nutrition_stats import columns_from_logs, compare, format_comparison, format_summary, summarize
+from fcp.services.prompt_context import format_logs
+from fcp.services.result_cache import skip_result_cache
+
+logger = logging.getLogger(__name__)
 
 # Text fields in food logs that should be sanitized (user-provided content)
 _SANITIZE_FIELDS = ("dish_name", "cuisine", "venue", "notes", "cooking_method")
@@ -24,6 +37,9 @@ _SANITIZE_FIELDS = ("dish_name", "cuisine", "venue", "notes", "cooking_method")
 # Valid metric values for trend analysis
 _VALID_METRICS = {"calories", "protein", "carbs", "fat", "fiber", "sodium", "sugar"}
 
+# Where statistics are computed: in-process ("local") or by Gemini code execution ("llm")
+_VALID_MODES = {"local", "llm"}
+
 
 def _sanitize_food_logs(food_logs: list[dict]) -> list[dict]:
     """
@@ -67,29 +83,97 @@ def _validate_metric(metric: str) -> str:
     return metric.lower()
 
 
+def _validate_mode(mode: str) -> str:
+    """
+    Validate the analytics mode.
+
+    Raises:
+        ValueError: If mode is not "local" or "llm"
+    """
+    if mode not in _VALID_MODES:
+        raise ValueError(f"Invalid mode '{mode}'. Must be one of: {', '.join(sorted(_VALID_MODES))}")
+    return mode
+
+
+def _data_block(safe_logs: list[dict]) -> str:
+    """The logs as the block the code execution prompts open with.
+
+    Every analysis of the same logs starts with the same block, so running
+    several of them sends it once and then as a context cache. No log is
+    left out to fit a token budget: the statistics are computed from all of them.
+    """
+    return f"Data ({len(safe_logs)} entries):\n{format_logs(safe_logs)}\n\n"
+
+
+async def _narrate(instructions: str, summary: str) -> str:
+    """Ask Gemini for a short prose narration of precomputed statistics.
+
+    The numbers do not depend on Gemini, so if it fails (or its circuit
+    breaker is open) the summary itself is returned, and kept out of the
+    result cache so a later request can narrate it.
+    """
+    prompt = f"""{instructions}
+
+Statistics (already computed, do not recalculate):
+{summary}
+
+Write 3-5 sentences for the user. Only use the numbers given above."""
+    try:
+        return await gemini.generate_content(prompt)
+    except Exception as e:
+        logger.warning("Narration failed, returning the computed summary: %s", e)
+        skip_result_cache()
+        return summary
+
+
 async def calculate_nutrition_stats(
     food_logs: list[dict],
     period: str = "week",
+    mode: str = "llm",
+    narrate: bool = True,
 ) -> dict[str, Any]:
     """
     Calculate nutrition statistics from food logs.
 
-    Uses Gemini Code Execution to run Python calculations on the data.
+    With ``mode="llm"`` Gemini Code Execution runs Python calculations on the
+    data. With ``mode="local"`` the statistics are computed in-process and
+    Gemini only narrates the summary (skipped when ``narrate`` is False); the
+    result then also carries the structured ``stats``.
 
     Args:
         food_logs: List of food log entries with nutrition data
         period: Time period label for the analysis
+        mode: "local" or "llm"
+        narrate: In local mode, whether to ask Gemini for the prose analysis
 
     Returns:
         dict with calculated statistics and the code used
+
+    Raises:
+        ValueError: If mode is not "local" or "llm"
     """
+    _validate_mode(mode)
+
     # Sanitize user-provided fields to prevent prompt injection
     safe_logs = _sanitize_food_logs(food_logs)
 
-    prompt = f"""Analyze this nutrition data and calculate comprehensive statistics.
-
-Data ({len(safe_logs)} entries, {period}):
-{json.dumps(safe_logs, indent=2)}
+    if mode == "local":
+        stats = summarize(columns_from_logs(safe_logs))
+        summary = format_summary(stats)
+        analysis = summary
+        if narrate:
+            analysis = await _narrate(f"Summarize this {period} of nutrition data.", summary)
+        return {
+            "period": period,
+            "entry_count": len(food_logs),
+            "analysis": analysis,
+            "code_executed": None,
+            "raw_output": summary,
+            "stats": stats,
+        }
+
+    data = _data_block(safe_logs)
+    prompt = f"""{data}Analyze this {period} of nutrition data above and calculate comprehensive statistics.
 
 Write Python code to calculate:
 1. Total and average daily calories
@@ -101,7 +185,8 @@ Write Python code to calculate:
 
 Use pandas if helpful. Print the results in a clear format."""
 
-    result = await gemini.generate_with_code_execution(prompt)
+    with cached_prefix(data):
+        result = await gemini.generate_with_code_execution(prompt)
 
     return {
         "period": period,
@@ -114,29 +199,56 @@ Use pandas if helpful. Print the results in a clear format."""
 
 async def analyze_eating_patterns(
     food_logs: list[dict],
+    mode: str = "llm",
+    narrate: bool = True,
 ) -> dict[str, Any]:
     """
     Analyze eating patterns and habits from food logs.
 
-    Uses code execution to identify patterns in:
+    Identifies patterns in:
     - Meal timing
     - Cuisine preferences over time
     - Weekend vs weekday eating
-    - Venue frequency
+    - Home cooking vs restaurant meals and venue frequency
+    - Food variety
+
+    With ``mode="llm"`` Gemini Code Execution computes them. With
+    ``mode="local"`` they are computed in-process and Gemini only narrates
+    the summary (skipped when ``narrate`` is False); the result then also
+    carries the structured ``patterns``.
 
     Args:
         food_logs: List of food log entries
+        mode: "local" or "llm"
+        narrate: In local mode, whether to ask Gemini for the prose analysis
 
     Returns:
         dict with pattern analysis
+
+    Raises:
+        ValueError: If mode is not "local" or "llm"
     """
+    _validate_mode(mode)
+
     # Sanitize user-provided fields to prevent prompt injection
     safe_logs = _sanitize_food_logs(food_logs)
 
-    prompt = f"""Analyze eating patterns in this food log data.
-
-Data ({len(safe_logs)} entries):
-{json.dumps(safe_logs, indent=2)}
+    if mode == "local":
+        patterns = eating_patterns.summarize(eating_patterns.columns_from_logs(safe_logs))
+        summary = eating_patterns.format_summary(patterns)
+        analysis = summary
+        if narrate:
+            analysis = await _narrate("Describe the notable patterns in these eating habits.", summary)
+        return {
+            "entry_count": len(food_logs),
+            "pattern_analysis": analysis,
+            "code_executed": None,
+            "raw_output": summary,
+            "patterns": patterns,
+        }
+
+    data = _data_block(safe_logs)
+    prompt = f"""{data}Analyze eating patterns in the food log data above.
 
 Write Python code to analyze:
 1. Meal timing patterns (what time do they usually eat)
@@ -148,7 +260,8 @@ Write Python code to analyze:
 
 Create clear statistics and identify notable patterns."""
 
-    result = await gemini.generate_with_code_execution(prompt)
+    with cached_prefix(data):
+        result = await gemini.generate_with_code_execution(prompt)
 
     return {
         "entry_count": len(food_logs),
@@ -168,7 +281,7 @@ async def calculate_trend_report(
     Uses code execution to perform time series analysis.
 
     Args:
-        food_logs: List of food log entries (should span multiple weeks)
+        food_logs: List of food log entries or daily nutrition rollups (should span multiple weeks)
         metric: Metric to analyze (calories, protein, carbs, fat, fiber, sodium, sugar)
 
     Returns:
@@ -183,10 +296,8 @@ async def calculate_trend_report(
     # Sanitize user-provided fields to prevent prompt injection
     safe_logs = _sanitize_food_logs(food_logs)
 
-    prompt = f"""Analyze the trend of {safe_metric} over time in this food data.
-
-Data ({len(safe_logs)} entries):
-{json.dumps(safe_logs, indent=2)}
+    data = _data_block(safe_logs)
+    prompt = f"""{data}Analyze the trend of {safe_metric} over time in the food data above.
 
 Write Python code to:
 1. Group data by week
@@ -198,7 +309,8 @@ Write Python code to:
 
 Print a clear trend summary with numbers."""
 
-    result = await gemini.generate_with_code_execution(prompt)
+    with cached_prefix(data):
+        result = await gemini.generate_with_code_execution(prompt)
 
     return {
         "metric": safe_metric,
@@ -214,32 +326,65 @@ async def compare_periods(
     period2_logs: list[dict],
     period1_name: str = "Period 1",
     period2_name: str = "Period 2",
+    mode: str = "llm",
+    narrate: bool = True,
 ) -> dict[str, Any]:
     """
     Compare nutrition between two time periods.
 
-    Uses code execution to calculate differences and improvements.
+    With ``mode="llm"`` code execution calculates differences and
+    improvements. With ``mode="local"`` both periods are summarized
+    in-process and Gemini only narrates the comparison (skipped when
+    ``narrate`` is False); the result then also carries the structured
+    ``stats`` per period and the ``metrics`` compared.
 
     Args:
         period1_logs: Food logs from first period
         period2_logs: Food logs from second period
         period1_name: Label for first period
         period2_name: Label for second period
+        mode: "local" or "llm"
+        narrate: In local mode, whether to ask Gemini for the prose comparison
 
     Returns:
         dict with comparison analysis
+
+    Raises:
+        ValueError: If mode is not "local" or "llm"
     """
+    _validate_mode(mode)
+
     # Sanitize user-provided fields to prevent prompt injection
     safe_logs1 = _sanitize_food_logs(period1_logs)
     safe_logs2 = _sanitize_food_logs(period2_logs)
 
+    if mode == "local":
+        stats1 = summarize(columns_from_logs(safe_logs1))
+        stats2 = summarize(columns_from_logs(safe_logs2))
+        metrics = compare(stats1, stats2)
+        summary = format_comparison(metrics, period1_name, period2_name)
+        comparison = summary
+        if narrate:
+            comparison = await _narrate(
+                "Compare these two periods of nutrition data, highlighting improvements and areas of concern.",
+                summary,
+            )
+        return {
+            "period1": {"name": period1_name, "entries": len(period1_logs), "stats": stats1},
+            "period2": {"name": period2_name, "entries": len(period2_logs), "stats": stats2},
+            "comparison": comparison,
+            "metrics": metrics,
+            "code_executed": None,
+            "raw_output": summary,
+        }
+
     prompt = f"""Compare nutrition between two time periods.
 
 {period1_name} ({len(safe_logs1)} entries):
-{json.dumps(safe_logs1, indent=2)}
+{format_logs(safe_logs1)}
 
 {period2_name} ({len(safe_logs2)} entries):
-{json.dumps(safe_logs2, indent=2)}
+{format_logs(safe_logs2)}
 
 Write Python code to compare:
 1. Average daily calories (and % change)
@@ -288,10 +433,8 @@ User's nutrition goals:
 
 Compare actual intake against these goals."""
 
-    prompt = f"""Generate a comprehensive nutrition report from this food log data.
-
-Data ({len(safe_logs)} entries):
-{json.dumps(safe_logs, indent=2)}
+    data = _data_block(safe_logs)
+    prompt = f"""{data}Generate a comprehensive nutrition report from the food log data above.
 {goals_str}
 
 Write Python code to create a full report including:
@@ -321,7 +464,8 @@ Write Python code to create a full report including:
 
 Format the output as a clear, readable report."""
 
-    result = await gemini.generate_with_code_execution(prompt)
+    with cached_prefix(data):
+        result = await gemini.generate_with_code_execution(prompt)
 
     return {
         "report_type": "comprehensive_nutrition",
@@ -361,7 +505,7 @@ async def calculate_macro_targets(
     prompt = f"""Calculate recommended macro targets based on this data and goal.
 
 Current eating data ({len(safe_logs)} entries):
-{json.dumps(safe_logs, indent=2)}
+{format_logs(safe_logs)}
 
 Goal: {goal}
 {weight_str}
@@ -5,6 +5,7 @@ from typing import Any
 
 from fcp.mcp.registry import tool
 from fcp.services.gemini import gemini
+from fcp.services.gemini_response_cache import cache_gemini_responses
 from fcp.utils.errors import tool_error
 
 logger = logging.getLogger(__name__)
@@ -78,6 +79,7 @@ async def plan_food_festival(
     description="Identify culinary gaps in a neighborhood to help new businesses plan",
     category="business",
 )
+@cache_gemini_responses()
 async def detect_economic_gaps(neighborhood: str, existing_cuisines: list[str]) -> dict[str, Any]:
     """
     Identify culinary gaps in a neighborhood to help new businesses plan.
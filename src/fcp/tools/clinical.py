@@ -7,6 +7,9 @@ from typing import Any
 from fcp.mcp.registry import tool
 from fcp.services.firestore import firestore_client
 from fcp.services.gemini import gemini
+from fcp.services.gemini_context_cache import cached_prefix
+from fcp.services.prompt_context import format_logs
+from fcp.services.result_cache import result_cache
 from fcp.utils.errors import tool_error
 
 logger = logging.getLogger(__name__)
@@ -29,7 +32,16 @@ async def generate_dietitian_report(user_id: str, days: int = 7, focus_area: str
     Returns:
         Structured dietitian report with macro/micro analysis and trigger identification.
     """
+    return await result_cache.get_or_compute(
+        "clinical.dietitian_report",
+        user_id,
+        {"days": days, "focus_area": focus_area},
+        lambda: _build_dietitian_report(user_id, days, focus_area),
+        data_version=lambda uid: firestore_client.get_data_version(uid),
+    )
 
+
+async def _build_dietitian_report(user_id: str, days: int, focus_area: str | None) -> dict[str, Any]:
     # 1. Fetch user data
     logs = await firestore_client.get_user_logs(user_id, days=days)
     preferences = await firestore_client.get_user_preferences(user_id)
@@ -68,16 +80,17 @@ async def generate_dietitian_report(user_id: str, days: int = 7, focus_area: str
     }}
     """
 
+    # The logs open the prompt so reports with another focus can send them as a context cache.
+    # All of them are sent: the macro averages are taken over the whole period.
+    history = f"USER LOGS (Last {days} days):\n{format_logs(logs_summary)}\n\n"
     prompt = f"""
-    USER LOGS (Last {days} days):
-    {json.dumps(logs_summary, indent=2)}
-
     USER GOALS:
     {json.dumps(preferences.get("dietary_patterns", []), indent=2)}
     """
 
     try:
-        json_response = await gemini.generate_json(f"{system_instruction}\n\n{prompt}")
+        with cached_prefix(history, user_id=user_id):
+            json_response = await gemini.generate_json(f"{history}{system_instruction}\n\n{prompt}")
         if isinstance(json_response, list) and json_response:
             return json_response[0]
         return json_response
@@ -1,6 +1,6 @@
 """CRUD operations for food logs and pantry items."""
 
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from typing import Any, cast
 
 from fcp.mcp.protocols import Database
@@ -23,18 +23,28 @@ async def get_recent_meals_tool(
     days: int | None = None,
     include_nutrition: bool = False,
     output_format: str | None = None,
+    cursor: str | None = None,
     db: Database | None = None,
 ) -> dict[str, Any]:
-    """MCP tool wrapper for get_meals."""
-    meals = await get_meals(
-        user_id=user_id,
-        limit=limit,
-        days=days,
-        include_nutrition=include_nutrition,
-        output_format=output_format,
-        db=db,
-    )
-    return {"meals": meals}
+    """MCP tool wrapper for get_meals_page.
+
+    Returns ``next_cursor`` alongside the meals; pass it back as ``cursor`` to
+    page further into the user's history.
+    """
+    try:
+        meals, next_cursor = await get_meals_page(
+            user_id=user_id,
+            limit=limit,
+            days=days,
+            include_nutrition=include_nutrition,
+            cursor=cursor,
+            db=db,
+        )
+    except ValueError as e:
+        return tool_error(e, "listing meals")
+    if output_format == "schema_org":
+        meals = [to_schema_org_recipe(meal) for meal in meals]
+    return {"meals": meals, "next_cursor": next_cursor}
 
 
 async def get_meals(
@@ -53,8 +63,7 @@ async def get_meals(
     logs = await db.get_user_logs(user_id, limit=limit, days=days, start_date=start_date, end_date=end_date)
 
     if not include_nutrition:
-        for log in logs:
-            log.pop("nutrition", None)
+        _drop_nutrition(logs)
 
     if output_format == "schema_org":
         return [to_schema_org_recipe(meal) for meal in logs]
@@ -62,6 +71,68 @@ async def get_meals(
     return logs
 
 
+async def get_meals_page(
+    user_id: str,
+    limit: int = 10,
+    days: int | None = None,
+    include_nutrition: bool = False,
+    cursor: str | None = None,
+    db: Database | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Get one page of a user's meals, newest first, and the cursor for the next page.
+
+    The cursor comes from the backend, which looks one row past the page, so
+    it is None exactly when there are no more meals. Raises ``ValueError`` for
+    a malformed ``cursor``.
+    """
+    db = db or cast(Database, firestore_client)
+    logs, next_cursor = await db.get_user_logs_page(user_id, page_size=limit, cursor=cursor, days=days)
+
+    if not include_nutrition:
+        _drop_nutrition(logs)
+
+    return logs, next_cursor
+
+
+def _drop_nutrition(logs: list[dict[str, Any]]) -> None:
+    for log in logs:
+        # del rather than pop: a lazily decoded log never parses the dropped value
+        if "nutrition" in log:
+            del log["nutrition"]
+
+
+async def get_daily_nutrition(
+    user_id: str,
+    days: int = 7,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    include_breakdown: bool = False,
+    db: Database | None = None,
+) -> list[dict[str, Any]]:
+    """Get per-day nutrition rollups for a user, oldest day first.
+
+    Covers the last ``days`` days unless ``start_date``/``end_date`` are given
+    (whole days, inclusive). The per-day ``cuisines`` and ``venues`` counts are
+    only kept with ``include_breakdown``.
+    """
+    db = db or cast(Database, firestore_client)
+    end = (end_date or datetime.now(UTC)).date()
+    start = start_date.date() if start_date else (datetime.now(UTC) - timedelta(days=days)).date()
+    rollups = await db.get_daily_rollups(user_id, start, end)
+
+    if not include_breakdown:
+        for rollup in rollups:
+            del rollup["cuisines"], rollup["venues"]
+
+    return rollups
+
+
+async def get_data_version(user_id: str, db: Database | None = None) -> int:
+    """Get the user's data version; it changes whenever their logs, pantry or preferences do."""
+    db = db or cast(Database, firestore_client)
+    return await db.get_data_version(user_id)
+
+
 async def get_meal(user_id: str, log_id: str) -> dict[str, Any] | None:
     """Get a specific meal."""
     return await firestore_client.get_log(user_id, log_id)
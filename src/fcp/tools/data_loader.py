@@ -0,0 +1,121 @@
+"""Request-scoped loading of a user's logs, taste profile and preferences.
+
+A single request often needs the same user data in several places: a route
+handler reads the taste profile and recent logs, then calls a tool that
+reads them again with a different limit or window. ``user_data(user_id)``
+returns a loader that runs each underlying query at most once per request
+and serves narrower reads from a wider one already fetched. Logs come back
+newest first, so the ``limit`` newest logs of a ``days`` window are a prefix
+of any wider fetch once the older rows are filtered out.
+
+HTTP requests get one loader per user for the whole request (see
+``user_data_scope``). Outside a scope every ``user_data`` call returns a
+fresh loader, which still deduplicates the reads made through it.
+
+Results are shared between callers, so treat returned logs as read-only.
+"""
+
+import asyncio
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from fcp.mcp.protocols import Database
+from fcp.services.firestore import firestore_client
+from fcp.tools.profile import get_stored_taste_profile
+
+# (limit, days, fields) of one log query; fields None means every field
+LogQuery = tuple[int, int | None, frozenset[str] | None]
+
+_scope: ContextVar[dict[str, "UserDataLoader"] | None] = ContextVar("user_data_scope", default=None)
+
+
+@contextmanager
+def user_data_scope() -> Iterator[None]:
+    """Share one loader per user between everything that runs inside the block."""
+    token = _scope.set({})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def user_data(user_id: str) -> "UserDataLoader":
+    """The loader for ``user_id`` in the current scope, or a fresh one outside any scope."""
+    loaders = _scope.get()
+    if loaders is None:
+        return UserDataLoader(user_id)
+    if user_id not in loaders:
+        loaders[user_id] = UserDataLoader(user_id)
+    return loaders[user_id]
+
+
+class UserDataLoader:
+    """Memoized, concurrency-safe reads of one user's data."""
+
+    def __init__(self, user_id: str, db: Database | None = None):
+        self.user_id = user_id
+        self._db = db or cast(Database, firestore_client)
+        self._log_queries: dict[LogQuery, asyncio.Future[list[dict[str, Any]]]] = {}
+        self._profiles: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._preferences: asyncio.Future[dict[str, Any]] | None = None
+
+    async def logs(
+        self,
+        limit: int,
+        days: int | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """The user's ``limit`` newest logs, optionally within the last ``days``.
+
+        Served from an earlier (or in-flight) read that covers it when there
+        is one, so fetch the widest slice first - or concurrently - and the
+        narrower ones cost no query.
+        """
+        wanted = frozenset(fields) if fields is not None else None
+        for query, task in list(self._log_queries.items()):
+            if _covers(query, days, wanted) and (limit <= query[0] or _came_back_short(query, task)):
+                return _slice(await asyncio.shield(task), limit, days)
+
+        query: LogQuery = (limit, days, wanted)
+        # created_at is what lets a later, narrower window be cut from this read
+        fetch_fields = None if wanted is None else sorted(wanted | {"created_at"})
+        task = self._log_queries[query] = asyncio.ensure_future(
+            self._db.get_user_logs(self.user_id, limit=limit, days=days, fields=fetch_fields)
+        )
+        return await asyncio.shield(task)
+
+    async def taste_profile(self, period: str = "all_time") -> dict[str, Any]:
+        """The stored taste profile for ``period``, including its ``staleness`` entry."""
+        if period not in self._profiles:
+            self._profiles[period] = asyncio.ensure_future(get_stored_taste_profile(self.user_id, period))
+        # Callers pop the staleness entry, so each gets its own dict
+        return dict(await asyncio.shield(self._profiles[period]))
+
+    async def preferences(self) -> dict[str, Any]:
+        """The user's preferences."""
+        if self._preferences is None:
+            self._preferences = asyncio.ensure_future(self._db.get_user_preferences(self.user_id))
+        return await asyncio.shield(self._preferences)
+
+
+def _covers(query: LogQuery, days: int | None, fields: frozenset[str] | None) -> bool:
+    """Whether every log ``(days, fields)`` asks for is among the newest rows of ``query``."""
+    _, have_days, have_fields = query
+    if have_fields is not None and (fields is None or not fields <= have_fields):
+        return False
+    return have_days is None or (days is not None and days <= have_days)
+
+
+def _came_back_short(query: LogQuery, task: asyncio.Future[list[dict[str, Any]]]) -> bool:
+    """A finished read with fewer rows than its limit already holds every matching log."""
+    return task.done() and task.exception() is None and len(task.result()) < query[0]
+
+
+def _slice(rows: list[dict[str, Any]], limit: int, days: int | None) -> list[dict[str, Any]]:
+    if days:
+        cutoff = (datetime.now(UTC) - timedelta(days=days)).isoformat()
+        rows = [row for row in rows if (row.get("created_at") or "") >= cutoff]
+    return rows[:limit]
@@ -3,9 +3,11 @@
 from typing import Any
 
 from fcp.services.gemini import gemini
+from fcp.services.gemini_response_cache import cache_gemini_responses
 from fcp.utils.errors import tool_error
 
 
+@cache_gemini_responses()
 async def analyze_beverage(description: str, beverage_type: str = "auto") -> dict[str, Any]:
     """
     Extract specialized metadata for beverages.
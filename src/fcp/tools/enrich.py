@@ -9,6 +9,7 @@ from fcp.prompts import PROMPTS
 from fcp.services.firestore import firestore_client
 from fcp.services.gemini import gemini
 from fcp.services.storage import is_storage_configured, storage_client
+from fcp.utils.circuit_breaker import call_with_circuit_breaker, is_server_error
 from fcp.utils.errors import tool_error
 
 USDA_API_KEY = os.environ.get("USDA_API_KEY", "DEMO_KEY")
@@ -19,7 +20,9 @@ async def get_usda_nutrition(dish_name: str) -> dict[str, Any]:
     url = f"https://api.nal.usda.gov/fdc/v1/foods/search?query={dish_name}&pageSize=1&api_key={USDA_API_KEY}"
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=5.0)
+            response = await call_with_circuit_breaker(
+                "usda", lambda: client.get(url, timeout=5.0), failed=is_server_error
+            )
             if response.status_code == 200:
                 data = response.json()
                 if data.get("foods"):
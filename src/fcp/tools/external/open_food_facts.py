@@ -12,6 +12,7 @@ from typing import Any
 import httpx
 
 from fcp.mcp.registry import tool
+from fcp.utils.circuit_breaker import call_with_circuit_breaker, is_server_error
 from fcp.utils.errors import tool_error
 
 OFF_API_BASE = "https://world.openfoodfacts.org"
@@ -55,7 +56,9 @@ async def lookup_product(barcode: str) -> dict[str, Any] | None:
 
     async with httpx.AsyncClient(follow_redirects=True) as client:
         try:
-            response = await client.get(url, timeout=10.0)
+            response = await call_with_circuit_breaker(
+                "open_food_facts", lambda: client.get(url, timeout=10.0), failed=is_server_error
+            )
             if response.status_code != 200:
                 return {"error": "Product not found or API error"}
 
@@ -100,16 +103,20 @@ async def search_by_name(
             follow_redirects=True,
             timeout=DEFAULT_TIMEOUT,
         ) as client:
-            response = await client.get(
-                OFF_SEARCH_URL,
-                params={
-                    "search_terms": query,
-                    "search_simple": 1,
-                    "action": "process",
-                    "json": 1,
-                    "page_size": page_size,
-                    "fields": OFF_SEARCH_FIELDS,
-                },
+            response = await call_with_circuit_breaker(
+                "open_food_facts",
+                lambda: client.get(
+                    OFF_SEARCH_URL,
+                    params={
+                        "search_terms": query,
+                        "search_simple": 1,
+                        "action": "process",
+                        "json": 1,
+                        "page_size": page_size,
+                        "fields": OFF_SEARCH_FIELDS,
+                    },
+                ),
+                failed=is_server_error,
             )
             if response.status_code != 200:
                 return []
@@ -13,6 +13,8 @@ from typing import Any
 
 import httpx
 
+from fcp.utils.circuit_breaker import CircuitBreakerError, call_with_circuit_breaker, is_server_error
+
 USDA_API_BASE = "https://api.nal.usda.gov/fdc/v1"
 DEFAULT_TIMEOUT = 10.0
 logger = logging.getLogger(__name__)
@@ -40,13 +42,17 @@ async def search_foods(query: str, page_size: int = 5) -> list[dict[str, Any]]:
 
     try:
         async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(
-                f"{USDA_API_BASE}/foods/search",
-                params={
-                    "query": query,
-                    "pageSize": page_size,
-                    "api_key": api_key,
-                },
+            response = await call_with_circuit_breaker(
+                "usda",
+                lambda: client.get(
+                    f"{USDA_API_BASE}/foods/search",
+                    params={
+                        "query": query,
+                        "pageSize": page_size,
+                        "api_key": api_key,
+                    },
+                ),
+                failed=is_server_error,
             )
             if response.status_code == 200:
                 try:
@@ -55,6 +61,9 @@ async def search_foods(query: str, page_size: int = 5) -> list[dict[str, Any]]:
                     logger.warning("USDA search returned non-JSON response for query=%r", query)
                     return []
                 return data.get("foods", [])
+    except CircuitBreakerError:
+        # USDA has been failing: skip the lookup until the breaker half-opens
+        pass
     except httpx.TimeoutException:
         # Graceful degradation: return empty results on timeout
         pass
@@ -81,9 +90,10 @@ async def get_food_details(fdc_id: int) -> dict[str, Any]:
 
     try:
         async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(
-                f"{USDA_API_BASE}/food/{fdc_id}",
-                params={"api_key": api_key},
+            response = await call_with_circuit_breaker(
+                "usda",
+                lambda: client.get(f"{USDA_API_BASE}/food/{fdc_id}", params={"api_key": api_key}),
+                failed=is_server_error,
             )
             if response.status_code == 200:
                 try:
@@ -91,6 +101,8 @@ async def get_food_details(fdc_id: int) -> dict[str, Any]:
                 except ValueError:
                     logger.warning("USDA food details returned non-JSON response for fdc_id=%r", fdc_id)
                     return {}
+    except CircuitBreakerError:
+        pass
     except httpx.TimeoutException:
         # Graceful degradation: return empty dict on timeout
         pass
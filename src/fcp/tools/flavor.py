@@ -5,6 +5,7 @@ from typing import Any
 
 from fcp.mcp.registry import tool
 from fcp.services.gemini import gemini
+from fcp.services.gemini_response_cache import cache_gemini_responses
 from fcp.utils.errors import tool_error
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,7 @@ logger = logging.getLogger(__name__)
     description="Get perfect culinary pairings for an ingredient or dish",
     category="trends",
 )
+@cache_gemini_responses()
 async def get_flavor_pairings(subject: str, pairing_type: str = "ingredient") -> dict[str, Any]:
     """
     Get perfect culinary pairings for an ingredient or dish.
@@ -1,6 +1,5 @@
 """Inventory and pantry tools for FCP."""
 
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Any
@@ -8,6 +7,7 @@ from typing import Any
 from fcp.mcp.registry import tool
 from fcp.services.firestore import firestore_client
 from fcp.services.gemini import gemini
+from fcp.services.prompt_context import format_table
 from fcp.utils.errors import tool_error
 
 logger = logging.getLogger(__name__)
@@ -93,17 +93,6 @@ async def check_pantry_expiry(user_id: str) -> dict[str, Any]:
     if not pantry:
         return {"alerts": [], "message": "Pantry is empty."}
 
-    # Helper to handle non-serializable objects (like Firestore timestamps)
-    def serialize_pantry(p):
-        clean = []
-        for item in p:
-            item_copy = dict(item)
-            for k, v in item_copy.items():
-                if hasattr(v, "isoformat"):
-                    item_copy[k] = v.isoformat()
-            clean.append(item_copy)
-        return clean
-
     system_instruction = """
     Analyze the following pantry items and their purchase dates.
     Identify items that are likely to expire within 7 days or are already past their prime.
@@ -117,7 +106,8 @@ async def check_pantry_expiry(user_id: str) -> dict[str, Any]:
     }
     """
 
-    prompt = f"Pantry Data:\n{json.dumps(serialize_pantry(pantry), indent=2)}"
+    # Every item is sent; the oldest purchases are the ones most likely to expire
+    prompt = f"Pantry Data:\n{format_table(pantry)}"
 
     try:
         return await gemini.generate_json(f"{system_instruction}\n\n{prompt}")
@@ -14,6 +14,7 @@ from typing import Any
 from fcp.mcp.registry import tool
 from fcp.services.firestore import get_firestore_client
 from fcp.services.gemini import gemini
+from fcp.services.gemini_response_cache import cache_gemini_responses
 from fcp.tools.external import open_food_facts as off
 from fcp.tools.external import usda
 
@@ -141,6 +142,7 @@ async def _get_off_data(dish_name: str) -> dict[str, Any] | None:
     }
 
 
+@cache_gemini_responses()
 async def _get_related_foods(dish_name: str) -> list[str]:
     """Get related foods using AI."""
     try:
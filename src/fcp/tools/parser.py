@@ -305,7 +305,7 @@ async def add_items_from_receipt(
     """
     db = get_firestore_client()
     purchase_date = purchase_date or datetime.now()
-    added_items = []
+    pantry_items = []
 
     for item in receipt_items:
         # Normalize category to handle casing and synonyms
@@ -331,9 +331,10 @@ async def add_items_from_receipt(
             "source": "receipt",
             "price": item.get("price", 0),
         }
+        pantry_items.append(pantry_item)
 
-        item_id = await db.add_pantry_item(user_id, pantry_item)
-        added_items.append({**pantry_item, "id": item_id})
+    item_ids = await db.add_pantry_items_batch(user_id, pantry_items) if pantry_items else []
+    added_items = [{**pantry_item, "id": item_id} for pantry_item, item_id in zip(pantry_items, item_ids, strict=True)]
 
     return {
         "success": True,
@@ -1,12 +1,31 @@
 """Generate taste profiles from food history."""
 
-import json
+import contextvars
+from datetime import UTC, datetime
 from typing import Any
 
 from fcp.mcp.registry import tool
 from fcp.prompts import PROMPTS
 from fcp.services.firestore import firestore_client
-from fcp.services.gemini import gemini
+from fcp.services.gemini import gemini, gemini_circuit_open
+from fcp.services.gemini_context_cache import cached_prefix
+from fcp.services.gemini_governor import Priority, gemini_priority
+from fcp.services.prompt_context import format_logs
+from fcp.services.result_cache import result_cache, skip_result_cache
+from fcp.settings import settings
+from fcp.utils.background_tasks import create_tracked_task
+
+# The only log fields the profile prompt and fallback read.
+PROFILE_LOG_FIELDS = ("dish_name", "venue_name", "cuisine", "spice_level", "created_at", "dietary_tags")
+
+# Days of history each profile period covers; None means all history.
+PERIOD_DAYS: dict[str, int | None] = {
+    "week": 7,
+    "month": 30,
+    "quarter": 90,
+    "year": 365,
+    "all_time": None,
+}
 
 
 @tool(
@@ -37,54 +56,194 @@ async def get_taste_profile(
     Returns:
         dict with cuisine preferences, spice level, patterns, etc.
     """
-    # Map period to days
-    period_days = {
-        "week": 7,
-        "month": 30,
-        "quarter": 90,
-        "year": 365,
-        "all_time": None,
-    }
-    days = period_days.get(period)
+    return await result_cache.get_or_compute(
+        "profile.taste_profile",
+        user_id,
+        {"period": period},
+        lambda: _build_taste_profile(user_id, period),
+        data_version=lambda uid: firestore_client.get_data_version(uid),
+    )
 
-    # Fetch logs
-    logs = await firestore_client.get_user_logs(user_id, limit=500, days=days)
 
-    if not logs:
-        return {
-            "total_meals": 0,
-            "message": "No food logs found for this period",
-        }
+async def _build_taste_profile(user_id: str, period: str) -> dict[str, Any]:
+    profile, generated = await _generate_taste_profile(user_id, period)
+    if not generated:
+        # Fallback aggregation, recomputed on the next request rather than cached
+        skip_result_cache()
+    return profile
 
-    # Prepare logs for the prompt
-    logs_summary = json.dumps(
-        [
-            {
-                "dish_name": log.get("dish_name", ""),
-                "venue": log.get("venue_name", ""),
-                "cuisine": log.get("cuisine", ""),
-                "spice_level": log.get("spice_level"),
-                "date": log.get("created_at", ""),
-                "dietary_tags": log.get("dietary_tags", []),
-            }
-            for log in logs
-        ],
-        indent=2,
+
+async def _profile_logs(user_id: str, period: str) -> list[dict[str, Any]]:
+    return await firestore_client.get_user_logs(
+        user_id, limit=500, days=PERIOD_DAYS.get(period), fields=PROFILE_LOG_FIELDS
     )
 
-    prompt = PROMPTS["taste_profile"].format(logs=logs_summary)
+
+async def _generate_taste_profile(user_id: str, period: str) -> tuple[dict[str, Any], bool]:
+    """Build a profile with Gemini; the flag is False when the simple aggregation fallback was used."""
+    logs = await _profile_logs(user_id, period)
+
+    if not logs:
+        return _empty_profile(), True
+
+    if gemini_circuit_open():
+        return _simple_profile(logs, period), False
+
+    # The history opens the prompt so repeated calls can send it as a context cache
+    history = f"Food History:\n{format_logs(_prompt_rows(logs), budget=settings.prompt_log_token_budget)}\n\n"
+    prompt = history + PROMPTS["taste_profile"].format()
 
     try:
-        result = await gemini.generate_json(prompt)
+        with cached_prefix(history, user_id=user_id):
+            result = await gemini.generate_json(prompt)
         return {
             "period": period,
             "total_meals": len(logs),
             **result,
-        }
+        }, True
 
     except Exception:
-        # Fallback to simple aggregation
-        return _simple_profile(logs, period)
+        return _simple_profile(logs, period), False
+
+
+def _prompt_rows(logs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The fields of each log the profile prompt shows."""
+    return [
+        {
+            "dish_name": log.get("dish_name", ""),
+            "venue": log.get("venue_name", ""),
+            "cuisine": log.get("cuisine", ""),
+            "spice_level": log.get("spice_level"),
+            "date": log.get("created_at", ""),
+            "dietary_tags": log.get("dietary_tags", []),
+        }
+        for log in logs
+    ]
+
+
+def _empty_profile() -> dict[str, Any]:
+    return {
+        "total_meals": 0,
+        "message": "No food logs found for this period",
+    }
+
+
+# --- Materialized profiles ---
+#
+# Agent routes and meal suggestions need the profile as context on almost
+# every request, so they read a stored copy per (user, period) instead of
+# regenerating it. Each copy records the watermark it was built at: the
+# user's total log count and data version. Reads compare that with the
+# current values and, once enough new logs have arrived (or the copy is old
+# and the data changed), regenerate it in a background task while the stored
+# copy keeps being served.
+
+# (user_id, period) pairs with a refresh in flight in this process
+_refreshing: set[tuple[str, str]] = set()
+
+
+async def get_stored_taste_profile(
+    user_id: str,
+    period: str = "all_time",
+) -> dict[str, Any]:
+    """
+    Get the user's stored taste profile without waiting on profile generation.
+
+    Before the first profile is stored, the simple aggregation of the user's
+    logs is served while the full profile is generated in the background.
+
+    Args:
+        user_id: The user's ID
+        period: Time period - week, month, quarter, year, all_time
+
+    Returns:
+        The profile, with a ``staleness`` entry describing how far behind the
+        user's data it is and whether a refresh is running.
+    """
+    snapshot = await firestore_client.get_taste_profile_snapshot(user_id, period)
+    if snapshot is None:
+        logs = await _profile_logs(user_id, period)
+        if not logs:
+            return {**_empty_profile(), "staleness": _staleness(None, 0, False, False)}
+        refresh_taste_profile_in_background(user_id, period)
+        return {**_simple_profile(logs, period), "staleness": _staleness(None, len(logs), True, True)}
+
+    data_changed = await firestore_client.get_data_version(user_id) != snapshot["data_version"]
+    new_logs = 0
+    if data_changed:
+        new_logs = max(await firestore_client.count_user_logs(user_id) - snapshot["log_count"], 0)
+    age = (datetime.now(UTC) - datetime.fromisoformat(snapshot["built_at"])).total_seconds()
+    # Windowed periods move with the calendar, so they age out even without writes.
+    expired = age >= settings.taste_profile_max_age_seconds and (data_changed or PERIOD_DAYS.get(period) is not None)
+    enough_new_logs = new_logs >= settings.taste_profile_refresh_after_logs or (
+        new_logs > 0 and not snapshot["profile"].get("total_meals")
+    )
+    refreshing = (user_id, period) in _refreshing
+    if not refreshing and (enough_new_logs or expired):
+        refresh_taste_profile_in_background(user_id, period)
+        refreshing = True
+    return {
+        **snapshot["profile"],
+        "staleness": _staleness(snapshot["built_at"], new_logs, data_changed, refreshing, age),
+    }
+
+
+def _staleness(
+    built_at: str | None,
+    new_logs: int,
+    data_changed: bool,
+    refreshing: bool,
+    age: float | None = None,
+) -> dict[str, Any]:
+    return {
+        "built_at": built_at,
+        "age_seconds": round(age) if age is not None else None,
+        "new_logs_since_build": new_logs,
+        "data_changed": data_changed,
+        "refreshing": refreshing,
+    }
+
+
+async def refresh_taste_profile(user_id: str, period: str = "all_time") -> dict[str, Any]:
+    """
+    Regenerate and store the user's taste profile for ``period``.
+
+    A profile that fell back to simple aggregation is returned but not stored,
+    so the previous stored profile keeps being served.
+    """
+    # Take the watermark before reading the logs: writes that land while the
+    # profile is generated then leave it marked stale instead of being missed.
+    data_version = await firestore_client.get_data_version(user_id)
+    log_count = await firestore_client.count_user_logs(user_id)
+    profile, generated = await _generate_taste_profile(user_id, period)
+    if generated:
+        await firestore_client.save_taste_profile_snapshot(
+            user_id,
+            period,
+            {
+                "profile": profile,
+                "log_count": log_count,
+                "data_version": data_version,
+                "built_at": datetime.now(UTC).isoformat(),
+            },
+        )
+    return profile
+
+
+def refresh_taste_profile_in_background(user_id: str, period: str = "all_time") -> None:
+    """Start ``refresh_taste_profile`` as a tracked task unless one is already running for this profile."""
+    key = (user_id, period)
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+    refresh = gemini_priority(Priority.BACKGROUND)(refresh_taste_profile)
+    # A fresh context, so the refresh outlives the request's deadline and other per-request state
+    task = create_tracked_task(
+        refresh(user_id, period),
+        name=f"refresh_taste_profile:{user_id}:{period}",
+        context=contextvars.Context(),
+    )
+    task.add_done_callback(lambda _: _refreshing.discard(key))
 
 
 def _simple_profile(logs: list[dict], period: str) -> dict[str, Any]:
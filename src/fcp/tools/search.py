@@ -5,7 +5,6 @@ Security:
 - Query length limits
 """
 
-import json
 from typing import Any
 
 from fcp.mcp.registry import tool
@@ -13,7 +12,27 @@ from fcp.prompts import PROMPTS
 from fcp.security import sanitize_search_query
 from fcp.security.input_sanitizer import escape_for_prompt
 from fcp.services.firestore import firestore_client
-from fcp.services.gemini import gemini
+from fcp.services.gemini import gemini, gemini_circuit_open
+from fcp.services.prompt_context import format_logs
+
+# Logs sent to Gemini for reranking. Full-text hits come first; recent logs
+# fill any remaining slots so descriptive queries ("that trip to Tokyo")
+# that share no words with a log still have something to match against.
+RERANK_CANDIDATES = 30
+
+# Fields loaded for each candidate: what the rerank prompt and keyword
+# fallback read, plus what a result card shows.
+CANDIDATE_FIELDS = (
+    "dish_name",
+    "venue_name",
+    "cuisine",
+    "notes",
+    "ingredients",
+    "spice_level",
+    "rating",
+    "image_path",
+    "created_at",
+)
 
 
 @tool(
@@ -39,6 +58,9 @@ async def search_meals(
     """
     Semantic search using Gemini to find matching food logs.
 
+    Candidates come from the full-text index across the user's whole
+    history; only the top ``RERANK_CANDIDATES`` are sent to Gemini to rerank.
+
     Args:
         user_id: The user's ID
         query: Natural language search query (e.g., "that spicy ramen")
@@ -53,32 +75,17 @@ async def search_meals(
     if not safe_query:
         return []
 
-    # Fetch user's logs
-    logs = await firestore_client.get_user_logs(user_id, limit=100)
+    logs = await _retrieve_candidates(user_id, safe_query)
 
     if not logs:
         return []
 
-    # Prepare logs for the prompt (simplified for context length)
-    logs_summary = json.dumps(
-        [
-            {
-                "id": log["id"],
-                "dish_name": log.get("dish_name", ""),
-                "venue": log.get("venue_name", ""),
-                "cuisine": log.get("cuisine", ""),
-                "notes": log.get("notes", ""),
-                "date": log.get("created_at", ""),
-                "ingredients": log.get("ingredients", [])[:5],
-            }
-            for log in logs
-        ],
-        indent=2,
-    )
-
-    # Build prompt with escaped query
+    if gemini_circuit_open():
+        return _keyword_search(logs, safe_query, limit)
+
+    # Build prompt with escaped query; candidates are already capped, so no token budget
     escaped_query = escape_for_prompt(safe_query)
-    prompt = PROMPTS["search_meals"].format(logs=logs_summary, query=escaped_query)
+    prompt = PROMPTS["search_meals"].format(logs=format_logs(_prompt_rows(logs)), query=escaped_query)
 
     try:
         result = await gemini.generate_json(prompt)
@@ -107,6 +114,33 @@ async def search_meals(
         return _keyword_search(logs, safe_query, limit)
 
 
+def _prompt_rows(logs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The fields of each candidate the rerank prompt shows."""
+    return [
+        {
+            "id": log["id"],
+            "dish_name": log.get("dish_name", ""),
+            "venue": log.get("venue_name", ""),
+            "cuisine": log.get("cuisine", ""),
+            "notes": log.get("notes", ""),
+            "date": log.get("created_at", ""),
+            "ingredients": log.get("ingredients", [])[:5],
+        }
+        for log in logs
+    ]
+
+
+async def _retrieve_candidates(user_id: str, query: str) -> list[dict[str, Any]]:
+    """Return up to RERANK_CANDIDATES logs: BM25 hits, then the most recent logs."""
+    hits = await firestore_client.search_logs(user_id, query, limit=RERANK_CANDIDATES, fields=CANDIDATE_FIELDS)
+    if len(hits) >= RERANK_CANDIDATES:
+        return hits
+    seen = {hit["id"] for hit in hits}
+    recent = await firestore_client.get_user_logs(user_id, limit=RERANK_CANDIDATES, fields=CANDIDATE_FIELDS)
+    padding = [log for log in recent if log["id"] not in seen]
+    return hits + padding[: RERANK_CANDIDATES - len(hits)]
+
+
 def _keyword_search(
     logs: list[dict],
     query: str,
@@ -5,6 +5,8 @@ from typing import Any
 from fcp.mcp.registry import tool
 from fcp.security.input_sanitizer import sanitize_user_input
 from fcp.services.gemini import gemini
+from fcp.services.prompt_context import format_logs
+from fcp.settings import settings
 
 
 @tool(
@@ -76,7 +78,7 @@ async def generate_weekly_digest(food_logs: list[dict[str, Any]], user_name: str
     """
 
     safe_name = sanitize_user_input(user_name, max_length=100, field_name="user_name") if user_name else "Foodie"
-    prompt = f"User: {safe_name}\nMeals:\n{food_logs}"
+    prompt = f"User: {safe_name}\nMeals:\n{format_logs(food_logs, budget=settings.prompt_log_token_budget)}"
 
     try:
         return await gemini.generate_json(f"{system_instruction}\n\n{prompt}")
@@ -88,6 +90,7 @@ async def generate_food_story(food_logs: list[dict[str, Any]], theme: str | None
     """Generate a visual food story from multiple logs."""
     system_instruction = f"Create a narrative story theme: {theme or 'culinary journey'} for these logs."
     try:
-        return await gemini.generate_json(f"{system_instruction}\n\nLogs: {food_logs}")
+        logs = format_logs(food_logs, budget=settings.prompt_log_token_budget)
+        return await gemini.generate_json(f"{system_instruction}\n\nLogs:\n{logs}")
     except Exception:
         return {"story": "A collection of great meals."}
@@ -5,6 +5,7 @@ from typing import Any
 
 from fcp.mcp.registry import tool
 from fcp.services.gemini import gemini
+from fcp.services.gemini_response_cache import cache_gemini_responses
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,7 @@ logger = logging.getLogger(__name__)
     description="Convert unstructured recipe text into standard Schema.org/Recipe JSON-LD",
     category="recipes",
 )
+@cache_gemini_responses()
 async def standardize_recipe(raw_text: str) -> dict[str, Any]:
     """
     Convert unstructured recipe text into standard Schema.org/Recipe JSON-LD.
@@ -1,17 +1,24 @@
 """AI-powered meal suggestions."""
 
+import asyncio
 import json
 import logging
 from typing import Any
 
 from fcp.mcp.registry import tool
 from fcp.prompts import PROMPTS
-from fcp.services.firestore import firestore_client
-from fcp.services.gemini import gemini
-from fcp.tools.profile import get_taste_profile
+from fcp.services.gemini import gemini, gemini_circuit_open
+from fcp.services.prompt_context import format_logs
+from fcp.tools.data_loader import user_data
 
 logger = logging.getLogger(__name__)
 
+# Suggestions only look at what was eaten and where.
+SUGGESTION_LOG_FIELDS = ("dish_name", "venue_name")
+
+# History read for the fallback favorites; the recent logs are cut from it.
+HISTORY_LIMIT = 200
+
 
 @tool(
     name="dev.fcp.planning.get_meal_suggestions",
@@ -44,22 +51,29 @@ async def suggest_meal(
     Returns:
         List of 3 suggestions with reasons
     """
-    # Get taste profile
-    profile = await get_taste_profile(user_id, period="month")
-
-    # Get recent meals to exclude
-    recent_logs = await firestore_client.get_user_logs(user_id, limit=20, days=exclude_recent_days)
+    # The profile and the history are independent; the recent logs to exclude
+    # are the newest of the history, so they cost no second query.
+    data = user_data(user_id)
+    if gemini_circuit_open():
+        # The profile is only needed for the prompt
+        all_logs = await data.logs(limit=HISTORY_LIMIT, fields=SUGGESTION_LOG_FIELDS)
+        recent_logs = await data.logs(limit=20, days=exclude_recent_days, fields=SUGGESTION_LOG_FIELDS)
+        return _simple_suggestions(all_logs, [log.get("dish_name", "").lower() for log in recent_logs])
+
+    profile, all_logs = await asyncio.gather(
+        data.taste_profile(period="month"),
+        data.logs(limit=HISTORY_LIMIT, fields=SUGGESTION_LOG_FIELDS),
+    )
+    # The profile's staleness is not useful to the model
+    profile.pop("staleness", None)
+    recent_logs = await data.logs(limit=20, days=exclude_recent_days, fields=SUGGESTION_LOG_FIELDS)
     recent_dishes = [log.get("dish_name", "").lower() for log in recent_logs]
 
-    # Get historical favorites
-    all_logs = await firestore_client.get_user_logs(user_id, limit=200)
-
     # Build prompt
     prompt = PROMPTS["suggest_meal"].format(
         profile=json.dumps(profile, indent=2),
-        recent=json.dumps(
-            [{"dish_name": log.get("dish_name"), "venue": log.get("venue_name")} for log in recent_logs[:5]],
-            indent=2,
+        recent=format_logs(
+            [{"dish_name": log.get("dish_name"), "venue": log.get("venue_name")} for log in recent_logs[:5]]
         ),
         context=context or "any meal",
     )
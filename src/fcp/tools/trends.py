@@ -7,11 +7,15 @@ from typing import Any
 from fcp.mcp.registry import tool
 from fcp.services.firestore import firestore_client
 from fcp.services.gemini import gemini
+from fcp.services.result_cache import result_cache
 from fcp.utils.errors import tool_error
 from fcp.utils.json_extractor import extract_json
 
 logger = logging.getLogger(__name__)
 
+# Trends are grounded in live web search, so cached results go stale even when the user's data does not.
+TRENDS_CACHE_TTL_SECONDS = 6 * 3600
+
 
 @tool(
     name="dev.fcp.trends.identify_emerging_trends",
@@ -24,7 +28,17 @@ async def identify_emerging_trends(
     """
     Identify emerging food trends by grounding global data with user history.
     """
+    return await result_cache.get_or_compute(
+        "trends.emerging",
+        user_id,
+        {"region": region, "cuisine_focus": cuisine_focus},
+        lambda: _identify_emerging_trends(user_id, region, cuisine_focus),
+        data_version=lambda uid: firestore_client.get_data_version(uid),
+        ttl_seconds=TRENDS_CACHE_TTL_SECONDS,
+    )
+
 
+async def _identify_emerging_trends(user_id: str, region: str, cuisine_focus: str | None) -> dict[str, Any]:
     # 1. Fetch user context
     stats = await firestore_client.get_user_stats(user_id)
     preferences = await firestore_client.get_user_preferences(user_id)
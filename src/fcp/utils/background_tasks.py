@@ -5,6 +5,7 @@ Tasks are registered to prevent garbage collection and logged when they complete
 """
 
 import asyncio
+import contextvars
 import logging
 from collections.abc import Coroutine
 from typing import Any
@@ -15,7 +16,11 @@ logger = logging.getLogger(__name__)
 _background_tasks: set[asyncio.Task] = set()
 
 
-def create_tracked_task(coro: Coroutine[Any, Any, Any], name: str | None = None) -> asyncio.Task:
+def create_tracked_task(
+    coro: Coroutine[Any, Any, Any],
+    name: str | None = None,
+    context: contextvars.Context | None = None,
+) -> asyncio.Task:
     """
     Create and track a background task.
 
@@ -24,11 +29,12 @@ def create_tracked_task(coro: Coroutine[Any, Any, Any], name: str | None = None)
     Args:
         coro: The coroutine to run as a background task
         name: Optional name for the task (for logging/debugging)
+        context: Context to run the task in (defaults to a copy of the caller's)
 
     Returns:
         The created asyncio.Task
     """
-    task = asyncio.create_task(coro, name=name)
+    task = asyncio.create_task(coro, name=name, context=context)
     _background_tasks.add(task)
 
     def on_task_done(t: asyncio.Task) -> None:
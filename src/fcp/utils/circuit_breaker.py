@@ -9,19 +9,29 @@ Usage:
     @gemini_circuit_breaker
     async def call_gemini(prompt: str):
         ...
+
+Client code that talks to a dependency directly wraps each request instead:
+
+    response = await call_with_circuit_breaker("usda", lambda: client.get(url), failed=is_server_error)
 """
 
 import asyncio
 import logging
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import wraps
-from typing import Any
+from typing import Any, TypeVar
+
+import httpx
+
+from fcp.config import Config
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class CircuitState(Enum):
     """Circuit breaker states."""
@@ -102,6 +112,15 @@ class CircuitBreakerState:
                     str(error)[:100],
                 )
 
+    async def release(self) -> None:
+        """Give back the half-open slot of a call that was cancelled before it finished."""
+        async with self._lock:
+            if self.state == CircuitState.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+            else:
+                # No-op when no half-open slot is held.
+                pass
+
     async def can_execute(self) -> bool:
         """Check if a call can be executed."""
         async with self._lock:
@@ -111,6 +130,8 @@ class CircuitBreakerState:
             if self.state == CircuitState.OPEN:
                 if self._should_attempt_reset():
                     self._half_open()
+                    # This call is the first trial
+                    self.half_open_calls = 1
                     logger.info(
                         "Circuit breaker '%s' entering half-open state",
                         self.name,
@@ -172,8 +193,9 @@ _circuit_breakers: dict[str, CircuitBreakerState] = {}
 
 def get_circuit_breaker(
     name: str,
-    failure_threshold: int = 5,
-    recovery_timeout: float = 30.0,
+    failure_threshold: int = Config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout: float = Config.CIRCUIT_BREAKER_RECOVERY_TIMEOUT_SECONDS,
+    half_open_max_calls: int = Config.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
 ) -> CircuitBreakerState:
     """Get or create a circuit breaker by name."""
     if name not in _circuit_breakers:
@@ -181,10 +203,76 @@ def get_circuit_breaker(
             name=name,
             failure_threshold=failure_threshold,
             recovery_timeout=recovery_timeout,
+            half_open_max_calls=half_open_max_calls,
         )
     return _circuit_breakers[name]
 
 
+def is_circuit_open(name: str) -> bool:
+    """Whether calls through breaker ``name`` would currently be rejected without being tried."""
+    cb = _circuit_breakers.get(name)
+    return cb is not None and cb.state == CircuitState.OPEN and not cb._should_attempt_reset()
+
+
+def is_dependency_failure(error: BaseException) -> bool:
+    """Whether ``error`` says the dependency itself is down, rather than that the request was bad.
+
+    Connection errors, timeouts and 5xx responses count; 4xx errors
+    (including 429, which callers back off from on their own) do not.
+    """
+    if isinstance(error, httpx.TransportError | TimeoutError):
+        return True
+    status = getattr(error, "code", None)
+    if not isinstance(status, int):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def is_server_error(response: Any) -> bool:
+    """Whether an HTTP response is a 5xx."""
+    status = getattr(response, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+async def call_with_circuit_breaker(
+    name: str,
+    call: Callable[[], Awaitable[T]],
+    *,
+    failed: Callable[[T], bool] | None = None,
+) -> T:
+    """Run ``call`` through breaker ``name``, raising CircuitBreakerError without calling while it is open.
+
+    Exceptions for which ``is_dependency_failure`` holds, and results for which
+    ``failed`` does, count as failures; anything else shows the dependency is
+    up and counts as a success.
+
+    A cancelled call (a lost hedge, an abandoned flight, a deadline) says
+    nothing about the dependency; it only gives back its half-open slot.
+
+    The breaker is looked up on every call, so ``reset_all_circuit_breakers``
+    takes effect for code that uses this.
+    """
+    cb = get_circuit_breaker(name)
+    if not await cb.can_execute():
+        raise CircuitBreakerError(name, cb.get_time_remaining())
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        await cb.release()
+        raise
+    except Exception as e:
+        if is_dependency_failure(e):
+            await cb.record_failure(e)
+        else:
+            await cb.record_success()
+        raise
+    if failed is not None and failed(result):
+        await cb.record_failure(RuntimeError(f"{name} returned a failed result"))
+    else:
+        await cb.record_success()
+    return result
+
+
 def circuit_breaker(
     name: str,
     failure_threshold: int = 5,
@@ -216,6 +304,9 @@ def circuit_breaker(
                 result = await func(*args, **kwargs)
                 await cb.record_success()
                 return result
+            except asyncio.CancelledError:
+                await cb.release()
+                raise
             except exceptions as e:
                 await cb.record_failure(e)
                 raise
@@ -234,8 +325,6 @@ def gemini_circuit_breaker(func: Callable[..., Any]) -> Callable[..., Any]:
     - Waits 30 seconds before attempting recovery
     - Catches common Gemini/HTTP errors
     """
-    import httpx
-
     return circuit_breaker(
         name="gemini",
         failure_threshold=5,
@@ -0,0 +1,93 @@
+"""Request-scoped deadlines.
+
+An interactive request has a budget for its whole run, not per call:
+without one, ``gemini_retry`` can stack three attempts of up to
+``GEMINI_TIMEOUT_SECONDS`` each plus backoff, long after the client gave
+up. The API sets a deadline for each request (from ``X-Request-Timeout`` or
+the route's default) with ``deadline_scope``; the Gemini client, its retry
+policy and media downloads read it from the context and stop waiting, or
+stop retrying, once it has passed. Code running outside a scope has no
+deadline and behaves as before.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+# time.monotonic() by which the current request must finish
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceededError(Exception):
+    """The request's deadline passed before the work finished.
+
+    Deliberately not a ``TimeoutError``: running out of the caller's budget
+    says nothing about the health of the dependency being called, so it is
+    neither retried nor counted against a circuit breaker.
+    """
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """Finish the work in this block within ``seconds``; an enclosing, sooner deadline still applies.
+
+    ``None`` or a non-positive value leaves the current deadline as it is.
+    """
+    if seconds is None or seconds <= 0:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline (negative once passed); None when there is none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    """Whether the current deadline has passed."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout_within_deadline(timeout: float) -> float:
+    """``timeout``, shortened to the time left before the deadline.
+
+    Raises:
+        DeadlineExceededError: The deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceededError("Request deadline passed")
+    return min(timeout, left)
+
+
+@asynccontextmanager
+async def within_deadline() -> AsyncIterator[None]:
+    """Cancel the block when the deadline passes and raise ``DeadlineExceededError`` instead."""
+    left = remaining()
+    if left is None:
+        yield
+        return
+    if left <= 0:
+        raise DeadlineExceededError("Request deadline passed")
+    try:
+        async with asyncio.timeout(left) as scope:
+            yield
+    except TimeoutError as e:
+        if scope.expired():
+            raise DeadlineExceededError(f"Request deadline passed after {left:.1f}s") from e
+        raise
@@ -24,6 +24,9 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from fcp.utils.deadline import DeadlineExceededError
+from fcp.utils.metrics import record_deadline_exceeded
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,6 +44,7 @@ class APIErrorCodes:
     # Server errors (5xx)
     INTERNAL_ERROR = "INTERNAL_ERROR"
     SERVICE_UNAVAILABLE = "SERVICE_UNAVAILABLE"
+    GATEWAY_TIMEOUT = "GATEWAY_TIMEOUT"
 
     # Domain-specific errors
     GEMINI_ERROR = "GEMINI_ERROR"
@@ -57,6 +61,7 @@ class APIErrorCodes:
         429: "RATE_LIMITED",
         500: "INTERNAL_ERROR",
         503: "SERVICE_UNAVAILABLE",
+        504: "GATEWAY_TIMEOUT",
     }
 
     @classmethod
@@ -162,6 +167,26 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError) -> JSONResponse:
+    """Answer 504 when the request's deadline passed before its work finished."""
+    request_id = _get_request_id(request)
+    logger.warning("Deadline exceeded [request_id=%s]: %s", request_id, exc)
+    record_deadline_exceeded(request.url.path)
+
+    error_response = APIErrorResponse(
+        error=APIErrorDetail(
+            code=APIErrorCodes.GATEWAY_TIMEOUT,
+            message="The request did not finish within its deadline",
+            request_id=request_id,
+        )
+    )
+
+    return JSONResponse(
+        status_code=504,
+        content=error_response.model_dump(),
+    )
+
+
 async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle unexpected exceptions with standardized format.
 
@@ -211,8 +236,10 @@ def register_exception_handlers(app: FastAPI) -> None:
     Registers handlers for:
     - HTTPException: Standardized HTTP error responses
     - RequestValidationError: Pydantic validation errors with field paths
+    - DeadlineExceededError: 504 when the request ran out of time
     - Exception: Catch-all for uncaught exceptions (prevents stack trace leaks)
     """
     app.add_exception_handler(HTTPException, http_exception_handler)  # type: ignore[arg-type]
     app.add_exception_handler(RequestValidationError, validation_exception_handler)  # type: ignore[arg-type]
+    app.add_exception_handler(DeadlineExceededError, deadline_exceeded_handler)  # type: ignore[arg-type]
     app.add_exception_handler(Exception, generic_exception_handler)  # type: ignore[arg-type]
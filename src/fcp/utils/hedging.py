@@ -0,0 +1,76 @@
+"""Hedged calls: a second attempt for a call that is running unusually long.
+
+Most of a slow call's tail comes from the one attempt that landed on a
+slow backend, not from the request itself. Sending a copy once the first
+attempt has run longer than nearly all recent calls of its kind (its p95),
+and taking whichever answers first, cuts that tail while adding only about
+one extra attempt per twenty calls.
+"""
+
+import asyncio
+import math
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Latencies of the last ``window`` calls of one kind."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """The ``q`` quantile of recent latencies; None until ``min_samples`` have been seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(math.ceil(q * len(ordered)), len(ordered)) - 1]
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    delay: float | None,
+    on_hedge: Callable[[str], None] | None = None,
+) -> T:
+    """Run ``call``; if it has not finished after ``delay`` seconds, run it again and return the first success.
+
+    The attempt that loses is cancelled. If both fail, the first error is
+    raised. ``on_hedge`` is told which attempt won (``"primary"``,
+    ``"hedge"`` or ``"none"``) whenever a second attempt was sent.
+    """
+    primary = asyncio.ensure_future(call())
+    if delay is None:
+        return await primary
+
+    attempts = [primary]
+    try:
+        done, pending = await asyncio.wait(attempts, timeout=delay)
+        if not done:
+            attempts.append(asyncio.ensure_future(call()))
+            pending = set(attempts)
+        errors: list[BaseException] = []
+        while True:
+            for attempt in done:
+                error = attempt.exception()
+                if error is None:
+                    if len(attempts) > 1 and on_hedge is not None:
+                        on_hedge("primary" if attempt is primary else "hedge")
+                    return attempt.result()
+                errors.append(error)
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if len(attempts) > 1 and on_hedge is not None:
+            on_hedge("none")
+        raise errors[0]
+    finally:
+        for attempt in attempts:
+            if not attempt.done():
+                attempt.cancel()
@@ -2,14 +2,156 @@
 
 LLMs often wrap JSON in markdown code fences or include extra text.
 This module provides utilities to reliably extract JSON from such responses.
+
+Candidates are found in one linear sweep over the text: markdown code
+fences, and every balanced ``{...}`` or ``[...]`` not nested in another
+one. Strings are skipped whole, so brackets and fences inside them do
+not count. Each character is looked at a bounded number of times, which
+keeps large malformed responses from taking super-linear time.
 """
 
 import json
+import logging
 import re
+from dataclasses import dataclass, field
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
+# Outside any bracket: the next opening bracket or fence; prose is skipped unread
+_OUTSIDE = re.compile(r"[\[{]|```")
+# Inside brackets: a whole string (group 1 is empty if the text ends in it), a bracket, a comma or a fence
+_INSIDE = re.compile(r'"(?:[^"\\]++|\\.)*+("?)|[\[\]{},]|```', re.DOTALL)
+_FENCE_TAG = re.compile(r"[A-Za-z]*")
+# An escape cut off by the end of the text
+_PARTIAL_ESCAPE = re.compile(r"\\(?:u[0-9a-fA-F]{0,3})?$")
+_CLOSERS = {"{": "}", "[": "]"}
+# How a JSON object or array can begin; brackets in prose mostly don't
+_JSON_START = re.compile(r'\{\s*["}]|\[\s*[]\[{"0-9tfn-]')
+
+
+@dataclass(slots=True)
+class _Scan:
+    """What one sweep over a response found."""
+
+    # Code fence contents as (start, end, tagged json), in document order
+    fences: list[tuple[int, int, bool]] = field(default_factory=list)
+    # Balanced brackets not nested in one another, as (start, end), in document order
+    spans: list[tuple[int, int]] = field(default_factory=list)
+    # Brackets still open when the text ended: where each opened, and its closer
+    open_starts: list[int] = field(default_factory=list)
+    open_closers: list[str] = field(default_factory=list)
+    in_string: bool = False
+    # Last point the open document can be cut at: text end, and how many brackets are open there
+    safe_end: int = 0
+    safe_depth: int = 0
+
+
+def _scan(text: str) -> _Scan:
+    scan = _Scan()
+    starts = scan.open_starts
+    closers = scan.open_closers
+    spans = scan.spans
+    fence_start: int | None = None
+    fence_json = False
+    pos, end = 0, len(text)
+
+    while pos < end:
+        if not starts:
+            match = _OUTSIDE.search(text, pos)
+            if match is None:
+                break
+            token = match.group()
+            pos = match.end()
+            if token != "```":
+                starts.append(match.start())
+                closers.append(_CLOSERS[token])
+                scan.safe_end, scan.safe_depth = pos, 1
+                continue
+        else:
+            for match in _INSIDE.finditer(text, pos):
+                token = match.group()
+                char = token[0]
+                if char == '"':
+                    if not match.group(1):
+                        scan.in_string = True
+                elif char in "{[":
+                    starts.append(match.start())
+                    closers.append(_CLOSERS[char])
+                    scan.safe_end, scan.safe_depth = match.end(), len(starts)
+                elif char == ",":
+                    scan.safe_end, scan.safe_depth = match.start(), len(starts)
+                elif token == "```":
+                    break
+                elif char == closers[-1]:
+                    # Everything kept since this bracket opened is inside it
+                    start = starts.pop()
+                    closers.pop()
+                    while spans and spans[-1][0] > start:
+                        spans.pop()
+                    spans.append((start, match.end()))
+                    scan.safe_end, scan.safe_depth = match.end(), len(starts)
+                    if not starts:
+                        break
+                # A closer that does not match the open bracket is ignored
+            else:
+                break
+            pos = match.end()
+            if token != "```":
+                continue
+            # A fence ends whatever was open before it; brackets closed inside it remain candidates
+            starts.clear()
+            closers.clear()
+
+        if fence_start is None:
+            tag = _FENCE_TAG.match(text, pos)
+            fence_start, fence_json = tag.end(), tag.group().lower() == "json"  # type: ignore[union-attr]
+        else:
+            scan.fences.append((fence_start, pos - 3, fence_json))
+            fence_start = None
+
+    return scan
+
+
+def _candidates(text: str, scan: _Scan) -> list[tuple[int, str]]:
+    """Candidate JSON texts and where they start: ```json fences, other fences, then bare brackets."""
+    fences = sorted(scan.fences, key=lambda fence: not fence[2])
+    return [(start, text[start:end].strip()) for start, end, _ in fences] + [
+        (start, text[start:end]) for start, end in scan.spans if _JSON_START.match(text, start)
+    ]
+
+
+def _loads(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except (json.JSONDecodeError, RecursionError):
+        return None
+
+
+def _repair(text: str, scan: _Scan) -> Any:
+    """Close the brackets a truncated document left open.
 
-def extract_json(text: str | None) -> dict[str, Any] | list[Any] | None:
+    First the document is kept as it is, with an unfinished string closed
+    and a trailing comma dropped. If that still does not parse, it is cut
+    back to just after its last complete value. An empty result is no
+    repair.
+    """
+    start = scan.open_starts[0]
+    body = text[start:]
+    if scan.in_string:
+        body = _PARTIAL_ESCAPE.sub("", body) + '"'
+    body = body.rstrip().rstrip(",")
+    repaired = _loads(body + "".join(reversed(scan.open_closers)))
+    if repaired is None:
+        cut = text[start : scan.safe_end].rstrip()
+        repaired = _loads(cut + "".join(reversed(scan.open_closers[: scan.safe_depth])))
+    if not repaired:
+        return None
+    logger.warning("Repaired truncated JSON (length=%d)", len(text))
+    return repaired
+
+
+def extract_json(text: str | None, *, repair: bool = False) -> dict[str, Any] | list[Any] | None:
     """
     Extract JSON from LLM response text.
 
@@ -22,6 +164,9 @@ def extract_json(text: str | None) -> dict[str, Any] | list[Any] | None:
 
     Args:
         text: The raw text response from the LLM (None returns None)
+        repair: If no complete JSON is found, close the strings, arrays
+            and objects left open by a response cut off mid-document
+            (as when it hits the output token limit)
 
     Returns:
         Parsed JSON as dict or list, or None if extraction fails
@@ -32,110 +177,23 @@ def extract_json(text: str | None) -> dict[str, Any] | list[Any] | None:
     text = text.strip()
 
     # Strategy 1: Try parsing the whole text as JSON
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
-    if json_block_match := re.search(r"```json\s*([\s\S]*?)```", text, re.IGNORECASE):
-        try:
-            return json.loads(json_block_match[1].strip())
-        except json.JSONDecodeError:
-            pass
-
-    if code_block_match := re.search(r"```\s*([\s\S]*?)```", text):
-        try:
-            return json.loads(code_block_match[1].strip())
-        except json.JSONDecodeError:
-            pass
-
-    obj_index = text.find("{")
-    arr_index = text.find("[")
-    if arr_index != -1 and (obj_index == -1 or arr_index < obj_index):
-        if json_arr := _extract_balanced_json(text, "[", "]"):
-            try:
-                return json.loads(json_arr)
-            except json.JSONDecodeError:
-                pass
-
-    if json_obj := _extract_balanced_json(text, "{", "}"):
-        try:
-            return json.loads(json_obj)
-        except json.JSONDecodeError:
-            pass
-
-    if arr_index != -1 and (obj_index != -1 and arr_index > obj_index):
-        if json_arr := _extract_balanced_json(text, "[", "]"):
-            try:
-                return json.loads(json_arr)
-            except json.JSONDecodeError:
-                pass
-
-    # Strategy 6: Last resort - find anything that looks like JSON
-    # This handles cases where JSON is embedded in explanatory text
-    patterns = [
-        r'(\{[\s\S]*"[^"]+"\s*:[\s\S]*\})',  # Object with at least one key
-        r"(\[[\s\S]*\{[\s\S]*\}[\s\S]*\])",  # Array of objects
-    ]
-
-    for pattern in patterns:
-        if match := re.search(pattern, text):
-            try:
-                return json.loads(match[1])
-            except json.JSONDecodeError:
-                continue
-
-    return None
-
-
-def _extract_balanced_json(text: str, open_char: str, close_char: str) -> str | None:
-    """
-    Extract a balanced JSON structure from text.
-
-    Handles nested braces/brackets correctly.
-
-    Args:
-        text: The text to search
-        open_char: Opening character ('{' or '[')
-        close_char: Closing character ('}' or ']')
-
-    Returns:
-        The extracted JSON string or None
-    """
-    start = text.find(open_char)
-    if start == -1:
-        return None
-
-    depth = 0
-    in_string = False
-    escape_next = False
-
-    for i in range(start, len(text)):
-        char = text[i]
-
-        if escape_next:
-            escape_next = False
-            continue
-
-        if char == "\\":
-            escape_next = True
-            continue
-
-        if char == '"' and not escape_next:
-            in_string = not in_string
-            continue
+    result = _loads(text)
+    if isinstance(result, dict | list):
+        return result
 
-        if in_string:
-            continue
+    scan = _scan(text)
+    truncated_at = scan.open_starts[0] if repair and scan.open_starts else None
+    for start, candidate in _candidates(text, scan):
+        if truncated_at is not None and start > truncated_at:
+            # Values complete inside a truncated document are only parts of it
+            if (repaired := _repair(text, scan)) is not None:
+                return repaired
+            truncated_at = None
+        result = _loads(candidate)
+        if isinstance(result, dict | list):
+            return result
 
-        if char == open_char:
-            depth += 1
-        elif char == close_char:
-            depth -= 1
-            if depth == 0:
-                return text[start : i + 1]
-
-    return None
+    return _repair(text, scan) if truncated_at is not None else None
 
 
 def extract_json_with_key(text: str | None, required_key: str) -> dict[str, Any] | None:
@@ -160,17 +218,11 @@ def extract_json_with_key(text: str | None, required_key: str) -> dict[str, Any]
     if isinstance(result, dict) and required_key in result:
         return result
 
-    # If extraction failed or key missing, try finding JSON with that key
-    # Note: This fallback is rarely triggered because extract_json is thorough,
-    # and the greedy regex usually matches more than the valid JSON object.
-    pattern = rf'(\{{[\s\S]*"{re.escape(required_key)}"[\s\S]*\}})'
-    match = re.search(pattern, text)
-    if match:
-        try:
-            parsed = json.loads(match.group(1))
-            if isinstance(parsed, dict) and required_key in parsed:
-                return parsed
-        except json.JSONDecodeError:
-            pass
+    # The first JSON found may be a different object; look through the rest
+    text = text.strip()
+    for _, candidate in _candidates(text, _scan(text)):
+        parsed = _loads(candidate)
+        if isinstance(parsed, dict) and required_key in parsed:
+            return parsed
 
     return None
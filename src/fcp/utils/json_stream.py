@@ -0,0 +1,350 @@
+"""Incremental JSON parsing of streamed LLM responses.
+
+A JSON response streamed from Gemini is only parseable as a whole once the
+last chunk has arrived, but most of its fields are complete long before
+that: ``dish_name`` usually arrives in the first chunk of an analysis.
+``IncrementalJsonParser`` is fed the chunks as they come and reports each
+value as soon as it is syntactically complete, along with the growing text
+of the string being written, so a UI can show the first fields while the
+rest is still being generated.
+
+A value that starts and ends within one chunk is parsed by the C scanner
+of the ``json`` module, and the events for everything inside it are then
+reported in document order. Only values split across chunks go through the
+character-level state machine, which reads runs of plain string,
+whitespace and number characters with a single regex match. Text before
+the first ``{`` or ``[`` (such as a markdown fence) and after the closing
+bracket is ignored.
+"""
+
+import json
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from typing import Any, Literal
+
+# Kinds of event: a member of an object completed, an element of an array
+# completed, more text of a string still being written, the whole document
+EventKind = Literal["field", "item", "partial", "done"]
+
+_WHITESPACE = re.compile(r"[ \t\r\n]+")
+_STRING_RUN = re.compile(r'[^"\\]+')
+# A whole key without escapes, with its colon
+_PLAIN_KEY = re.compile(r'"([^"\\]*)"[ \t\r\n]*:')
+_SCALAR_RUN = re.compile(r"[^\s,\]}]+")
+_DELIMITERS = frozenset(" \t\r\n,]}")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_MISSING = object()
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"Invalid JSON value {name!r}")
+
+
+# Parses one complete value at an index; raises StopIteration when there is none
+_scan = json.JSONDecoder(strict=False, parse_constant=_reject_constant).scan_once
+
+
+@dataclass(frozen=True, slots=True)
+class JsonEvent:
+    """Something that became known about the document being parsed.
+
+    ``path`` leads from the root to the value: object keys and array
+    indexes. For ``field``, ``item`` and ``done`` events ``value`` is the
+    completed value; for ``partial`` it is the text added to the string at
+    ``path`` since the last event for it.
+    """
+
+    kind: EventKind
+    path: tuple[str | int, ...]
+    value: Any
+
+
+class _Frame:
+    """An object or array still open."""
+
+    __slots__ = ("container", "key", "state")
+
+    def __init__(self, container: dict[str, Any] | list[Any]):
+        self.container = container
+        self.key: str | None = None
+        # object: "key_or_end", "key", "colon", "value", "comma_or_end"; array: "value_or_end", "value", "comma_or_end"
+        self.state = "key_or_end" if isinstance(container, dict) else "value_or_end"
+
+
+class IncrementalJsonParser:
+    """Parse one JSON object or array from text arriving in pieces.
+
+    ``feed`` returns the events its text completed. ``close`` returns the
+    whole document and raises ``ValueError`` if it never completed; invalid
+    JSON raises ``ValueError`` from ``feed`` as soon as it is seen.
+    """
+
+    def __init__(self) -> None:
+        self._stack: list[_Frame] = []
+        self._root: Any = _MISSING
+        self._events: list[JsonEvent] = []
+        # String being read: decoded pieces, pieces not yet sent as partial, whether it is a key
+        self._in_string = False
+        self._string: list[str] = []
+        self._unsent: list[str] = []
+        self._is_key = False
+        # Escape being read ("" right after the backslash) and a high surrogate awaiting its pair
+        self._escape: str | None = None
+        self._high_surrogate: int | None = None
+        # Number or literal being read
+        self._scalar: list[str] | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._root is not _MISSING
+
+    def feed(self, text: str) -> list[JsonEvent]:
+        """Consume the next piece of the document and return the events it completed."""
+        i, end = 0, len(text)
+        while i < end and self._root is _MISSING:
+            if self._in_string:
+                i = self._read_string(text, i)
+            elif self._scalar is not None:
+                i = self._read_scalar(text, i)
+            elif match := _WHITESPACE.match(text, i):
+                i = match.end()
+            elif not self._stack:
+                # Skip whatever precedes the document
+                i = self._start_value(text, i) if text[i] in "{[" else i + 1
+            else:
+                i = self._read_structure(text, i)
+
+        if self._in_string and not self._is_key and self._unsent:
+            self._flush_partial()
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> Any:
+        """The parsed document; raises ``ValueError`` if the text ended before it did."""
+        if self._root is _MISSING:
+            raise ValueError("Incomplete JSON: stream ended before the document was closed")
+        return self._root
+
+    def _path(self) -> tuple[str | int, ...]:
+        """Path of the value currently being read."""
+        return tuple(
+            frame.key if isinstance(frame.container, dict) else len(frame.container)  # type: ignore[misc]
+            for frame in self._stack
+        )
+
+    def _read_structure(self, text: str, i: int) -> int:
+        """Read the token starting at ``text[i]`` outside any string or scalar; returns where it ends."""
+        char = text[i]
+        frame = self._stack[-1]
+        state = frame.state
+        if state in ("value", "value_or_end"):
+            if char == "]" and state == "value_or_end":
+                self._close()
+                return i + 1
+            return self._start_value(text, i)
+        if state in ("key", "key_or_end"):
+            if char == '"':
+                # Keys are nearly always plain and arrive whole with their colon
+                if match := _PLAIN_KEY.match(text, i):
+                    frame.key = match.group(1)
+                    frame.state = "value"
+                    return match.end()
+                self._start_string(is_key=True)
+            elif char == "}" and state == "key_or_end":
+                self._close()
+            else:
+                raise ValueError(f"Expected an object key, got {char!r}")
+        elif state == "colon":
+            if char != ":":
+                raise ValueError(f"Expected ':' after key {frame.key!r}, got {char!r}")
+            frame.state = "value"
+        elif char == ",":
+            frame.state = "key" if isinstance(frame.container, dict) else "value"
+        elif char == ("}" if isinstance(frame.container, dict) else "]"):
+            self._close()
+        else:
+            raise ValueError(f"Expected ',' or the end of the container, got {char!r}")
+        return i + 1
+
+    def _start_value(self, text: str, i: int) -> int:
+        char = text[i]
+        if char in '{["-0123456789tfn':
+            try:
+                value, after = _scan(text, i)
+            except (StopIteration, ValueError):
+                pass
+            else:
+                # A number is only known to be whole once a delimiter follows it
+                if char not in "-0123456789" or text[after : after + 1] in _DELIMITERS:
+                    if isinstance(value, dict | list) and value:
+                        self._report_inside(self._path(), value)
+                    self._complete(value)
+                    return after
+        if char in "{[":
+            self._open(char)
+        elif char == '"':
+            self._start_string(is_key=False)
+        elif char in "-0123456789tfn":
+            self._scalar = []
+            return self._read_scalar(text, i)
+        else:
+            raise ValueError(f"Expected a value, got {char!r}")
+        return i + 1
+
+    def _open(self, char: str) -> None:
+        self._stack.append(_Frame({} if char == "{" else []))
+
+    def _report_inside(self, path: tuple[str | int, ...], container: dict[str, Any] | list[Any]) -> None:
+        """Report every value inside ``container``, completed at once by the scanner."""
+        kind: EventKind = "field" if isinstance(container, dict) else "item"
+        children = container.items() if isinstance(container, dict) else enumerate(container)
+        for key, child in children:
+            child_path = (*path, key)
+            if isinstance(child, dict | list) and child:
+                self._report_inside(child_path, child)
+            self._events.append(JsonEvent(kind, child_path, child))
+
+    def _close(self) -> None:
+        self._complete(self._stack.pop().container)
+
+    def _complete(self, value: Any) -> None:
+        """Store a finished value in its parent and report it."""
+        if not self._stack:
+            self._root = value
+            self._events.append(JsonEvent("done", (), value))
+            return
+        path = self._path()
+        parent = self._stack[-1]
+        if isinstance(parent.container, dict):
+            parent.container[parent.key] = value  # type: ignore[index]
+            self._events.append(JsonEvent("field", path, value))
+        else:
+            parent.container.append(value)
+            self._events.append(JsonEvent("item", path, value))
+        parent.state = "comma_or_end"
+
+    def _read_scalar(self, text: str, i: int) -> int:
+        """Read a number or literal; it ends at the first delimiter, which may be in a later chunk."""
+        match = _SCALAR_RUN.match(text, i)
+        if match:
+            self._scalar.append(match.group())  # type: ignore[union-attr]
+            i = match.end()
+        if i < len(text):
+            token = "".join(self._scalar or ())
+            self._scalar = None
+            self._complete(_scalar_value(token))
+        return i
+
+    def _start_string(self, *, is_key: bool) -> None:
+        self._in_string = True
+        self._string = []
+        self._unsent = []
+        self._is_key = is_key
+
+    def _read_string(self, text: str, i: int) -> int:
+        """Read string characters from ``text[i]`` on; returns where reading stopped."""
+        end = len(text)
+        while i < end:
+            if self._escape is not None:
+                i = self._read_escape(text, i)
+                continue
+            match = _STRING_RUN.match(text, i)
+            if match:
+                self._append(match.group())
+                i = match.end()
+                continue
+            char = text[i]
+            i += 1
+            if char == "\\":
+                self._escape = ""
+            else:
+                self._end_string()
+                break
+        return i
+
+    def _read_escape(self, text: str, i: int) -> int:
+        escape = self._escape or ""
+        if not escape:
+            char = text[i]
+            if char == "u":
+                self._escape = "u"
+                return i + 1
+            if char not in _ESCAPES:
+                raise ValueError(f"Invalid escape '\\{char}' in string")
+            self._escape = None
+            self._append(_ESCAPES[char])
+            return i + 1
+
+        digits = text[i : i + 5 - len(escape)]
+        escape += digits
+        i += len(digits)
+        if len(escape) < 5:
+            self._escape = escape
+            return i
+        self._escape = None
+        try:
+            code = int(escape[1:], 16)
+        except ValueError:
+            raise ValueError(f"Invalid escape '\\{escape}' in string") from None
+        if 0xD800 <= code < 0xDC00:
+            self._flush_surrogate()
+            self._high_surrogate = code
+        elif 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            self._append(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)))
+        else:
+            self._append(chr(code))
+        return i
+
+    def _append(self, piece: str) -> None:
+        self._flush_surrogate()
+        self._string.append(piece)
+        self._unsent.append(piece)
+
+    def _flush_surrogate(self) -> None:
+        """A high surrogate not followed by its pair stands alone, as ``json.loads`` leaves it."""
+        if self._high_surrogate is not None:
+            piece, self._high_surrogate = chr(self._high_surrogate), None
+            self._string.append(piece)
+            self._unsent.append(piece)
+
+    def _flush_partial(self) -> None:
+        self._events.append(JsonEvent("partial", self._path(), "".join(self._unsent)))
+        self._unsent = []
+
+    def _end_string(self) -> None:
+        self._flush_surrogate()
+        value = "".join(self._string)
+        self._in_string = False
+        self._string = []
+        self._unsent = []
+        if self._is_key:
+            frame = self._stack[-1]
+            frame.key = value
+            frame.state = "colon"
+        else:
+            self._complete(value)
+
+
+def _scalar_value(token: str) -> Any:
+    try:
+        value, after = _scan(token, 0)
+    except StopIteration:
+        after = -1
+    if after != len(token) or isinstance(value, str | dict | list):
+        raise ValueError(f"Invalid JSON value {token!r}")
+    return value
+
+
+async def iter_json_events(chunks: AsyncIterable[str]) -> AsyncIterator[JsonEvent]:
+    """Parse a stream of JSON text chunks, yielding events as they complete.
+
+    Raises:
+        ValueError: If the text is not valid JSON or ends before the document does.
+    """
+    parser = IncrementalJsonParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    parser.close()
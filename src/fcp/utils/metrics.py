@@ -13,7 +13,7 @@ Usage:
 import logging
 
 from fastapi import FastAPI
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +42,98 @@ GEMINI_COST = Counter(
     "Total Gemini API cost in USD",
 )
 
+GEMINI_QUEUE_WAIT = Histogram(
+    "gemini_api_queue_wait_seconds",
+    "Time Gemini calls waited for a concurrency slot and budget",
+    ["model", "priority"],
+    buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0],
+)
+
+GEMINI_CONCURRENCY_LIMIT = Gauge(
+    "gemini_api_concurrency_limit",
+    "Adaptive limit on concurrent Gemini calls",
+    ["model"],
+)
+
+GEMINI_COALESCED_CALLS = Counter(
+    "gemini_api_coalesced_calls_total",
+    "Gemini calls that joined an identical call already in flight instead of making their own",
+    ["method"],
+)
+
+GEMINI_CONTEXT_CACHE_CALLS = Counter(
+    "gemini_api_context_cache_calls_total",
+    "Gemini calls that sent a declared prefix as a context cache",
+    ["method", "result"],  # cached, fallback
+)
+
+GEMINI_CONTEXT_CACHE_TOKENS_SAVED = Counter(
+    "gemini_api_context_cache_tokens_saved_total",
+    "Input tokens served from Gemini context caches instead of sent inline",
+    ["method"],
+)
+
+GEMINI_HEDGED_CALLS = Counter(
+    "gemini_api_hedged_calls_total",
+    "Gemini calls that ran past their method's p95 and sent a second attempt",
+    ["method", "winner"],  # primary, hedge, none
+)
+
+REQUEST_DEADLINE_EXCEEDED = Counter(
+    "fcp_request_deadline_exceeded_total",
+    "Requests answered 504 because their deadline passed",
+    ["path"],
+)
+
+# =============================================================================
+# Database Metrics
+# =============================================================================
+
+DB_COMMIT_BATCH_SIZE = Histogram(
+    "fcp_db_commit_batch_size",
+    "Number of write calls sharing one SQLite commit",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128],
+)
+
+DB_COMMIT_LATENCY = Histogram(
+    "fcp_db_commit_latency_seconds",
+    "SQLite group commit latency",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25],
+)
+
+# =============================================================================
+# Result Cache Metrics
+# =============================================================================
+
+RESULT_CACHE_LOOKUPS = Counter(
+    "fcp_result_cache_lookups_total",
+    "Result cache lookups by endpoint and outcome",
+    ["endpoint", "result"],  # memory, sqlite, miss
+)
+
+GEMINI_RESPONSE_CACHE_LOOKUPS = Counter(
+    "fcp_gemini_response_cache_lookups_total",
+    "Gemini response cache lookups by method and outcome",
+    ["method", "result"],  # memory, sqlite, miss
+)
+
+GEMINI_RESPONSE_CACHE_BYTES_SAVED = Counter(
+    "fcp_gemini_response_cache_bytes_saved_total",
+    "Bytes of Gemini responses served from cache instead of the API",
+    ["method"],
+)
+
+MEDIA_CACHE_LOOKUPS = Counter(
+    "fcp_media_cache_lookups_total",
+    "Media fetches for Gemini by outcome",
+    ["result"],  # memory, disk, revalidated, miss
+)
+
+MEDIA_CACHE_BYTES_SAVED = Counter(
+    "fcp_media_cache_bytes_saved_total",
+    "Bytes of media served from cache instead of downloaded",
+)
+
 # =============================================================================
 # Business Metrics - Food Logging
 # =============================================================================
@@ -196,6 +288,114 @@ def record_user_session(auth_method: str) -> None:
     USER_ACTIVE_SESSIONS.labels(auth_method=auth_method).inc()
 
 
+def record_db_commit(batch_size: int, latency_seconds: float) -> None:
+    """Record one SQLite group commit.
+
+    Args:
+        batch_size: Number of write calls resolved by this commit
+        latency_seconds: Time spent in the commit itself
+    """
+    DB_COMMIT_BATCH_SIZE.observe(batch_size)
+    DB_COMMIT_LATENCY.observe(latency_seconds)
+
+
+def record_result_cache_lookup(endpoint: str, result: str) -> None:
+    """Record a result cache lookup.
+
+    Args:
+        endpoint: Cached endpoint name
+        result: Where the result came from (memory, sqlite) or miss
+    """
+    RESULT_CACHE_LOOKUPS.labels(endpoint=endpoint, result=result).inc()
+
+
+def record_gemini_response_cache_lookup(method: str, result: str, size: int = 0) -> None:
+    """Record a Gemini response cache lookup.
+
+    Args:
+        method: Gemini client method
+        result: Where the response came from (memory, sqlite) or miss
+        size: Bytes of the response served from cache
+    """
+    GEMINI_RESPONSE_CACHE_LOOKUPS.labels(method=method, result=result).inc()
+    if size:
+        GEMINI_RESPONSE_CACHE_BYTES_SAVED.labels(method=method).inc(size)
+
+
+def record_media_cache_lookup(result: str, size: int = 0) -> None:
+    """Record a media fetch through the media cache.
+
+    Args:
+        result: Where the media came from (memory, disk, revalidated) or miss
+        size: Bytes of media not downloaded
+    """
+    MEDIA_CACHE_LOOKUPS.labels(result=result).inc()
+    if size:
+        MEDIA_CACHE_BYTES_SAVED.inc(size)
+
+
+def record_gemini_coalesced_call(method: str) -> None:
+    """Record a Gemini call served by an identical call already in flight.
+
+    Args:
+        method: Gemini client method
+    """
+    GEMINI_COALESCED_CALLS.labels(method=method).inc()
+
+
+def record_gemini_context_cache(method: str, result: str, tokens_saved: int = 0) -> None:
+    """Record a Gemini call made against a context cache.
+
+    Args:
+        method: Gemini client method
+        result: cached, or fallback when the cache was gone and the prefix was sent inline
+        tokens_saved: Input tokens served from the cache
+    """
+    GEMINI_CONTEXT_CACHE_CALLS.labels(method=method, result=result).inc()
+    if tokens_saved:
+        GEMINI_CONTEXT_CACHE_TOKENS_SAVED.labels(method=method).inc(tokens_saved)
+
+
+def record_gemini_hedge(method: str, winner: str) -> None:
+    """Record a hedged Gemini call.
+
+    Args:
+        method: Gemini client method
+        winner: Attempt whose response was used (primary, hedge, none when both failed)
+    """
+    GEMINI_HEDGED_CALLS.labels(method=method, winner=winner).inc()
+
+
+def record_deadline_exceeded(path: str) -> None:
+    """Record a request that ran out of time.
+
+    Args:
+        path: Request path
+    """
+    REQUEST_DEADLINE_EXCEEDED.labels(path=path).inc()
+
+
+def record_gemini_admission(model: str, priority: str, wait_seconds: float) -> None:
+    """Record a Gemini call admitted by the governor.
+
+    Args:
+        model: Gemini model name
+        priority: Caller priority (interactive, background)
+        wait_seconds: Time spent queued for a slot
+    """
+    GEMINI_QUEUE_WAIT.labels(model=model, priority=priority).observe(wait_seconds)
+
+
+def record_gemini_concurrency_limit(model: str, limit: float) -> None:
+    """Record the governor's current concurrency limit for a model.
+
+    Args:
+        model: Gemini model name
+        limit: Concurrent calls allowed
+    """
+    GEMINI_CONCURRENCY_LIMIT.labels(model=model).set(limit)
+
+
 # =============================================================================
 # Security Event Recording Functions
 # =============================================================================
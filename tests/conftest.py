@@ -9,6 +9,11 @@ import os
 
 os.environ["ENVIRONMENT"] = "test"
 os.environ["DEMO_MODE"] = "false"
+# Settings load while importing tests.constants below; cached results would leak between tests.
+os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+os.environ.setdefault("GEMINI_RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("GEMINI_CONTEXT_CACHE_ENABLED", "false")
+os.environ.setdefault("MEDIA_CACHE_ENABLED", "false")
 
 import asyncio
 import warnings
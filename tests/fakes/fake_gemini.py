@@ -23,6 +23,8 @@ Example:
 from collections.abc import AsyncIterator
 from typing import Any
 
+from fcp.utils.json_stream import JsonEvent, iter_json_events
+
 
 class FakeGeminiClient:
     """In-memory implementation of GeminiClient for testing.
@@ -154,6 +156,15 @@ class FakeGeminiClient:
         for i in range(0, len(json_str), 10):
             yield json_str[i : i + 10]
 
+    async def generate_json_events(
+        self,
+        prompt: str,
+        image_url: str | None = None,
+    ) -> AsyncIterator[JsonEvent]:
+        """Stream JSON generation as parse events."""
+        async for event in iter_json_events(self.generate_json_stream(prompt, image_url)):
+            yield event
+
     # =========================================================================
     # Function Calling
     # =========================================================================
@@ -390,6 +390,40 @@ class TestMediaProcessingAgentCreateFoodLogEntries:
 
             assert len(result) == 0
 
+    @pytest.mark.asyncio
+    async def test_create_food_log_entries_saves_in_one_batch(self):
+        """Test that save=True persists every draft with a single batch write."""
+        from fcp.agents.media_processor import MediaProcessingAgent
+
+        agent = MediaProcessingAgent(user_id="user1")
+        mock_analysis = {"is_food": True, "dish_name": "Tacos", "cuisine": "Mexican", "venue": {}}
+
+        with (
+            patch.object(agent, "process_single_photo", new_callable=AsyncMock, return_value=mock_analysis),
+            patch("fcp.agents.media_processor.firestore_client") as mock_db,
+        ):
+            mock_db.create_logs_batch = AsyncMock(return_value=["log1", "log2"])
+
+            result = await agent.create_food_log_entries(image_urls=["url1", "url2"], default_venue="Home", save=True)
+
+            mock_db.create_logs_batch.assert_awaited_once()
+            user_id, logs = mock_db.create_logs_batch.call_args[0]
+            assert user_id == "user1"
+            assert logs[0]["venue_name"] == "Home"
+            assert logs[1]["image_path"] == "url2"
+            assert [entry["log_id"] for entry in result] == ["log1", "log2"]
+
+    @pytest.mark.asyncio
+    async def test_create_food_log_entries_save_requires_user(self):
+        """Test that saving drafts without a user is rejected."""
+        from fcp.agents.media_processor import MediaProcessingAgent
+
+        agent = MediaProcessingAgent()
+
+        with patch.object(agent, "process_single_photo", new_callable=AsyncMock, return_value={"is_food": True}):
+            with pytest.raises(ValueError, match="user_id is required"):
+                await agent.create_food_log_entries(image_urls=["url1"], save=True)
+
 
 class TestMediaProcessingAgentAnalyzeMealSequence:
     """Tests for analyze_meal_sequence method."""
@@ -80,8 +80,8 @@ class TestAuthentication:
 
     def test_missing_auth_header_allows_demo_read(self, client_no_auth):
         """Test that missing auth header allows read access for demo user."""
-        with patch("fcp.routes.meals.get_meals") as mock_get:
-            mock_get.return_value = []
+        with patch("fcp.routes.meals.get_meals_page") as mock_get:
+            mock_get.return_value = ([], None)
             response = client_no_auth.get("/meals")
             # Demo users can read
             assert response.status_code == 200
@@ -99,8 +99,8 @@ class TestAuthentication:
 
     def test_valid_auth_header(self):
         """Test that valid auth header works."""
-        with patch("fcp.routes.meals.get_meals") as mock_get:
-            mock_get.return_value = []
+        with patch("fcp.routes.meals.get_meals_page") as mock_get:
+            mock_get.return_value = ([], None)
             response = client.get("/meals", headers=AUTH_HEADER)
             assert response.status_code == 200
 
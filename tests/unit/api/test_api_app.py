@@ -283,6 +283,66 @@ class TestSchedulerImportError:
             # close_http_client was called (even though it raised)
             mock_close.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_lifespan_handles_result_cache_close_exception(self, caplog):
+        """Test that lifespan logs and survives a result cache that fails to close."""
+        from fcp.api import app, lifespan
+
+        mock_close = AsyncMock(side_effect=RuntimeError("database is locked"))
+
+        with (
+            patch("fcp.api.init_logfire"),
+            patch("fcp.api.shutdown_logfire"),
+            patch("fcp.api.cancel_all_tasks", new_callable=AsyncMock),
+            patch("fcp.api._is_scheduler_available", return_value=False),
+            patch("fcp.services.result_cache.result_cache.close", mock_close),
+        ):
+            async with lifespan(app):
+                pass
+
+        mock_close.assert_awaited_once()
+        assert "Failed to close result cache during shutdown" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_lifespan_handles_gemini_response_cache_close_exception(self, caplog):
+        """Test that lifespan logs and survives a Gemini response cache that fails to close."""
+        from fcp.api import app, lifespan
+
+        mock_close = AsyncMock(side_effect=RuntimeError("database is locked"))
+
+        with (
+            patch("fcp.api.init_logfire"),
+            patch("fcp.api.shutdown_logfire"),
+            patch("fcp.api.cancel_all_tasks", new_callable=AsyncMock),
+            patch("fcp.api._is_scheduler_available", return_value=False),
+            patch("fcp.services.gemini_response_cache.gemini_response_cache.close", mock_close),
+        ):
+            async with lifespan(app):
+                pass
+
+        mock_close.assert_awaited_once()
+        assert "Failed to close Gemini response cache during shutdown" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_lifespan_handles_media_cache_close_exception(self, caplog):
+        """Test that lifespan logs and survives a media cache that fails to close."""
+        from fcp.api import app, lifespan
+
+        mock_close = AsyncMock(side_effect=RuntimeError("database is locked"))
+
+        with (
+            patch("fcp.api.init_logfire"),
+            patch("fcp.api.shutdown_logfire"),
+            patch("fcp.api.cancel_all_tasks", new_callable=AsyncMock),
+            patch("fcp.api._is_scheduler_available", return_value=False),
+            patch("fcp.services.media_cache.media_cache.close", mock_close),
+        ):
+            async with lifespan(app):
+                pass
+
+        mock_close.assert_awaited_once()
+        assert "Failed to close media cache during shutdown" in caplog.text
+
 
 class TestUserIdMiddleware:
     """Tests for user ID middleware for rate limiting."""
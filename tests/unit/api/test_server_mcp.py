@@ -106,6 +106,7 @@ def mock_firestore_client():
 
     # Default mock behaviors for common operations
     mock_db.get_user_logs.return_value = []
+    mock_db.get_user_logs_page.return_value = ([], None)
     mock_db.get_log.return_value = None
     mock_db.create_log.return_value = "mock-log-id"
     mock_db.update_log.return_value = True
@@ -130,7 +131,7 @@ def mock_firestore_client():
         patch("fcp.tools.profile.firestore_client", mock_db),
         patch("fcp.tools.safety.firestore_client", mock_db),
         patch("fcp.tools.search.firestore_client", mock_db),
-        patch("fcp.tools.suggest.firestore_client", mock_db),
+        patch("fcp.tools.data_loader.firestore_client", mock_db),
         patch("fcp.tools.trends.firestore_client", mock_db),
         # Patch get_firestore_client for modules that use the function
         patch("fcp.tools.knowledge_graph.get_firestore_client", return_value=mock_db),
@@ -311,13 +312,14 @@ class TestCallTool:
         from fcp.server import call_tool
 
         # Configure mock for this test
-        mock_firestore_client.get_user_logs.return_value = [{"dish_name": "Pasta", "cuisine": "Italian"}]
+        mock_firestore_client.get_user_logs_page.return_value = ([{"dish_name": "Pasta", "cuisine": "Italian"}], None)
 
         with (
             patch("fcp.server.check_mcp_rate_limit"),
             patch("fcp.server.get_user_id", return_value=MOCK_USER),
             patch(
-                "fcp.tools.crud.get_meals", new=AsyncMock(return_value=[{"dish_name": "Pasta", "cuisine": "Italian"}])
+                "fcp.tools.crud.get_meals_page",
+                new=AsyncMock(return_value=([{"dish_name": "Pasta", "cuisine": "Italian"}], None)),
             ),
         ):
             result = await call_tool("dev.fcp.nutrition.get_recent_meals", {"limit": 5, "days": 3})
@@ -619,7 +621,7 @@ class TestCallTool:
 
         # Reset and configure mock to raise exception
         mock_firestore_client.reset_mock()
-        mock_firestore_client.get_user_logs = AsyncMock(side_effect=Exception("Database error"))
+        mock_firestore_client.get_user_logs_page = AsyncMock(side_effect=Exception("Database error"))
 
         with (
             patch("fcp.server.check_mcp_rate_limit"),
@@ -637,7 +639,7 @@ class TestCallTool:
         from fcp.server import call_tool
 
         # Configure mock for successful call
-        mock_firestore_client.get_user_logs.return_value = [{"dish_name": "Pasta"}]
+        mock_firestore_client.get_user_logs_page.return_value = ([{"dish_name": "Pasta"}], None)
 
         with (
             patch("fcp.server.check_mcp_rate_limit"),
@@ -1736,7 +1738,9 @@ class TestMissingToolParity:
         with (
             patch("fcp.server.check_mcp_rate_limit"),
             patch("fcp.server.get_user_id", return_value=MOCK_USER),
-            patch("fcp.tools.recipe_generator.generate_recipe", new=AsyncMock(return_value={"recipe_name": "Prompt Pie"})),
+            patch(
+                "fcp.tools.recipe_generator.generate_recipe", new=AsyncMock(return_value={"recipe_name": "Prompt Pie"})
+            ),
         ):
             result = await call_tool("dev.fcp.recipes.generate_recipe", {"prompt": "easy pasta for dinner"})
             data = json.loads(result[0].text)
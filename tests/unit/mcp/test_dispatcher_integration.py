@@ -17,6 +17,7 @@ def mock_firestore_client():
 
     # Default mock behaviors
     mock_db.get_user_logs.return_value = []
+    mock_db.get_user_logs_page.return_value = ([], None)
     mock_db.get_log.return_value = None
     mock_db.create_log.return_value = "mock-log-id"
     mock_db.update_log.return_value = True
@@ -35,7 +36,7 @@ def mock_firestore_client():
         patch("fcp.tools.profile.firestore_client", mock_db),
         patch("fcp.tools.safety.firestore_client", mock_db),
         patch("fcp.tools.search.firestore_client", mock_db),
-        patch("fcp.tools.suggest.firestore_client", mock_db),
+        patch("fcp.tools.data_loader.firestore_client", mock_db),
         patch("fcp.tools.trends.firestore_client", mock_db),
         patch("fcp.tools.knowledge_graph.get_firestore_client", return_value=mock_db),
         patch("fcp.tools.parser.get_firestore_client", return_value=mock_db),
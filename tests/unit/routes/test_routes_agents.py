@@ -103,7 +103,7 @@ class TestFoodDiscoveryEndpoint:
 
         with (
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch("fcp.routes.agents.FoodDiscoveryAgent") as mock_agent_class,
@@ -142,7 +142,7 @@ class TestRestaurantDiscoveryEndpoint:
 
         with (
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch("fcp.routes.agents.FoodDiscoveryAgent") as mock_agent_class,
@@ -179,7 +179,7 @@ class TestRecipeDiscoveryEndpoint:
 
         with (
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch("fcp.routes.agents.FoodDiscoveryAgent") as mock_agent_class,
@@ -217,7 +217,7 @@ class TestDailyInsightEndpoint:
 
         with (
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch(
@@ -244,7 +244,7 @@ class TestDailyInsightEndpoint:
     def test_get_daily_insight_allows_demo_user(self, client, mock_auth):
         """Test that daily insight allows demo users (read endpoint)."""
         with (
-            patch("fcp.routes.agents.get_taste_profile", new_callable=AsyncMock) as mock_profile,
+            patch("fcp.tools.data_loader.get_stored_taste_profile", new_callable=AsyncMock) as mock_profile,
             patch("fcp.routes.agents.get_meals", new_callable=AsyncMock) as mock_meals,
             patch("fcp.routes.agents.FreshnessAgent") as mock_agent_class,
         ):
@@ -300,7 +300,7 @@ class TestFoodTipEndpoint:
 
         with (
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch("fcp.routes.agents.FreshnessAgent") as mock_agent_class,
@@ -320,7 +320,7 @@ class TestFoodTipEndpoint:
     def test_get_food_tip_allows_demo_user(self, client, mock_auth):
         """Test that food tip allows demo users (read endpoint)."""
         with (
-            patch("fcp.routes.agents.get_taste_profile", new_callable=AsyncMock) as mock_profile,
+            patch("fcp.tools.data_loader.get_stored_taste_profile", new_callable=AsyncMock) as mock_profile,
             patch("fcp.routes.agents.FreshnessAgent") as mock_agent_class,
         ):
             mock_profile.return_value = {}
@@ -342,7 +342,7 @@ class TestSeasonalReminderEndpoint:
 
         with (
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch("fcp.routes.agents.FreshnessAgent") as mock_agent_class,
@@ -362,7 +362,7 @@ class TestSeasonalReminderEndpoint:
     def test_get_seasonal_reminder_allows_demo_user(self, client, mock_auth):
         """Test that seasonal reminder allows demo users (read endpoint)."""
         with (
-            patch("fcp.routes.agents.get_taste_profile", new_callable=AsyncMock, return_value={}),
+            patch("fcp.tools.data_loader.get_stored_taste_profile", new_callable=AsyncMock, return_value={}),
             patch("fcp.routes.agents.FreshnessAgent") as mock_agent_class,
         ):
             mock_agent = MagicMock()
@@ -628,7 +628,7 @@ class TestMonthlyReviewEndpoint:
                 new_callable=AsyncMock,
             ) as mock_get_meals,
             patch(
-                "fcp.routes.agents.get_taste_profile",
+                "fcp.tools.data_loader.get_stored_taste_profile",
                 new_callable=AsyncMock,
             ) as mock_get_profile,
             patch("fcp.routes.agents.ContentGeneratorAgent") as mock_agent_class,
@@ -649,7 +649,7 @@ class TestMonthlyReviewEndpoint:
     def test_generate_monthly_review_allows_demo_user(self, client, mock_auth):
         """Test that monthly review allows demo users (read endpoint)."""
         with (
-            patch("fcp.routes.agents.get_taste_profile", new_callable=AsyncMock, return_value={}),
+            patch("fcp.tools.data_loader.get_stored_taste_profile", new_callable=AsyncMock, return_value={}),
             patch("fcp.routes.agents.get_meals", new_callable=AsyncMock) as mock_meals,
             patch("fcp.routes.agents.ContentGeneratorAgent") as mock_agent_class,
         ):
@@ -81,6 +81,50 @@ class TestNutritionAnalyticsEndpoint:
             assert data["meal_count"] == 2
             assert "stats" in data
             mock_get.assert_called_once()
+            assert mock_calc.await_args.kwargs == {"mode": "local", "narrate": False}
+
+    def test_nutrition_analytics_narrated(self, client, mock_auth):
+        """Test nutrition analytics can ask Gemini to summarize the local statistics."""
+        with (
+            patch("fcp.routes.analytics.get_meals", new_callable=AsyncMock, return_value=[]),
+            patch("fcp.routes.analytics.calculate_nutrition_stats", new_callable=AsyncMock) as mock_calc,
+        ):
+            mock_calc.return_value = {}
+
+            response = client.post(
+                "/analytics/nutrition",
+                json={"days": 7, "narrate": True},
+                headers=TEST_AUTH_HEADER,
+            )
+
+            assert response.status_code == 200
+            assert mock_calc.await_args.kwargs == {"mode": "local", "narrate": True}
+
+    def test_nutrition_analytics_llm_mode(self, client, mock_auth):
+        """Test nutrition analytics can opt into Gemini code execution."""
+        with (
+            patch("fcp.routes.analytics.get_meals", new_callable=AsyncMock, return_value=[]),
+            patch("fcp.routes.analytics.calculate_nutrition_stats", new_callable=AsyncMock) as mock_calc,
+        ):
+            mock_calc.return_value = {}
+
+            response = client.post(
+                "/analytics/nutrition",
+                json={"days": 7, "mode": "llm"},
+                headers=TEST_AUTH_HEADER,
+            )
+
+            assert response.status_code == 200
+            assert mock_calc.await_args.kwargs == {"mode": "llm", "narrate": False}
+
+    def test_nutrition_analytics_invalid_mode(self, client, mock_auth):
+        """Test nutrition analytics rejects unknown modes."""
+        response = client.post(
+            "/analytics/nutrition",
+            json={"days": 7, "mode": "fast"},
+            headers=TEST_AUTH_HEADER,
+        )
+        assert response.status_code == 422
 
     def test_nutrition_analytics_default_days(self, client, mock_auth):
         """Test nutrition analytics with default days."""
@@ -129,6 +173,41 @@ class TestEatingPatternsEndpoint:
             data = response.json()
             assert data["period_days"] == 14
             assert "patterns" in data
+            assert mock_analyze.await_args.kwargs == {"mode": "local", "narrate": False}
+
+    def test_eating_patterns_narrated(self, client, mock_auth):
+        """Test eating patterns can ask Gemini to describe the local patterns."""
+        with (
+            patch("fcp.routes.analytics.get_meals", new_callable=AsyncMock, return_value=[]),
+            patch("fcp.routes.analytics.analyze_eating_patterns", new_callable=AsyncMock) as mock_analyze,
+        ):
+            mock_analyze.return_value = {}
+
+            response = client.post(
+                "/analytics/patterns",
+                json={"days": 7, "narrate": True},
+                headers=TEST_AUTH_HEADER,
+            )
+
+            assert response.status_code == 200
+            assert mock_analyze.await_args.kwargs == {"mode": "local", "narrate": True}
+
+    def test_eating_patterns_llm_mode(self, client, mock_auth):
+        """Test eating patterns can opt into Gemini code execution."""
+        with (
+            patch("fcp.routes.analytics.get_meals", new_callable=AsyncMock, return_value=[]),
+            patch("fcp.routes.analytics.analyze_eating_patterns", new_callable=AsyncMock) as mock_analyze,
+        ):
+            mock_analyze.return_value = {}
+
+            response = client.post(
+                "/analytics/patterns",
+                json={"days": 7, "mode": "llm"},
+                headers=TEST_AUTH_HEADER,
+            )
+
+            assert response.status_code == 200
+            assert mock_analyze.await_args.kwargs == {"mode": "llm", "narrate": False}
 
     def test_eating_patterns_requires_auth(self, client):
         """Test eating patterns requires authentication."""
@@ -142,10 +221,10 @@ class TestNutritionTrendsEndpoint:
     def test_nutrition_trends_success(self, client, mock_auth, sample_meals):
         """Test successful nutrition trends analysis."""
         with (
-            patch("fcp.routes.analytics.get_meals", new_callable=AsyncMock) as mock_get,
+            patch("fcp.routes.analytics.get_daily_nutrition", new_callable=AsyncMock) as mock_get,
             patch("fcp.routes.analytics.calculate_trend_report", new_callable=AsyncMock) as mock_trend,
         ):
-            mock_get.return_value = sample_meals
+            mock_get.return_value = [{"day": "2026-01-15", "meal_count": 2, "calories": 1100}]
             mock_trend.return_value = {"trend": "improving", "change_pct": 5}
 
             response = client.post(
@@ -158,6 +237,8 @@ class TestNutritionTrendsEndpoint:
             data = response.json()
             assert data["period_days"] == 30
             assert "trends" in data
+            assert mock_get.await_args.kwargs == {"days": 30}
+            mock_trend.assert_awaited_once_with(mock_get.return_value)
 
     def test_nutrition_trends_requires_auth(self, client):
         """Test nutrition trends requires authentication."""
@@ -206,6 +287,8 @@ class TestComparePeriodsEndpoint:
             assert response.status_code == 200
             data = response.json()
             assert "comparison" in data
+            assert mock_compare.await_args.kwargs["mode"] == "local"
+            assert mock_compare.await_args.kwargs["narrate"] is False
 
     def test_compare_periods_with_string_dates(self, client, mock_auth):
         """Test period comparison with ISO string dates in meals."""
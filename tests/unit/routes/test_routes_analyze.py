@@ -96,6 +96,59 @@ class TestAnalyzeImageStreamEndpoint:
             finally:
                 app.dependency_overrides.pop(get_gemini, None)
 
+    def test_analyze_stream_events(self, mock_auth):
+        """Fields are sent as events as soon as each one is complete."""
+
+        async def mock_stream(prompt, image_url=None):
+            for chunk in ('{"dish_name": "Tonk', 'otsu Ramen", "ingredients": ["pork",', ' "egg"]}'):
+                yield chunk
+
+        from fcp.services.gemini import GeminiClient, get_gemini
+
+        mock_gemini = GeminiClient()
+        mock_gemini.generate_json_stream = mock_stream
+        app.dependency_overrides[get_gemini] = lambda: mock_gemini
+        try:
+            response = client.post(
+                "/analyze/stream?events=true",
+                json={"image_url": "https://firebasestorage.googleapis.com/ramen.jpg"},
+                headers=TEST_AUTH_HEADER,
+            )
+        finally:
+            app.dependency_overrides.pop(get_gemini, None)
+
+        assert response.status_code == 200
+        blocks = response.content.decode().split("\n\n")
+        assert blocks[:3] == [
+            'event: partial\ndata: {"path": ["dish_name"], "value": "Tonk"}',
+            'event: field\ndata: {"path": ["dish_name"], "value": "Tonkotsu Ramen"}',
+            'event: item\ndata: {"path": ["ingredients", 0], "value": "pork"}',
+        ]
+        assert blocks[-3].startswith('event: done\ndata: {"path": [], "value": {"dish_name": "Tonkotsu Ramen"')
+        assert blocks[-2] == "data: [DONE]"
+
+    def test_analyze_stream_events_invalid_json(self, mock_auth):
+        async def mock_stream(prompt, image_url=None):
+            yield '{"dish_name": "Ramen"'
+
+        from fcp.services.gemini import GeminiClient, get_gemini
+
+        mock_gemini = GeminiClient()
+        mock_gemini.generate_json_stream = mock_stream
+        app.dependency_overrides[get_gemini] = lambda: mock_gemini
+        try:
+            response = client.post(
+                "/analyze/stream?events=true",
+                json={"image_url": "https://firebasestorage.googleapis.com/ramen.jpg"},
+                headers=TEST_AUTH_HEADER,
+            )
+        finally:
+            app.dependency_overrides.pop(get_gemini, None)
+
+        content = response.content.decode()
+        assert 'event: error\ndata: {"message": "Analysis was not valid JSON"}' in content
+        assert content.endswith("data: [DONE]\n\n")
+
 
 class TestAnalyzeImageV2Endpoint:
     """Tests for POST /analyze/v2 endpoint."""
@@ -52,8 +52,8 @@ class TestListMealsEndpoint:
 
     def test_list_meals(self, client, sample_food_logs):
         """Test listing meals."""
-        with patch("fcp.routes.meals.get_meals", new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = sample_food_logs
+        with patch("fcp.routes.meals.get_meals_page", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = (sample_food_logs, None)
             response = client.get("/meals", headers=AUTH_HEADER)
 
             assert response.status_code == 200
@@ -63,8 +63,8 @@ class TestListMealsEndpoint:
 
     def test_list_meals_with_params(self, client, sample_food_logs):
         """Test listing meals with query parameters."""
-        with patch("fcp.routes.meals.get_meals", new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = sample_food_logs[:2]
+        with patch("fcp.routes.meals.get_meals_page", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = (sample_food_logs[:2], None)
             response = client.get(
                 "/meals?limit=2&days=7&include_nutrition=true",
                 headers=AUTH_HEADER,
@@ -77,6 +77,32 @@ class TestListMealsEndpoint:
             assert call_kwargs["days"] == 7
             assert call_kwargs["include_nutrition"] is True
 
+    def test_list_meals_returns_backend_cursor(self, client, sample_food_logs):
+        """The backend's next-page cursor is returned and passed back on the next request."""
+        with patch("fcp.routes.meals.get_meals_page", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = (sample_food_logs[:2], "next-page")
+            response = client.get("/meals?limit=2", headers=AUTH_HEADER)
+            assert response.json()["next_cursor"] == "next-page"
+            assert mock_get.call_args[1]["cursor"] is None
+
+            client.get("/meals?limit=2&cursor=next-page", headers=AUTH_HEADER)
+            assert mock_get.call_args[1]["cursor"] == "next-page"
+
+    def test_list_meals_full_last_page_has_no_cursor(self, client, sample_food_logs):
+        """A last page that exactly fills the limit has a null cursor."""
+        with patch("fcp.routes.meals.get_meals_page", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = (sample_food_logs, None)
+            response = client.get(f"/meals?limit={len(sample_food_logs)}", headers=AUTH_HEADER)
+            assert response.json()["count"] == len(sample_food_logs)
+            assert response.json()["next_cursor"] is None
+
+    def test_list_meals_invalid_cursor(self, client):
+        """A malformed cursor is a client error."""
+        with patch("fcp.routes.meals.get_meals_page", new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = ValueError("Invalid pagination cursor")
+            response = client.get("/meals?cursor=bogus", headers=AUTH_HEADER)
+            assert response.status_code == 400
+
 
 class TestGetSingleMealEndpoint:
     """Tests for GET /meals/{log_id} endpoint."""
@@ -522,8 +548,8 @@ class TestRouterIntegration:
 
     def test_meals_endpoints_exist(self, client):
         """Test that all meals endpoints are registered."""
-        with patch("fcp.routes.meals.get_meals", new_callable=AsyncMock) as mock:
-            mock.return_value = []
+        with patch("fcp.routes.meals.get_meals_page", new_callable=AsyncMock) as mock:
+            mock.return_value = ([], None)
 
             # GET /meals should work
             response = client.get("/meals", headers=AUTH_HEADER)
@@ -401,6 +401,35 @@ class TestLifetimeProfileEndpoint:
 
         clear_lifetime_cache()
 
+    def test_lifetime_profile_page_2_embeds_stored_json(self, client):
+        """Test that lazily decoded log rows serialize to the same JSON as plain dicts."""
+        from fcp.routes.profile import clear_lifetime_cache
+        from fcp.services.log_row import LogRow
+
+        clear_lifetime_cache()
+        row = LogRow(
+            {"id": "log1", "dish_name": "Ramen", "nutrition": '{"calories": 500}'},
+            frozenset({"nutrition"}),
+        )
+
+        with patch("fcp.routes.profile.firestore_client") as mock_firestore:
+            mock_firestore.get_user_logs_paginated = AsyncMock(return_value=([row, {"dish_name": "Meal 2"}], 200))
+
+            response = client.get(
+                "/profile/lifetime?page=2",
+                headers=AUTH_HEADER,
+            )
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["meals"] == [
+                {"id": "log1", "dish_name": "Ramen", "nutrition": {"calories": 500}},
+                {"dish_name": "Meal 2"},
+            ]
+            assert data["pagination"]["total_count"] == 200
+
+        clear_lifetime_cache()
+
     def test_lifetime_profile_with_mocked_dependencies(self, client):
         """Test lifetime profile with properly mocked dependencies."""
         from fcp.routes.profile import clear_lifetime_cache
@@ -46,7 +46,7 @@ class TestSecurityHeaders:
 
     def test_security_headers_on_authenticated_endpoints(self):
         """Security headers should be present on all endpoints."""
-        with patch("fcp.routes.meals.get_meals", return_value=[]):
+        with patch("fcp.routes.meals.get_meals_page", return_value=([], None)):
             response = client.get(
                 "/meals",
                 headers={"Authorization": "Bearer test_token"},
@@ -1,7 +1,10 @@
 """Comprehensive unit tests for fcp.services.database – targeting 100 % branch coverage."""
 
+import asyncio
 import json
-from datetime import UTC, datetime, timedelta
+import random
+from contextlib import nullcontext
+from datetime import UTC, date, datetime, timedelta
 from unittest.mock import patch
 
 import aiosqlite
@@ -16,6 +19,7 @@ from fcp.services.database import (
     _now,
     _row_to_dict,
 )
+from fcp.services.log_row import LogRow
 
 # ---------------------------------------------------------------------------
 # Shared fixture
@@ -78,6 +82,25 @@ class TestEncodeJson:
         result = _encode_json(data, frozenset({"tags"}))
         assert result["tags"] == '["already"]'
 
+    def test_quotes_non_json_string(self):
+        data = {"tags": "spicy"}
+        result = _encode_json(data, frozenset({"tags"}))
+        assert result["tags"] == '"spicy"'
+
+    @pytest.mark.parametrize("text", ["NaN", "-Infinity", '{"calories": NaN}', "[1, Infinity]"])
+    def test_quotes_string_with_non_json_constant(self, text):
+        result = _encode_json({"nutrition": text}, frozenset({"nutrition"}))
+        assert json.loads(result["nutrition"], parse_constant=pytest.fail) == text
+
+    def test_non_finite_floats_stored_as_null(self):
+        data = {"nutrition": {"calories": float("nan"), "per_serving": [1.5, float("inf")]}, "tags": ("a",)}
+        result = _encode_json(data, frozenset({"nutrition", "tags"}))
+        assert json.loads(result["nutrition"], parse_constant=pytest.fail) == {
+            "calories": None,
+            "per_serving": [1.5, None],
+        }
+        assert result["tags"] == '["a"]'
+
     def test_non_json_field_unchanged(self):
         data = {"other": [1, 2]}
         result = _encode_json(data, frozenset({"tags"}))
@@ -191,6 +214,197 @@ class TestDatabaseLifecycle:
         assert database._db_path == str(DB_PATH)
 
 
+# ===========================================================================
+# Connection pool / pragmas
+# ===========================================================================
+
+
+@pytest_asyncio.fixture
+async def pooled_db(tmp_path):
+    database = Database(tmp_path / "pooled.db", reader_pool_size=2)
+    await database.connect()
+    yield database
+    await database.close()
+
+
+class TestReaderPool:
+    @pytest.mark.asyncio
+    async def test_file_database_uses_wal(self, pooled_db):
+        async with pooled_db.db.execute("PRAGMA journal_mode") as cur:
+            assert (await cur.fetchone())[0] == "wal"
+        async with pooled_db.db.execute("PRAGMA synchronous") as cur:
+            assert (await cur.fetchone())[0] == 1  # NORMAL
+
+    @pytest.mark.asyncio
+    async def test_opens_read_only_readers(self, pooled_db):
+        assert len(pooled_db._readers) == 2
+        reader = pooled_db._readers[0]
+        async with reader.execute("PRAGMA query_only") as cur:
+            assert (await cur.fetchone())[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_database_never_pools(self):
+        database = Database(":memory:", reader_pool_size=4)
+        await database.connect()
+        assert database._readers == []
+        async with database._reader() as conn:
+            assert conn is database.db
+        await database.close()
+
+    @pytest.mark.asyncio
+    async def test_default_pool_size_from_settings(self, tmp_path):
+        with patch("fcp.services.database.settings") as mock_settings:
+            mock_settings.sqlite_reader_connections = 3
+            database = Database(tmp_path / "x.db")
+        assert database._reader_pool_size == 3
+
+    @pytest.mark.asyncio
+    async def test_reads_see_committed_writes(self, pooled_db):
+        log_id = await pooled_db.create_log("u1", {"dish_name": "Ramen"})
+        log = await pooled_db.get_log("u1", log_id)
+        assert log["dish_name"] == "Ramen"
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_block_on_open_write_transaction(self, pooled_db):
+        await pooled_db.create_log("u1", {"dish_name": "Committed"})
+        await pooled_db.db.execute("BEGIN IMMEDIATE")
+        await pooled_db.db.execute("INSERT INTO food_logs (id, user_id, deleted) VALUES ('pending', 'u1', 0)")
+        try:
+            count = await asyncio.wait_for(pooled_db.count_user_logs("u1"), timeout=2)
+            assert count == 1
+        finally:
+            await pooled_db.db.rollback()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_return_connections_to_pool(self, pooled_db):
+        await pooled_db.create_log("u1", {"dish_name": "Ramen"})
+        results = await asyncio.gather(*(pooled_db.get_user_logs("u1") for _ in range(16)))
+        assert all(len(r) == 1 for r in results)
+        assert pooled_db._idle_readers.qsize() == 2
+
+    @pytest.mark.asyncio
+    async def test_close_releases_readers(self, tmp_path):
+        database = Database(tmp_path / "close.db", reader_pool_size=2)
+        await database.connect()
+        await database.close()
+        assert database._readers == []
+        assert database._idle_readers.qsize() == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_auto_connect_connects_once(self, tmp_path):
+        database = Database(tmp_path / "auto.db", reader_pool_size=1)
+        with patch.object(database, "connect", wraps=database.connect) as connect:
+            await asyncio.gather(database.count_user_logs("u1"), database.count_user_logs("u1"))
+        assert connect.call_count == 1
+        await database.close()
+
+
+class TestGroupCommit:
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_commits(self, pooled_db):
+        with patch("fcp.services.database.record_db_commit") as record:
+            ids = await asyncio.gather(*(pooled_db.create_log("u1", {"dish_name": f"D{i}"}) for i in range(20)))
+        batch_sizes = [c.args[0] for c in record.call_args_list]
+        assert sum(batch_sizes) == 20
+        assert len(batch_sizes) < 20
+        assert max(batch_sizes) > 1
+        assert len(await pooled_db.get_logs_by_ids("u1", ids)) == 20
+
+    @pytest.mark.asyncio
+    async def test_single_write_commits_without_waiting(self, db):
+        with patch("fcp.services.database.record_db_commit") as record:
+            await db.add_pantry_item("u1", {"name": "Rice"})
+        record.assert_called_once()
+        assert record.call_args.args[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_commit_failure_reaches_every_waiter(self, db):
+        async def boom():
+            raise aiosqlite.OperationalError("disk I/O error")
+
+        with patch.object(db._db, "commit", side_effect=boom):
+            results = await asyncio.gather(
+                db.add_pantry_item("u1", {"name": "Rice"}),
+                db.add_pantry_item("u1", {"name": "Beans"}),
+                return_exceptions=True,
+            )
+        assert all(isinstance(r, aiosqlite.OperationalError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_window_collects_writers_until_batch_is_full(self, db):
+        with (
+            patch("fcp.services.database.settings") as mock_settings,
+            patch("fcp.services.database.record_db_commit") as record,
+        ):
+            mock_settings.sqlite_group_commit_window_ms = 5000
+            mock_settings.sqlite_group_commit_max_batch = 3
+            await asyncio.wait_for(
+                asyncio.gather(*(db.add_pantry_item("u1", {"name": f"I{i}"}) for i in range(3))),
+                timeout=2,
+            )
+        assert [c.args[0] for c in record.call_args_list] == [3]
+
+    @pytest.mark.asyncio
+    async def test_window_elapses_for_lone_writer(self, db):
+        with patch("fcp.services.database.settings") as mock_settings:
+            mock_settings.sqlite_group_commit_window_ms = 1
+            mock_settings.sqlite_group_commit_max_batch = 64
+            item_id = await db.add_pantry_item("u1", {"name": "Rice"})
+        assert any(p["id"] == item_id for p in await db.get_pantry("u1"))
+
+    @pytest.mark.asyncio
+    async def test_cancelled_writer_does_not_break_batch(self, db):
+        task = asyncio.create_task(db.add_pantry_item("u1", {"name": "Rice"}))
+        other = asyncio.create_task(db.add_pantry_item("u1", {"name": "Beans"}))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert await other
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("commit_fails", [False, True])
+    async def test_writer_cancelled_while_waiting_for_commit(self, db, commit_fails):
+        async def boom():
+            raise aiosqlite.OperationalError("disk I/O error")
+
+        with (
+            patch("fcp.services.database.settings") as mock_settings,
+            patch.object(db._db, "commit", side_effect=boom) if commit_fails else nullcontext(),
+        ):
+            mock_settings.sqlite_group_commit_window_ms = 5000
+            mock_settings.sqlite_group_commit_max_batch = 3
+            task = asyncio.create_task(db.add_pantry_item("u1", {"name": "Rice"}))
+            while not db._pending_commits:
+                await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # The cancelled writer still counts towards the batch it joined
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    db.add_pantry_item("u1", {"name": "Beans"}),
+                    db.add_pantry_item("u1", {"name": "Miso"}),
+                    return_exceptions=True,
+                ),
+                timeout=2,
+            )
+        assert all(isinstance(r, aiosqlite.OperationalError) for r in results) == commit_fails
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_pending_commit(self, tmp_path):
+        database = Database(tmp_path / "close.db", reader_pool_size=0)
+        await database.connect()
+        write = asyncio.create_task(database.add_pantry_item("u1", {"name": "Rice"}))
+        while database._commit_task is None:
+            await asyncio.sleep(0)
+        await database.close()
+        assert write.done()
+
+        reopened = Database(tmp_path / "close.db", reader_pool_size=0)
+        assert len(await reopened.get_pantry("u1")) == 1
+        await reopened.close()
+
+
 # ===========================================================================
 # Food Logs
 # ===========================================================================
@@ -260,6 +474,34 @@ class TestGetUserLogs:
         logs = await db.get_user_logs("u1", limit=2)
         assert len(logs) == 2
 
+    @pytest.mark.asyncio
+    async def test_fields_projection(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "Ramen", "cuisine": "Japanese", "tags": ["hot"]})
+        logs = await db.get_user_logs("u1", fields=["dish_name", "tags"])
+        assert logs == [{"id": log_id, "dish_name": "Ramen", "tags": ["hot"]}]
+
+    @pytest.mark.asyncio
+    async def test_unknown_field_rejected(self, db):
+        with pytest.raises(ValueError, match="Unknown food log fields: nope"):
+            await db.get_user_logs("u1", fields=["dish_name", "nope"])
+
+    @pytest.mark.asyncio
+    async def test_json_fields_decoded_lazily(self, db):
+        await db.create_log("u1", {"dish_name": "Ramen", "nutrition": {"calories": 500}, "notes": "plain"})
+        [log] = await db.get_user_logs("u1")
+        assert isinstance(log, LogRow)
+        assert dict.__getitem__(log, "nutrition") == '{"calories": 500}'
+        assert log["nutrition"] == {"calories": 500}
+        assert json.loads(log.to_json())["nutrition"] == {"calories": 500}
+
+    @pytest.mark.asyncio
+    async def test_to_json_valid_for_non_finite_values(self, db):
+        await db.create_log("u1", {"dish_name": "Ramen", "nutrition": {"calories": float("nan")}, "tags": "Infinity"})
+        [log] = await db.get_user_logs("u1")
+        decoded = json.loads(log.to_json(), parse_constant=pytest.fail)
+        assert decoded["nutrition"] == {"calories": None}
+        assert decoded["tags"] == "Infinity"
+
 
 class TestGetLog:
     @pytest.mark.asyncio
@@ -317,6 +559,52 @@ class TestCreateLog:
         assert row is not None
 
 
+class TestCreateLogsBatch:
+    @pytest.mark.asyncio
+    async def test_empty(self, db):
+        assert await db.create_logs_batch("u1", []) == []
+
+    @pytest.mark.asyncio
+    async def test_creates_in_input_order(self, db):
+        ids = await db.create_logs_batch(
+            "u1",
+            [
+                {"dish_name": "A", "tags": ["x"]},
+                {"dish_name": "B", "tags": ["y"]},
+                {"dish_name": "C", "cuisine": "Thai"},
+            ],
+        )
+        assert len(ids) == 3
+        logs = {log["id"]: log for log in await db.get_logs_by_ids("u1", ids)}
+        assert [logs[i]["dish_name"] for i in ids] == ["A", "B", "C"]
+        assert logs[ids[0]]["tags"] == ["x"]
+        assert logs[ids[2]]["cuisine"] == "Thai"
+        stats = await db.get_user_stats("u1")
+        assert stats["total_logs"] == 3
+
+    @pytest.mark.asyncio
+    async def test_commits_once(self, db):
+        with patch.object(db, "_commit", wraps=db._commit) as commit:
+            await db.create_logs_batch("u1", [{"dish_name": str(i)} for i in range(40)])
+        assert commit.await_count == 1
+        assert await db.count_user_logs("u1") == 40
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_leaves_no_rows(self, db):
+        entries = [{"dish_name": "a"}, {"dish_name": "b"}, {"dish_name": "c", "bogus_col": 1}]
+        # The unrelated write is still uncommitted when the batch runs
+        results = await asyncio.gather(
+            db.create_log("u1", {"dish_name": "unrelated"}),
+            db.create_logs_batch("u1", entries),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], aiosqlite.OperationalError)
+        # Another writer commits after the failure; only its own row is kept
+        await db.create_log("u2", {"dish_name": "later"})
+        assert [log["dish_name"] for log in await db.get_user_logs("u1")] == ["unrelated"]
+        assert (await db.get_user_stats("u1"))["total_logs"] == 1
+
+
 class TestUpdateLog:
     @pytest.mark.asyncio
     async def test_updates_existing(self, db):
@@ -362,6 +650,13 @@ class TestGetAllUserLogs:
         logs = await db.get_all_user_logs("u1", limit=2)
         assert len(logs) == 2
 
+    @pytest.mark.asyncio
+    async def test_fields_projection(self, db):
+        await db.create_log("u1", {"dish_name": "D", "nutrition": {"calories": 1}})
+        logs = await db.get_all_user_logs("u1", fields=["nutrition"])
+        assert set(logs[0]) == {"id", "nutrition"}
+        assert logs[0]["nutrition"] == {"calories": 1}
+
 
 class TestGetUserLogsPaginated:
     @pytest.mark.asyncio
@@ -395,6 +690,123 @@ class TestGetUserLogsPaginated:
         assert len(logs) == 1
 
 
+class TestGetUserLogsPage:
+    async def _walk(self, db, page_size, **kwargs):
+        seen, cursor, pages = [], None, 0
+        while True:
+            logs, cursor = await db.get_user_logs_page("u1", page_size=page_size, cursor=cursor, **kwargs)
+            seen.extend(log["id"] for log in logs)
+            pages += 1
+            if cursor is None:
+                return seen, pages
+
+    @pytest.mark.asyncio
+    async def test_walks_every_log_once_newest_first(self, db):
+        ids = [await db.create_log("u1", {"dish_name": f"D{i}"}) for i in range(7)]
+        seen, pages = await self._walk(db, page_size=3)
+        assert seen == list(reversed(ids))
+        assert pages == 3
+
+    @pytest.mark.asyncio
+    async def test_exact_multiple_has_no_trailing_cursor(self, db):
+        for i in range(4):
+            await db.create_log("u1", {"dish_name": f"D{i}"})
+        logs, cursor = await db.get_user_logs_page("u1", page_size=2)
+        logs, cursor = await db.get_user_logs_page("u1", page_size=2, cursor=cursor)
+        assert len(logs) == 2
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_identical_timestamps_break_ties_on_id(self, db):
+        for i in range(5):
+            await db.create_log("u1", {"dish_name": f"D{i}"})
+        await db.db.execute("UPDATE food_logs SET created_at = '2024-01-01T00:00:00+00:00'")
+        seen, _ = await self._walk(db, page_size=2)
+        assert len(seen) == 5
+        assert seen == sorted(seen, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_excludes_deleted_and_other_users(self, db):
+        keep = await db.create_log("u1", {"dish_name": "Keep"})
+        gone = await db.create_log("u1", {"dish_name": "Gone"})
+        await db.update_log("u1", gone, {"deleted": 1})
+        await db.create_log("u2", {"dish_name": "Other"})
+        logs, cursor = await db.get_user_logs_page("u1", page_size=10)
+        assert [log["id"] for log in logs] == [keep]
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_days_filter(self, db):
+        old = await db.create_log("u1", {"dish_name": "Old"})
+        await db.db.execute("UPDATE food_logs SET created_at = '2000-01-01T00:00:00+00:00' WHERE id = ?", (old,))
+        recent = await db.create_log("u1", {"dish_name": "Recent"})
+        logs, _ = await db.get_user_logs_page("u1", days=7)
+        assert [log["id"] for log in logs] == [recent]
+
+    @pytest.mark.asyncio
+    async def test_decodes_json_fields(self, db):
+        await db.create_log("u1", {"dish_name": "X", "tags": ["a"]})
+        logs, _ = await db.get_user_logs_page("u1")
+        assert logs[0]["tags"] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_raises(self, db):
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            await db.get_user_logs_page("u1", cursor="not-a-cursor")
+
+
+class TestSearchLogs:
+    @pytest.mark.asyncio
+    async def test_ranks_dish_name_above_notes(self, db):
+        in_notes = await db.create_log("u1", {"dish_name": "Pizza", "notes": "craving ramen after this"})
+        in_dish = await db.create_log("u1", {"dish_name": "Shoyu Ramen"})
+        hits = await db.search_logs("u1", "ramen")
+        assert [hit["id"] for hit in hits] == [in_dish, in_notes]
+        assert hits[0]["search_score"] > hits[1]["search_score"] > 0
+
+    @pytest.mark.asyncio
+    async def test_matches_any_word_and_stems(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "Tacos", "ingredients": ["pickled onions", "pork"]})
+        hits = await db.search_logs("u1", "onion sandwich")
+        assert [hit["id"] for hit in hits] == [log_id]
+        assert hits[0]["ingredients"] == ["pickled onions", "pork"]
+
+    @pytest.mark.asyncio
+    async def test_scoped_to_user_and_live_logs(self, db):
+        await db.create_log("u2", {"dish_name": "Ramen"})
+        deleted = await db.create_log("u1", {"dish_name": "Ramen"})
+        await db.update_log("u1", deleted, {"deleted": 1})
+        assert await db.search_logs("u1", "ramen") == []
+
+    @pytest.mark.asyncio
+    async def test_index_follows_updates_and_deletes(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "Ramen"})
+        await db.update_log("u1", log_id, {"dish_name": "Udon"})
+        assert await db.search_logs("u1", "ramen") == []
+        assert [hit["id"] for hit in await db.search_logs("u1", "udon")] == [log_id]
+        await db.delete_log("u1", log_id)
+        assert await db.search_logs("u1", "udon") == []
+
+    @pytest.mark.asyncio
+    async def test_fields_projection(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "Ramen", "notes": "rich"})
+        hits = await db.search_logs("u1", "ramen", fields=["dish_name"])
+        assert set(hits[0]) == {"id", "dish_name", "search_score"}
+        assert hits[0]["id"] == log_id
+
+    @pytest.mark.asyncio
+    async def test_fts_syntax_is_treated_as_text(self, db):
+        await db.create_log("u1", {"dish_name": "Ramen"})
+        assert await db.search_logs("u1", 'dish_name: NEAR( "*') == []
+        assert await db.search_logs("u1", "   ") == []
+
+    @pytest.mark.asyncio
+    async def test_limit(self, db):
+        for i in range(5):
+            await db.create_log("u1", {"dish_name": f"Ramen {i}"})
+        assert len(await db.search_logs("u1", "ramen", limit=2)) == 2
+
+
 class TestCountUserLogs:
     @pytest.mark.asyncio
     async def test_empty(self, db):
@@ -477,6 +889,28 @@ class TestUpdatePantryItemsBatch:
         )
         assert len(ids) == 1
 
+    @pytest.mark.asyncio
+    async def test_upserts_existing_in_one_commit(self, db):
+        await db.update_pantry_item("u1", {"name": "Eggs", "quantity": 12})
+        with patch.object(db, "_commit", wraps=db._commit) as commit:
+            ids = await db.update_pantry_items_batch(
+                "u1",
+                [{"name": "Eggs", "quantity": 6}, {"name": "Whole Milk", "quantity": 1, "unit": "gal"}],
+            )
+        assert ids == ["eggs", "whole_milk"]
+        assert commit.await_count == 1
+        items = {item["id"]: item for item in await db.get_pantry("u1")}
+        assert items["eggs"]["quantity"] == 6
+        assert items["whole_milk"]["unit"] == "gal"
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_changes_nothing(self, db):
+        await db.update_pantry_item("u1", {"name": "Eggs", "quantity": 12})
+        with pytest.raises(aiosqlite.OperationalError):
+            await db.update_pantry_items_batch("u1", [{"name": "Eggs", "quantity": 6}, {"name": "Milk", "bogus": 1}])
+        await db.add_pantry_item("u2", {"name": "Salt"})
+        assert [(item["id"], item["quantity"]) for item in await db.get_pantry("u1")] == [("eggs", 12)]
+
 
 class TestAddPantryItem:
     @pytest.mark.asyncio
@@ -487,6 +921,28 @@ class TestAddPantryItem:
         assert len(items) == 1
 
 
+class TestAddPantryItemsBatch:
+    @pytest.mark.asyncio
+    async def test_empty(self, db):
+        assert await db.add_pantry_items_batch("u1", []) == []
+
+    @pytest.mark.asyncio
+    async def test_adds_items(self, db):
+        items = [{"name": "Salt"}, {"name": "Pepper", "quantity": 2}]
+        ids = await db.add_pantry_items_batch("u1", items)
+        assert len(set(ids)) == 2
+        pantry = {item["id"]: item for item in await db.get_pantry("u1")}
+        assert [pantry[i]["name"] for i in ids] == ["Salt", "Pepper"]
+        assert "id" not in items[0]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_adds_nothing(self, db):
+        with pytest.raises(aiosqlite.OperationalError):
+            await db.add_pantry_items_batch("u1", [{"name": "Salt"}, {"name": "Pepper", "bogus": 1}])
+        await db.add_pantry_item("u2", {"name": "Salt"})
+        assert await db.get_pantry("u1") == []
+
+
 class TestDeletePantryItem:
     @pytest.mark.asyncio
     async def test_found(self, db):
@@ -695,16 +1151,12 @@ class TestUpdateUserPreferences:
 
 class TestInvalidateUserStats:
     @pytest.mark.asyncio
-    async def test_clears_stats(self, db):
+    async def test_resyncs_aggregate(self, db):
         await db.create_log("u1", {"dish_name": "X"})
-        # Build stats cache
-        await db.get_user_stats("u1")
-        # Invalidate
+        await db.db.execute("UPDATE user_log_totals SET total_logs = 99 WHERE user_id = ?", ("u1",))
         await db.invalidate_user_stats("u1")
-        # Check stats is NULL
-        async with db.db.execute("SELECT stats FROM users WHERE id = ?", ("u1",)) as cur:
-            row = await cur.fetchone()
-        assert row[0] is None
+        stats = await db.get_user_stats("u1")
+        assert stats["total_logs"] == 1
 
 
 class TestGetUserStats:
@@ -743,17 +1195,13 @@ class TestGetUserStats:
 
     @pytest.mark.asyncio
     async def test_stale_streak_reset(self, db):
-        """When last_log_date is > 1 day ago, current_streak should reset to 0."""
-        await db.create_log("u1", {"dish_name": "X"})
-        stats = await db.get_user_stats("u1")
-        # Manually set last_log_date to 5 days ago in cached stats
-        stats["last_log_date"] = (datetime.now(UTC) - timedelta(days=5)).date().isoformat()
-        stats["current_streak"] = 3
-        stats_json = json.dumps(stats)
-        await db.db.execute("UPDATE users SET stats = ? WHERE id = ?", (stats_json, "u1"))
-        await db.db.commit()
+        """When the last log is > 1 day ago, current_streak is 0 but longest_streak remains."""
+        log_id = await db.create_log("u1", {"dish_name": "X"})
+        five_days_ago = (datetime.now(UTC) - timedelta(days=5)).isoformat()
+        await db.db.execute("UPDATE food_logs SET created_at = ? WHERE id = ?", (five_days_ago, log_id))
         result = await db.get_user_stats("u1")
         assert result["current_streak"] == 0
+        assert result["longest_streak"] == 1
 
     @pytest.mark.asyncio
     async def test_streak_yesterday_still_active(self, db):
@@ -819,45 +1267,6 @@ class TestGetUserStats:
         stats = await db.get_user_stats("ghost")
         assert stats["total_logs"] == 0
 
-    @pytest.mark.asyncio
-    async def test_cached_stats_without_last_log_date(self, db):
-        """Cached stats that have no last_log_date key (falsy) should return as-is."""
-        cached = {
-            "current_streak": 0,
-            "longest_streak": 0,
-            "total_logs": 0,
-            "cuisines_tried": 0,
-            "first_log_date": None,
-            "last_log_date": None,
-        }
-        await db.db.execute(
-            "INSERT INTO users (id, stats) VALUES (?, ?)",
-            ("u_cached", json.dumps(cached)),
-        )
-        await db.db.commit()
-        stats = await db.get_user_stats("u_cached")
-        assert stats["total_logs"] == 0
-
-    @pytest.mark.asyncio
-    async def test_cached_stats_with_invalid_last_log_date(self, db):
-        """Cached stats with invalid date string in last_log_date."""
-        cached = {
-            "current_streak": 5,
-            "longest_streak": 5,
-            "total_logs": 10,
-            "cuisines_tried": 3,
-            "first_log_date": "2025-01-01",
-            "last_log_date": "not-a-date",
-        }
-        await db.db.execute(
-            "INSERT INTO users (id, stats) VALUES (?, ?)",
-            ("u_bad_date", json.dumps(cached)),
-        )
-        await db.db.commit()
-        stats = await db.get_user_stats("u_bad_date")
-        # ValueError branch: stats returned as-is with original streak
-        assert stats["current_streak"] == 5
-
     @pytest.mark.asyncio
     async def test_logs_with_no_cuisine(self, db):
         """Logs that have NULL cuisine should not be added to cuisines set."""
@@ -937,60 +1346,318 @@ class TestGetUserStats:
         assert stats["first_log_date"] is None
         assert stats["last_log_date"] is None
 
-    @pytest.mark.asyncio
-    async def test_logs_with_empty_created_at_in_window(self, db):
-        """Cover the ``if created:`` falsy branch (line 600->605).
-
-        The 90-day window SQL filter ``created_at >= ?`` normally prevents
-        NULL / empty created_at rows from appearing.  We wrap the connection's
-        execute so that the 90-day cuisine/streak query returns a fake row
-        whose ``created_at`` is the empty string, while all other queries
-        pass through to the real database.
-        """
-        # Create a real log so total_logs > 0
-        await db.create_log("u1", {"dish_name": "Real"})
-        await db.invalidate_user_stats("u1")
 
-        # Build a fake row tuple: (created_at, cuisine) where created_at is ""
-        fake_row = ("", "Italian")
+class TestUserStatsAggregate:
+    @staticmethod
+    def _at(days_ago: int) -> str:
+        return (datetime.now(UTC) - timedelta(days=days_ago)).replace(hour=12).isoformat()
 
-        original_execute = db.db.execute
+    @pytest.mark.asyncio
+    async def test_runs_merge_and_split(self, db):
+        ids = {}
+        for days_ago in (4, 2, 3):
+            ids[days_ago] = await db.create_log("u1", {"dish_name": "X"})
+            await db.db.execute("UPDATE food_logs SET created_at = ? WHERE id = ?", (self._at(days_ago), ids[days_ago]))
+        assert (await db.get_user_stats("u1"))["longest_streak"] == 3
 
-        class _FakeCursorCtx:
-            """Mimics aiosqlite's cursor context manager and plain await."""
+        await db.delete_log("u1", ids[3])
+        stats = await db.get_user_stats("u1")
+        assert stats["longest_streak"] == 1
+        assert stats["current_streak"] == 0
+        assert await db.check_user_stats("u1") == {}
 
-            def __init__(self, rows):
-                self._rows = rows
+    @pytest.mark.asyncio
+    async def test_soft_delete_and_restore(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "X", "cuisine": "Thai"})
+        await db.update_log("u1", log_id, {"deleted": 1})
+        stats = await db.get_user_stats("u1")
+        assert stats["total_logs"] == 0
+        assert stats["cuisines_tried"] == 0
+        await db.update_log("u1", log_id, {"deleted": 0})
+        stats = await db.get_user_stats("u1")
+        assert stats["total_logs"] == 1
+        assert stats["cuisines_tried"] == 1
+        assert stats["current_streak"] == 1
 
-            async def __aenter__(self):
-                return self
+    @pytest.mark.asyncio
+    async def test_cuisines_count_all_history(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "X", "cuisine": "Thai"})
+        await db.db.execute("UPDATE food_logs SET created_at = ? WHERE id = ?", (self._at(400), log_id))
+        await db.create_log("u1", {"dish_name": "Y", "cuisine": "Greek"})
+        assert (await db.get_user_stats("u1"))["cuisines_tried"] == 2
 
-            async def __aexit__(self, *exc):
-                pass
+    @pytest.mark.asyncio
+    async def test_future_dated_run_counts_up_to_today(self, db):
+        for days_ago in (1, 0, -1):
+            log_id = await db.create_log("u1", {"dish_name": "X"})
+            await db.db.execute("UPDATE food_logs SET created_at = ? WHERE id = ?", (self._at(days_ago), log_id))
+        stats = await db.get_user_stats("u1")
+        assert stats["current_streak"] == 2
+        assert stats["longest_streak"] == 3
+        assert await db.check_user_stats("u1") == {}
+
+    @pytest.mark.asyncio
+    async def test_random_edits_stay_consistent(self, db):
+        rng = random.Random(1234)
+        cuisines = ["Thai", "thai", "Greek", "", None]
+        live: list[str] = []
+        for _ in range(150):
+            op = rng.random()
+            if op < 0.4 or not live:
+                live.append(await db.create_log(rng.choice(["u1", "u2"]), {"cuisine": rng.choice(cuisines)}))
+            elif op < 0.6:
+                await db.db.execute(
+                    "UPDATE food_logs SET created_at = ? WHERE id = ?",
+                    (self._at(rng.randint(-2, 12)), rng.choice(live)),
+                )
+            elif op < 0.7:
+                await db.db.execute(
+                    "UPDATE food_logs SET cuisine = ? WHERE id = ?", (rng.choice(cuisines), rng.choice(live))
+                )
+            elif op < 0.8:
+                await db.db.execute("UPDATE food_logs SET deleted = 1 - deleted WHERE id = ?", (rng.choice(live),))
+            elif op < 0.9:
+                await db.db.execute(
+                    "UPDATE food_logs SET user_id = ? WHERE id = ?", (rng.choice(["u1", "u2"]), rng.choice(live))
+                )
+            else:
+                log_id = live.pop(rng.randrange(len(live)))
+                await db.db.execute("DELETE FROM food_logs WHERE id = ?", (log_id,))
+            assert await db.check_user_stats("u1") == {}
+            assert await db.check_user_stats("u2") == {}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_repairs_drift(self, db):
+        await db.create_log("u1", {"dish_name": "X", "cuisine": "Thai"})
+        await db.create_log("u2", {"dish_name": "Y"})
+        await db.db.execute("DELETE FROM user_cuisines")
+        await db.db.execute("UPDATE user_log_totals SET total_logs = 7")
+        assert await db.check_user_stats("u1") == {"total_logs": (7, 1), "cuisines_tried": (0, 1)}
+
+        assert await db.rebuild_user_stats() == 2
+        assert await db.check_user_stats("u1") == {}
+        assert await db.check_user_stats("u2") == {}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_clears_users_without_logs(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "X"})
+        await db.db.execute("DROP TRIGGER food_logs_stats_delete")
+        await db.db.execute("DELETE FROM food_logs WHERE id = ?", (log_id,))
+        assert (await db.get_user_stats("u1"))["total_logs"] == 1
+        await db.rebuild_user_stats()
+        assert (await db.get_user_stats("u1"))["total_logs"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rebuild_with_no_users(self, db):
+        assert await db.rebuild_user_stats() == 0
+
+
+class TestDailyRollups:
+    START, END = date(2026, 1, 1), date(2026, 1, 31)
+
+    @staticmethod
+    def _at(day: int, hour: int = 12) -> str:
+        return datetime(2026, 1, day, hour, tzinfo=UTC).isoformat()
+
+    async def _log(self, db, user_id: str, day: int, **data) -> str:
+        log_id = await db.create_log(user_id, data)
+        await db.db.execute("UPDATE food_logs SET created_at = ? WHERE id = ?", (self._at(day), log_id))
+        return log_id
+
+    @pytest.mark.asyncio
+    async def test_aggregates_per_day(self, db):
+        await self._log(db, "u1", 2, cuisine="Thai", venue_name="Home", nutrition={"calories": 400, "protein_g": 20})
+        await self._log(db, "u1", 2, cuisine="thai", nutrition={"calories": 250.5, "fat_g": True})
+        await self._log(db, "u1", 5, venue_name="Cafe", nutrition="lots")
+        await self._log(db, "u2", 2, nutrition={"calories": 900})
+
+        rollups = await db.get_daily_rollups("u1", self.START, self.END)
+
+        assert rollups == [
+            {
+                "day": "2026-01-02",
+                "meal_count": 2,
+                "logs_with_nutrition": 2,
+                "calories": 650.5,
+                "protein_g": 20,
+                "carbs_g": 0,
+                "fat_g": 0,
+                "fiber_g": 0,
+                "cuisines": {"thai": 2},
+                "venues": {"Home": 1},
+            },
+            {
+                "day": "2026-01-05",
+                "meal_count": 1,
+                "logs_with_nutrition": 0,
+                "calories": 0,
+                "protein_g": 0,
+                "carbs_g": 0,
+                "fat_g": 0,
+                "fiber_g": 0,
+                "cuisines": {},
+                "venues": {"Cafe": 1},
+            },
+        ]
+        assert await db.check_daily_rollups("u1") == {}
+
+    @pytest.mark.asyncio
+    async def test_range_is_inclusive(self, db):
+        for day in (1, 2, 3, 4):
+            await self._log(db, "u1", day)
+        rollups = await db.get_daily_rollups("u1", date(2026, 1, 2), date(2026, 1, 3))
+        assert [r["day"] for r in rollups] == ["2026-01-02", "2026-01-03"]
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_adjust_rollups(self, db):
+        log_id = await self._log(db, "u1", 3, cuisine="Thai", nutrition={"calories": 500})
+        await db.update_log("u1", log_id, {"cuisine": "Greek", "nutrition": {"calories": 300}})
+        [rollup] = await db.get_daily_rollups("u1", self.START, self.END)
+        assert rollup["calories"] == 300
+        assert rollup["cuisines"] == {"greek": 1}
+
+        await db.delete_log("u1", log_id)
+        assert await db.get_daily_rollups("u1", self.START, self.END) == []
+
+    @pytest.mark.asyncio
+    async def test_random_edits_stay_consistent(self, db):
+        rng = random.Random(4321)
+        nutritions = [None, {"calories": 410, "protein_g": 12.3}, {"calories": 99.9, "fiber_g": 4}, "unknown", [1]]
+        live: list[str] = []
+        for _ in range(150):
+            op = rng.random()
+            if op < 0.4 or not live:
+                live.append(
+                    await self._log(
+                        db,
+                        rng.choice(["u1", "u2"]),
+                        rng.randint(1, 6),
+                        cuisine=rng.choice(["Thai", "thai", "", None]),
+                        venue_name=rng.choice(["Home", "Cafe", "", None]),
+                        nutrition=rng.choice(nutritions),
+                    )
+                )
+            elif op < 0.55:
+                await db.db.execute(
+                    "UPDATE food_logs SET created_at = ? WHERE id = ?", (self._at(rng.randint(1, 6)), rng.choice(live))
+                )
+            elif op < 0.7:
+                await db.update_log("u1", rng.choice(live), {"nutrition": rng.choice(nutritions)})
+            elif op < 0.8:
+                await db.db.execute("UPDATE food_logs SET deleted = 1 - deleted WHERE id = ?", (rng.choice(live),))
+            elif op < 0.9:
+                await db.db.execute(
+                    "UPDATE food_logs SET user_id = ?, venue_name = ? WHERE id = ?",
+                    (rng.choice(["u1", "u2"]), rng.choice(["Home", None]), rng.choice(live)),
+                )
+            else:
+                log_id = live.pop(rng.randrange(len(live)))
+                await db.db.execute("DELETE FROM food_logs WHERE id = ?", (log_id,))
+            assert await db.check_daily_rollups("u1") == {}
+            assert await db.check_daily_rollups("u2") == {}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_repairs_drift(self, db):
+        await self._log(db, "u1", 2, cuisine="Thai", nutrition={"calories": 500})
+        await self._log(db, "u2", 2)
+        await db.db.execute("UPDATE daily_nutrition SET calories = 7")
+        await db.db.execute("DELETE FROM daily_cuisines")
+        mismatches = await db.check_daily_rollups("u1")
+        assert list(mismatches) == ["2026-01-02"]
+        maintained, recomputed = mismatches["2026-01-02"]
+        assert (maintained["calories"], recomputed["calories"]) == (7, 500)
+
+        assert await db.rebuild_daily_rollups() == 2
+        assert await db.check_daily_rollups("u1") == {}
+        assert await db.check_daily_rollups("u2") == {}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_clears_users_without_logs(self, db):
+        log_id = await self._log(db, "u1", 2)
+        await db.db.execute("DROP TRIGGER food_logs_rollup_delete")
+        await db.db.execute("DELETE FROM food_logs WHERE id = ?", (log_id,))
+        assert await db.check_daily_rollups("u1") != {}
+        await db.rebuild_daily_rollups()
+        assert await db.get_daily_rollups("u1", self.START, self.END) == []
+
+    @pytest.mark.asyncio
+    async def test_rebuild_with_no_users(self, db):
+        assert await db.rebuild_daily_rollups() == 0
+
+
+class TestDataVersion:
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_version_zero(self, db):
+        assert await db.get_data_version("nobody") == 0
+
+    @pytest.mark.asyncio
+    async def test_log_writes_bump_version(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "Ramen"})
+        assert await db.get_data_version("u1") == 1
+        await db.create_logs_batch("u1", [{"dish_name": "Pho"}, {"dish_name": "Tacos"}])
+        assert await db.get_data_version("u1") == 3
+        await db.update_log("u1", log_id, {"rating": 5})
+        assert await db.get_data_version("u1") == 4
+        await db.delete_log("u1", log_id)
+        assert await db.get_data_version("u1") == 5
+        assert await db.get_data_version("u2") == 0
+
+    @pytest.mark.asyncio
+    async def test_pantry_and_preference_writes_bump_version(self, db):
+        item_id = await db.add_pantry_item("u1", {"name": "Eggs"})
+        await db.update_pantry_item("u1", {"id": item_id, "name": "Eggs", "quantity": 6})
+        await db.delete_pantry_item("u1", item_id)
+        assert await db.get_data_version("u1") == 3
+        await db.update_user_preferences("u1", {"timezone": "UTC"})
+        assert await db.get_data_version("u1") == 4
+        await db.update_user_preferences("u1", {"timezone": "UTC"})
+        assert await db.get_data_version("u1") == 4
 
-            async def fetchall(self):
-                return self._rows
+    @pytest.mark.asyncio
+    async def test_reads_and_activity_leave_version_alone(self, db):
+        await db.create_log("u1", {"dish_name": "Ramen"})
+        version = await db.get_data_version("u1")
+        await db.get_user_logs("u1")
+        await db.get_user_stats("u1")
+        await db.store_notification("u1", "tip", {"text": "hi"})
+        assert await db.get_data_version("u1") == version
 
-            async def fetchone(self):
-                return self._rows[0] if self._rows else None
+    @pytest.mark.asyncio
+    async def test_moving_a_log_bumps_both_users(self, db):
+        log_id = await db.create_log("u1", {"dish_name": "Ramen"})
+        await db.db.execute("UPDATE food_logs SET user_id = 'u2' WHERE id = ?", (log_id,))
+        assert (await db.get_data_version("u1"), await db.get_data_version("u2")) == (2, 1)
 
-            # Allow plain ``await execute(...)`` (non-SELECT usage)
-            def __await__(self):
-                return self._finish().__await__()
 
-            async def _finish(self):
-                return self
+class TestTasteProfileSnapshots:
+    @pytest.mark.asyncio
+    async def test_missing_snapshot_is_none(self, db):
+        assert await db.get_taste_profile_snapshot("u1", "month") is None
 
-        def patched_execute(sql, params=None):
-            if "created_at, cuisine" in sql:
-                return _FakeCursorCtx([fake_row])
-            return original_execute(sql, params)
+    @pytest.mark.asyncio
+    async def test_round_trip_per_period(self, db):
+        snapshot = {
+            "profile": {"total_meals": 3, "top_cuisines": ["Thai"]},
+            "log_count": 3,
+            "data_version": 5,
+            "built_at": "2026-01-01T00:00:00+00:00",
+        }
+        await db.save_taste_profile_snapshot("u1", "month", snapshot)
+        assert await db.get_taste_profile_snapshot("u1", "month") == snapshot
+        assert await db.get_taste_profile_snapshot("u1", "week") is None
+        assert await db.get_taste_profile_snapshot("u2", "month") is None
 
-        with patch.object(db._db, "execute", side_effect=patched_execute):
-            stats = await db.get_user_stats("u1")
+        await db.save_taste_profile_snapshot("u1", "month", {**snapshot, "log_count": 4})
+        assert (await db.get_taste_profile_snapshot("u1", "month"))["log_count"] == 4
 
-        # The empty created_at is skipped; Italian is still counted
-        assert stats["cuisines_tried"] == 1
+    @pytest.mark.asyncio
+    async def test_saving_leaves_version_alone(self, db):
+        await db.create_log("u1", {"dish_name": "Ramen"})
+        version = await db.get_data_version("u1")
+        await db.save_taste_profile_snapshot(
+            "u1", "all_time", {"profile": {}, "log_count": 1, "data_version": version, "built_at": "x"}
+        )
+        assert await db.get_data_version("u1") == version
 
 
 # ===========================================================================
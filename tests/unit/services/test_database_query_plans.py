@@ -0,0 +1,345 @@
+"""Query-plan regression suite for fcp.services.database.
+
+Every statement the ``Database`` backend issues is captured through the
+SQLite trace callback while a workload exercises each public method. Each
+captured statement is then run through ``EXPLAIN QUERY PLAN`` and the test
+fails if any of them falls back to a full table ``SCAN``. FTS5 lookups show
+up as ``SCAN ... VIRTUAL TABLE INDEX`` and scalar-subquery selects as
+``SCAN CONSTANT ROW``; neither reads a table.
+"""
+
+import inspect
+import json
+from datetime import UTC, date, datetime, timedelta
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+
+from fcp.services.database import _CREATE_TABLES, _MIGRATIONS, Database
+
+USER = "plan-user"
+
+_PLANNED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "INSERT")
+
+
+async def _run_workload(db: Database) -> set[str]:
+    """Call every public Database method once and return the names exercised."""
+    now = datetime.now(UTC)
+    called: set[str] = set()
+
+    async def call(name: str, *args, **kwargs):
+        called.add(name)
+        return await getattr(db, name)(*args, **kwargs)
+
+    log_id = await call("create_log", USER, {"dish_name": "Ramen", "cuisine": "Japanese", "tags": ["x"]})
+    await call("create_logs_batch", USER, [{"dish_name": "Pho", "cuisine": "Vietnamese"}, {"dish_name": "Banh Mi"}])
+    await call("get_user_logs", USER, limit=10)
+    await call("get_user_logs", USER, days=7)
+    await call("get_user_logs", USER, limit=500, fields=["dish_name", "cuisine", "created_at"])
+    await call("get_user_logs", USER, start_date=now - timedelta(days=3), end_date=now)
+    await call("get_log", USER, log_id)
+    await call("get_logs_by_ids", USER, [log_id, "missing"])
+    await call("update_log", USER, log_id, {"notes": "rich"})
+    await call("get_all_user_logs", USER)
+    await call("get_all_user_logs", USER, limit=5)
+    await call("get_user_logs_paginated", USER, page=2, page_size=5)
+    _, cursor = await call("get_user_logs_page", USER, page_size=1)
+    await call("get_user_logs_page", USER, page_size=1, cursor=cursor, days=7)
+    await call("count_user_logs", USER)
+    await call("search_logs", USER, "ramen japanese", limit=5)
+
+    await call("get_pantry", USER)
+    await call("update_pantry_item", USER, {"name": "Rice", "quantity": 1})
+    await call("update_pantry_items_batch", USER, [{"name": "Eggs"}, {"quantity": 2}])
+    item_id = await call("add_pantry_item", USER, {"name": "Milk"})
+    await call("add_pantry_items_batch", USER, [{"name": "Flour"}, {"name": "Sugar", "quantity": 2}])
+    await call("delete_pantry_item", USER, item_id)
+
+    recipe_id = await call("create_recipe", USER, {"name": "Curry", "ingredients": ["rice"]})
+    await call("get_recipes", USER)
+    await call("get_recipes", USER, favorites_only=True)
+    await call("get_recipes", USER, include_archived=True)
+    await call("get_recipe", USER, recipe_id)
+    await call("update_recipe", USER, recipe_id, {"is_favorite": 1})
+    await call("delete_recipe", USER, recipe_id)
+
+    await call("save_receipt", USER, {"items": []})
+
+    await call("get_active_users", days=7)
+    await call("update_user_preferences", USER, {"timezone": "UTC"})
+    await call("get_user_preferences", USER)
+    await call("invalidate_user_stats", USER)
+    await call("get_user_stats", USER)
+    await call("rebuild_user_stats", USER)
+    await call("check_user_stats", USER)
+    await call("get_daily_rollups", USER, (now - timedelta(days=30)).date(), now.date())
+    await call("rebuild_daily_rollups", USER)
+    await call("check_daily_rollups", USER)
+    await call("get_data_version", USER)
+    snapshot = {"profile": {"total_meals": 1}, "log_count": 1, "data_version": 1, "built_at": now.isoformat()}
+    await call("save_taste_profile_snapshot", USER, "month", snapshot)
+    await call("get_taste_profile_snapshot", USER, "month")
+
+    nid = await call("store_notification", USER, "tip", {"text": "hi"})
+    await call("get_user_notifications", USER)
+    await call("get_user_notifications", USER, unread_only=True)
+    await call("mark_notification_read", USER, nid)
+
+    draft_id = await call("save_draft", USER, {"content_type": "blog", "content": {"t": 1}, "status": "draft"})
+    await call("get_drafts", USER)
+    await call("get_draft", USER, draft_id)
+    await call("update_draft", USER, draft_id, {"status": "ready"})
+    content_id, _ = await call("publish_draft", USER, draft_id, {"content": {"t": 1}})
+    await call("save_published_content", USER, {"content": {"t": 2}})
+    await call("get_published_content", USER)
+    await call("get_published_content_item", USER, content_id)
+    await call("update_published_content", USER, content_id, {"platforms": ["x"]})
+    await call("delete_draft", USER, draft_id)
+
+    await call("delete_log", USER, log_id)
+    return called
+
+
+def _public_methods() -> set[str]:
+    return {
+        name
+        for name, _ in inspect.getmembers(Database, inspect.iscoroutinefunction)
+        if not name.startswith("_") and name not in {"connect", "close"}
+    }
+
+
+@pytest_asyncio.fixture
+async def traced_db():
+    database = Database(":memory:")
+    await database.connect()
+    statements: list[str] = []
+    await database.db.set_trace_callback(statements.append)
+    yield database, statements
+    await database.close()
+
+
+async def _explain(conn: aiosqlite.Connection, sql: str) -> list[str]:
+    async with conn.execute(f"EXPLAIN QUERY PLAN {sql}") as cursor:
+        rows = await cursor.fetchall()
+    return [row[3] for row in rows]
+
+
+class TestQueryPlans:
+    @pytest.mark.asyncio
+    async def test_workload_covers_every_public_method(self, traced_db):
+        database, _ = traced_db
+        called = await _run_workload(database)
+        missing = _public_methods() - called
+        assert not missing, f"Add these Database methods to the query-plan workload: {sorted(missing)}"
+
+    @pytest.mark.asyncio
+    async def test_no_statement_scans_a_table(self, traced_db):
+        database, statements = traced_db
+        await _run_workload(database)
+        await database.db.set_trace_callback(None)
+
+        planned = {s.strip() for s in statements if s.lstrip().upper().startswith(_PLANNED_PREFIXES)}
+        assert planned
+
+        regressions = {}
+        for sql in sorted(planned):
+            plan = await _explain(database.db, sql)
+            scans = [
+                d for d in plan if d.startswith("SCAN") and "VIRTUAL TABLE INDEX" not in d and d != "SCAN CONSTANT ROW"
+            ]
+            if scans:
+                regressions[sql] = scans
+        assert not regressions, f"Full table scans detected: {regressions}"
+
+    @pytest.mark.asyncio
+    async def test_unread_notifications_use_partial_index(self, traced_db):
+        database, _ = traced_db
+        plan = await _explain(
+            database.db,
+            "SELECT * FROM notifications WHERE user_id = 'u' AND read = 0 ORDER BY created_at DESC LIMIT 20",
+        )
+        assert any("idx_notifications_user_unread" in d for d in plan)
+        assert not any("TEMP B-TREE" in d for d in plan)
+
+    @pytest.mark.asyncio
+    async def test_log_listing_avoids_sort(self, traced_db):
+        database, _ = traced_db
+        plan = await _explain(
+            database.db,
+            "SELECT * FROM food_logs WHERE user_id = 'u' AND deleted = 0 ORDER BY created_at DESC, id DESC LIMIT 100",
+        )
+        assert any("idx_food_logs_user_deleted_created_id" in d for d in plan)
+        assert not any("TEMP B-TREE" in d for d in plan)
+
+    @pytest.mark.asyncio
+    async def test_keyset_page_seeks_index(self, traced_db):
+        database, _ = traced_db
+        plan = await _explain(
+            database.db,
+            "SELECT * FROM food_logs WHERE user_id = 'u' AND deleted = 0 AND (created_at, id) < ('2024', 'x') "
+            "ORDER BY created_at DESC, id DESC LIMIT 101",
+        )
+        assert any("idx_food_logs_user_deleted_created_id" in d and "created_at" in d for d in plan)
+        assert not any("TEMP B-TREE" in d for d in plan)
+
+    @pytest.mark.asyncio
+    async def test_search_uses_fts_index(self, traced_db):
+        database, _ = traced_db
+        plan = await _explain(
+            database.db,
+            "SELECT f.* FROM food_logs_fts JOIN food_logs AS f ON f.rowid = food_logs_fts.rowid "
+            "WHERE food_logs_fts MATCH 'ramen' AND f.user_id = 'u' AND f.deleted = 0 "
+            "ORDER BY bm25(food_logs_fts) LIMIT 20",
+        )
+        assert any("food_logs_fts VIRTUAL TABLE INDEX" in d for d in plan)
+        assert any("USING INTEGER PRIMARY KEY" in d for d in plan)
+
+
+class TestMigrations:
+    @pytest.mark.asyncio
+    async def test_user_version_matches_latest_migration(self, traced_db):
+        database, _ = traced_db
+        assert await database._schema_version() == _MIGRATIONS[-1][0]
+
+    @pytest.mark.asyncio
+    async def test_migrations_upgrade_legacy_database(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(_CREATE_TABLES)
+            await conn.commit()
+
+        database = Database(path)
+        await database.connect()
+        try:
+            async with database.db.execute("SELECT name FROM sqlite_master WHERE type = 'index'") as cursor:
+                names = {row[0] for row in await cursor.fetchall()}
+            assert "idx_food_logs_user_deleted_created_id" in names
+            assert "idx_food_logs_user_deleted_created" not in names
+            assert "food_logs_fts_insert" in {
+                row[0] for row in await database._fetchall("SELECT name FROM sqlite_master WHERE type = 'trigger'", ())
+            }
+            assert await database._schema_version() == _MIGRATIONS[-1][0]
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_fts_migration_indexes_existing_logs(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(_CREATE_TABLES)
+            await conn.execute(
+                "INSERT INTO food_logs (id, user_id, dish_name, created_at, deleted) VALUES (?, ?, ?, ?, 0)",
+                ("old-log", USER, "Pho Ga", "2020-01-01T00:00:00+00:00"),
+            )
+            await conn.commit()
+
+        database = Database(path)
+        await database.connect()
+        try:
+            hits = await database.search_logs(USER, "pho")
+            assert [hit["id"] for hit in hits] == ["old-log"]
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_stats_migration_backfills_existing_logs(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(_CREATE_TABLES)
+            for i, day in enumerate(("2020-01-01", "2020-01-02", "2020-01-04")):
+                await conn.execute(
+                    "INSERT INTO food_logs (id, user_id, cuisine, created_at, deleted) VALUES (?, ?, ?, ?, 0)",
+                    (f"log-{i}", USER, "Thai", f"{day}T12:00:00+00:00"),
+                )
+            await conn.commit()
+
+        database = Database(path)
+        await database.connect()
+        try:
+            stats = await database.get_user_stats(USER)
+            assert stats["total_logs"] == 3
+            assert stats["longest_streak"] == 2
+            assert stats["cuisines_tried"] == 1
+            assert await database.check_user_stats(USER) == {}
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_rollup_migration_backfills_existing_logs(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(_CREATE_TABLES)
+            for i, calories in enumerate((300, 450)):
+                await conn.execute(
+                    "INSERT INTO food_logs (id, user_id, nutrition, created_at, deleted) VALUES (?, ?, ?, ?, 0)",
+                    (f"log-{i}", USER, json.dumps({"calories": calories}), "2020-01-01T12:00:00+00:00"),
+                )
+            await conn.commit()
+
+        database = Database(path)
+        await database.connect()
+        try:
+            day = date(2020, 1, 1)
+            [rollup] = await database.get_daily_rollups(USER, day, day)
+            assert (rollup["meal_count"], rollup["calories"]) == (2, 750)
+            assert await database.check_daily_rollups(USER) == {}
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_json_migration_quotes_legacy_plain_text(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(_CREATE_TABLES)
+            await conn.execute(
+                "INSERT INTO food_logs (id, user_id, tags, nutrition, created_at, deleted) VALUES (?, ?, ?, ?, ?, 0)",
+                ("old-log", USER, "spicy, hot", '{"calories": 300}', "2020-01-01T00:00:00+00:00"),
+            )
+            await conn.commit()
+
+        database = Database(path)
+        await database.connect()
+        try:
+            [row] = await database._fetchall("SELECT tags, nutrition FROM food_logs", ())
+            assert tuple(row) == ('"spicy, hot"', '{"calories": 300}')
+            log = await database.get_log(USER, "old-log")
+            assert log["tags"] == "spicy, hot"
+            assert json.loads(log.to_json())["tags"] == "spicy, hot"
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_legacy_food_logs_gain_donation_columns(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        legacy_tables = _CREATE_TABLES.replace("    donated INTEGER DEFAULT 0,\n", "").replace(
+            "    donation_organization TEXT,\n", ""
+        )
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(legacy_tables)
+            await conn.commit()
+
+        database = Database(path)
+        await database.connect()
+        try:
+            log_id = await database.create_log(USER, {"dish_name": "Soup", "donated": True})
+            log = await database.get_log(USER, log_id)
+            assert log["donated"] == 1
+            assert log["donation_organization"] is None
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_reconnect_skips_applied_migrations(self, tmp_path):
+        path = tmp_path / "fcp.db"
+        database = Database(path)
+        await database.connect()
+        await database.close()
+
+        statements: list[str] = []
+        database = Database(path)
+        await database.connect()
+        await database.db.set_trace_callback(statements.append)
+        await database._apply_migrations()
+        assert not any("CREATE INDEX" in s for s in statements)
+        await database.close()
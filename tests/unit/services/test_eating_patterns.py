@@ -0,0 +1,116 @@
+"""Golden-value tests for the in-process eating-pattern analyzer."""
+
+from datetime import date, datetime
+
+from fcp.services.eating_patterns import columns_from_logs, format_summary, summarize
+
+LOGS = [
+    {"created_at": "2026-01-01T08:30:00+00:00", "dish_name": "Oatmeal", "nutrition": {"calories": 300}},
+    {
+        "created_at": "2026-01-01T19:00:00+00:00",
+        "dish_name": "Ramen",
+        "cuisine": "Japanese",
+        "venue_name": "Ippudo",
+        "nutrition": {"calories": 700},
+    },
+    {
+        "created_at": "2026-01-03T12:15:00+00:00",
+        "dish_name": "Ramen",
+        "cuisine": "japanese",
+        "venue_name": "Ippudo",
+        "nutrition": {"calories": 650},
+    },
+    {
+        "created_at": datetime(2026, 1, 4, 23, 0),
+        "dish_name": "Tacos",
+        "cuisine": "Mexican",
+        "venue_name": "Home",
+        "nutrition": {"calories": True},
+    },
+    {"created_at": "2026-01-05", "dish_name": "Pasta", "cuisine": "Italian", "venue_name": "Luigi's"},
+    {"dish_name": "Snack"},
+]
+
+
+class TestColumnsFromLogs:
+    def test_histograms(self):
+        columns = columns_from_logs(LOGS)
+        assert columns.entry_count == 6
+        assert columns.undated_entries == 1
+        assert columns.untimed_entries == 1
+        assert [h for h, count in enumerate(columns.hours) if count] == [8, 12, 19, 23]
+        assert list(columns.weekday_meals) == [1, 0, 0, 2, 0, 1, 1]
+        assert list(columns.weekday_days) == [1, 0, 0, 1, 0, 1, 1]
+        assert list(columns.weekday_calories) == [0, 0, 0, 1000, 0, 650, 0]
+
+    def test_invalid_dates_are_undated(self):
+        columns = columns_from_logs([{"created_at": "2026-02-30T12:00:00"}, {"created_at": 12}])
+        assert columns.undated_entries == 2
+        assert sum(columns.hours) == 0
+
+
+class TestSummarize:
+    def test_golden(self):
+        patterns = summarize(columns_from_logs(LOGS))
+        timing = patterns["meal_timing"]
+        assert timing["timed_entries"] == 4
+        assert timing["by_window"] == {"breakfast": 1, "lunch": 1, "afternoon": 0, "dinner": 1, "late_night": 1}
+        assert timing["peak_hour"] == 8
+        assert patterns["day_of_week"]["by_weekday"]["thursday"] == 2
+        assert patterns["day_of_week"]["weekday"] == {
+            "meals": 3,
+            "days_tracked": 2,
+            "meals_per_day": 1.5,
+            "avg_daily_calories": 500,
+        }
+        assert patterns["day_of_week"]["weekend"] == {
+            "meals": 2,
+            "days_tracked": 2,
+            "meals_per_day": 1,
+            "avg_daily_calories": 325,
+        }
+        assert patterns["cuisines"]["distribution"] == [
+            {"cuisine": "Japanese", "count": 2, "pct": 50},
+            {"cuisine": "Mexican", "count": 1, "pct": 25},
+            {"cuisine": "Italian", "count": 1, "pct": 25},
+        ]
+        assert patterns["cuisines"]["by_week"] == [
+            {"week": "2026-W01", "cuisines": {"Japanese": 2, "Mexican": 1}},
+            {"week": "2026-W02", "cuisines": {"Italian": 1}},
+        ]
+        assert patterns["home_vs_restaurant"] == {"home": 3, "restaurant": 3, "home_pct": 50}
+        assert patterns["top_venues"] == [{"venue_name": "Ippudo", "count": 2}, {"venue_name": "Luigi's", "count": 1}]
+        assert patterns["variety"] == {"unique_dishes": 5, "meals_with_dish": 6, "score": 0.833}
+
+    def test_empty(self):
+        patterns = summarize(columns_from_logs([]))
+        assert patterns["meal_timing"]["peak_hour"] is None
+        assert patterns["day_of_week"]["weekend"]["meals_per_day"] == 0
+        assert patterns["home_vs_restaurant"]["home_pct"] is None
+        assert patterns["variety"]["score"] is None
+        assert format_summary(patterns) == "No entries to analyze."
+
+
+class TestFormatSummary:
+    def test_summary_lines(self):
+        text = format_summary(summarize(columns_from_logs(LOGS)))
+        assert text.splitlines() == [
+            "Entries: 6",
+            "Meal times: breakfast 1, lunch 1, dinner 1, late_night 1; busiest hour 08:00",
+            "Weekdays: 1.5 meals/day, 500.0 kcal/day over 2 days",
+            "Weekends: 1.0 meals/day, 325.0 kcal/day over 2 days",
+            "Cuisines: Japanese 50.0%, Mexican 25.0%, Italian 25.0%",
+            "Home vs restaurant: 3 vs 3 (50.0% at home)",
+            "Top venues: Ippudo (2), Luigi's (1)",
+            "Variety: 5 unique dishes, score 0.833",
+        ]
+
+    def test_dates_without_times_or_dishes(self):
+        logs = [{"created_at": date(2026, 1, 6)}, {"created_at": date(2026, 1, 5), "nutrition": {"calories": 400}}]
+        columns = columns_from_logs(logs)
+        assert (columns.undated_entries, columns.untimed_entries) == (0, 2)
+        assert format_summary(summarize(columns)).splitlines() == [
+            "Entries: 2",
+            "Weekdays: 1.0 meals/day, 200.0 kcal/day over 2 days",
+            "Home vs restaurant: 2 vs 0 (100.0% at home)",
+        ]
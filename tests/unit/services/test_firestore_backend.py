@@ -2,7 +2,7 @@
 
 import importlib
 import sys
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -22,6 +22,13 @@ class MockDocument:
         return self._data
 
 
+class MockIncrement:
+    """Mock ``firestore.Increment`` transform."""
+
+    def __init__(self, value: int):
+        self.value = value
+
+
 class MockAsyncCollection:
     """Mock async Firestore collection with async streaming."""
 
@@ -36,10 +43,12 @@ class MockAsyncCollection:
             return doc
 
         async def async_set(data, merge=False):
-            if merge:
-                self._docs[doc_id] = MockDocument(doc_id, {**doc.to_dict(), **data}, exists=True)
-            else:
-                self._docs[doc_id] = MockDocument(doc_id, data, exists=True)
+            existing = self._docs[doc_id].to_dict() if merge and doc_id in self._docs else {}
+            data = {
+                key: existing.get(key, 0) + value.value if isinstance(value, MockIncrement) else value
+                for key, value in data.items()
+            }
+            self._docs[doc_id] = MockDocument(doc_id, {**existing, **data}, exists=True)
 
         async def async_update(data):
             if doc_id in self._docs:
@@ -70,6 +79,26 @@ class MockAsyncCollection:
         return query.limit(count)
 
 
+class MockAggregationResult:
+    """Mock Firestore aggregation result."""
+
+    def __init__(self, value: int):
+        self.value = value
+
+
+class MockAggregationQuery:
+    """Mock Firestore COUNT aggregation over a MockQuery."""
+
+    def __init__(self, query: "MockQuery"):
+        self._query = query
+
+    async def get(self):
+        count = 0
+        async for _ in self._query.stream():
+            count += 1
+        return [[MockAggregationResult(count)]]
+
+
 class MockQuery:
     """Mock Firestore query."""
 
@@ -77,6 +106,9 @@ class MockQuery:
         self._docs = docs
         self._filters = []
         self._order = None
+        self._orders = []
+        self._start_after = None
+        self._select = None
         self._limit_val = None
         self._offset_val = 0
 
@@ -86,6 +118,15 @@ class MockQuery:
 
     def order_by(self, field, direction=None):
         self._order = (field, direction)
+        self._orders.append(field)
+        return self
+
+    def select(self, field_paths):
+        self._select = list(field_paths)
+        return self
+
+    def start_after(self, values):
+        self._start_after = values
         return self
 
     def limit(self, count):
@@ -96,6 +137,9 @@ class MockQuery:
         self._offset_val = count
         return self
 
+    def count(self, alias=None):
+        return MockAggregationQuery(self)
+
     async def stream(self):
         """Async generator that yields documents."""
         filtered_docs = self._docs[:]
@@ -116,11 +160,22 @@ class MockQuery:
                     match = field_value is not None and field_value >= value
                 elif op == "<=":
                     match = field_value is not None and field_value <= value
+                elif op == "<":
+                    match = field_value is not None and field_value < value
 
                 if match:
                     new_filtered.append(doc)
             filtered_docs = new_filtered
 
+        # Apply cursor (all orderings are DESCENDING; "__name__" is the document ID)
+        if self._start_after is not None:
+
+            def sort_key(doc):
+                return tuple(doc.id if f == "__name__" else doc.to_dict().get(f) for f in self._orders)
+
+            cursor = tuple(self._start_after[f] for f in self._orders)
+            filtered_docs = [d for d in sorted(filtered_docs, key=sort_key, reverse=True) if sort_key(d) < cursor]
+
         # Apply offset
         if self._offset_val:
             filtered_docs = filtered_docs[self._offset_val :]
@@ -130,6 +185,9 @@ class MockQuery:
             filtered_docs = filtered_docs[: self._limit_val]
 
         for doc in filtered_docs:
+            if self._select is not None:
+                data = doc.to_dict()
+                doc = MockDocument(doc.id, {f: data[f] for f in self._select if f in data})
             yield doc
 
     def get(self):
@@ -139,11 +197,31 @@ class MockQuery:
         return mock_result
 
 
+class MockWriteBatch:
+    """Mock Firestore WriteBatch that applies its sets on commit."""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, ref, data, merge=False):
+        self._writes.append((ref, data, merge))
+
+    async def commit(self):
+        self._client.batch_sizes.append(len(self._writes))
+        for ref, data, merge in self._writes:
+            await ref.set(data, merge=merge)
+
+
 class MockFirestoreClient:
     """Mock Firestore AsyncClient."""
 
     def __init__(self):
         self._collections = {}
+        self.batch_sizes = []
+
+    def batch(self):
+        return MockWriteBatch(self)
 
     def collection(self, name: str):
         if name not in self._collections:
@@ -157,7 +235,8 @@ class MockFirestoreClient:
 @pytest.fixture
 def mock_firestore_client():
     """Provide a mock Firestore client for testing."""
-    return MockFirestoreClient()
+    with patch("fcp.services.firestore_backend.firestore", MagicMock(Increment=MockIncrement)):
+        yield MockFirestoreClient()
 
 
 # ============================================================================
@@ -933,6 +1012,167 @@ async def test_get_user_logs_paginated(mock_firestore_client):
     assert total == 2
 
 
+@pytest.mark.asyncio
+async def test_get_user_logs_page_walks_with_start_after(mock_firestore_client):
+    """get_user_logs_page should seek with start_after instead of offset and counting."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    collection = backend.db.collection("food_logs")
+    collection._docs = {
+        f"log{i}": MockDocument(
+            f"log{i}",
+            {"user_id": "user1", "dish_name": f"D{i}", "deleted": False, "created_at": f"2026-01-0{i}T00:00:00Z"},
+        )
+        for i in range(5, 0, -1)
+    }
+
+    with patch.object(backend, "count_user_logs", new=AsyncMock()) as mock_count:
+        first, cursor = await backend.get_user_logs_page("user1", page_size=2)
+        second, cursor = await backend.get_user_logs_page("user1", page_size=2, cursor=cursor)
+        third, last_cursor = await backend.get_user_logs_page("user1", page_size=2, cursor=cursor)
+
+    assert [log["id"] for log in first] == ["log5", "log4"]
+    assert [log["id"] for log in second] == ["log3", "log2"]
+    assert [log["id"] for log in third] == ["log1"]
+    assert last_cursor is None
+    mock_count.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_user_logs_page_invalid_cursor(mock_firestore_client):
+    """get_user_logs_page should reject cursors it did not issue."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        await backend.get_user_logs_page("user1", cursor="%%%")
+
+
+@pytest.mark.asyncio
+async def test_search_logs_ranks_user_logs(mock_firestore_client):
+    """search_logs should rank the user's live logs with BM25."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    collection = backend.db.collection("food_logs")
+    collection._docs = {
+        "notes": MockDocument("notes", {"user_id": "user1", "dish_name": "Pizza", "notes": "ramen", "deleted": False}),
+        "dish": MockDocument("dish", {"user_id": "user1", "dish_name": "Ramen", "deleted": False}),
+        "gone": MockDocument("gone", {"user_id": "user1", "dish_name": "Ramen", "deleted": True}),
+        "other": MockDocument("other", {"user_id": "user2", "dish_name": "Ramen", "deleted": False}),
+    }
+
+    hits = await backend.search_logs("user1", "ramen", limit=5)
+
+    assert [hit["id"] for hit in hits] == ["dish", "notes"]
+    assert await backend.search_logs("user1", "!!") == []
+
+
+@pytest.mark.asyncio
+async def test_get_user_logs_fields_projection(mock_firestore_client):
+    """get_user_logs should select only the requested fields."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+    mock_firestore_client.collection("food_logs")._docs = {
+        "log1": MockDocument(
+            "log1", {"user_id": "user1", "deleted": False, "dish_name": "Ramen", "analysis": {"big": True}}
+        ),
+    }
+
+    logs = await backend.get_user_logs("user1", fields=["dish_name"])
+    all_logs = await backend.get_all_user_logs("user1", fields=["dish_name"])
+
+    assert logs == [{"dish_name": "Ramen", "id": "log1"}]
+    assert all_logs == logs
+
+
+@pytest.mark.asyncio
+async def test_search_logs_fields_projection(mock_firestore_client):
+    """search_logs should rank on the search fields but return only the requested ones."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+    mock_firestore_client.collection("food_logs")._docs = {
+        "log1": MockDocument(
+            "log1", {"user_id": "user1", "deleted": False, "dish_name": "Pizza", "notes": "ramen", "rating": 4}
+        ),
+    }
+
+    hits = await backend.search_logs("user1", "ramen", fields=["rating"])
+
+    assert set(hits[0]) == {"id", "rating", "search_score"}
+
+
+@pytest.mark.asyncio
+async def test_get_daily_rollups_computed_from_range(mock_firestore_client):
+    """get_daily_rollups should aggregate the user's live logs within the inclusive day range."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    def log(day, **data):
+        return {"user_id": "user1", "deleted": False, "created_at": f"{day}T12:00:00+00:00", **data}
+
+    mock_firestore_client.collection("food_logs")._docs = {
+        "a": MockDocument("a", log("2026-01-01", cuisine="Thai", nutrition={"calories": 400, "protein_g": 20})),
+        "b": MockDocument("b", log("2026-01-01", cuisine="thai", venue_name="Home", nutrition={"calories": 250.5})),
+        "c": MockDocument("c", log("2026-01-03", dish_name="Toast")),
+        "d": MockDocument("d", log("2026-01-04", nutrition={"calories": 900})),
+        "e": MockDocument("e", {**log("2026-01-02", nutrition={"calories": 700}), "deleted": True}),
+    }
+
+    rollups = await backend.get_daily_rollups("user1", date(2026, 1, 1), date(2026, 1, 3))
+
+    assert [r["day"] for r in rollups] == ["2026-01-01", "2026-01-03"]
+    assert rollups[0]["meal_count"] == 2
+    assert rollups[0]["calories"] == 650.5
+    assert rollups[0]["protein_g"] == 20
+    assert rollups[0]["cuisines"] == {"thai": 2}
+    assert rollups[0]["venues"] == {"Home": 1}
+    assert rollups[1]["logs_with_nutrition"] == 0
+
+
+@pytest.mark.asyncio
+async def test_data_version_changes_on_every_write(mock_firestore_client):
+    """Log, pantry and preferences writes should each move the user's data version."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+    assert await backend.get_data_version("user1") == 0
+
+    log_id = await backend.create_log("user1", {"dish_name": "Ramen"})
+    assert await backend.get_data_version("user1") == 1
+    await backend.create_logs_batch("user1", [{"dish_name": "Pho"}])
+    await backend.update_log("user1", log_id, {"rating": 5})
+    await backend.delete_log("user1", log_id)
+    assert await backend.get_data_version("user1") == 4
+
+    item_id = await backend.add_pantry_item("user1", {"name": "Eggs"})
+    await backend.add_pantry_items_batch("user1", [{"name": "Milk"}])
+    await backend.update_pantry_item("user1", {"id": item_id, "name": "Eggs", "quantity": 6})
+    await backend.update_pantry_items_batch("user1", [{"name": "Milk", "quantity": 2}])
+    await backend.delete_pantry_item("user1", item_id)
+    await backend.update_user_preferences("user1", {"timezone": "UTC"})
+    assert await backend.get_data_version("user1") == 10
+
+    await backend.update_pantry_items_batch("user1", [])
+    await backend.get_user_logs("user1")
+    assert await backend.get_data_version("user1") == 10
+    assert await backend.get_data_version("user2") == 0
+
+
+@pytest.mark.asyncio
+async def test_taste_profile_snapshot_round_trip(mock_firestore_client):
+    """Stored taste profiles live outside the user document and leave the data version alone."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+    assert await backend.get_taste_profile_snapshot("user1", "month") is None
+
+    snapshot = {"profile": {"total_meals": 2}, "log_count": 2, "data_version": 7, "built_at": "2026-01-01T00:00:00"}
+    await backend.save_taste_profile_snapshot("user1", "month", snapshot)
+    assert await backend.get_taste_profile_snapshot("user1", "month") == snapshot
+    assert await backend.get_taste_profile_snapshot("user1", "week") is None
+    assert await backend.get_data_version("user1") == 0
+
+
 @pytest.mark.asyncio
 async def test_update_pantry_items_batch_empty(mock_firestore_client):
     """update_pantry_items_batch should handle empty list."""
@@ -970,6 +1210,60 @@ async def test_update_pantry_items_batch_skips_invalid(mock_firestore_client):
     assert len(ids) == 1
 
 
+@pytest.mark.asyncio
+async def test_update_pantry_items_batch_uses_one_write_batch(mock_firestore_client):
+    """update_pantry_items_batch should merge every item through a single batch commit."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+    await backend.update_pantry_item("user1", {"name": "Milk", "quantity": 1, "unit": "gal"})
+
+    ids = await backend.update_pantry_items_batch("user1", [{"name": "Milk", "quantity": 2}, {"name": "Eggs"}])
+
+    assert ids == ["milk", "eggs"]
+    assert mock_firestore_client.batch_sizes == [2]
+    milk = mock_firestore_client.collection("pantry")._docs["milk"].to_dict()
+    assert milk["quantity"] == 2
+    assert milk["unit"] == "gal"
+
+
+@pytest.mark.asyncio
+async def test_create_logs_batch(mock_firestore_client):
+    """create_logs_batch should write logs and last_active in one batch."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    ids = await backend.create_logs_batch("user1", [{"dish_name": "Pho"}, {"dish_name": "Ramen"}])
+
+    docs = mock_firestore_client.collection("food_logs")._docs
+    assert [docs[i].to_dict()["dish_name"] for i in ids] == ["Pho", "Ramen"]
+    assert docs[ids[0]].to_dict()["deleted"] is False
+    assert "last_active" in mock_firestore_client.collection("users")._docs["user1"].to_dict()
+    assert mock_firestore_client.batch_sizes == [3]
+
+
+@pytest.mark.asyncio
+async def test_create_logs_batch_empty(mock_firestore_client):
+    """create_logs_batch should not commit anything for an empty list."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    assert await backend.create_logs_batch("user1", []) == []
+    assert mock_firestore_client.batch_sizes == []
+
+
+@pytest.mark.asyncio
+async def test_add_pantry_items_batch_chunks_at_batch_limit(mock_firestore_client):
+    """add_pantry_items_batch should split writes into commits of at most 500 documents."""
+    backend = FirestoreBackend(client=mock_firestore_client)
+    await backend.connect()
+
+    ids = await backend.add_pantry_items_batch("user1", [{"name": f"item{i}"} for i in range(1201)])
+
+    assert len(set(ids)) == 1201
+    assert mock_firestore_client.batch_sizes == [500, 500, 201]
+    assert len(mock_firestore_client.collection("pantry")._docs) == 1201
+
+
 @pytest.mark.asyncio
 async def test_get_recipe(mock_firestore_client):
     """get_recipe should return recipe if found."""
@@ -1,6 +1,6 @@
 """Tests for fcp.services.firestore wrapper module."""
 
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -82,7 +82,9 @@ class TestFirestoreClientFoodLogs:
         start = datetime(2026, 1, 1)
         end = datetime(2026, 1, 31)
         result = await client.get_user_logs("u1", limit=10, days=7, start_date=start, end_date=end)
-        mock_db.get_user_logs.assert_awaited_once_with("u1", limit=10, days=7, start_date=start, end_date=end)
+        mock_db.get_user_logs.assert_awaited_once_with(
+            "u1", limit=10, days=7, start_date=start, end_date=end, fields=None
+        )
         assert result == [{"id": "1"}]
 
     @pytest.mark.asyncio
@@ -112,6 +114,16 @@ class TestFirestoreClientFoodLogs:
         mock_db.create_log.assert_awaited_once_with("u1", {"dish_name": "Test"})
         assert result == "new-id"
 
+    @pytest.mark.asyncio
+    async def test_create_logs_batch(self):
+        mock_db = AsyncMock()
+        mock_db.create_logs_batch.return_value = ["id1", "id2"]
+        client = FirestoreClient(db=mock_db)
+        entries = [{"dish_name": "A"}, {"dish_name": "B"}]
+        result = await client.create_logs_batch("u1", entries)
+        mock_db.create_logs_batch.assert_awaited_once_with("u1", entries)
+        assert result == ["id1", "id2"]
+
     @pytest.mark.asyncio
     async def test_update_log(self):
         mock_db = AsyncMock()
@@ -136,7 +148,7 @@ class TestFirestoreClientFoodLogs:
         mock_db.get_all_user_logs.return_value = [{"id": "x"}]
         client = FirestoreClient(db=mock_db)
         result = await client.get_all_user_logs("u1", limit=50)
-        mock_db.get_all_user_logs.assert_awaited_once_with("u1", limit=50)
+        mock_db.get_all_user_logs.assert_awaited_once_with("u1", limit=50, fields=None)
         assert result == [{"id": "x"}]
 
     @pytest.mark.asyncio
@@ -148,6 +160,24 @@ class TestFirestoreClientFoodLogs:
         mock_db.get_user_logs_paginated.assert_awaited_once_with("u1", page=2, page_size=10)
         assert result == ([{"id": "p1"}], 5)
 
+    @pytest.mark.asyncio
+    async def test_get_user_logs_page(self):
+        mock_db = AsyncMock()
+        mock_db.get_user_logs_page.return_value = ([{"id": "p1"}], "next")
+        client = FirestoreClient(db=mock_db)
+        result = await client.get_user_logs_page("u1", page_size=10, cursor="c", days=7)
+        mock_db.get_user_logs_page.assert_awaited_once_with("u1", page_size=10, cursor="c", days=7)
+        assert result == ([{"id": "p1"}], "next")
+
+    @pytest.mark.asyncio
+    async def test_search_logs(self):
+        mock_db = AsyncMock()
+        mock_db.search_logs.return_value = [{"id": "s1"}]
+        client = FirestoreClient(db=mock_db)
+        result = await client.search_logs("u1", "ramen", limit=5)
+        mock_db.search_logs.assert_awaited_once_with("u1", "ramen", limit=5, fields=None)
+        assert result == [{"id": "s1"}]
+
     @pytest.mark.asyncio
     async def test_count_user_logs(self):
         mock_db = AsyncMock()
@@ -201,6 +231,15 @@ class TestFirestoreClientPantry:
         mock_db.add_pantry_item.assert_awaited_once_with("u1", {"name": "bread"})
         assert result == "new-item"
 
+    @pytest.mark.asyncio
+    async def test_add_pantry_items_batch(self):
+        mock_db = AsyncMock()
+        mock_db.add_pantry_items_batch.return_value = ["id1"]
+        client = FirestoreClient(db=mock_db)
+        result = await client.add_pantry_items_batch("u1", [{"name": "bread"}])
+        mock_db.add_pantry_items_batch.assert_awaited_once_with("u1", [{"name": "bread"}])
+        assert result == ["id1"]
+
     @pytest.mark.asyncio
     async def test_delete_pantry_item(self):
         mock_db = AsyncMock()
@@ -326,6 +365,31 @@ class TestFirestoreClientUsersPrefsStats:
         mock_db.get_user_stats.assert_awaited_once_with("u1")
         assert result == {"total_logs": 100}
 
+    @pytest.mark.asyncio
+    async def test_get_daily_rollups(self):
+        mock_db = AsyncMock()
+        mock_db.get_daily_rollups.return_value = [{"day": "2026-01-01", "meal_count": 2}]
+        client = FirestoreClient(db=mock_db)
+        result = await client.get_daily_rollups("u1", date(2026, 1, 1), date(2026, 1, 7))
+        mock_db.get_daily_rollups.assert_awaited_once_with("u1", date(2026, 1, 1), date(2026, 1, 7))
+        assert result == [{"day": "2026-01-01", "meal_count": 2}]
+
+    async def test_get_data_version(self):
+        mock_db = AsyncMock()
+        mock_db.get_data_version.return_value = 7
+        client = FirestoreClient(db=mock_db)
+        assert await client.get_data_version("u1") == 7
+        mock_db.get_data_version.assert_awaited_once_with("u1")
+
+    async def test_taste_profile_snapshots(self):
+        mock_db = AsyncMock()
+        mock_db.get_taste_profile_snapshot.return_value = {"profile": {}, "log_count": 2}
+        client = FirestoreClient(db=mock_db)
+        assert await client.get_taste_profile_snapshot("u1", "month") == {"profile": {}, "log_count": 2}
+        mock_db.get_taste_profile_snapshot.assert_awaited_once_with("u1", "month")
+        await client.save_taste_profile_snapshot("u1", "month", {"profile": {}})
+        mock_db.save_taste_profile_snapshot.assert_awaited_once_with("u1", "month", {"profile": {}})
+
 
 # ---------------------------------------------------------------------------
 # Notification methods
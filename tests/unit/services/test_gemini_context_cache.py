@@ -0,0 +1,247 @@
+"""Tests for Gemini context caches of declared prompt prefixes."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from fcp.services import gemini_context_cache as context_cache_module
+from fcp.services.gemini import GeminiClient
+from fcp.services.gemini_context_cache import (
+    ContextCacheHandle,
+    GeminiContextCache,
+    _without_prefix,
+    cached_prefix,
+)
+
+HISTORY = "Food History:\n" + "ramen, tonkotsu, 2026-01-01\n" * 200 + "\n"
+
+
+class FakeModels:
+    """Stands in for ``client.aio.models``; records the contents and config of each call."""
+
+    def __init__(self):
+        self.calls: list[tuple[list, types.GenerateContentConfig | None]] = []
+        self.error: Exception | None = None
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls.append((contents, config))
+        if config is not None and config.cached_content and self.error is not None:
+            raise self.error
+        usage = SimpleNamespace(cached_content_token_count=1500 if config and config.cached_content else None)
+        return MagicMock(text='{"ok": true}', usage_metadata=usage, candidates=[])
+
+
+@pytest.fixture
+def context_cache():
+    return GeminiContextCache(enabled=True, min_tokens=100, ttl_seconds=600, max_entries=8)
+
+
+@pytest.fixture
+def gemini_client(context_cache):
+    client = GeminiClient()
+    client.client = MagicMock()
+    client.client.aio.models = FakeModels()
+    client.client.aio.caches.create = AsyncMock(
+        side_effect=lambda **kwargs: SimpleNamespace(
+            name=f"cachedContents/{client.client.aio.caches.create.await_count}",
+            usage_metadata=SimpleNamespace(total_token_count=1500),
+        )
+    )
+    client.client.aio.caches.update = AsyncMock()
+    client.client.aio.caches.delete = AsyncMock()
+    with patch("fcp.services.gemini_base.gemini_context_cache", context_cache):
+        yield client
+
+
+async def ask(client, instructions="Build a taste profile.", history=HISTORY):
+    with cached_prefix(history, user_id="u1"):
+        return await client.generate_json(history + instructions)
+
+
+class TestWithoutPrefix:
+    def test_strips_prefix_from_first_part(self):
+        image = types.Part.from_bytes(data=b"jpeg", mime_type="image/jpeg")
+        rest = _without_prefix([types.Part(text="HISTORY\n\nDo it"), image], "HISTORY")
+        assert rest == [types.Part(text="Do it"), image]
+        assert _without_prefix("HISTORY\n\nDo it", "HISTORY") == [types.Part(text="Do it")]
+
+    def test_no_match(self):
+        assert _without_prefix("Do it", "HISTORY") is None
+        assert _without_prefix("HISTORY", "HISTORY") is None
+        assert _without_prefix([], "HISTORY") is None
+
+
+class TestContextCache:
+    @pytest.mark.asyncio
+    async def test_cached_from_second_use(self, gemini_client, context_cache):
+        models = gemini_client.client.aio.models
+        caches = gemini_client.client.aio.caches
+        with patch("fcp.services.gemini_context_cache.record_gemini_context_cache") as record:
+            await ask(gemini_client)
+            assert caches.create.await_count == 0
+            assert models.calls[0][0][0].text.startswith("Food History")
+
+            await ask(gemini_client, "Suggest a meal.")
+            await ask(gemini_client, "Write a digest.")
+
+        assert caches.create.await_count == 1
+        created = caches.create.await_args.kwargs["config"]
+        assert created.contents[0].parts[0].text == HISTORY
+        assert created.display_name == "fcp-u1"
+        for contents, config in models.calls[1:]:
+            assert config.cached_content == "cachedContents/1"
+            assert config.response_mime_type == "application/json"
+        assert [contents[0].text for contents, _ in models.calls[1:]] == ["Suggest a meal.", "Write a digest."]
+        record.assert_called_with("generate_json", "cached", 1500)
+        assert context_cache.stats()["tokens_saved"] == 3000
+
+    @pytest.mark.asyncio
+    async def test_sent_inline_when_not_applicable(self, gemini_client):
+        models = gemini_client.client.aio.models
+        for _ in range(2):
+            # Too small
+            await ask(gemini_client, history="Food History: ramen\n\n")
+            # Prompt does not start with the declared prefix
+            with cached_prefix(HISTORY):
+                await gemini_client.generate_json("Build a profile.\n" + HISTORY)
+            # Nothing declared
+            await gemini_client.generate_json(HISTORY + "Build a profile.")
+
+        gemini_client.client.aio.caches.create.assert_not_awaited()
+        assert all(config.cached_content is None for _, config in models.calls)
+
+    @pytest.mark.asyncio
+    async def test_tools_move_into_the_cache(self, gemini_client):
+        models = gemini_client.client.aio.models
+        models.generate_content = AsyncMock(
+            return_value=MagicMock(
+                text="done", usage_metadata=None, candidates=[MagicMock(content=MagicMock(parts=[]))]
+            )
+        )
+        for _ in range(2):
+            with cached_prefix(HISTORY):
+                await gemini_client.generate_with_code_execution(HISTORY + "Compute averages.")
+
+        created = gemini_client.client.aio.caches.create.await_args.kwargs["config"]
+        assert created.tools[0].code_execution is not None
+        config = models.generate_content.await_args.kwargs["config"]
+        assert config.cached_content == "cachedContents/1"
+        assert config.tools is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_uses_create_one_cache(self, gemini_client):
+        await ask(gemini_client)
+        await asyncio.gather(*(ask(gemini_client, f"Question {i}") for i in range(4)))
+        assert gemini_client.client.aio.caches.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_gone_cache_falls_back_inline(self, gemini_client, context_cache):
+        models = gemini_client.client.aio.models
+        await ask(gemini_client)
+        models.error = genai_errors.ClientError(404, {"error": {"message": "cache not found"}})
+
+        assert await ask(gemini_client, "Suggest a meal.") == {"ok": True}
+        contents, config = models.calls[-1]
+        assert config.cached_content is None
+        assert contents[0].text.startswith("Food History")
+        assert context_cache.stats()["fallback"] == 1
+        assert context_cache.stats()["handles"] == 0
+
+    def test_forgetting_a_replaced_handle_keeps_the_new_one(self, context_cache):
+        current = ContextCacheHandle("cachedContents/2", "key", 1500, 0.0)
+        context_cache._handles["key"] = current
+        context_cache.forget("generate_json", ContextCacheHandle("cachedContents/1", "key", 1500, 0.0))
+        assert context_cache._handles["key"] is current
+        assert context_cache.stats()["fallback"] == 1
+
+    @pytest.mark.asyncio
+    async def test_other_errors_propagate(self, gemini_client):
+        models = gemini_client.client.aio.models
+        await ask(gemini_client)
+        models.error = genai_errors.ClientError(403, {"error": {"message": "denied"}})
+        with pytest.raises(genai_errors.ClientError):
+            await ask(gemini_client, "Suggest a meal.")
+
+    @pytest.mark.asyncio
+    async def test_failed_creation_sends_inline(self, gemini_client):
+        gemini_client.client.aio.caches.create.side_effect = RuntimeError("too small")
+        await ask(gemini_client)
+        assert await ask(gemini_client, "Suggest a meal.") == {"ok": True}
+        assert gemini_client.client.aio.models.calls[-1][1].cached_content is None
+
+
+class TestRegistry:
+    @pytest.mark.asyncio
+    async def test_ttl_extended_when_used_near_expiry(self, gemini_client, context_cache):
+        await ask(gemini_client)
+        await ask(gemini_client)
+        handle = next(iter(context_cache._handles.values()))
+        handle.expires_at -= 400
+
+        await ask(gemini_client)
+        await asyncio.sleep(0)
+        update = gemini_client.client.aio.caches.update
+        update.assert_awaited_once()
+        assert update.await_args.kwargs["name"] == "cachedContents/1"
+        assert update.await_args.kwargs["config"].ttl == "600s"
+
+    @pytest.mark.asyncio
+    async def test_failed_ttl_extension_keeps_the_handle(self, gemini_client, context_cache, caplog):
+        gemini_client.client.aio.caches.update.side_effect = RuntimeError("quota")
+        await ask(gemini_client)
+        await ask(gemini_client)
+        next(iter(context_cache._handles.values())).expires_at -= 400
+
+        await ask(gemini_client)
+        await asyncio.sleep(0)
+        assert "Could not extend Gemini context cache cachedContents/1" in caplog.text
+        assert await ask(gemini_client) == {"ok": True}
+        assert gemini_client.client.aio.models.calls[-1][1].cached_content == "cachedContents/1"
+
+    @pytest.mark.asyncio
+    async def test_expired_handle_is_recreated(self, gemini_client, context_cache):
+        await ask(gemini_client)
+        await ask(gemini_client)
+        next(iter(context_cache._handles.values())).expires_at = 0
+
+        await ask(gemini_client)
+        assert gemini_client.client.aio.caches.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_oldest_cache_deleted_past_max_entries(self, gemini_client, context_cache):
+        context_cache.max_entries = 1
+        for history in (HISTORY, HISTORY.replace("ramen", "pho")):
+            await ask(gemini_client, history=history)
+            await ask(gemini_client, history=history)
+        await asyncio.sleep(0)
+
+        gemini_client.client.aio.caches.delete.assert_awaited_once_with(name="cachedContents/1")
+        assert context_cache.stats()["handles"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_delete_is_ignored(self, gemini_client, context_cache):
+        gemini_client.client.aio.caches.delete.side_effect = RuntimeError("already gone")
+        context_cache.max_entries = 1
+        for history in (HISTORY, HISTORY.replace("ramen", "pho")):
+            await ask(gemini_client, history=history)
+            await ask(gemini_client, history=history)
+        await asyncio.sleep(0)
+
+        gemini_client.client.aio.caches.delete.assert_awaited_once()
+        assert context_cache.stats()["handles"] == 1
+
+    @pytest.mark.asyncio
+    async def test_use_counts_bounded(self, gemini_client):
+        other = HISTORY.replace("ramen", "pho")
+        with patch.object(context_cache_module, "MAX_TRACKED_PREFIXES", 1):
+            await ask(gemini_client)
+            await ask(gemini_client, history=other)
+            # The first prefix's use was forgotten, so it counts from one again
+            await ask(gemini_client)
+            gemini_client.client.aio.caches.create.assert_not_awaited()
+            await ask(gemini_client)
+        gemini_client.client.aio.caches.create.assert_awaited_once()
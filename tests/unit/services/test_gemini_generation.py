@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from google.genai import types
 
+from fcp.services.gemini_base import GeminiBase
 from fcp.services.gemini_generation import (
     GeminiCodeExecutionMixin,
     GeminiCombinedToolsMixin,
@@ -28,11 +29,13 @@ class MockGeminiService(
     GeminiMediaMixin,
     GeminiImageMixin,
     GeminiCombinedToolsMixin,
+    GeminiBase,
 ):
     """Mock service combining all mixins for testing."""
 
     def __init__(self, mock_client):
         self.mock_client = mock_client
+        self._in_flight = {}
 
     def _require_client(self):
         """Return the mock client."""
@@ -169,6 +172,20 @@ class TestGeminiGenerationMixin:
 
         assert result == {"items": [1, 2, 3]}
 
+    @pytest.mark.asyncio
+    async def test_generate_json_repairs_response_cut_at_token_limit(self, service, mock_client):
+        """A response cut off by the token limit is closed up rather than rejected."""
+        mock_response = MagicMock()
+        mock_response.text = '{"dish_name": "Ramen", "ingredients": ["noodles", "eg'
+        mock_response.candidates = [MagicMock(finish_reason=types.FinishReason.MAX_TOKENS)]
+        mock_response.usage_metadata = MagicMock(prompt_token_count=10, candidates_token_count=5)
+
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
+
+        result = await service.generate_json("Test prompt")
+
+        assert result == {"dish_name": "Ramen", "ingredients": ["noodles", "eg"]}
+
     @pytest.mark.asyncio
     async def test_generate_json_with_image_bytes(self, service, mock_client):
         """Test JSON generation with image bytes."""
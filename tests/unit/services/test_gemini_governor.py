@@ -0,0 +1,274 @@
+"""Tests for the Gemini concurrency and budget governor."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from fcp.services.gemini_governor import (
+    GeminiGovernor,
+    ModelGovernor,
+    Priority,
+    _priority,
+    estimate_tokens,
+    gemini_priority,
+    is_rate_limited,
+)
+
+
+def governor(**overrides) -> ModelGovernor:
+    options = {
+        "initial_concurrency": 2,
+        "min_concurrency": 1,
+        "max_concurrency": 8,
+        "rpm_limit": 0,
+        "tpm_limit": 0,
+        "latency_target_seconds": 10.0,
+        "expected_output_tokens": 0,
+    }
+    return ModelGovernor("gemini-test", **(options | overrides))
+
+
+def rate_limited() -> genai_errors.ClientError:
+    return genai_errors.ClientError(429, {"error": {"message": "quota"}})
+
+
+class TestHelpers:
+    def test_estimate_tokens(self):
+        assert estimate_tokens("x" * 400) == 101
+        image = types.Part.from_bytes(data=b"jpeg", mime_type="image/jpeg")
+        assert estimate_tokens([types.Part(text="x" * 40), image]) == 11 + 258
+        assert estimate_tokens([types.Content(role="user", parts=[types.Part(text="abcd")])]) == 2
+        assert estimate_tokens(None) == 0
+
+    def test_is_rate_limited(self):
+        request = httpx.Request("POST", "https://example.com")
+        assert is_rate_limited(rate_limited())
+        assert is_rate_limited(
+            httpx.HTTPStatusError("429", request=request, response=httpx.Response(429, request=request))
+        )
+        assert not is_rate_limited(genai_errors.ClientError(400, {"error": {"message": "bad"}}))
+        assert not is_rate_limited(ValueError("boom"))
+
+    @pytest.mark.asyncio
+    async def test_gemini_priority_scopes_calls(self):
+        @gemini_priority(Priority.BACKGROUND)
+        async def job():
+            return _priority.get()
+
+        assert await job() is Priority.BACKGROUND
+        assert _priority.get() is Priority.INTERACTIVE
+
+
+class TestAdmission:
+    @pytest.mark.asyncio
+    async def test_in_flight_calls_bounded_by_limit(self):
+        gov = governor(initial_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with gov.slot("hi"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+        assert gov.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_callers_admitted_before_background(self):
+        gov = governor(initial_concurrency=1)
+        admitted: list[str] = []
+        release = asyncio.Event()
+
+        async def call(name: str, priority: Priority):
+            token = _priority.set(priority)
+            try:
+                async with gov.slot():
+                    admitted.append(name)
+                    if name == "first":
+                        await release.wait()
+            finally:
+                _priority.reset(token)
+
+        first = asyncio.ensure_future(call("first", Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.ensure_future(call("job-1", Priority.BACKGROUND)),
+            asyncio.ensure_future(call("job-2", Priority.BACKGROUND)),
+            asyncio.ensure_future(call("request", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *queued)
+        assert admitted == ["first", "request", "job-1", "job-2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiters_do_not_hold_slots(self):
+        gov = governor(initial_concurrency=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with gov.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(gov.acquire(1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+
+        async with gov.slot():
+            assert gov.in_flight == 1
+        assert gov.in_flight == 0
+        assert gov.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiter_cancelled_as_it_is_admitted_hands_slot_back(self):
+        gov = governor(initial_concurrency=1)
+        holder = await gov.acquire(1)
+        waiter = asyncio.ensure_future(gov.acquire(1))
+        await asyncio.sleep(0)
+        # The slot goes to the waiter, which is cancelled before it resumes
+        holder.finish()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert gov.in_flight == 0
+
+        async with gov.slot():
+            assert gov.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_requests_per_minute_budget(self):
+        gov = governor(initial_concurrency=8, rpm_limit=2)
+        with patch("fcp.services.gemini_governor.WINDOW_SECONDS", 0.05):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(3):
+                async with gov.slot():
+                    pass
+            # The third call waited for the first to leave the window
+            assert loop.time() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_callers_queued_on_the_budget_all_get_through(self):
+        gov = governor(initial_concurrency=8, rpm_limit=1)
+        with patch("fcp.services.gemini_governor.WINDOW_SECONDS", 0.02):
+            async with gov.slot():
+                pass
+            # Each waiter behind the budget reschedules the wakeup
+            permits = await asyncio.gather(gov.acquire(1), gov.acquire(1))
+            for permit in permits:
+                permit.finish()
+        assert gov.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_token_budget_uses_reported_usage(self):
+        gov = governor(initial_concurrency=8, tpm_limit=1000, expected_output_tokens=500)
+        async with gov.slot("x" * 400) as permit:
+            permit.finish(MagicMock(usage_metadata=MagicMock(total_token_count=50)))
+        assert gov.stats()["tokens_in_window"] == 50
+
+        # 50 + 601 fits; another 601 would not
+        async with gov.slot("x" * 400):
+            pass
+        waiter = asyncio.ensure_future(gov.acquire(601))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        waiter.cancel()
+
+
+class TestAdaptiveLimit:
+    @pytest.mark.asyncio
+    async def test_successes_raise_limit_additively(self):
+        gov = governor(initial_concurrency=2)
+        for _ in range(4):
+            async with gov.slot():
+                pass
+        assert 3.5 < gov.limit < 4
+
+    @pytest.mark.asyncio
+    async def test_burst_of_429s_halves_limit_once(self):
+        gov = governor(initial_concurrency=8)
+
+        async def failing_call():
+            async with gov.slot():
+                await asyncio.sleep(0.01)
+                raise rate_limited()
+
+        results = await asyncio.gather(*(failing_call() for _ in range(4)), return_exceptions=True)
+        assert all(isinstance(r, genai_errors.ClientError) for r in results)
+        assert gov.limit == 4
+
+        # A call admitted after the cut that is still rate limited cuts again
+        with pytest.raises(genai_errors.ClientError):
+            await failing_call()
+        assert gov.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_calls_cut_limit_and_floor_holds(self):
+        gov = governor(initial_concurrency=1, latency_target_seconds=0.001)
+        async with gov.slot():
+            await asyncio.sleep(0.01)
+        assert gov.limit == 1
+
+        gov = governor(initial_concurrency=4, latency_target_seconds=0.001)
+        async with gov.slot():
+            await asyncio.sleep(0.01)
+        assert gov.limit == pytest.approx(3.6)
+
+    @pytest.mark.asyncio
+    async def test_untimed_slots_ignore_latency(self):
+        gov = governor(initial_concurrency=4, latency_target_seconds=0.001)
+        async with gov.slot(timed=False):
+            await asyncio.sleep(0.01)
+        assert gov.limit > 4
+
+
+class TestGeminiGovernor:
+    @pytest.mark.asyncio
+    async def test_generate_content_goes_through_model_gate(self):
+        gov = GeminiGovernor(enabled=True)
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=MagicMock(usage_metadata=None))
+
+        await gov.generate_content(client, model="gemini-a", contents="hi")
+        await gov.generate_content(client, model="gemini-b", contents="hi", config=types.GenerateContentConfig())
+
+        client.aio.models.generate_content.assert_any_await(model="gemini-a", contents="hi")
+        assert set(gov.stats()) == {"gemini-a", "gemini-b"}
+
+    @pytest.mark.asyncio
+    async def test_disabled_governor_calls_straight_through(self):
+        gov = GeminiGovernor(enabled=False)
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value="response")
+
+        assert await gov.generate_content(client, model="gemini-a", contents="hi") == "response"
+        assert gov.stats() == {}
+
+    @pytest.mark.asyncio
+    async def test_separately_constructed_clients_are_governed(self):
+        """Services that build their own genai.Client still queue behind the shared gate."""
+        from fcp.services import live_restaurant_data
+
+        gov = GeminiGovernor(enabled=True)
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text="[]", usage_metadata=None))
+        with (
+            patch.object(live_restaurant_data.genai, "Client", return_value=client),
+            patch.object(live_restaurant_data, "gemini_governor", gov),
+        ):
+            await live_restaurant_data.check_food_recalls("spinach")
+
+        assert gov.stats()["gemini-3-flash-preview"]["requests_in_window"] == 1
@@ -9,6 +9,7 @@ from fcp.services.gemini_helpers import (
     _extract_grounding_sources,
     _extract_thinking_content,
     _get_thinking_budget,
+    _hit_token_limit,
     _log_token_usage,
     _parse_json_response,
 )
@@ -189,6 +190,11 @@ class TestParseJsonResponse:
         with pytest.raises(ValueError, match="Failed to parse JSON"):
             _parse_json_response('{"key": "value"')
 
+    def test_truncated_json_repaired_when_cut_at_token_limit(self):
+        """Test JSON cut off by the token limit is closed up."""
+        result = _parse_json_response('{"key": "val', truncated=True)
+        assert result == {"key": "val"}
+
     def test_logs_warning_on_failure(self, caplog):
         """Test that parsing failure logs a warning."""
         with caplog.at_level(logging.WARNING):
@@ -412,3 +418,18 @@ class TestRetryDecorator:
 
         # Function should still be callable
         assert callable(test_func)
+
+
+class TestHitTokenLimit:
+    """Tests for _hit_token_limit function."""
+
+    def test_max_tokens(self):
+        response = MagicMock(candidates=[MagicMock(finish_reason="MAX_TOKENS")])
+        assert _hit_token_limit(response) is True
+
+    def test_other_finish_reason(self):
+        response = MagicMock(candidates=[MagicMock(finish_reason="STOP")])
+        assert _hit_token_limit(response) is False
+
+    def test_no_candidates(self):
+        assert _hit_token_limit(MagicMock(candidates=None)) is False
@@ -0,0 +1,324 @@
+"""Tests for the opt-in Gemini response cache."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from google.genai import types
+
+from fcp.services.gemini_response_cache import (
+    METHOD_TTL_SECONDS,
+    GeminiResponseCache,
+    cache_gemini_responses,
+    response_key,
+)
+
+JSON_CONFIG = types.GenerateContentConfig(response_mime_type="application/json")
+
+
+@pytest_asyncio.fixture
+async def cache(tmp_path):
+    response_cache = GeminiResponseCache(tmp_path / "responses.db", enabled=True)
+    yield response_cache
+    await response_cache.close()
+
+
+def counting(response):
+    return AsyncMock(return_value=response)
+
+
+async def lookup(cache, generate, prompt="Pair fennel", method="generate_json", config=JSON_CONFIG):
+    return await cache.get_or_generate(method, "gemini-test", [types.Part(text=prompt)], config, generate)
+
+
+class TestResponseKey:
+    def test_stable_and_covers_request(self):
+        parts = [types.Part(text="hi")]
+        key = response_key("generate_json", "m1", parts, JSON_CONFIG)
+        assert key == response_key("generate_json", "m1", [types.Part(text="hi")], JSON_CONFIG)
+        assert key != response_key("generate_content", "m1", parts, JSON_CONFIG)
+        assert key != response_key("generate_json", "m2", parts, JSON_CONFIG)
+        assert key != response_key("generate_json", "m1", parts, None)
+        assert key != response_key("generate_json", "m1", [types.Part(text="hello")], JSON_CONFIG)
+
+    def test_string_contents_match_a_text_part(self):
+        assert response_key("m", "x", "hi") == response_key("m", "x", [types.Part(text="hi")])
+
+    def test_media_keyed_by_content(self):
+        def with_image(data: bytes) -> list[types.Part]:
+            return [types.Part(text="what is this"), types.Part.from_bytes(data=data, mime_type="image/jpeg")]
+
+        assert response_key("m", "x", with_image(b"a")) == response_key("m", "x", with_image(b"a"))
+        assert response_key("m", "x", with_image(b"a")) != response_key("m", "x", with_image(b"b"))
+
+    def test_file_references_keyed_by_uri(self):
+        def with_file(uri: str) -> list[types.Part]:
+            return [types.Part(text="hi"), types.Part(file_data=types.FileData(file_uri=uri))]
+
+        assert response_key("m", "x", with_file("gs://a")) != response_key("m", "x", with_file("gs://b"))
+
+
+class TestGetOrGenerate:
+    @pytest.mark.asyncio
+    async def test_undeclared_callers_always_generate(self, cache, tmp_path):
+        generate = counting({"pairings": []})
+        await lookup(cache, generate)
+        await lookup(cache, generate)
+        assert generate.await_count == 2
+        assert cache.stats()["miss"] == 0
+        assert not (tmp_path / "responses.db").exists()
+
+    @pytest.mark.asyncio
+    async def test_declared_tool_reuses_responses(self, cache):
+        generate = counting({"pairings": ["orange"]})
+
+        @cache_gemini_responses()
+        async def tool(prompt):
+            return await lookup(cache, generate, prompt)
+
+        first = await tool("Pair fennel")
+        second = await tool("Pair fennel")
+        await tool("Pair ribeye")
+        assert first == second == {"pairings": ["orange"]}
+        assert generate.await_count == 2
+        stats = cache.stats()
+        assert (stats["memory"], stats["miss"]) == (1, 2)
+        assert stats["bytes_saved"] == len('{"pairings": ["orange"]}')
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_always_generates(self, tmp_path):
+        cache = GeminiResponseCache(tmp_path / "responses.db", enabled=False)
+        generate = counting("text")
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate, method="generate_content", config=None)
+
+        await tool()
+        await tool()
+        assert generate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_per_method_and_declared_ttls(self, cache):
+        generate = counting({"data": {}, "sources": []})
+
+        @cache_gemini_responses()
+        async def grounded():
+            return await lookup(cache, generate, method="generate_json_with_grounding")
+
+        @cache_gemini_responses(ttl_seconds=60)
+        async def short_lived():
+            return await lookup(cache, generate, prompt="short")
+
+        with patch("fcp.services.gemini_response_cache.time.time", return_value=1000.0):
+            await grounded()
+            await short_lived()
+        with patch("fcp.services.gemini_response_cache.time.time", return_value=1061.0):
+            await grounded()
+            await short_lived()
+        with patch(
+            "fcp.services.gemini_response_cache.time.time",
+            return_value=1001.0 + METHOD_TTL_SECONDS["generate_json_with_grounding"],
+        ):
+            await grounded()
+        assert generate.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_unserializable_responses_not_cached(self, cache):
+        generate = counting({"value": object()})
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate)
+
+        await tool()
+        await tool()
+        assert generate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_not_cached(self, cache):
+        generate = AsyncMock(side_effect=[RuntimeError("boom"), {"ok": True}])
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await tool()
+        assert await tool() == {"ok": True}
+
+
+class TestTiers:
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_shared_across_instances(self, cache, tmp_path):
+        @cache_gemini_responses()
+        async def tool(response_cache, generate):
+            return await lookup(response_cache, generate)
+
+        await tool(cache, counting({"value": 1}))
+        other = GeminiResponseCache(tmp_path / "responses.db", enabled=True)
+        try:
+            generate = counting({"value": 2})
+            assert await tool(other, generate) == {"value": 1}
+            assert await tool(other, generate) == {"value": 1}
+            generate.assert_not_awaited()
+            assert (other.stats()["sqlite"], other.stats()["memory"]) == (1, 1)
+        finally:
+            await other.close()
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_evicts_by_size(self, tmp_path):
+        response = "x" * 100
+        size = len(f'"{response}"')
+        cache = GeminiResponseCache(tmp_path / "responses.db", enabled=True, max_memory_bytes=2 * size, persist=False)
+        generate = counting(response)
+
+        @cache_gemini_responses()
+        async def tool(prompt):
+            return await lookup(cache, generate, prompt, method="generate_content", config=None)
+
+        for prompt in ("a", "b", "a", "c", "a", "b"):
+            await tool(prompt)
+        # "b" was evicted by "c"; "a" stayed because it was used most recently.
+        assert generate.await_count == 4
+        assert cache.stats()["memory_bytes"] == 2 * size
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_trimmed_oldest_first(self, tmp_path):
+        cache = GeminiResponseCache(tmp_path / "responses.db", enabled=True, max_memory_bytes=0, max_disk_bytes=250)
+        generate = counting("y" * 98)  # 100 bytes once JSON-encoded
+
+        @cache_gemini_responses()
+        async def tool(prompt):
+            return await lookup(cache, generate, prompt, method="generate_content", config=None)
+
+        now = time.time()
+        try:
+            with patch("fcp.services.gemini_response_cache.PRUNE_EVERY", 1):
+                for i, prompt in enumerate(("a", "b", "c", "d")):
+                    with patch("fcp.services.gemini_response_cache.time.time", return_value=now + i):
+                        await tool(prompt)
+            db = await cache._connection()
+            async with db.execute("SELECT COUNT(*), SUM(size) FROM responses") as cursor:
+                assert tuple(await cursor.fetchone()) == (2, 200)
+            await tool("d")
+            await tool("a")
+            assert generate.await_count == 5
+        finally:
+            await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_responses_over_disk_limit_kept_in_memory_only(self, tmp_path):
+        cache = GeminiResponseCache(tmp_path / "responses.db", enabled=True, max_disk_bytes=10)
+        generate = counting({"value": "too long for the file"})
+
+        @cache_gemini_responses()
+        async def tool(response_cache):
+            return await lookup(response_cache, generate)
+
+        await tool(cache)
+        await tool(cache)
+        assert generate.await_count == 1
+        await cache.close()
+
+        # Nothing reached the SQLite tier
+        other = GeminiResponseCache(tmp_path / "responses.db", enabled=True)
+        await tool(other)
+        assert generate.await_count == 2
+        await other.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_errors_only_cost_misses(self, cache, caplog):
+        db = await cache._connection()
+        await db.execute("DROP TABLE responses")
+        generate = counting({"value": 1})
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate)
+
+        assert await tool() == {"value": 1}
+        assert "Gemini response cache read failed" in caplog.text
+        assert "Gemini response cache write failed" in caplog.text
+        # The memory tier still serves the response
+        assert await tool() == {"value": 1}
+        assert generate.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_corrupt_sqlite_file_falls_back_to_memory(self, tmp_path):
+        (tmp_path / "responses.db").write_bytes(b"not a database" * 100)
+        cache = GeminiResponseCache(tmp_path / "responses.db", enabled=True)
+        generate = counting({"value": 1})
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate)
+
+        await tool()
+        await tool()
+        assert generate.await_count == 1
+        assert await cache._connection() is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_opens_one_connection(self, cache):
+        first, second = await asyncio.gather(cache._connection(), cache._connection())
+        assert first is second is not None
+
+    @pytest.mark.asyncio
+    async def test_unavailable_sqlite_falls_back_to_memory(self, tmp_path):
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        cache = GeminiResponseCache(blocker / "responses.db", enabled=True)
+        generate = counting({"value": 1})
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate)
+
+        await tool()
+        await tool()
+        assert generate.await_count == 1
+        assert await cache._connection() is None
+        await cache.clear()
+        assert cache.stats()["memory_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_clear(self, cache):
+        generate = counting({"value": 1})
+
+        @cache_gemini_responses()
+        async def tool():
+            return await lookup(cache, generate)
+
+        await tool()
+        await cache.clear()
+        await tool()
+        assert generate.await_count == 2
+
+
+class TestClientIntegration:
+    @pytest.mark.asyncio
+    async def test_declared_tool_skips_repeat_api_calls(self, cache):
+        """get_flavor_pairings declares its output cacheable, so a repeat subject costs no API call."""
+        from fcp.services.gemini import GeminiClient
+        from fcp.tools.flavor import get_flavor_pairings
+
+        response = MagicMock(text='{"subject": "Fennel", "pairings": []}', usage_metadata=None)
+        mock_client = MagicMock()
+        mock_client.aio.models.generate_content = AsyncMock(return_value=response)
+        client = GeminiClient()
+        client.client = mock_client
+
+        with (
+            patch("fcp.services.gemini_generation.gemini_response_cache", cache),
+            patch("fcp.tools.flavor.gemini", client),
+        ):
+            first = await get_flavor_pairings("Fennel")
+            second = await get_flavor_pairings("Fennel")
+            await client.generate_json("not declared")
+            await client.generate_json("not declared")
+
+        assert first == second
+        assert mock_client.aio.models.generate_content.await_count == 3
@@ -0,0 +1,118 @@
+"""Tests for coalescing identical concurrent Gemini calls."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fcp.services.gemini import GeminiClient
+
+
+class SlowModel:
+    """Stands in for ``client.aio.models``; each call takes ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.02, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        text = contents if isinstance(contents, str) else contents[0].text
+        return MagicMock(text=f'{{"echo": "{text}"}}', usage_metadata=None, candidates=[])
+
+
+@pytest.fixture
+def model():
+    return SlowModel()
+
+
+@pytest.fixture
+def client(model):
+    gemini_client = GeminiClient()
+    gemini_client.client = MagicMock()
+    gemini_client.client.aio.models = model
+    return gemini_client
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_calls_share_one_request(self, client, model):
+        with patch("fcp.services.gemini_base.record_gemini_coalesced_call") as record:
+            results = await asyncio.gather(*(client.generate_json("Pair fennel") for _ in range(5)))
+
+        assert results == [{"echo": "Pair fennel"}] * 5
+        assert model.calls == 1
+        assert record.call_count == 4
+        record.assert_called_with("generate_json")
+        assert client._in_flight == {}
+
+    @pytest.mark.asyncio
+    async def test_different_requests_are_not_shared(self, client, model):
+        await asyncio.gather(
+            client.generate_json("Pair fennel"),
+            client.generate_json("Pair ribeye"),
+            client.generate_content("Pair fennel"),
+        )
+        assert model.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_each_reach_the_api(self, client, model):
+        await client.generate_json("Pair fennel")
+        await client.generate_json("Pair fennel")
+        assert model.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_grounding_calls_are_coalesced(self, client, model):
+        results = await asyncio.gather(*(client.generate_with_grounding("Any recalls?") for _ in range(3)))
+        assert all(r["text"] == '{"echo": "Any recalls?"}' for r in results)
+        assert model.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter_and_are_not_kept(self, client, model):
+        model.error = ValueError("bad request")
+        results = await asyncio.gather(
+            client.generate_json("Pair fennel"), client.generate_json("Pair fennel"), return_exceptions=True
+        )
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert model.calls == 1
+
+        model.error = None
+        assert await client.generate_json("Pair fennel") == {"echo": "Pair fennel"}
+        assert model.calls == 2
+
+
+class TestCancellation:
+    @pytest.mark.asyncio
+    async def test_call_continues_while_anyone_waits(self, client, model):
+        first = asyncio.ensure_future(client.generate_json("Pair fennel"))
+        second = asyncio.ensure_future(client.generate_json("Pair fennel"))
+        await asyncio.sleep(0.005)
+        first.cancel()
+
+        assert await second == {"echo": "Pair fennel"}
+        assert first.cancelled()
+        assert (model.calls, model.cancelled) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_call_cancelled_when_every_waiter_leaves(self, client, model):
+        waiters = [asyncio.ensure_future(client.generate_json("Pair fennel")) for _ in range(2)]
+        await asyncio.sleep(0.005)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert model.cancelled == 1
+        assert client._in_flight == {}
+        # A later caller starts a fresh call instead of joining the cancelled one
+        assert await client.generate_json("Pair fennel") == {"echo": "Pair fennel"}
+        assert model.calls == 2
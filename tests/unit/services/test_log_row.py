@@ -0,0 +1,147 @@
+"""Tests for lazily decoded SQLite food log rows."""
+
+import copy
+import json
+import pickle
+from typing import Any
+
+import pytest
+from pydantic import BaseModel, TypeAdapter
+
+from fcp.services.log_row import LogRow
+
+JSON_FIELDS = frozenset({"tags", "analysis", "nutrition"})
+
+
+def make_row(**overrides: Any) -> LogRow:
+    stored = {
+        "id": "log1",
+        "dish_name": "Ramen",
+        "tags": '["hot", "noodles"]',
+        "analysis": '{"confidence": 0.9}',
+        "nutrition": None,
+        **overrides,
+    }
+    return LogRow(stored, JSON_FIELDS)
+
+
+class TestLazyDecoding:
+    def test_decodes_on_first_access_and_caches(self):
+        row = make_row()
+        assert dict.__getitem__(row, "tags") == '["hot", "noodles"]'
+        assert row["tags"] == ["hot", "noodles"]
+        assert row["tags"] is row["tags"]
+        assert dict.__getitem__(row, "analysis") == '{"confidence": 0.9}'
+
+    def test_get_and_membership(self):
+        row = make_row()
+        assert row.get("analysis") == {"confidence": 0.9}
+        assert row.get("missing", "default") == "default"
+        assert row.get("nutrition") is None
+        assert "tags" in row
+
+    def test_invalid_json_kept_as_text(self):
+        row = make_row(tags="not json{")
+        assert row["tags"] == "not json{"
+
+    def test_assignment_replaces_pending_value(self):
+        row = make_row()
+        row["tags"] = '["literal"]'
+        assert row["tags"] == '["literal"]'
+        row.update(analysis="plain")
+        assert row["analysis"] == "plain"
+
+
+class TestDictCompatibility:
+    def test_is_a_dict_and_compares_decoded(self):
+        row = make_row()
+        expected = {
+            "id": "log1",
+            "dish_name": "Ramen",
+            "tags": ["hot", "noodles"],
+            "analysis": {"confidence": 0.9},
+            "nutrition": None,
+        }
+        assert isinstance(row, dict)
+        assert row == expected
+        assert expected == make_row()
+        assert make_row() == make_row()
+        assert row != {}
+
+    def test_unpacking_and_conversion_decode(self):
+        assert {**make_row()}["tags"] == ["hot", "noodles"]
+        assert dict(make_row())["analysis"] == {"confidence": 0.9}
+        assert (make_row() | {"x": 1})["tags"] == ["hot", "noodles"]
+        assert (lambda **kw: kw["analysis"])(**make_row()) == {"confidence": 0.9}
+
+    def test_items_values_pop(self):
+        row = make_row()
+        assert dict(row.items())["tags"] == ["hot", "noodles"]
+        assert {"confidence": 0.9} in list(row.values())
+        assert row.pop("analysis") == {"confidence": 0.9}
+        assert row.pop("analysis", None) is None
+        assert row.popitem() == ("nutrition", None)
+        assert row.setdefault("tags") == ["hot", "noodles"]
+
+    def test_missing_keys_and_empty_rows_raise(self):
+        with pytest.raises(KeyError):
+            make_row().pop("missing")
+        with pytest.raises(KeyError, match="empty"):
+            LogRow({}, JSON_FIELDS).popitem()
+
+    def test_setdefault_adds_missing_key(self):
+        row = make_row()
+        assert row.setdefault("venue", "Ichiran") == "Ichiran"
+        assert row["venue"] == "Ichiran"
+        assert row.setdefault("venue", "other") == "Ichiran"
+
+    def test_in_place_merge_replaces_pending_values(self):
+        row = make_row()
+        row |= {"analysis": '{"kept": "as text"}', "venue": "Ichiran"}
+        assert isinstance(row, LogRow)
+        assert row["analysis"] == '{"kept": "as text"}'
+        assert row["tags"] == ["hot", "noodles"]
+        assert row["venue"] == "Ichiran"
+
+    def test_merge_with_non_mapping_unsupported(self):
+        with pytest.raises(TypeError):
+            make_row() | [("x", 1)]
+
+    def test_del_skips_decoding(self):
+        row = make_row()
+        del row["analysis"]
+        assert "analysis" not in row
+        assert row.to_json() == '{"id":"log1","dish_name":"Ramen","tags":["hot", "noodles"],"nutrition":null}'
+
+    def test_copies_and_pickles_are_decoded_dicts(self):
+        for clone in (make_row().copy(), copy.copy(make_row()), copy.deepcopy(make_row())):
+            assert type(clone) is dict
+            assert clone["tags"] == ["hot", "noodles"]
+        assert pickle.loads(pickle.dumps(make_row()))["analysis"] == {"confidence": 0.9}
+        assert "'hot'" in repr(make_row())
+
+
+class TestSerialization:
+    def test_json_dumps_decodes(self):
+        assert json.loads(json.dumps(make_row()))["tags"] == ["hot", "noodles"]
+
+    def test_pydantic_validation_and_serialization(self):
+        class Model(BaseModel):
+            meal: dict[str, Any]
+
+        assert Model(meal=make_row()).meal["analysis"] == {"confidence": 0.9}
+        dumped = json.loads(TypeAdapter(Any).dump_json({"meals": [make_row()]}))
+        assert dumped["meals"][0]["tags"] == ["hot", "noodles"]
+
+    def test_to_json_embeds_untouched_columns_verbatim(self):
+        row = make_row()
+        row["dish_name"] = "Shōyu"
+        encoded = row.to_json()
+        assert '"analysis":{"confidence": 0.9}' in encoded
+        assert '"dish_name":"Shōyu"' in encoded
+        assert json.loads(encoded) == dict(make_row(dish_name="Shōyu"))
+
+    def test_to_json_reencodes_accessed_columns(self):
+        row = make_row()
+        row["tags"].append("extra")
+        assert json.loads(row.to_json())["tags"] == ["hot", "noodles", "extra"]
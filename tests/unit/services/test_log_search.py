@@ -0,0 +1,61 @@
+"""Tests for the shared food log full-text ranking helpers."""
+
+from fcp.services.log_search import fts_match_expression, rank_logs, tokenize
+
+
+class TestTokenize:
+    def test_lowercases_and_splits_on_punctuation(self):
+        assert tokenize("Spicy, Tonkotsu-Ramen!") == ["spicy", "tonkotsu", "ramen"]
+
+    def test_keeps_non_ascii_words(self):
+        assert tokenize("Crème brûlée") == ["crème", "brûlée"]
+
+
+class TestFtsMatchExpression:
+    def test_quotes_and_ors_unique_words(self):
+        assert fts_match_expression("ramen Ramen broth") == '"ramen" OR "broth"'
+
+    def test_neutralises_fts_operators(self):
+        assert fts_match_expression('dish_name: NEAR("x" *') == '"dish_name" OR "near" OR "x"'
+
+    def test_no_words(self):
+        assert fts_match_expression("  ?! ") is None
+
+
+class TestRankLogs:
+    def test_weights_dish_name_over_notes(self):
+        logs = [
+            {"id": "notes", "dish_name": "Pizza", "notes": "wanted ramen instead"},
+            {"id": "dish", "dish_name": "Miso Ramen"},
+            {"id": "miss", "dish_name": "Salad"},
+        ]
+        hits = rank_logs(logs, "ramen", limit=10)
+        assert [h["id"] for h in hits] == ["dish", "notes"]
+        assert hits[0]["search_score"] > hits[1]["search_score"] > 0
+
+    def test_searches_list_fields(self):
+        logs = [{"id": "a", "dish_name": "Tacos", "ingredients": ["cilantro", "lime"]}]
+        assert [h["id"] for h in rank_logs(logs, "lime", limit=10)] == ["a"]
+
+    def test_more_matched_words_rank_higher(self):
+        logs = [
+            {"id": "one", "dish_name": "Spicy Curry"},
+            {"id": "two", "dish_name": "Spicy Ramen"},
+        ]
+        assert rank_logs(logs, "spicy ramen", limit=10)[0]["id"] == "two"
+
+    def test_words_no_log_contains_are_ignored(self):
+        logs = [{"id": "a", "dish_name": "Ramen"}, {"id": "b", "dish_name": "Salad"}]
+        hits = rank_logs(logs, "ramen durian", limit=10)
+        assert [h["id"] for h in hits] == ["a"]
+        assert hits[0]["search_score"] == rank_logs(logs, "ramen", limit=10)[0]["search_score"]
+        assert rank_logs(logs, "durian", limit=10) == []
+
+    def test_limit_and_does_not_mutate_input(self):
+        logs = [{"id": str(i), "dish_name": "Ramen"} for i in range(3)]
+        assert len(rank_logs(logs, "ramen", limit=2)) == 2
+        assert "search_score" not in logs[0]
+
+    def test_empty_inputs(self):
+        assert rank_logs([], "ramen", limit=5) == []
+        assert rank_logs([{"id": "a", "dish_name": "Ramen"}], "", limit=5) == []
@@ -0,0 +1,326 @@
+"""Tests for the media fetch cache."""
+
+import asyncio
+import time
+from email.utils import formatdate
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from fcp.services import media_cache as media_cache_module
+from fcp.services.gemini import GeminiClient
+from fcp.services.media_cache import MediaCache, fresh_until
+
+URL = "https://firebasestorage.googleapis.com/ramen.jpg"
+PHOTO = b"\xff\xd8 ramen photo"
+
+
+@pytest_asyncio.fixture
+async def cache(tmp_path):
+    media = MediaCache(tmp_path / "media", enabled=True)
+    yield media
+    await media.close()
+
+
+def response(status: int = 200, content: bytes = PHOTO, **headers: str) -> httpx.Response:
+    headers = {"content-type": "image/jpeg", **{k.replace("_", "-"): v for k, v in headers.items()}}
+    return httpx.Response(status, content=content, headers=headers, request=httpx.Request("GET", URL))
+
+
+def server(*responses: httpx.Response) -> AsyncMock:
+    return AsyncMock(side_effect=list(responses))
+
+
+class TestFreshUntil:
+    def test_max_age_less_age(self):
+        assert fresh_until({"cache-control": "public, max-age=600", "age": "100"}, 1000.0, 60) == 1500.0
+
+    def test_no_store_and_no_cache(self):
+        assert fresh_until({"cache-control": "no-store"}, 1000.0, 60) is None
+        assert fresh_until({"cache-control": "no-cache"}, 1000.0, 60) == 1000.0
+
+    def test_expires(self):
+        assert fresh_until({"expires": formatdate(2000.0, usegmt=True)}, 1000.0, 60) == 2000.0
+        assert fresh_until({"expires": "0"}, 1000.0, 60) == 1000.0
+
+    def test_default(self):
+        assert fresh_until({}, 1000.0, 60) == 1060.0
+
+    def test_invalid_max_age_means_expired(self):
+        assert fresh_until({"cache-control": "max-age=soon"}, 1000.0, 60) == 1000.0
+        assert fresh_until({"cache-control": "max-age=60", "age": "old"}, 1000.0, 60) == 1000.0
+
+
+class TestFetch:
+    @pytest.mark.asyncio
+    async def test_fresh_media_served_without_downloading(self, cache):
+        download = server(response(cache_control="max-age=600"))
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert download.await_count == 1
+        assert cache.stats()["memory"] == 1
+        assert cache.stats()["bytes_saved"] == len(PHOTO)
+
+    @pytest.mark.asyncio
+    async def test_stale_media_revalidated(self, cache):
+        download = server(
+            response(cache_control="no-cache", etag='"v1"', last_modified="Tue, 01 Sep 2026 10:00:00 GMT"),
+            response(304, content=b"", cache_control="max-age=600"),
+        )
+        await cache.fetch(URL, download)
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert download.await_args_list[0].args == ({},)
+        assert download.await_args_list[1].args == (
+            {"If-None-Match": '"v1"', "If-Modified-Since": "Tue, 01 Sep 2026 10:00:00 GMT"},
+        )
+        # The 304 made it fresh again
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert download.await_count == 2
+        assert cache.stats()["revalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_revalidated_by_date_alone(self, cache):
+        modified = "Tue, 01 Sep 2026 10:00:00 GMT"
+        download = server(response(cache_control="no-cache", last_modified=modified), response(304, content=b""))
+        await cache.fetch(URL, download)
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert download.await_args.args == ({"If-Modified-Since": modified},)
+
+    @pytest.mark.asyncio
+    async def test_changed_media_replaced(self, cache):
+        download = server(response(cache_control="max-age=0", etag='"v1"'), response(content=b"new", etag='"v2"'))
+        await cache.fetch(URL, download)
+        assert await cache.fetch(URL, download) == (b"new", "image/jpeg")
+
+    @pytest.mark.asyncio
+    async def test_no_store_not_kept(self, cache):
+        download = server(response(cache_control="no-store"), response(cache_control="no-store"))
+        await cache.fetch(URL, download)
+        await cache.fetch(URL, download)
+        assert download.await_count == 2
+        assert cache.stats()["memory_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_download(self, cache):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow(headers):
+            started.set()
+            await release.wait()
+            return response()
+
+        download = AsyncMock(side_effect=slow)
+        fetches = [asyncio.create_task(cache.fetch(URL, download)) for _ in range(5)]
+        await started.wait()
+        release.set()
+        assert await asyncio.gather(*fetches) == [(PHOTO, "image/jpeg")] * 5
+        assert download.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_failure(self, cache):
+        download = AsyncMock(side_effect=httpx.ConnectError("down"))
+        results = await asyncio.gather(cache.fetch(URL, download), cache.fetch(URL, download), return_exceptions=True)
+        assert all(isinstance(result, httpx.ConnectError) for result in results)
+        assert download.await_count == 1
+        # Nothing is left in flight; the next fetch tries again
+        download.side_effect = [response()]
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_download_already_replaced_is_ignored(self, cache):
+        task = asyncio.ensure_future(asyncio.sleep(10))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        cache._in_flight[URL] = other = asyncio.ensure_future(asyncio.sleep(0))
+        cache._landed(URL, task)
+        assert cache._in_flight[URL] is other
+        await other
+
+    @pytest.mark.asyncio
+    async def test_disabled_always_downloads(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=False)
+        download = server(response(), response())
+        await cache.fetch(URL, download)
+        await cache.fetch(URL, download)
+        assert download.await_count == 2
+        assert not (tmp_path / "index.db").exists()
+
+
+class TestTiers:
+    @pytest.mark.asyncio
+    async def test_memory_lru_bounded_by_size(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, persist=False, max_memory_bytes=25)
+        for name in "abc":
+            await cache.fetch(f"{URL}?{name}", server(response(content=name.encode() * 10)))
+        await cache.fetch(f"{URL}?b", server())
+        await cache.fetch(f"{URL}?d", server(response(content=b"d" * 10)))
+        assert cache.stats()["memory_bytes"] == 20
+        # "c" was least recently used once "b" was read again
+        assert [url[-1] for url in cache._entries] == ["b", "d"]
+
+    @pytest.mark.asyncio
+    async def test_shared_bytes_leave_memory_with_their_last_url(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, persist=False, max_memory_bytes=25)
+        for name, content in (("a", b"x" * 10), ("b", b"x" * 10), ("c", b"y" * 10)):
+            await cache.fetch(f"{URL}?{name}", server(response(content=content)))
+        assert cache.stats()["memory_bytes"] == 20
+        await cache.fetch(f"{URL}?d", server(response(content=b"z" * 10)))
+        # Evicting "a" kept the bytes "b" still uses; evicting "b" then freed them
+        assert [url[-1] for url in cache._entries] == ["c", "d"]
+        assert cache.stats()["memory_bytes"] == 20
+
+    @pytest.mark.asyncio
+    async def test_same_bytes_stored_once(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, persist=False)
+        await cache.fetch(f"{URL}?a", server(response()))
+        await cache.fetch(f"{URL}?b", server(response()))
+        assert cache.stats()["memory_entries"] == 2
+        assert cache.stats()["memory_bytes"] == len(PHOTO)
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_shared_across_processes(self, tmp_path):
+        first = MediaCache(tmp_path, enabled=True)
+        await first.fetch(URL, server(response(etag='"v1"')))
+        await first.close()
+
+        second = MediaCache(tmp_path, enabled=True)
+        download = server()
+        assert await second.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert download.await_count == 0
+        assert second.stats()["disk"] == 1
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_pruned_oldest_first(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, max_memory_bytes=0, max_disk_bytes=30)
+        with patch.object(media_cache_module, "PRUNE_EVERY", 1):
+            for name in "abcd":
+                await cache.fetch(f"{URL}?{name}", server(response(content=name.encode() * 10)))
+                time.sleep(0.001)
+        assert len(list(tmp_path.glob("??/*"))) == 3
+        download = server(response(content=b"a" * 10))
+        await cache.fetch(f"{URL}?a", download)
+        assert download.await_count == 1
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_keeps_files_other_urls_use(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, max_memory_bytes=0, max_disk_bytes=15)
+        with patch.object(media_cache_module, "PRUNE_EVERY", 1):
+            for name, content in (("a", b"x" * 10), ("b", b"x" * 10), ("c", b"y" * 10)):
+                await cache.fetch(f"{URL}?{name}", server(response(content=content)))
+                time.sleep(0.001)
+        # "a" and "b" were dropped, and their shared file with them
+        assert len(list(tmp_path.glob("??/*"))) == 1
+        await cache.fetch(f"{URL}?c", server())
+        download = server(response(content=b"x" * 10))
+        await cache.fetch(f"{URL}?b", download)
+        assert download.await_count == 1
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_media_over_disk_limit_kept_in_memory_only(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, max_disk_bytes=len(PHOTO) - 1)
+        download = server(response())
+        await cache.fetch(URL, download)
+        await cache.fetch(URL, download)
+        assert download.await_count == 1
+        assert not list(tmp_path.glob("??/*"))
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_file_downloads_again(self, tmp_path):
+        first = MediaCache(tmp_path, enabled=True)
+        await first.fetch(URL, server(response()))
+        await first.close()
+        for blob in tmp_path.glob("??/*"):
+            blob.unlink()
+
+        second = MediaCache(tmp_path, enabled=True)
+        download = server(response())
+        assert await second.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert download.await_count == 1
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_errors_fall_back_to_downloading(self, cache, caplog):
+        db = await cache._connection()
+        await db.execute("DROP TABLE media")
+        download = server(response(), response(cache_control="no-store"))
+        assert await cache.fetch(URL, download) == (PHOTO, "image/jpeg")
+        assert await cache.fetch(f"{URL}?private", download) == (PHOTO, "image/jpeg")
+        assert download.await_count == 2
+        failures = [r.getMessage() for r in caplog.records if r.name == media_cache_module.__name__]
+        assert [message.split(":")[0] for message in failures] == [
+            "Media cache read failed",
+            "Media cache write failed",
+            "Media cache read failed",
+            "Media cache write failed",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_corrupt_index_falls_back_to_memory(self, tmp_path):
+        (tmp_path / "index.db").write_bytes(b"not a database" * 100)
+        cache = MediaCache(tmp_path, enabled=True)
+        download = server(response())
+        await cache.fetch(URL, download)
+        await cache.fetch(URL, download)
+        assert download.await_count == 1
+        assert await cache._connection() is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_opens_one_connection(self, cache):
+        first, second = await asyncio.gather(cache._connection(), cache._connection())
+        assert first is second is not None
+
+    @pytest.mark.asyncio
+    async def test_memory_only_forgets_no_store(self, tmp_path):
+        cache = MediaCache(tmp_path, enabled=True, persist=False)
+        download = server(response(cache_control="no-cache", etag='"v1"'), response(cache_control="no-store"))
+        await cache.fetch(URL, download)
+        await cache.fetch(URL, download)
+        assert cache.stats()["memory_entries"] == 0
+        await cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_unusable_disk_falls_back_to_memory(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+        cache = MediaCache(blocker / "media", enabled=True)
+        download = server(response())
+        await cache.fetch(URL, download)
+        await cache.fetch(URL, download)
+        assert download.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_clear(self, cache, tmp_path):
+        await cache.fetch(URL, server(response()))
+        await cache.clear()
+        assert not list((tmp_path / "media").glob("??/*"))
+        download = server(response())
+        await cache.fetch(URL, download)
+        assert download.await_count == 1
+
+
+class TestFetchMedia:
+    @pytest.mark.asyncio
+    async def test_gemini_fetch_media_uses_cache(self, tmp_path):
+        http_client = MagicMock()
+        http_client.get = AsyncMock(
+            side_effect=[
+                response(cache_control="max-age=0", etag='"v1"'),
+                response(304, content=b""),
+            ]
+        )
+        with (
+            patch("fcp.services.gemini_base.media_cache", MediaCache(tmp_path, enabled=True, persist=False)),
+            patch.object(GeminiClient, "_get_http_client", return_value=http_client),
+        ):
+            client = GeminiClient()
+            assert await client._fetch_media(URL) == (PHOTO, "image/jpeg")
+            assert await client._fetch_media(URL) == (PHOTO, "image/jpeg")
+        assert http_client.get.await_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
@@ -0,0 +1,72 @@
+"""Tests for the shared daily nutrition rollup helpers."""
+
+from fcp.services.nutrition_rollups import cuisine_key, log_day, nutrient_value, rollups_from_logs
+
+
+class TestLogDay:
+    def test_date_prefix(self):
+        assert log_day("2026-01-05T23:59:00+00:00") == "2026-01-05"
+
+    def test_invalid_or_missing(self):
+        assert log_day(None) is None
+        assert log_day("2026-02-30T00:00:00") is None
+        assert log_day("yesterday") is None
+
+
+class TestCuisineKey:
+    def test_folds_ascii_only(self):
+        assert cuisine_key("THAI") == "thai"
+        assert cuisine_key("CRÊPES") == "crÊpes"
+        assert cuisine_key("") is None
+
+
+class TestNutrientValue:
+    def test_only_numbers_count(self):
+        nutrition = {"calories": 500, "protein_g": 12.5, "fat_g": True, "carbs_g": "30"}
+        assert nutrient_value(nutrition, "calories") == 500
+        assert nutrient_value(nutrition, "protein_g") == 12.5
+        assert nutrient_value(nutrition, "fat_g") is None
+        assert nutrient_value(nutrition, "carbs_g") is None
+        assert nutrient_value("500 kcal", "calories") is None
+
+
+class TestRollupsFromLogs:
+    def test_groups_by_day_oldest_first(self):
+        logs = [
+            {"created_at": "2026-01-02T08:00:00", "cuisine": "Thai", "venue_name": "Home"},
+            {"created_at": "2026-01-01T19:00:00", "nutrition": {"calories": 0.1}},
+            {"created_at": "2026-01-01T20:00:00", "nutrition": {"calories": 0.2, "fiber_g": 3}, "venue_name": ""},
+            {"created_at": None, "nutrition": {"calories": 999}},
+        ]
+
+        rollups = rollups_from_logs(logs)
+
+        assert rollups == [
+            {
+                "day": "2026-01-01",
+                "meal_count": 2,
+                "logs_with_nutrition": 2,
+                "calories": 0.3,
+                "protein_g": 0,
+                "carbs_g": 0,
+                "fat_g": 0,
+                "fiber_g": 3,
+                "cuisines": {},
+                "venues": {},
+            },
+            {
+                "day": "2026-01-02",
+                "meal_count": 1,
+                "logs_with_nutrition": 0,
+                "calories": 0,
+                "protein_g": 0,
+                "carbs_g": 0,
+                "fat_g": 0,
+                "fiber_g": 0,
+                "cuisines": {"thai": 1},
+                "venues": {"Home": 1},
+            },
+        ]
+
+    def test_empty(self):
+        assert rollups_from_logs([]) == []
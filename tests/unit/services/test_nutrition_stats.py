@@ -0,0 +1,131 @@
+"""Golden-value tests for the in-process nutrition statistics engine."""
+
+from datetime import date, datetime
+
+from fcp.services.nutrition_stats import columns_from_logs, compare, format_comparison, format_summary, summarize
+
+LOGS = [
+    {
+        "created_at": "2026-01-01T08:00:00+00:00",
+        "dish_name": "Oatmeal",
+        "cuisine": "American",
+        "nutrition": {"calories": 300, "protein_g": 10, "carbs_g": 50, "fat_g": 6},
+    },
+    {
+        "created_at": "2026-01-01T19:00:00+00:00",
+        "dish_name": "Ramen",
+        "cuisine": "Japanese",
+        "nutrition": {"calories": 700, "protein_g": 30, "carbs_g": 80, "fat_g": 25},
+    },
+    {
+        "created_at": "2026-01-02T12:00:00+00:00",
+        "dish_name": "Ramen",
+        "cuisine": "japanese",
+        "nutrition": {"calories": 650, "protein_g": 28, "carbs_g": 75, "fat_g": 22},
+    },
+    {"created_at": "2026-01-03T12:00:00+00:00", "dish_name": "Salad"},
+    {"dish_name": "Snack", "nutrition": {"calories": 150}},
+]
+
+GOLDEN_STATS = {
+    "entry_count": 5,
+    "days_tracked": 3,
+    "undated_entries": 1,
+    "meals_per_day": 1.33,
+    "total_calories": 1800,
+    "avg_daily_calories": 550,
+    "avg_daily_macros": {"protein_g": 22.67, "carbs_g": 68.33, "fat_g": 17.67},
+    "macro_ratio_pct": {"protein": 17.34, "carbs": 52.26, "fat": 30.4},
+    "daily_calories_stddev": 414.33,
+    "highest_day": {"day": "2026-01-01", "calories": 1000},
+    "lowest_day": {"day": "2026-01-03", "calories": 0},
+    "top_dishes": [
+        {"dish_name": "Ramen", "count": 2},
+        {"dish_name": "Oatmeal", "count": 1},
+        {"dish_name": "Salad", "count": 1},
+        {"dish_name": "Snack", "count": 1},
+    ],
+    "unique_dishes": 4,
+    "cuisines_tried": 2,
+}
+
+
+class TestColumnsFromLogs:
+    def test_groups_days_oldest_first(self):
+        columns = columns_from_logs(reversed(LOGS))
+        assert columns.days == ["2026-01-01", "2026-01-02", "2026-01-03"]
+        assert list(columns.meals) == [2, 1, 1]
+        assert list(columns.calories) == [1000, 650, 0]
+        assert list(columns.fat_g) == [31, 22, 0]
+
+    def test_accepts_datetimes_and_ignores_non_numeric_values(self):
+        logs = [
+            {"created_at": datetime(2026, 1, 5, 12), "nutrition": {"calories": "500", "protein_g": True}},
+            {"created_at": datetime(2026, 1, 5, 18), "nutrition": "unknown"},
+        ]
+        columns = columns_from_logs(logs)
+        assert columns.days == ["2026-01-05"]
+        assert list(columns.calories) == [0]
+        assert list(columns.protein_g) == [0]
+
+
+class TestSummarize:
+    def test_golden_values(self):
+        assert summarize(columns_from_logs(LOGS)) == GOLDEN_STATS
+
+    def test_empty(self):
+        stats = summarize(columns_from_logs([]))
+        assert stats["days_tracked"] == 0
+        assert stats["avg_daily_calories"] == 0
+        assert stats["daily_calories_stddev"] is None
+        assert stats["highest_day"] is None
+        assert stats["macro_ratio_pct"] == {"protein": None, "carbs": None, "fat": None}
+        assert format_summary(stats) == "0 entries, no dated entries to compute daily statistics."
+
+    def test_format_summary(self):
+        assert format_summary(GOLDEN_STATS) == (
+            "Days tracked: 3 (5 entries, 1.33 per day)\n"
+            "Total calories: 1800\n"
+            "Average daily calories: 550 (std dev 414.33)\n"
+            "Average daily macros: protein 22.67 g, carbs 68.33 g, fat 17.67 g\n"
+            "Macro ratio: protein 17.34%, carbs 52.26%, fat 30.4%\n"
+            "Highest day: 2026-01-01 (1000 kcal)\n"
+            "Lowest day: 2026-01-03 (0 kcal)\n"
+            "Most frequent: Ramen (2), Oatmeal (1), Salad (1), Snack (1)"
+        )
+
+    def test_format_summary_without_macros_or_dishes(self):
+        stats = summarize(columns_from_logs([{"created_at": date(2026, 1, 5)}]))
+        assert format_summary(stats).splitlines() == [
+            "Days tracked: 1 (1 entries, 1.0 per day)",
+            "Total calories: 0.0",
+            "Average daily calories: 0.0 (std dev 0.0)",
+            "Average daily macros: protein 0.0 g, carbs 0.0 g, fat 0.0 g",
+            "Highest day: 2026-01-05 (0.0 kcal)",
+            "Lowest day: 2026-01-05 (0.0 kcal)",
+        ]
+
+
+class TestCompare:
+    def test_golden_values(self):
+        later = summarize(columns_from_logs(LOGS[:2]))
+        comparison = compare(GOLDEN_STATS, later)
+        assert comparison == {
+            "avg_daily_calories": {"period1": 550, "period2": 1000, "change_pct": 81.82},
+            "avg_daily_protein_g": {"period1": 22.67, "period2": 40, "change_pct": 76.44},
+            "avg_daily_carbs_g": {"period1": 68.33, "period2": 130, "change_pct": 90.25},
+            "avg_daily_fat_g": {"period1": 17.67, "period2": 31, "change_pct": 75.44},
+            "meals_per_day": {"period1": 1.33, "period2": 2, "change_pct": 50.38},
+            "unique_dishes": {"period1": 4, "period2": 2, "change_pct": -50.0},
+            "cuisines_tried": {"period1": 2, "period2": 2, "change_pct": 0.0},
+        }
+        assert format_comparison(comparison, "A", "B").splitlines()[:2] == [
+            "A vs B",
+            "avg_daily_calories: 550 -> 1000.0 (+81.82%)",
+        ]
+
+    def test_change_from_zero_is_undefined(self):
+        empty = summarize(columns_from_logs([]))
+        comparison = compare(empty, GOLDEN_STATS)
+        assert comparison["avg_daily_calories"]["change_pct"] is None
+        assert format_comparison(comparison, "A", "B").splitlines()[1] == "avg_daily_calories: 0 -> 550"
@@ -0,0 +1,23 @@
+"""Tests for keyset pagination cursors."""
+
+import base64
+import json
+
+import pytest
+
+from fcp.services.pagination import decode_log_cursor, encode_log_cursor
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode("ascii")
+
+
+class TestLogCursor:
+    def test_round_trip(self):
+        cursor = encode_log_cursor("2026-03-01T12:00:00+00:00", "log-1")
+        assert decode_log_cursor(cursor) == ("2026-03-01T12:00:00+00:00", "log-1")
+
+    @pytest.mark.parametrize("value", [{"a": 1}, ["2026-03-01"], ["2026-03-01", 7], [1, "log-1"]])
+    def test_wrong_shape_rejected(self, value):
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            decode_log_cursor(_raw_cursor(value))
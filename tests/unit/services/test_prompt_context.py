@@ -0,0 +1,142 @@
+"""Tests for compact prompt serialization of food logs and pantry items."""
+
+import json
+from datetime import UTC, date, datetime
+
+from fcp.services.prompt_context import estimate_text_tokens, format_logs, format_table
+
+
+def _log(i: int, cuisine: str = "Japanese", **fields) -> dict:
+    return {
+        "id": f"log-{i}",
+        "dish_name": f"Dish {i}",
+        "cuisine": cuisine,
+        "created_at": f"2026-03-{i + 1:02d}T12:00:00",
+        **fields,
+    }
+
+
+class TestEstimateTextTokens:
+    def test_counts_pieces(self):
+        assert estimate_text_tokens("") == 0
+        assert estimate_text_tokens("ramen") == 1
+        assert estimate_text_tokens("ramen shop") == 2
+        # Long words are split, numbers go by three digits
+        assert estimate_text_tokens("okonomiyaki") == 2
+        assert estimate_text_tokens("2026") == 2
+        assert estimate_text_tokens('{"a": 1}') == 7
+
+    def test_indentation_costs(self):
+        logs = [_log(i, notes=None, rating=4.0) for i in range(10)]
+        indented = estimate_text_tokens(json.dumps(logs, indent=2))
+        assert estimate_text_tokens(json.dumps(logs)) < indented
+        assert estimate_text_tokens(format_logs(logs)) < indented / 2
+
+
+class TestFormatTable:
+    def test_header_and_rows(self):
+        text = format_table([{"name": "Eggs", "qty": 12}, {"name": "Miso", "qty": 1}])
+        assert text == "name\tqty\nEggs\t12\nMiso\t1"
+
+    def test_empty_fields_and_columns_dropped(self):
+        text = format_table(
+            [
+                {"name": "Eggs", "notes": None, "tags": [], "brand": ""},
+                {"name": "Miso", "notes": "white", "tags": [], "brand": None},
+            ]
+        )
+        assert text == "name\tnotes\nEggs\t\nMiso\twhite"
+
+    def test_values(self):
+        purchased = datetime(2026, 3, 1, 9, 30, 12, tzinfo=UTC)
+        text = format_table(
+            [
+                {
+                    "name": "Tofu\tsilken\n(firm)",
+                    "purchased": purchased,
+                    "weight": 0.5,
+                    "opened": False,
+                    "tags": ["soy", None, "chilled"],
+                    "nutrition": {"calories": 76.0, "protein_g": 8, "fat_g": None},
+                }
+            ]
+        )
+        header, row = text.split("\n")
+        assert header.split("\t") == [
+            "name",
+            "purchased",
+            "weight",
+            "opened",
+            "tags",
+            "nutrition.calories",
+            "nutrition.protein_g",
+        ]
+        assert row.split("\t") == [
+            "Tofu silken (firm)",
+            "2026-03-01T09:30+00:00",
+            "0.5",
+            "no",
+            "soy, chilled",
+            "76",
+            "8",
+        ]
+
+    def test_dates_and_deeper_nesting(self):
+        text = format_table(
+            [{"name": "Miso", "best_before": date(2026, 9, 1), "meta": {"source": {"shop": "Ito", "aisle": None}}}]
+        )
+        assert text == "name\tbest_before\tmeta.source\nMiso\t2026-09-01\tshop=Ito"
+
+    def test_long_text_cut(self):
+        text = format_table([{"notes": "spicy " * 100}], max_chars=20)
+        assert text.split("\n")[1] == "spicy spicy spicy s…"
+
+    def test_nothing_to_show(self):
+        assert format_table([]) == "(none)"
+        assert format_logs([]) == "(none)"
+
+
+class TestFormatLogsBudget:
+    def test_everything_fits(self):
+        logs = [_log(i) for i in range(5)]
+        assert format_logs(logs, budget=10_000) == format_logs(logs)
+        assert "not shown" not in format_logs(logs, budget=0)
+
+    def test_stays_within_budget(self):
+        logs = [_log(i, notes="broth " * 20) for i in range(28)]
+        text = format_logs(logs, budget=300)
+        assert estimate_text_tokens(text) <= 300
+        lines = text.split("\n")
+        assert lines[-1] == f"({28 - (len(lines) - 2)} more entries not shown)"
+
+    def test_recent_first_then_other_cuisines(self):
+        # Newest logs are all Japanese; one Thai and one Italian meal are older
+        logs = [_log(i) for i in range(20)]
+        logs[0]["cuisine"] = "Thai"
+        logs[1]["cuisine"] = "Italian"
+        row_tokens = estimate_text_tokens(format_logs(logs).split("\n")[1]) + 1
+
+        text = format_logs(logs, budget=row_tokens * 8 + 30)
+        kept = [line.split("\t")[0] for line in text.split("\n")[1:-1]]
+        newest = [f"log-{i}" for i in range(19, 15, -1)]
+        assert set(newest) <= set(kept)
+        assert {"log-0", "log-1"} <= set(kept)
+        assert "log-5" not in kept
+
+    def test_kept_entries_stay_in_given_order(self):
+        logs = [_log(i, cuisine=c) for i, c in enumerate(["Thai", "Thai", "Thai", "Italian"] * 5)]
+        text = format_logs(logs, budget=120)
+        kept = [int(line.split("\t")[0].removeprefix("log-")) for line in text.split("\n")[1:-1]]
+        assert kept == sorted(kept)
+
+    def test_undated_entries_come_after_dated_ones(self):
+        # Only log-3 has a date, in a later field after an empty one
+        logs = [{"id": f"log-{i}", "dish_name": f"Dish {i}", "cuisine": "Thai"} for i in range(6)]
+        logs[3].update(created_at="", date=date(2026, 3, 20))
+        header, *rows = format_logs(logs).split("\n")
+        # Room for the header, the dated row and the note, but not a second row
+        text = format_logs(logs, budget=estimate_text_tokens(header) + estimate_text_tokens(rows[3]) + 16)
+        assert [line.split("\t")[0] for line in text.split("\n")[1:-1]] == ["log-3"]
+
+    def test_budget_too_small_for_any_entry(self):
+        assert format_logs([_log(i) for i in range(3)], budget=5) == "(3 more entries not shown)"
@@ -0,0 +1,260 @@
+"""Tests for the versioned result cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+
+from fcp.services import result_cache as result_cache_module
+from fcp.services.result_cache import ResultCache, skip_result_cache
+
+
+@pytest_asyncio.fixture
+async def cache(tmp_path):
+    result_cache = ResultCache(tmp_path / "cache.db", enabled=True, ttl_seconds=60, max_entries=8)
+    yield result_cache
+    await result_cache.close()
+
+
+class Versions:
+    """Per-user data versions standing in for the database."""
+
+    def __init__(self):
+        self.versions: dict[str, int] = {}
+
+    async def __call__(self, user_id: str) -> int:
+        return self.versions.get(user_id, 0)
+
+
+def counting(result):
+    return AsyncMock(return_value=result)
+
+
+class TestGetOrCompute:
+    @pytest.mark.asyncio
+    async def test_disabled_always_computes(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache.db", enabled=False)
+        data_version = AsyncMock(return_value=1)
+        compute = counting({"value": 1})
+        for _ in range(2):
+            assert await cache.get_or_compute("e", "u1", {}, compute, data_version=data_version) == {"value": 1}
+        assert compute.await_count == 2
+        data_version.assert_not_awaited()
+        assert not (tmp_path / "cache.db").exists()
+
+    @pytest.mark.asyncio
+    async def test_hit_while_data_version_unchanged(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        first = await cache.get_or_compute("e", "u1", {"days": 7}, compute, data_version=versions)
+        second = await cache.get_or_compute("e", "u1", {"days": 7}, compute, data_version=versions)
+        assert first == second == {"value": 1}
+        assert second is not first
+        assert compute.await_count == 1
+        assert cache.stats() == {"memory": 1, "sqlite": 0, "miss": 1, "memory_entries": 1}
+
+    @pytest.mark.asyncio
+    async def test_key_covers_version_user_endpoint_and_args(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        await cache.get_or_compute("e", "u1", {"days": 7}, compute, data_version=versions)
+        await cache.get_or_compute("e", "u1", {"days": 30}, compute, data_version=versions)
+        await cache.get_or_compute("e", "u2", {"days": 7}, compute, data_version=versions)
+        await cache.get_or_compute("other", "u1", {"days": 7}, compute, data_version=versions)
+        versions.versions["u1"] = 1
+        await cache.get_or_compute("e", "u1", {"days": 7}, compute, data_version=versions)
+        assert compute.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_key_rolls_over_with_the_utc_day(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        with patch("fcp.services.result_cache.datetime") as mock_datetime:
+            mock_datetime.now.return_value.date.return_value.isoformat.return_value = "2026-01-01"
+            await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+            mock_datetime.now.return_value.date.return_value.isoformat.return_value = "2026-01-02"
+            await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+        assert compute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_shared_across_instances(self, cache, tmp_path):
+        versions = Versions()
+        await cache.get_or_compute("e", "u1", {}, counting({"value": 1}), data_version=versions)
+
+        other = ResultCache(tmp_path / "cache.db", enabled=True, ttl_seconds=60)
+        try:
+            compute = counting({"value": 2})
+            assert await other.get_or_compute("e", "u1", {}, compute, data_version=versions) == {"value": 1}
+            assert await other.get_or_compute("e", "u1", {}, compute, data_version=versions) == {"value": 1}
+            compute.assert_not_awaited()
+            assert other.stats()["sqlite"] == 1
+            assert other.stats()["memory"] == 1
+        finally:
+            await other.close()
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        with patch("fcp.services.result_cache.time.time", return_value=1000.0):
+            await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+            await cache.get_or_compute("short", "u1", {}, compute, data_version=versions, ttl_seconds=5)
+        with patch("fcp.services.result_cache.time.time", return_value=1010.0):
+            await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+            await cache.get_or_compute("short", "u1", {}, compute, data_version=versions)
+        with patch("fcp.services.result_cache.time.time", return_value=1061.0):
+            await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+        assert compute.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_and_skipped_results_not_cached(self, cache):
+        versions = Versions()
+        error = counting({"error": "Gemini unavailable"})
+        await cache.get_or_compute("e", "u1", {}, error, data_version=versions)
+        await cache.get_or_compute("e", "u1", {}, error, data_version=versions)
+        assert error.await_count == 2
+
+        calls = 0
+
+        async def fallback():
+            nonlocal calls
+            calls += 1
+            skip_result_cache()
+            return {"value": "degraded"}
+
+        await cache.get_or_compute("f", "u1", {}, fallback, data_version=versions)
+        await cache.get_or_compute("f", "u1", {}, fallback, data_version=versions)
+        assert calls == 2
+
+        # The skip flag does not leak into later computations.
+        compute = counting({"value": 1})
+        await cache.get_or_compute("g", "u1", {}, compute, data_version=versions)
+        await cache.get_or_compute("g", "u1", {}, compute, data_version=versions)
+        assert compute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unserializable_results_not_cached(self, cache):
+        compute = counting({"value": object()})
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        assert compute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_compute_errors_propagate(self, cache):
+        compute = AsyncMock(side_effect=RuntimeError("boom"))
+        with pytest.raises(RuntimeError, match="boom"):
+            await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        assert cache.stats()["miss"] == 1
+
+
+class TestTiers:
+    @pytest.mark.asyncio
+    async def test_memory_tier_evicts_least_recently_used(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache.db", enabled=True, max_entries=2, persist=False)
+        versions = Versions()
+        compute = counting({"value": 1})
+        for endpoint in ("a", "b", "a", "c", "a", "b"):
+            await cache.get_or_compute(endpoint, "u1", {}, compute, data_version=versions)
+        # "b" was evicted by "c"; "a" stayed because it was used most recently.
+        assert compute.await_count == 4
+        assert cache.stats()["memory_entries"] == 2
+        assert not (tmp_path / "cache.db").exists()
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_can_be_turned_off(self, tmp_path):
+        memoryless = ResultCache(tmp_path / "cache.db", enabled=True, max_entries=0)
+        versions = Versions()
+        compute = counting({"value": 1})
+        await memoryless.get_or_compute("e", "u1", {}, compute, data_version=versions)
+        await memoryless.get_or_compute("e", "u1", {}, compute, data_version=versions)
+        assert compute.await_count == 1
+        assert memoryless.stats() == {"memory": 0, "sqlite": 1, "miss": 1, "memory_entries": 0}
+        await memoryless.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_pruned_from_sqlite(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        with patch.object(result_cache_module, "PRUNE_EVERY", 2):
+            with patch("fcp.services.result_cache.time.time", return_value=1000.0):
+                await cache.get_or_compute("short", "u1", {}, compute, data_version=versions, ttl_seconds=5)
+            with patch("fcp.services.result_cache.time.time", return_value=1010.0):
+                await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+
+        db = await cache._connection()
+        async with db.execute("SELECT endpoint FROM results") as cursor:
+            assert [row[0] for row in await cursor.fetchall()] == ["e"]
+
+    @pytest.mark.asyncio
+    async def test_sqlite_errors_only_cost_misses(self, cache, caplog):
+        db = await cache._connection()
+        await db.execute("DROP TABLE results")
+        versions = Versions()
+        compute = counting({"value": 1})
+        assert await cache.get_or_compute("e", "u1", {}, compute, data_version=versions) == {"value": 1}
+        assert "Result cache read failed" in caplog.text
+        assert "Result cache write failed" in caplog.text
+
+        # The memory tier still serves the result
+        other = counting({"value": 2})
+        assert await cache.get_or_compute("e", "u1", {}, other, data_version=versions) == {"value": 1}
+        other.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_superseded_versions_removed_from_sqlite(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        await cache.get_or_compute("e", "u1", {"days": 7}, compute, data_version=versions)
+        await cache.get_or_compute("e", "u1", {"days": 30}, compute, data_version=versions)
+        await cache.get_or_compute("e", "u2", {}, compute, data_version=versions)
+        versions.versions["u1"] = 3
+        await cache.get_or_compute("e", "u1", {"days": 7}, compute, data_version=versions)
+
+        db = await cache._connection()
+        async with db.execute("SELECT user_id, data_version FROM results ORDER BY user_id") as cursor:
+            rows = [tuple(row) for row in await cursor.fetchall()]
+        assert rows == [("u1", 3), ("u2", 0)]
+
+    @pytest.mark.asyncio
+    async def test_unavailable_sqlite_falls_back_to_memory(self, tmp_path):
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        cache = ResultCache(blocker / "cache.db", enabled=True)
+        compute = counting({"value": 1})
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        assert compute.await_count == 1
+        assert await cache._connection() is None
+
+    @pytest.mark.asyncio
+    async def test_corrupt_sqlite_file_falls_back_to_memory(self, tmp_path):
+        (tmp_path / "cache.db").write_bytes(b"not a database" * 100)
+        cache = ResultCache(tmp_path / "cache.db", enabled=True)
+        compute = counting({"value": 1})
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        assert compute.await_count == 1
+        assert await cache._connection() is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_opens_one_connection(self, cache):
+        first, second = await asyncio.gather(cache._connection(), cache._connection())
+        assert first is second is not None
+
+    @pytest.mark.asyncio
+    async def test_clear_memory_only(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache.db", enabled=True, persist=False)
+        compute = counting({"value": 1})
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=Versions())
+        await cache.clear()
+        assert cache.stats()["memory_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_clear(self, cache):
+        versions = Versions()
+        compute = counting({"value": 1})
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+        await cache.clear()
+        await cache.get_or_compute("e", "u1", {}, compute, data_version=versions)
+        assert compute.await_count == 2
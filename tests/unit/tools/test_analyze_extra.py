@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import base64
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -22,6 +23,17 @@ async def test_analyze_meal_from_bytes_uses_image_bytes():
     assert kwargs["image_mime_type"] == "image/png"
 
 
+@pytest.mark.asyncio
+async def test_analyze_meal_from_bytes_tool_decodes_base64():
+    with patch("fcp.tools.analyze.analyze_meal_from_bytes", new=AsyncMock(return_value={"dish_name": "Salad"})) as mock:
+        from fcp.tools.analyze import analyze_meal_from_bytes_tool
+
+        result = await analyze_meal_from_bytes_tool(base64.b64encode(b"fake").decode(), mime_type="image/png")
+
+    assert result == {"dish_name": "Salad"}
+    mock.assert_awaited_once_with(b"fake", "image/png")
+
+
 @pytest.mark.asyncio
 async def test_analyze_meal_v2_allergen_warnings():
     mock_function_calls = {
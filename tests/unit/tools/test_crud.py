@@ -1,12 +1,22 @@
 """Unit tests for CRUD tools."""
 
+from datetime import UTC, date, datetime
 from unittest.mock import AsyncMock
 
 import pytest
 
 from fcp.mcp.container import DependencyContainer
 from fcp.mcp.protocols import AIService, Database, HTTPClient
-from fcp.tools.crud import add_meal, add_to_pantry, delete_meal, get_meals
+from fcp.tools.crud import (
+    add_meal,
+    add_to_pantry,
+    delete_meal,
+    get_daily_nutrition,
+    get_data_version,
+    get_meals,
+    get_meals_page,
+    get_recent_meals_tool,
+)
 
 
 @pytest.fixture
@@ -278,6 +288,75 @@ class TestGetMeals:
         )
 
 
+class TestGetMealsPage:
+    """Test keyset pagination through get_meals_page and get_recent_meals_tool."""
+
+    @pytest.mark.asyncio
+    async def test_uses_page_api(self, mock_container):
+        """Pages come from the keyset page query, with the backend's cursor."""
+        mock_container.database.get_user_logs_page.return_value = ([{"id": "log_3", "nutrition": {}}], "next")
+
+        result = await get_meals_page(user_id="user_456", limit=5, days=30, cursor="abc", db=mock_container.database)
+
+        assert result == ([{"id": "log_3"}], "next")
+        mock_container.database.get_user_logs_page.assert_called_once_with(
+            "user_456", page_size=5, cursor="abc", days=30
+        )
+        mock_container.database.get_user_logs.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_keeps_nutrition_when_asked(self, mock_container):
+        """include_nutrition leaves the nutrition data on each log."""
+        mock_container.database.get_user_logs_page.return_value = ([{"id": "log_3", "nutrition": {}}], None)
+
+        logs, _ = await get_meals_page(user_id="user_456", include_nutrition=True, db=mock_container.database)
+
+        assert logs == [{"id": "log_3", "nutrition": {}}]
+
+    @pytest.mark.asyncio
+    async def test_tool_first_page_uses_page_api(self, mock_container):
+        """The first page also goes through the page query and returns its cursor."""
+        mock_container.database.get_user_logs_page.return_value = ([{"id": "log_2"}, {"id": "log_1"}], "next")
+
+        result = await get_recent_meals_tool(user_id="user_456", limit=2, db=mock_container.database)
+
+        assert result["next_cursor"] == "next"
+        mock_container.database.get_user_logs_page.assert_called_once_with(
+            "user_456", page_size=2, cursor=None, days=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_tool_full_last_page_has_no_cursor(self, mock_container):
+        """A last page that exactly fills the limit has no next cursor."""
+        mock_container.database.get_user_logs_page.return_value = ([{"id": "log_2"}, {"id": "log_1"}], None)
+
+        result = await get_recent_meals_tool(user_id="user_456", limit=2, db=mock_container.database)
+
+        assert len(result["meals"]) == 2
+        assert result["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_tool_cursor_survives_schema_org_format(self, mock_container):
+        """The cursor is kept when the meals are converted to schema.org."""
+        mock_container.database.get_user_logs_page.return_value = ([{"id": "log_1"}], "next")
+
+        result = await get_recent_meals_tool(
+            user_id="user_456", limit=1, output_format="schema_org", db=mock_container.database
+        )
+
+        assert result["meals"][0]["@type"] == "Recipe"
+        assert result["next_cursor"] == "next"
+
+    @pytest.mark.asyncio
+    async def test_tool_invalid_cursor(self, mock_container):
+        """A malformed cursor is reported as a tool error."""
+        mock_container.database.get_user_logs_page.side_effect = ValueError("Invalid pagination cursor")
+
+        result = await get_recent_meals_tool(user_id="user_456", cursor="bogus", db=mock_container.database)
+
+        assert result == {"error": "An error occurred during listing meals. Please try again."}
+
+
 class TestAddToPantry:
     """Test add_to_pantry tool."""
 
@@ -344,3 +423,52 @@ class TestAddToPantry:
         call_args = mock_container.database.update_pantry_items_batch.call_args
         items_data = call_args[0][1]
         assert len(items_data) == 0
+
+
+class TestGetDailyNutrition:
+    """Test get_daily_nutrition tool."""
+
+    @staticmethod
+    def _rollup(day: str) -> dict:
+        return {"day": day, "meal_count": 1, "calories": 500, "cuisines": {"thai": 1}, "venues": {"Home": 1}}
+
+    @pytest.mark.asyncio
+    async def test_date_range_and_breakdown_dropped(self, mock_container):
+        """Whole days are passed through and the breakdowns are dropped by default."""
+        mock_container.database.get_daily_rollups.return_value = [self._rollup("2026-01-02")]
+
+        result = await get_daily_nutrition(
+            "user_1",
+            start_date=datetime(2026, 1, 1, 18, tzinfo=UTC),
+            end_date=datetime(2026, 1, 31, 6, tzinfo=UTC),
+            db=mock_container.database,
+        )
+
+        mock_container.database.get_daily_rollups.assert_awaited_once_with(
+            "user_1", date(2026, 1, 1), date(2026, 1, 31)
+        )
+        assert result == [{"day": "2026-01-02", "meal_count": 1, "calories": 500}]
+
+    @pytest.mark.asyncio
+    async def test_days_window_with_breakdown(self, mock_container):
+        """Without dates the window covers the last ``days`` days, up to today."""
+        mock_container.database.get_daily_rollups.return_value = [self._rollup("2026-01-02")]
+
+        result = await get_daily_nutrition("user_1", days=30, include_breakdown=True, db=mock_container.database)
+
+        _, start, end = mock_container.database.get_daily_rollups.call_args.args
+        assert (end - start).days == 30
+        assert end == datetime.now(UTC).date()
+        assert result[0]["cuisines"] == {"thai": 1}
+
+
+class TestGetDataVersion:
+    """Test get_data_version tool."""
+
+    @pytest.mark.asyncio
+    async def test_reads_version_from_database(self, mock_container):
+        """The user's data version comes straight from the database."""
+        mock_container.database.get_data_version.return_value = 7
+
+        assert await get_data_version("user_1", db=mock_container.database) == 7
+        mock_container.database.get_data_version.assert_awaited_once_with("user_1")
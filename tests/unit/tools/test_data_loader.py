@@ -0,0 +1,176 @@
+"""Tests for the request-scoped user data loader."""
+
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from fcp.tools.data_loader import UserDataLoader, user_data, user_data_scope
+from tests.fakes.fake_gemini import FakeGeminiClient
+
+
+def _logs(count: int) -> list[dict]:
+    now = datetime.now(UTC)
+    return [
+        {
+            "id": f"log{i}",
+            "dish_name": f"Dish {i}",
+            "venue_name": "Home",
+            "created_at": (now - timedelta(hours=12 * i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+class SlowDatabase:
+    """Database stand-in whose reads each take ``delay`` seconds."""
+
+    def __init__(self, logs: list[dict], delay: float = 0.0):
+        self.logs = logs
+        self.delay = delay
+        self.log_queries: list[dict] = []
+
+    async def get_user_logs(self, user_id, limit=100, days=None, fields=None):
+        self.log_queries.append({"limit": limit, "days": days, "fields": fields})
+        await asyncio.sleep(self.delay)
+        rows = self.logs
+        if days:
+            cutoff = (datetime.now(UTC) - timedelta(days=days)).isoformat()
+            rows = [row for row in rows if row["created_at"] >= cutoff]
+        return rows[:limit]
+
+    async def get_user_preferences(self, user_id):
+        await asyncio.sleep(self.delay)
+        return {"timezone": "UTC"}
+
+
+class TestUserDataLoaderLogs:
+    @pytest.mark.asyncio
+    async def test_narrower_reads_are_cut_from_the_wider_one(self):
+        db = SlowDatabase(_logs(30))
+        loader = UserDataLoader("u1", db=db)
+
+        history = await loader.logs(limit=20, fields=("dish_name",))
+        recent = await loader.logs(limit=5, days=3, fields=("dish_name",))
+
+        assert len(history) == 20
+        # Logs every 12 hours: today, 12h, 24h, 36h, 48h, 60h ago are within 3 days
+        assert [log["id"] for log in recent] == ["log0", "log1", "log2", "log3", "log4"]
+        assert db.log_queries == [{"limit": 20, "days": None, "fields": ["created_at", "dish_name"]}]
+
+    @pytest.mark.asyncio
+    async def test_short_read_serves_larger_limits(self):
+        db = SlowDatabase(_logs(3))
+        loader = UserDataLoader("u1", db=db)
+
+        await loader.logs(limit=10)
+        assert len(await loader.logs(limit=50)) == 3
+        assert len(db.log_queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_reads_that_are_not_covered_query_again(self):
+        db = SlowDatabase(_logs(30))
+        loader = UserDataLoader("u1", db=db)
+
+        await loader.logs(limit=10, days=2, fields=("dish_name",))
+        await loader.logs(limit=10, days=7, fields=("dish_name",))  # wider window
+        await loader.logs(limit=10, days=2, fields=("dish_name", "venue_name"))  # more fields
+        await loader.logs(limit=25, fields=("dish_name",))  # more rows
+        assert len(db.log_queries) == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_query(self):
+        db = SlowDatabase(_logs(30), delay=0.01)
+        loader = UserDataLoader("u1", db=db)
+
+        results = await asyncio.gather(loader.logs(limit=10), loader.logs(limit=10), loader.logs(limit=5))
+        assert [len(r) for r in results] == [10, 10, 5]
+        assert len(db.log_queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_shared_read(self):
+        db = SlowDatabase(_logs(5), delay=0.02)
+        loader = UserDataLoader("u1", db=db)
+
+        first = asyncio.ensure_future(loader.logs(limit=5))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(loader.logs(limit=5))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert len(await second) == 5
+        assert len(db.log_queries) == 1
+
+
+class TestUserDataLoaderProfileAndPreferences:
+    @pytest.mark.asyncio
+    async def test_profile_read_once_and_copied_per_caller(self):
+        stored = AsyncMock(return_value={"top_cuisines": ["Thai"], "staleness": {"refreshing": False}})
+        with patch("fcp.tools.data_loader.get_stored_taste_profile", stored):
+            loader = UserDataLoader("u1", db=SlowDatabase([]))
+            first = await loader.taste_profile("month")
+            first.pop("staleness")
+            second = await loader.taste_profile("month")
+
+        assert "staleness" in second
+        stored.assert_awaited_once_with("u1", "month")
+
+    @pytest.mark.asyncio
+    async def test_preferences_read_once(self):
+        db = SlowDatabase([])
+        db.get_user_preferences = AsyncMock(return_value={"timezone": "UTC"})
+        loader = UserDataLoader("u1", db=db)
+
+        await asyncio.gather(loader.preferences(), loader.preferences())
+        db.get_user_preferences.assert_awaited_once_with("u1")
+
+
+class TestUserDataScope:
+    def test_scope_shares_one_loader_per_user(self):
+        assert user_data("u1") is not user_data("u1")
+        with user_data_scope():
+            loader = user_data("u1")
+            assert user_data("u1") is loader
+            assert user_data("u2") is not loader
+        assert user_data("u1") is not loader
+
+    def test_nested_scopes_are_independent(self):
+        with user_data_scope():
+            outer = user_data("u1")
+            with user_data_scope():
+                assert user_data("u1") is not outer
+            assert user_data("u1") is outer
+
+
+class TestSuggestMealLatency:
+    @pytest.mark.asyncio
+    async def test_suggest_meal_reads_concurrently_and_once(self):
+        """With 100ms reads, suggest_meal takes about one read instead of three back to back."""
+        delay = 0.1
+        db = SlowDatabase(_logs(40), delay=delay)
+
+        async def slow_profile(user_id, period):
+            await asyncio.sleep(delay)
+            return {"top_cuisines": ["Italian"], "staleness": None}
+
+        fake_gemini = FakeGeminiClient(json_response={"suggestions": [{"dish_name": "Carbonara"}]})
+        with (
+            patch("fcp.tools.data_loader.firestore_client", db),
+            patch("fcp.tools.data_loader.get_stored_taste_profile", slow_profile),
+            patch("fcp.tools.suggest.gemini", fake_gemini),
+        ):
+            from fcp.tools.suggest import suggest_meal
+
+            start = time.perf_counter()
+            suggestions = await suggest_meal("u1", exclude_recent_days=3)
+            elapsed = time.perf_counter() - start
+
+        assert suggestions == [{"dish_name": "Carbonara"}]
+        assert len(db.log_queries) == 1
+        # Profile, recent logs and history used to be awaited serially (3 x delay)
+        assert elapsed < 2 * delay
+        prompt = fake_gemini.call_history[0]["prompt"]
+        assert "Dish 0" in prompt
+        assert "staleness" not in prompt
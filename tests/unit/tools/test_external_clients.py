@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import time
 from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
 
 from fcp.tools.external import open_food_facts, usda
+from fcp.utils.circuit_breaker import CircuitState, get_circuit_breaker
 
 
 class DummyResponse:
@@ -188,6 +190,37 @@ async def test_usda_timeout_and_request_error():
         assert await usda.get_food_details(1) == {}
 
 
+@pytest.mark.asyncio
+async def test_usda_non_json_response():
+    class TextResponse(DummyResponse):
+        def json(self):
+            raise ValueError("Expecting value")
+
+    with (
+        patch.dict("os.environ", {"USDA_API_KEY": "key"}),
+        patch("fcp.tools.external.usda.httpx.AsyncClient", new=lambda *a, **k: DummyClient(TextResponse())),
+    ):
+        assert await usda.search_foods("apple") == []
+        assert await usda.get_food_details(1) == {}
+
+
+@pytest.mark.asyncio
+async def test_usda_skipped_while_breaker_open():
+    breaker = get_circuit_breaker("usda")
+    breaker.state = CircuitState.OPEN
+    breaker.last_failure_time = time.monotonic()
+    client = DummyClient(DummyResponse(json_data={"foods": [{"fdcId": 1}]}))
+    client.get = AsyncMock()
+
+    with (
+        patch.dict("os.environ", {"USDA_API_KEY": "key"}),
+        patch("fcp.tools.external.usda.httpx.AsyncClient", new=lambda *a, **k: client),
+    ):
+        assert await usda.search_foods("apple") == []
+        assert await usda.get_food_details(1) == {}
+    client.get.assert_not_awaited()
+
+
 def test_usda_extract_micronutrients_and_normalize():
     data = {
         "foodNutrients": [
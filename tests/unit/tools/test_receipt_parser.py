@@ -454,7 +454,7 @@ class TestAddItemsFromReceipt:
 
         with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
             mock_db = AsyncMock()
-            mock_db.add_pantry_item = AsyncMock(side_effect=["item1", "item2"])
+            mock_db.add_pantry_items_batch = AsyncMock(return_value=["item1", "item2"])
             mock_get_db.return_value = mock_db
 
             result = await add_items_from_receipt("user123", receipt_items)
@@ -462,7 +462,8 @@ class TestAddItemsFromReceipt:
             assert result["success"] is True
             assert result["added_count"] == 2
             assert len(result["items"]) == 2
-            assert mock_db.add_pantry_item.call_count == 2
+            mock_db.add_pantry_items_batch.assert_awaited_once()
+            assert [item["id"] for item in result["items"]] == ["item1", "item2"]
 
     @pytest.mark.asyncio
     async def test_add_items_normalizes_category_casing(self):
@@ -475,20 +476,20 @@ class TestAddItemsFromReceipt:
 
         with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
             mock_db = AsyncMock()
-            mock_db.add_pantry_item = AsyncMock(side_effect=["id1", "id2", "id3"])
+            mock_db.add_pantry_items_batch = AsyncMock(return_value=["id1", "id2", "id3"])
             mock_get_db.return_value = mock_db
 
             await add_items_from_receipt("user123", receipt_items)
 
-            calls = mock_db.add_pantry_item.call_args_list
+            items = mock_db.add_pantry_items_batch.call_args[0][1]
             # DAIRY -> dairy, stored in fridge
-            assert calls[0][0][1]["category"] == "dairy"
-            assert calls[0][0][1]["storage_location"] == "fridge"
+            assert items[0]["category"] == "dairy"
+            assert items[0]["storage_location"] == "fridge"
             # Frozen Foods -> frozen, stored in freezer
-            assert calls[1][0][1]["category"] == "frozen"
-            assert calls[1][0][1]["storage_location"] == "freezer"
+            assert items[1]["category"] == "frozen"
+            assert items[1]["storage_location"] == "freezer"
             # Fruits -> produce
-            assert calls[2][0][1]["category"] == "produce"
+            assert items[2]["category"] == "produce"
 
     @pytest.mark.asyncio
     async def test_add_items_assigns_storage_based_on_category(self):
@@ -501,18 +502,18 @@ class TestAddItemsFromReceipt:
 
         with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
             mock_db = AsyncMock()
-            mock_db.add_pantry_item = AsyncMock(side_effect=["id1", "id2", "id3"])
+            mock_db.add_pantry_items_batch = AsyncMock(return_value=["id1", "id2", "id3"])
             mock_get_db.return_value = mock_db
 
             await add_items_from_receipt("user123", receipt_items)
 
-            calls = mock_db.add_pantry_item.call_args_list
+            items = mock_db.add_pantry_items_batch.call_args[0][1]
             # Frozen -> freezer
-            assert calls[0][0][1]["storage_location"] == "freezer"
+            assert items[0]["storage_location"] == "freezer"
             # Pantry -> pantry
-            assert calls[1][0][1]["storage_location"] == "pantry"
+            assert items[1]["storage_location"] == "pantry"
             # Proteins -> fridge (default)
-            assert calls[2][0][1]["storage_location"] == "fridge"
+            assert items[2]["storage_location"] == "fridge"
 
     @pytest.mark.asyncio
     async def test_add_items_calculates_expiration_dates(self):
@@ -524,7 +525,7 @@ class TestAddItemsFromReceipt:
 
         with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
             mock_db = AsyncMock()
-            mock_db.add_pantry_item = AsyncMock(return_value="id1")
+            mock_db.add_pantry_items_batch = AsyncMock(return_value=["id1"])
             mock_get_db.return_value = mock_db
 
             await add_items_from_receipt(
@@ -533,8 +534,8 @@ class TestAddItemsFromReceipt:
                 purchase_date=purchase_date,
             )
 
-            calls = mock_db.add_pantry_item.call_args_list
-            item = calls[0][0][1]
+            items = mock_db.add_pantry_items_batch.call_args[0][1]
+            item = items[0]
             assert item["purchase_date"] == purchase_date.isoformat()
             # Bakery expires in 5 days
             exp_date = datetime.fromisoformat(item["expiration_date"])
@@ -549,15 +550,15 @@ class TestAddItemsFromReceipt:
 
         with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
             mock_db = AsyncMock()
-            mock_db.add_pantry_item = AsyncMock(return_value="id1")
+            mock_db.add_pantry_items_batch = AsyncMock(return_value=["id1"])
             mock_get_db.return_value = mock_db
 
             before = datetime.now()
             await add_items_from_receipt("user123", receipt_items)
             after = datetime.now()
 
-            calls = mock_db.add_pantry_item.call_args_list
-            item = calls[0][0][1]
+            items = mock_db.add_pantry_items_batch.call_args[0][1]
+            item = items[0]
             purchase_date = datetime.fromisoformat(item["purchase_date"])
             assert before <= purchase_date <= after
 
@@ -570,13 +571,13 @@ class TestAddItemsFromReceipt:
 
         with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
             mock_db = AsyncMock()
-            mock_db.add_pantry_item = AsyncMock(return_value="id1")
+            mock_db.add_pantry_items_batch = AsyncMock(return_value=["id1"])
             mock_get_db.return_value = mock_db
 
             await add_items_from_receipt("user123", receipt_items)
 
-            calls = mock_db.add_pantry_item.call_args_list
-            item = calls[0][0][1]
+            items = mock_db.add_pantry_items_batch.call_args[0][1]
+            item = items[0]
             assert item["name"] == "Mystery Item"
             assert item["quantity"] == 1
             assert item["unit"] == "pieces"
@@ -586,3 +587,15 @@ class TestAddItemsFromReceipt:
             assert item["source"] == "receipt"
             # Verify default storage is fridge for uncategorized items
             assert item["storage_location"] == "fridge"
+
+    @pytest.mark.asyncio
+    async def test_add_items_empty_receipt_skips_write(self):
+        """Should not touch the database for a receipt without items."""
+        with patch("fcp.tools.parser.get_firestore_client") as mock_get_db:
+            mock_db = AsyncMock()
+            mock_get_db.return_value = mock_db
+
+            result = await add_items_from_receipt("user123", [])
+
+            assert result == {"success": True, "added_count": 0, "items": []}
+            mock_db.add_pantry_items_batch.assert_not_called()
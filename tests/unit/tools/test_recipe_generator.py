@@ -4,7 +4,7 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from fcp.tools.recipe_generator import generate_recipe
+from fcp.tools.recipe_generator import generate_recipe, generate_recipe_tool
 
 
 @pytest.mark.asyncio
@@ -115,3 +115,16 @@ async def test_generate_recipe_json_parse_error() -> None:
 
         with pytest.raises(ValueError, match="Failed to generate recipe"):
             await generate_recipe(ingredients=["chicken"])
+
+
+@pytest.mark.asyncio
+async def test_generate_recipe_tool_inputs() -> None:
+    """Ingredients win over the prompt, and one of them is required."""
+    with patch(
+        "fcp.tools.recipe_generator.generate_recipe", new=AsyncMock(return_value={"recipe_name": "Soup"})
+    ) as mock:
+        result = await generate_recipe_tool(ingredients=["leek"], prompt="something warm", cuisine="French")
+
+    assert result == {"recipe_name": "Soup"}
+    mock.assert_awaited_once_with(ingredients=["leek"], dish_name=None, cuisine="French", dietary_restrictions=None)
+    assert await generate_recipe_tool() == {"success": False, "error": "Provide either ingredients or prompt"}
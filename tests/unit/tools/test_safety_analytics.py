@@ -338,6 +338,167 @@ class TestAnalyticsEdgeCases:
             assert "analysis" in result
 
 
+class TestAnalyticsLocalMode:
+    """Local-mode statistics keep the code-execution output schema."""
+
+    LLM_KEYS = {"period", "entry_count", "analysis", "code_executed", "raw_output"}
+
+    @pytest.mark.asyncio
+    async def test_nutrition_stats_local_matches_llm_schema(self, sample_meals_with_nutrition):
+        """Local mode should return the llm keys plus structured stats, without code execution."""
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            mock_gemini.generate_with_code_execution = AsyncMock()
+            mock_gemini.generate_content = AsyncMock(return_value="You ate well.")
+
+            from fcp.tools.analytics import calculate_nutrition_stats
+
+            result = await calculate_nutrition_stats(sample_meals_with_nutrition, mode="local")
+
+        assert self.LLM_KEYS <= set(result)
+        assert result["period"] == "week"
+        assert result["entry_count"] == len(sample_meals_with_nutrition)
+        assert result["analysis"] == "You ate well."
+        assert result["code_executed"] is None
+        assert result["stats"]["entry_count"] == len(sample_meals_with_nutrition)
+        assert result["raw_output"].startswith("Days tracked:")
+        mock_gemini.generate_with_code_execution.assert_not_awaited()
+        narration_prompt = mock_gemini.generate_content.await_args.args[0]
+        assert result["raw_output"] in narration_prompt
+
+    @pytest.mark.asyncio
+    async def test_nutrition_stats_local_golden_without_narration(self):
+        """Without narration no model is called and the analysis is the summary text."""
+        logs = [
+            {"created_at": "2026-01-01T08:00:00", "dish_name": "Eggs", "nutrition": {"calories": 300, "fat_g": 20}},
+            {"created_at": "2026-01-02T08:00:00", "dish_name": "Eggs", "nutrition": {"calories": 500, "fat_g": 30}},
+        ]
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            from fcp.tools.analytics import calculate_nutrition_stats
+
+            result = await calculate_nutrition_stats(logs, period="month", mode="local", narrate=False)
+
+        assert mock_gemini.mock_calls == []
+        assert result["analysis"] == result["raw_output"]
+        stats = result["stats"]
+        assert (stats["avg_daily_calories"], stats["daily_calories_stddev"]) == (400, 100)
+        assert stats["macro_ratio_pct"] == {"protein": 0, "carbs": 0, "fat": 100}
+        assert stats["top_dishes"] == [{"dish_name": "Eggs", "count": 2}]
+
+    @pytest.mark.asyncio
+    async def test_compare_periods_local(self):
+        """Local comparison keeps the llm keys and adds per-period stats and metrics."""
+        week1 = [{"created_at": "2026-01-01T12:00:00", "dish_name": "Salad", "nutrition": {"calories": 400}}]
+        week2 = [{"created_at": "2026-01-08T12:00:00", "dish_name": "Pizza", "nutrition": {"calories": 600}}]
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            mock_gemini.generate_content = AsyncMock(return_value="Calories went up.")
+
+            from fcp.tools.analytics import compare_periods
+
+            result = await compare_periods(week1, week2, "Week 1", "Week 2", mode="local")
+
+        assert {"period1", "period2", "comparison", "code_executed", "raw_output"} <= set(result)
+        assert result["period1"]["name"] == "Week 1"
+        assert result["period2"]["entries"] == 1
+        assert result["comparison"] == "Calories went up."
+        assert result["metrics"]["avg_daily_calories"] == {"period1": 400, "period2": 600, "change_pct": 50.0}
+        assert result["raw_output"].startswith("Week 1 vs Week 2")
+
+    @pytest.mark.asyncio
+    async def test_compare_periods_local_without_narration(self):
+        """Without narration the comparison is the summary text and no model is called."""
+        week1 = [{"created_at": "2026-01-01T12:00:00", "dish_name": "Salad", "nutrition": {"calories": 400}}]
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            from fcp.tools.analytics import compare_periods
+
+            result = await compare_periods(week1, [], "Week 1", "Week 2", mode="local", narrate=False)
+
+        assert mock_gemini.mock_calls == []
+        assert result["comparison"] == result["raw_output"]
+        assert result["metrics"]["avg_daily_calories"]["period1"] == 400
+
+    @pytest.mark.asyncio
+    async def test_narration_failure_returns_summary(self, sample_meals_with_nutrition):
+        """Statistics and comparisons fall back to the summary when Gemini fails."""
+        from fcp.tools.analytics import calculate_nutrition_stats, compare_periods
+
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            mock_gemini.generate_content = AsyncMock(side_effect=RuntimeError("Gemini unavailable"))
+
+            stats = await calculate_nutrition_stats(sample_meals_with_nutrition, mode="local")
+            comparison = await compare_periods(sample_meals_with_nutrition, [], mode="local")
+
+        assert stats["analysis"] == stats["raw_output"]
+        assert stats["stats"]["entry_count"] == len(sample_meals_with_nutrition)
+        assert comparison["comparison"] == comparison["raw_output"]
+        assert comparison["metrics"]["avg_daily_calories"]["period2"] == 0
+
+    @pytest.mark.asyncio
+    async def test_eating_patterns_local(self, sample_meals_with_nutrition):
+        """Local patterns keep the llm keys and add structured patterns."""
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            mock_gemini.generate_with_code_execution = AsyncMock()
+            mock_gemini.generate_content = AsyncMock(return_value="You mostly eat lunch out.")
+
+            from fcp.tools.analytics import analyze_eating_patterns
+
+            result = await analyze_eating_patterns(sample_meals_with_nutrition, mode="local")
+
+        assert {"entry_count", "pattern_analysis", "code_executed", "raw_output"} <= set(result)
+        assert result["pattern_analysis"] == "You mostly eat lunch out."
+        assert result["code_executed"] is None
+        assert result["patterns"]["entry_count"] == len(sample_meals_with_nutrition)
+        mock_gemini.generate_with_code_execution.assert_not_awaited()
+        assert result["raw_output"] in mock_gemini.generate_content.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_eating_patterns_local_without_narration(self):
+        """Without narration no model is called."""
+        logs = [{"created_at": "2026-01-03T12:00:00", "dish_name": "Pho", "venue_name": "Pho 24"}]
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            from fcp.tools.analytics import analyze_eating_patterns
+
+            result = await analyze_eating_patterns(logs, mode="local", narrate=False)
+
+        assert mock_gemini.mock_calls == []
+        assert result["pattern_analysis"] == result["raw_output"]
+        assert result["patterns"]["top_venues"] == [{"venue_name": "Pho 24", "count": 1}]
+        assert result["patterns"]["day_of_week"]["weekend"]["meals"] == 1
+
+    @pytest.mark.asyncio
+    async def test_eating_patterns_narration_failure_returns_summary(self, sample_meals_with_nutrition):
+        """A failed narration falls back to the summary, which is not cached."""
+        from fcp.services.result_cache import ResultCache
+        from fcp.tools.analytics import analyze_eating_patterns
+        from fcp.utils.circuit_breaker import CircuitBreakerError
+
+        cache = ResultCache(enabled=True, persist=False)
+        with patch("fcp.tools.analytics.gemini") as mock_gemini:
+            mock_gemini.generate_content = AsyncMock(side_effect=[CircuitBreakerError("gemini", 10.0), "Narrated."])
+
+            async def compute():
+                return await analyze_eating_patterns(sample_meals_with_nutrition, mode="local")
+
+            version = AsyncMock(return_value=1)
+            fallback = await cache.get_or_compute("patterns", "u1", {}, compute, data_version=version)
+            narrated = await cache.get_or_compute("patterns", "u1", {}, compute, data_version=version)
+
+        assert fallback["pattern_analysis"] == fallback["raw_output"]
+        assert fallback["patterns"]["entry_count"] == len(sample_meals_with_nutrition)
+        assert narrated["pattern_analysis"] == "Narrated."
+
+    @pytest.mark.asyncio
+    async def test_invalid_mode_rejected(self):
+        """An unknown mode should raise ValueError."""
+        from fcp.tools.analytics import analyze_eating_patterns, calculate_nutrition_stats, compare_periods
+
+        with pytest.raises(ValueError, match="Invalid mode"):
+            await calculate_nutrition_stats([], mode="fast")
+        with pytest.raises(ValueError, match="Invalid mode"):
+            await analyze_eating_patterns([], mode="fast")
+        with pytest.raises(ValueError, match="Invalid mode"):
+            await compare_periods([], [], mode="fast")
+
+
 class TestDetectActiveRecall:
     """Tests for _detect_active_recall function."""
 
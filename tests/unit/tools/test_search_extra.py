@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -23,3 +23,52 @@ def test_keyword_search_respects_limit_break():
     ]
     result = search._keyword_search(logs, "tomato", limit=1)
     assert len(result) == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieve_candidates_pads_hits_with_recent_logs():
+    hits = [{"id": "hit", "dish_name": "Ramen"}]
+    recent = [{"id": "new"}, {"id": "hit"}, {"id": "older"}]
+    with (
+        patch("fcp.tools.search.firestore_client") as mock_fs,
+        patch("fcp.tools.search.RERANK_CANDIDATES", 3),
+    ):
+        mock_fs.search_logs = AsyncMock(return_value=hits)
+        mock_fs.get_user_logs = AsyncMock(return_value=recent)
+        result = await search._retrieve_candidates("u1", "ramen")
+
+    assert [log["id"] for log in result] == ["hit", "new", "older"]
+    mock_fs.search_logs.assert_awaited_once_with("u1", "ramen", limit=3, fields=search.CANDIDATE_FIELDS)
+    mock_fs.get_user_logs.assert_awaited_once_with("u1", limit=3, fields=search.CANDIDATE_FIELDS)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_candidates_skips_recent_when_hits_fill_budget():
+    hits = [{"id": str(i)} for i in range(2)]
+    with (
+        patch("fcp.tools.search.firestore_client") as mock_fs,
+        patch("fcp.tools.search.RERANK_CANDIDATES", 2),
+    ):
+        mock_fs.search_logs = AsyncMock(return_value=hits)
+        mock_fs.get_user_logs = AsyncMock()
+        result = await search._retrieve_candidates("u1", "ramen")
+
+    assert result == hits
+    mock_fs.get_user_logs.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_meals_prompts_only_candidates():
+    hits = [{"id": "old", "dish_name": "Ramen", "created_at": "2019-01-01"}]
+    with (
+        patch("fcp.tools.search.firestore_client") as mock_fs,
+        patch("fcp.tools.search.gemini") as mock_gemini,
+        patch("fcp.tools.search.RERANK_CANDIDATES", 1),
+    ):
+        mock_fs.search_logs = AsyncMock(return_value=hits)
+        mock_gemini.generate_json = AsyncMock(return_value={"matches": [{"id": "old", "relevance": 0.9}]})
+        results = await search.search_meals("u1", "ramen")
+
+    prompt = mock_gemini.generate_json.call_args[0][0]
+    assert "old\tRamen\t2019-01-01" in prompt
+    assert [r["id"] for r in results] == ["old"]
@@ -1,5 +1,6 @@
 """Tests for FCP tools."""
 
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -392,6 +393,7 @@ class TestSearchMeals:
     async def test_search_meals_semantic(self, sample_food_logs):
         """Test semantic search returns relevant results."""
         with patch("fcp.tools.search.firestore_client") as mock_fs:
+            mock_fs.search_logs = AsyncMock(return_value=[])
             mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
 
             with patch("fcp.tools.search.gemini") as mock_gemini:
@@ -416,6 +418,7 @@ class TestSearchMeals:
     async def test_search_meals_fallback_keyword(self, sample_food_logs):
         """Test fallback to keyword search when Gemini fails."""
         with patch("fcp.tools.search.firestore_client") as mock_fs:
+            mock_fs.search_logs = AsyncMock(return_value=[])
             mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
 
             with patch("fcp.tools.search.gemini") as mock_gemini:
@@ -432,6 +435,7 @@ class TestSearchMeals:
     async def test_search_meals_empty_logs(self):
         """Test search with no food logs."""
         with patch("fcp.tools.search.firestore_client") as mock_fs:
+            mock_fs.search_logs = AsyncMock(return_value=[])
             mock_fs.get_user_logs = AsyncMock(return_value=[])
 
             from fcp.tools.search import search_meals
@@ -444,6 +448,7 @@ class TestSearchMeals:
     async def test_search_meals_match_id_not_in_logs(self, sample_food_logs):
         """Test semantic search when Gemini returns IDs not in the logs."""
         with patch("fcp.tools.search.firestore_client") as mock_fs:
+            mock_fs.search_logs = AsyncMock(return_value=[])
             mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
 
             with patch("fcp.tools.search.gemini") as mock_gemini:
@@ -490,13 +495,16 @@ class TestGetTasteProfile:
                     }
                 )
 
-                from fcp.tools.profile import get_taste_profile
+                from fcp.tools.profile import PROFILE_LOG_FIELDS, get_taste_profile
 
                 result = await get_taste_profile("test_user", "month")
 
                 assert result["total_meals"] == 5
                 assert result["period"] == "month"
                 assert "top_cuisines" in result
+                mock_fs.get_user_logs.assert_awaited_once_with(
+                    "test_user", limit=500, days=30, fields=PROFILE_LOG_FIELDS
+                )
 
     @pytest.mark.asyncio
     async def test_taste_profile_empty(self):
@@ -531,6 +539,39 @@ class TestGetTasteProfile:
                 assert italian is not None
                 assert italian["count"] == 2
 
+    @pytest.mark.asyncio
+    async def test_taste_profile_cached_until_data_changes(self, sample_food_logs, tmp_path):
+        """Repeat requests reuse the profile until the user's data version changes."""
+        from fcp.services.result_cache import ResultCache
+
+        cache = ResultCache(tmp_path / "cache.db", enabled=True)
+        with (
+            patch("fcp.tools.profile.result_cache", cache),
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.gemini") as mock_gemini,
+        ):
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_fs.get_data_version = AsyncMock(return_value=1)
+            mock_gemini.generate_json = AsyncMock(return_value={"spice_preference": "medium"})
+
+            from fcp.tools.profile import get_taste_profile
+
+            first = await get_taste_profile("test_user")
+            assert await get_taste_profile("test_user") == first
+            assert mock_gemini.generate_json.await_count == 1
+
+            mock_fs.get_data_version.return_value = 2
+            await get_taste_profile("test_user")
+            assert mock_gemini.generate_json.await_count == 2
+
+            # Degraded fallback profiles are not cached.
+            mock_fs.get_data_version.return_value = 3
+            mock_gemini.generate_json.side_effect = Exception("API Error")
+            await get_taste_profile("test_user")
+            await get_taste_profile("test_user")
+            assert mock_fs.get_user_logs.await_count == 4
+        await cache.close()
+
     @pytest.mark.asyncio
     async def test_taste_profile_fallback_logs_missing_fields(self):
         """Test fallback aggregation with logs missing cuisine, venue, and spice_level."""
@@ -563,16 +604,220 @@ class TestGetTasteProfile:
                 assert result["spice_preference"] == "mild"
 
 
+class TestStoredTasteProfile:
+    """Tests for the materialized taste profile served to agent routes."""
+
+    @staticmethod
+    def _snapshot(log_count=5, data_version=1, built_at=None):
+        from datetime import UTC, datetime
+
+        return {
+            "profile": {"total_meals": log_count, "spice_preference": "medium"},
+            "log_count": log_count,
+            "data_version": data_version,
+            "built_at": built_at or datetime.now(UTC).isoformat(),
+        }
+
+    @pytest.mark.asyncio
+    async def test_first_read_serves_simple_profile_and_builds_in_background(self, sample_food_logs):
+        """Without a stored profile the aggregation is served while the full profile is built."""
+        import asyncio
+
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.gemini") as mock_gemini,
+        ):
+            mock_fs.get_taste_profile_snapshot = AsyncMock(return_value=None)
+            mock_fs.save_taste_profile_snapshot = AsyncMock()
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_fs.get_data_version = AsyncMock(return_value=3)
+            mock_fs.count_user_logs = AsyncMock(return_value=5)
+            mock_gemini.generate_json = AsyncMock(return_value={"spice_preference": "medium"})
+
+            from fcp.tools.profile import get_stored_taste_profile
+
+            result = await get_stored_taste_profile("test_user", "month")
+            assert result["total_meals"] == 5
+            assert result["staleness"]["built_at"] is None
+            assert result["staleness"]["refreshing"] is True
+            mock_gemini.generate_json.assert_not_awaited()
+
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            mock_fs.save_taste_profile_snapshot.assert_awaited_once()
+            user_id, period, snapshot = mock_fs.save_taste_profile_snapshot.await_args.args
+            assert (user_id, period) == ("test_user", "month")
+            assert snapshot["profile"]["spice_preference"] == "medium"
+            assert (snapshot["log_count"], snapshot["data_version"]) == (5, 3)
+
+    @pytest.mark.asyncio
+    async def test_no_logs_and_no_snapshot(self):
+        """Users without logs get the empty profile and no refresh."""
+        with patch("fcp.tools.profile.firestore_client") as mock_fs:
+            mock_fs.get_taste_profile_snapshot = AsyncMock(return_value=None)
+            mock_fs.get_user_logs = AsyncMock(return_value=[])
+
+            from fcp.tools.profile import get_stored_taste_profile
+
+            result = await get_stored_taste_profile("test_user")
+            assert result["total_meals"] == 0
+            assert result["staleness"]["refreshing"] is False
+
+    @pytest.mark.asyncio
+    async def test_current_snapshot_served_without_refresh(self):
+        """A snapshot built at the current data version is served as is."""
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.refresh_taste_profile_in_background") as mock_refresh,
+        ):
+            mock_fs.get_taste_profile_snapshot = AsyncMock(return_value=self._snapshot())
+            mock_fs.get_data_version = AsyncMock(return_value=1)
+            mock_fs.count_user_logs = AsyncMock(return_value=5)
+
+            from fcp.tools.profile import get_stored_taste_profile
+
+            result = await get_stored_taste_profile("test_user")
+            assert result["spice_preference"] == "medium"
+            assert result["staleness"]["data_changed"] is False
+            assert result["staleness"]["new_logs_since_build"] == 0
+            mock_refresh.assert_not_called()
+            mock_fs.count_user_logs.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_refresh_after_enough_new_logs(self):
+        """The stored copy is served stale until enough new logs trigger a refresh."""
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.refresh_taste_profile_in_background") as mock_refresh,
+            patch("fcp.tools.profile.settings") as mock_settings,
+        ):
+            mock_settings.taste_profile_refresh_after_logs = 10
+            mock_settings.taste_profile_max_age_seconds = 86400
+            mock_fs.get_taste_profile_snapshot = AsyncMock(return_value=self._snapshot())
+            mock_fs.get_data_version = AsyncMock(return_value=4)
+            mock_fs.count_user_logs = AsyncMock(return_value=8)
+
+            from fcp.tools.profile import get_stored_taste_profile
+
+            result = await get_stored_taste_profile("test_user")
+            assert result["staleness"]["new_logs_since_build"] == 3
+            assert result["staleness"]["refreshing"] is False
+            mock_refresh.assert_not_called()
+
+            mock_fs.count_user_logs.return_value = 15
+            result = await get_stored_taste_profile("test_user")
+            assert result["staleness"]["refreshing"] is True
+            mock_refresh.assert_called_once_with("test_user", "all_time")
+
+    @pytest.mark.asyncio
+    async def test_old_windowed_snapshot_refreshes_without_writes(self):
+        """Windowed periods move with the calendar, so old snapshots refresh even when data is unchanged."""
+        from datetime import UTC, datetime, timedelta
+
+        built_at = (datetime.now(UTC) - timedelta(days=2)).isoformat()
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.refresh_taste_profile_in_background") as mock_refresh,
+        ):
+            mock_fs.get_taste_profile_snapshot = AsyncMock(return_value=self._snapshot(built_at=built_at))
+            mock_fs.get_data_version = AsyncMock(return_value=1)
+
+            from fcp.tools.profile import get_stored_taste_profile
+
+            await get_stored_taste_profile("test_user", "all_time")
+            mock_refresh.assert_not_called()
+            result = await get_stored_taste_profile("test_user", "week")
+            mock_refresh.assert_called_once_with("test_user", "week")
+            assert result["staleness"]["age_seconds"] >= 2 * 86400 - 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_does_not_store_fallback_profile(self, sample_food_logs):
+        """A profile that fell back to simple aggregation leaves the stored copy in place."""
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.gemini") as mock_gemini,
+        ):
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_fs.get_data_version = AsyncMock(return_value=2)
+            mock_fs.count_user_logs = AsyncMock(return_value=5)
+            mock_fs.save_taste_profile_snapshot = AsyncMock()
+            mock_gemini.generate_json = AsyncMock(side_effect=Exception("API Error"))
+
+            from fcp.tools.profile import refresh_taste_profile
+
+            result = await refresh_taste_profile("test_user")
+            assert result["total_meals"] == 5
+            mock_fs.save_taste_profile_snapshot.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_runs_once_per_profile(self):
+        """Concurrent reads start a single refresh task per (user, period)."""
+        import asyncio
+
+        from fcp.tools import profile
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_refresh(user_id, period):
+            started.set()
+            await release.wait()
+
+        with patch("fcp.tools.profile.refresh_taste_profile", side_effect=slow_refresh) as mock_refresh:
+            profile.refresh_taste_profile_in_background("test_user", "month")
+            profile.refresh_taste_profile_in_background("test_user", "month")
+            await started.wait()
+            assert ("test_user", "month") in profile._refreshing
+            release.set()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        assert mock_refresh.call_count == 1
+        assert ("test_user", "month") not in profile._refreshing
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_outlives_request_deadline(self, sample_food_logs):
+        """A refresh started by a request with a short deadline still finishes and is stored."""
+        import asyncio
+
+        from fcp.tools import profile
+        from fcp.utils.background_tasks import get_pending_tasks
+        from fcp.utils.deadline import deadline_scope, within_deadline
+
+        async def slow_generate(*args, **kwargs):
+            # Bounded by the request deadline the way GeminiClient calls are
+            async with within_deadline():
+                await asyncio.sleep(0.05)
+            return {"top_cuisines": [{"name": "Japanese"}]}
+
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.gemini") as mock_gemini,
+        ):
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_fs.get_data_version = AsyncMock(return_value=2)
+            mock_fs.count_user_logs = AsyncMock(return_value=5)
+            mock_fs.save_taste_profile_snapshot = AsyncMock()
+            mock_gemini.generate_json = AsyncMock(side_effect=slow_generate)
+
+            with deadline_scope(0.01):
+                profile.refresh_taste_profile_in_background("test_user", "all_time")
+            await asyncio.gather(*get_pending_tasks())
+
+        mock_fs.save_taste_profile_snapshot.assert_awaited_once()
+        snapshot = mock_fs.save_taste_profile_snapshot.await_args.args[2]
+        assert snapshot["profile"]["top_cuisines"] == [{"name": "Japanese"}]
+
+
 class TestSuggestMeal:
     """Tests for suggest_meal tool."""
 
     @pytest.mark.asyncio
     async def test_suggest_meal_success(self, sample_food_logs):
         """Test meal suggestions."""
-        with patch("fcp.tools.suggest.firestore_client") as mock_fs:
+        with patch("fcp.tools.data_loader.firestore_client") as mock_fs:
             mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
 
-            with patch("fcp.tools.suggest.get_taste_profile") as mock_profile:
+            with patch("fcp.tools.data_loader.get_stored_taste_profile") as mock_profile:
                 mock_profile.return_value = {"top_cuisines": [{"name": "Italian"}]}
 
                 with patch("fcp.tools.suggest.gemini") as mock_gemini:
@@ -599,11 +844,11 @@ class TestSuggestMeal:
     @pytest.mark.asyncio
     async def test_suggest_meal_excludes_recent(self, sample_food_logs):
         """Test that recent meals are excluded."""
-        with patch("fcp.tools.suggest.firestore_client") as mock_fs:
+        with patch("fcp.tools.data_loader.firestore_client") as mock_fs:
             # Return only one recent log
             mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs[:1])
 
-            with patch("fcp.tools.suggest.get_taste_profile") as mock_profile:
+            with patch("fcp.tools.data_loader.get_stored_taste_profile") as mock_profile:
                 mock_profile.return_value = {}
 
                 with patch("fcp.tools.suggest.gemini") as mock_gemini:
@@ -611,13 +856,99 @@ class TestSuggestMeal:
 
                     from fcp.tools.suggest import suggest_meal
 
-                    # With fallback, should exclude recent
-                    results = await suggest_meal("test_user", exclude_recent_days=1)
+                    # With fallback, should exclude recent (the ramen was logged a day ago)
+                    results = await suggest_meal("test_user", exclude_recent_days=2)
 
                     # Recent dish should not be in suggestions
                     assert all(r["dish_name"] != "Tonkotsu Ramen" for r in results)
 
 
+class TestGeminiBreakerFallbacks:
+    """Tools with a local fallback use it without calling Gemini while its breaker is open."""
+
+    @pytest.fixture
+    def gemini_down(self):
+        from fcp.services.gemini_base import gemini_breaker_name
+        from fcp.utils.circuit_breaker import CircuitState, get_circuit_breaker
+
+        breaker = get_circuit_breaker(gemini_breaker_name())
+        breaker.state = CircuitState.OPEN
+        breaker.last_failure_time = time.monotonic()
+
+    @pytest.mark.asyncio
+    async def test_search_meals_uses_keyword_search(self, gemini_down, sample_food_logs):
+        with (
+            patch("fcp.tools.search.firestore_client") as mock_fs,
+            patch("fcp.tools.search.gemini") as mock_gemini,
+        ):
+            mock_fs.search_logs = AsyncMock(return_value=[])
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_gemini.generate_json = AsyncMock()
+
+            from fcp.tools.search import search_meals
+
+            results = await search_meals("test_user", "ramen")
+
+        assert any("Ramen" in r["dish_name"] for r in results)
+        mock_gemini.generate_json.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_taste_profile_uses_simple_profile(self, gemini_down, sample_food_logs):
+        with (
+            patch("fcp.tools.profile.firestore_client") as mock_fs,
+            patch("fcp.tools.profile.gemini") as mock_gemini,
+        ):
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_gemini.generate_json = AsyncMock()
+
+            from fcp.tools.profile import get_taste_profile
+
+            result = await get_taste_profile("test_user")
+
+        assert result["total_meals"] == 5
+        mock_gemini.generate_json.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_suggest_meal_uses_simple_suggestions(self, gemini_down, sample_food_logs):
+        with (
+            patch("fcp.tools.data_loader.firestore_client") as mock_fs,
+            patch("fcp.tools.data_loader.get_stored_taste_profile") as mock_profile,
+            patch("fcp.tools.suggest.gemini") as mock_gemini,
+        ):
+            mock_fs.get_user_logs = AsyncMock(return_value=sample_food_logs)
+            mock_gemini.generate_json = AsyncMock()
+
+            from fcp.tools.suggest import suggest_meal
+
+            results = await suggest_meal("test_user")
+
+        assert results
+        mock_gemini.generate_json.assert_not_awaited()
+        mock_profile.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_gemini_client_fails_fast_after_server_errors(self):
+        """Once a model's breaker opens, calls fail without reaching the API or retrying."""
+        from google.genai import errors as genai_errors
+
+        from fcp.services.gemini import GeminiClient, gemini_circuit_open
+        from fcp.utils.circuit_breaker import CircuitBreakerError
+
+        client = GeminiClient()
+        client.client = MagicMock()
+        client.client.aio.models.generate_content = AsyncMock(
+            side_effect=genai_errors.ServerError(503, {"error": {"message": "unavailable"}})
+        )
+        for _ in range(5):
+            with pytest.raises(genai_errors.ServerError):
+                await client.generate_json("hi")
+
+        assert gemini_circuit_open()
+        with pytest.raises(CircuitBreakerError):
+            await client.generate_json("hi")
+        assert client.client.aio.models.generate_content.await_count == 5
+
+
 class TestCrud:
     """Tests for CRUD operations."""
 
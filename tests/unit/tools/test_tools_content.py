@@ -154,3 +154,19 @@ async def test_visual_generate_food_image_maps_enums():
         result = await visual.generate_food_image("Tacos", aspect_ratio="16:9", resolution="4K")
         assert result["mime_type"] == "image/png"
         assert result["aspect_ratio"] == "16:9"
+
+
+@pytest.mark.asyncio
+async def test_visual_generate_food_image_failure():
+    service = AsyncMock()
+    service.generate_food_image.side_effect = RuntimeError("quota")
+
+    with patch("fcp.tools.visual._get_image_service", return_value=service):
+        result = await visual.generate_food_image("Tacos", aspect_ratio="7:7", resolution="8K")
+    assert result == {
+        "status": "failed",
+        "error": "quota",
+        "dish_name": "Tacos",
+        "aspect_ratio": visual.AspectRatio.STANDARD.value,
+        "resolution": visual.Resolution.HIGH.value,
+    }
@@ -27,7 +27,7 @@ class DummyFirestore:
         self.recent_logs = None
         self.preferences = {"dietary_patterns": ["vegan"]}
 
-    async def get_user_logs(self, user_id, limit=None, days=None):
+    async def get_user_logs(self, user_id, limit=None, days=None, fields=None):
         if days is not None and self.recent_logs is not None:
             return self.recent_logs
         return self.logs
@@ -89,8 +89,8 @@ async def test_suggest_meal_success_and_fallback():
     db = DummyFirestore()
     db.logs = [{"dish_name": "Soup", "venue_name": "Home"}]
     db.recent_logs = []
-    with patch("fcp.tools.suggest.firestore_client", db):
-        with patch("fcp.tools.suggest.get_taste_profile", new=AsyncMock(return_value={"likes": []})):
+    with patch("fcp.tools.data_loader.firestore_client", db):
+        with patch("fcp.tools.data_loader.get_stored_taste_profile", new=AsyncMock(return_value={"likes": []})):
             with patch(
                 "fcp.tools.suggest.gemini.generate_json",
                 new=AsyncMock(return_value={"suggestions": [{"dish_name": "Pasta"}]}),
@@ -8,6 +8,7 @@ from fcp.tools.video import (
     STYLE_PROMPTS,
     generate_cooking_clip,
     generate_recipe_video,
+    generate_recipe_video_tool,
 )
 
 
@@ -184,6 +185,36 @@ class TestGenerateRecipeVideo:
             assert result["dish_name"] == "Salad"
 
 
+class TestGenerateRecipeVideoTool:
+    """Tests for the MCP wrapper resolving its dish from a recipe."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_given_description_and_dish_name(self):
+        db = MagicMock(get_recipe=AsyncMock(return_value={"recipe_name": "Pho", "description": "From the recipe"}))
+        with (
+            patch("fcp.tools.video.get_firestore_client", return_value=db),
+            patch(
+                "fcp.tools.video.generate_recipe_video", new=AsyncMock(side_effect=lambda **_: {"status": "completed"})
+            ) as gen,
+        ):
+            result = await generate_recipe_video_tool(recipe_id="r1", description="Mine", user_id="u1")
+            assert result == {"status": "completed", "recipe_id": "r1"}
+            assert gen.call_args.kwargs["dish_name"] == "Pho"
+            assert gen.call_args.kwargs["description"] == "Mine"
+
+            # Without a recipe_id the dish name is used as given
+            assert await generate_recipe_video_tool(dish_name="Ramen") == {"status": "completed"}
+            db.get_recipe.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("recipe", [None, {"description": "No name"}])
+    async def test_unresolved_dish_is_an_error(self, recipe):
+        db = MagicMock(get_recipe=AsyncMock(return_value=recipe))
+        with patch("fcp.tools.video.get_firestore_client", return_value=db):
+            result = await generate_recipe_video_tool(recipe_id="r1", user_id="u1")
+        assert result == {"success": False, "error": "Provide dish_name or a valid recipe_id"}
+
+
 class TestGenerateCookingClip:
     """Tests for generate_cooking_clip function."""
 
@@ -1,6 +1,7 @@
 """Tests for background_tasks utility module."""
 
 import asyncio
+import contextvars
 
 import pytest
 
@@ -72,6 +73,18 @@ class TestCreateTrackedTask:
 
         assert get_pending_task_count() == 0
 
+    @pytest.mark.asyncio
+    async def test_runs_in_given_context(self):
+        """A task given a fresh context does not see the caller's context variables."""
+        request_id = contextvars.ContextVar("request_id", default=None)
+        request_id.set("req-1")
+
+        async def read():
+            return request_id.get()
+
+        assert await create_tracked_task(read()) == "req-1"
+        assert await create_tracked_task(read(), context=contextvars.Context()) is None
+
 
 class TestGetPendingTasks:
     """Tests for get_pending_tasks function."""
@@ -1,17 +1,25 @@
 """Tests for circuit breaker implementation."""
 
+import asyncio
 import time
+from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
+from google.genai import errors as genai_errors
 
 from fcp.utils.circuit_breaker import (
     CircuitBreakerError,
     CircuitBreakerState,
     CircuitState,
+    call_with_circuit_breaker,
     circuit_breaker,
     gemini_circuit_breaker,
     get_all_circuit_breakers,
     get_circuit_breaker,
+    is_circuit_open,
+    is_dependency_failure,
+    is_server_error,
     reset_circuit_breaker,
 )
 
@@ -120,6 +128,30 @@ class TestCircuitBreakerState:
         assert await cb.can_execute() is True
         assert cb.half_open_calls == 2  # Incremented
 
+    @pytest.mark.asyncio
+    async def test_first_half_open_call_takes_a_slot(self, cb):
+        """The call that moves the circuit to half-open is one of its trial calls."""
+        cb.state = CircuitState.OPEN
+        cb.last_failure_time = time.monotonic() - 2.0
+
+        assert await cb.can_execute() is True
+        assert await cb.can_execute() is True
+        assert await cb.can_execute() is False
+
+    @pytest.mark.asyncio
+    async def test_release_gives_back_half_open_slot(self, cb):
+        """A released slot can be taken again; releasing never goes below zero."""
+        cb.state = CircuitState.HALF_OPEN
+        cb.half_open_calls = 2
+
+        await cb.release()
+        assert cb.half_open_calls == 1
+        assert await cb.can_execute() is True
+
+        cb.half_open_calls = 0
+        await cb.release()
+        assert cb.half_open_calls == 0
+
     @pytest.mark.asyncio
     async def test_success_in_closed_state_resets_failures(self, cb):
         """Success in closed state resets failure count."""
@@ -303,3 +335,90 @@ class TestGeminiCircuitBreaker:
         # Should raise the error (circuit not yet open)
         with pytest.raises(httpx.ConnectError):
             await failing_function()
+
+
+class TestCallWithCircuitBreaker:
+    """Tests for wrapping individual client requests."""
+
+    def test_dependency_failures(self):
+        request = httpx.Request("GET", "https://example.com")
+        assert is_dependency_failure(httpx.ConnectError("down"))
+        assert is_dependency_failure(httpx.ReadTimeout("slow"))
+        assert is_dependency_failure(genai_errors.ServerError(503, {"error": {"message": "unavailable"}}))
+        assert is_dependency_failure(
+            httpx.HTTPStatusError("502", request=request, response=httpx.Response(502, request=request))
+        )
+        assert not is_dependency_failure(genai_errors.ClientError(429, {"error": {"message": "quota"}}))
+        assert not is_dependency_failure(ValueError("bad json"))
+        assert is_server_error(httpx.Response(500)) and not is_server_error(httpx.Response(404))
+
+    @pytest.mark.asyncio
+    async def test_opens_and_fails_fast(self):
+        call = AsyncMock(side_effect=httpx.ConnectError("down"))
+        for _ in range(5):
+            with pytest.raises(httpx.ConnectError):
+                await call_with_circuit_breaker("dep", call)
+
+        assert is_circuit_open("dep")
+        with pytest.raises(CircuitBreakerError):
+            await call_with_circuit_breaker("dep", call)
+        assert call.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_failed_results_count(self):
+        call = AsyncMock(return_value=MagicMock(status_code=503))
+        for _ in range(5):
+            await call_with_circuit_breaker("dep", call, failed=is_server_error)
+        assert is_circuit_open("dep")
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_trip(self):
+        call = AsyncMock(side_effect=ValueError("bad request"))
+        for _ in range(10):
+            with pytest.raises(ValueError):
+                await call_with_circuit_breaker("dep", call)
+        assert not is_circuit_open("dep")
+        assert get_circuit_breaker("dep").failure_count == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_calls_release_their_slots(self):
+        cb = get_circuit_breaker("dep", half_open_max_calls=2)
+        cb.state = CircuitState.OPEN
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        for _ in range(3):
+            started.clear()
+            task = asyncio.create_task(call_with_circuit_breaker("dep", hang))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        # Cancellations neither tripped nor closed the breaker, and left no slot taken
+        assert cb.state == CircuitState.HALF_OPEN
+        assert cb.half_open_calls == 0
+        assert await call_with_circuit_breaker("dep", AsyncMock(return_value="ok")) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_decorator_releases_slot_on_cancel(self):
+        cb = get_circuit_breaker("decorated_cancel", recovery_timeout=0.0)
+
+        @circuit_breaker("decorated_cancel")
+        async def cancelled():
+            raise asyncio.CancelledError
+
+        cb.state = CircuitState.OPEN
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled()
+        assert cb.state == CircuitState.HALF_OPEN
+        assert cb.half_open_calls == 0
+
+    def test_is_circuit_open_false_once_recovery_due(self):
+        assert not is_circuit_open("unknown")
+        cb = get_circuit_breaker("dep", recovery_timeout=0.0)
+        cb.state = CircuitState.OPEN
+        assert not is_circuit_open("dep")
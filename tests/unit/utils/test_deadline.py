@@ -0,0 +1,216 @@
+"""Tests for request-scoped deadlines."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from fcp.services.gemini import GeminiClient, gemini_retry
+from fcp.utils.deadline import (
+    DeadlineExceededError,
+    deadline_scope,
+    expired,
+    remaining,
+    timeout_within_deadline,
+    within_deadline,
+)
+from tests.constants import TEST_AUTH_HEADER, TEST_USER_ID
+
+
+class TestDeadlineScope:
+    def test_no_deadline_outside_a_scope(self):
+        assert remaining() is None
+        assert not expired()
+        assert timeout_within_deadline(30.0) == 30.0
+
+    def test_nested_scope_keeps_the_sooner_deadline(self):
+        with deadline_scope(10):
+            assert 9 < remaining() <= 10
+            with deadline_scope(60):
+                assert remaining() <= 10
+            with deadline_scope(1):
+                assert remaining() <= 1
+                assert timeout_within_deadline(30.0) <= 1
+        assert remaining() is None
+
+    def test_zero_or_none_leaves_deadline_alone(self):
+        with deadline_scope(0), deadline_scope(None):
+            assert remaining() is None
+
+    def test_passed_deadline_raises(self):
+        with deadline_scope(0.001):
+            time.sleep(0.002)
+            assert expired()
+            with pytest.raises(DeadlineExceededError):
+                timeout_within_deadline(30.0)
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_cancels_the_block(self):
+        with deadline_scope(0.01):
+            with pytest.raises(DeadlineExceededError):
+                async with within_deadline():
+                    await asyncio.sleep(1)
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_already_passed(self):
+        body = AsyncMock()
+        with deadline_scope(0.001):
+            await asyncio.sleep(0.002)
+            with pytest.raises(DeadlineExceededError):
+                async with within_deadline():
+                    await body()
+        body.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_passes_other_timeouts_through(self):
+        with deadline_scope(10):
+            with pytest.raises(TimeoutError):
+                async with within_deadline():
+                    raise TimeoutError("from the call")
+
+
+class TestRetryWithinDeadline:
+    @pytest.mark.asyncio
+    async def test_no_retry_when_backoff_would_pass_the_deadline(self):
+        calls = 0
+
+        @gemini_retry
+        async def failing():
+            nonlocal calls
+            calls += 1
+            raise httpx.ConnectError("Connection failed")
+
+        with deadline_scope(0.5), pytest.raises(httpx.ConnectError):
+            await failing()
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_exceeded_is_not_retried(self):
+        calls = 0
+
+        @gemini_retry
+        async def out_of_time():
+            nonlocal calls
+            calls += 1
+            raise DeadlineExceededError("Request deadline passed")
+
+        with pytest.raises(DeadlineExceededError):
+            await out_of_time()
+        assert calls == 1
+
+
+class TestGeminiClientDeadline:
+    @pytest.mark.asyncio
+    async def test_call_abandoned_when_deadline_passes(self):
+        cancelled = asyncio.Event()
+
+        async def slow_generate(**kwargs):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        client = GeminiClient()
+        client.client = MagicMock()
+        client.client.aio.models.generate_content = slow_generate
+
+        started = time.monotonic()
+        with deadline_scope(0.05), pytest.raises(DeadlineExceededError):
+            await client.generate_json("Pair fennel")
+        assert time.monotonic() - started < 0.5
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert client._in_flight == {}
+
+    @pytest.mark.asyncio
+    async def test_media_download_bounded_by_deadline(self):
+        http_client = MagicMock()
+        http_client.get = AsyncMock(
+            return_value=httpx.Response(
+                200, content=b"jpeg", headers={"content-type": "image/jpeg"}, request=httpx.Request("GET", "https://x")
+            )
+        )
+        client = GeminiClient()
+        with patch.object(GeminiClient, "_get_http_client", return_value=http_client), deadline_scope(2):
+            await client._fetch_media("https://firebasestorage.googleapis.com/ramen.jpg")
+        assert http_client.get.await_args.kwargs["timeout"] <= 2
+
+    @pytest.mark.asyncio
+    async def test_media_timeout_past_deadline_is_not_retried(self):
+        http_client = MagicMock()
+
+        async def timing_out(*args, **kwargs):
+            await asyncio.sleep(kwargs["timeout"])
+            raise httpx.ReadTimeout("timed out")
+
+        http_client.get = AsyncMock(side_effect=timing_out)
+        client = GeminiClient()
+        with (
+            patch.object(GeminiClient, "_get_http_client", return_value=http_client),
+            deadline_scope(0.02),
+            pytest.raises(DeadlineExceededError),
+        ):
+            await client._fetch_media("https://firebasestorage.googleapis.com/ramen.jpg")
+        assert http_client.get.await_count == 1
+
+
+class TestRequestDeadlineMiddleware:
+    @pytest.fixture
+    def client(self):
+        from fcp.api import app
+        from fcp.auth.local import get_current_user
+        from fcp.auth.permissions import AuthenticatedUser, UserRole, require_write_access
+
+        user = AuthenticatedUser(user_id=TEST_USER_ID, role=UserRole.AUTHENTICATED)
+
+        async def override_get_current_user(authorization=None):
+            return user
+
+        app.dependency_overrides[get_current_user] = override_get_current_user
+        app.dependency_overrides[require_write_access] = override_get_current_user
+        with TestClient(app) as test_client:
+            yield test_client
+        app.dependency_overrides.pop(get_current_user, None)
+        app.dependency_overrides.pop(require_write_access, None)
+
+    def analyze(self, client, headers=None):
+        return client.post(
+            "/analyze",
+            json={"image_url": "https://firebasestorage.googleapis.com/ramen.jpg"},
+            headers=TEST_AUTH_HEADER | (headers or {}),
+        )
+
+    def test_route_default_and_header(self, client):
+        seen: list[float | None] = []
+
+        async def analyze_meal(image_url):
+            seen.append(remaining())
+            return {"dish_name": "Ramen"}
+
+        with (
+            patch("fcp.routes.analyze.analyze_meal", side_effect=analyze_meal),
+            patch.dict("fcp.api.ROUTE_DEADLINE_SECONDS", {"/analyze": 45.0}),
+        ):
+            self.analyze(client)
+            self.analyze(client, {"X-Request-Timeout": "2.5"})
+            self.analyze(client, {"X-Request-Timeout": "3600"})
+            self.analyze(client, {"X-Request-Timeout": "soon"})
+
+        assert 44 < seen[0] <= 45
+        assert 2 < seen[1] <= 2.5
+        assert 119 < seen[2] <= 120
+        assert 44 < seen[3] <= 45
+
+    def test_exceeded_deadline_answers_504(self, client):
+        with patch(
+            "fcp.routes.analyze.analyze_meal",
+            new_callable=AsyncMock,
+            side_effect=DeadlineExceededError("Request deadline passed"),
+        ):
+            response = self.analyze(client, {"X-Request-Timeout": "1"})
+
+        assert response.status_code == 504
+        assert response.json()["error"]["code"] == "GATEWAY_TIMEOUT"
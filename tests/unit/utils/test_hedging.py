@@ -0,0 +1,166 @@
+"""Tests for hedged calls."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fcp.services.gemini import GeminiClient
+from fcp.services.gemini_governor import Priority, gemini_priority
+from fcp.utils.hedging import LatencyTracker, hedged
+
+
+def attempts(*delays: float, error: Exception | None = None):
+    """A call whose n-th attempt takes ``delays[n]`` seconds; the first raises ``error`` if given."""
+    started: list[int] = []
+    cancelled: list[int] = []
+
+    async def call():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(delays[n])
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        if n == 0 and error is not None:
+            raise error
+        return n
+
+    return call, started, cancelled
+
+
+class TestLatencyTracker:
+    def test_quantile_needs_min_samples(self):
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+        assert tracker.quantile(0.95) is None
+        tracker.record(3.0)
+        assert tracker.quantile(0.95) == 3.0
+
+    def test_p95_of_recent_window(self):
+        tracker = LatencyTracker(window=100, min_samples=1)
+        for ms in range(200):
+            tracker.record(ms / 1000)
+        # Only the last 100 samples (0.100 .. 0.199) count
+        assert tracker.quantile(0.95) == pytest.approx(0.194)
+        assert tracker.quantile(0.5) == pytest.approx(0.149)
+
+
+class TestHedged:
+    @pytest.mark.asyncio
+    async def test_no_delay_runs_once(self):
+        call, started, _ = attempts(0.01)
+        assert await hedged(call, None) == 0
+        assert started == [0]
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        call, started, _ = attempts(0.001)
+        on_hedge = MagicMock()
+        assert await hedged(call, 0.05, on_hedge) == 0
+        assert started == [0]
+        on_hedge.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_hedge(self):
+        call, started, cancelled = attempts(1.0, 0.001)
+        on_hedge = MagicMock()
+        assert await hedged(call, 0.01, on_hedge) == 1
+        await asyncio.sleep(0)
+        assert started == [0, 1]
+        assert cancelled == [0]
+        on_hedge.assert_called_once_with("hedge")
+
+    @pytest.mark.asyncio
+    async def test_primary_can_still_win(self):
+        call, _, cancelled = attempts(0.02, 1.0)
+        on_hedge = MagicMock()
+        assert await hedged(call, 0.01, on_hedge) == 0
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        on_hedge.assert_called_once_with("primary")
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_waits_for_the_other(self):
+        call, _, _ = attempts(0.02, 0.04, error=ValueError("boom"))
+        assert await hedged(call, 0.01) == 1
+
+    @pytest.mark.asyncio
+    async def test_both_attempts_failing_raises_the_first_error(self):
+        errors = iter([ValueError("primary"), ValueError("hedge")])
+
+        async def call():
+            error = next(errors)
+            await asyncio.sleep(0.02)
+            raise error
+
+        on_hedge = MagicMock()
+        with pytest.raises(ValueError, match="primary"):
+            await hedged(call, 0.01, on_hedge)
+        on_hedge.assert_called_once_with("none")
+
+    @pytest.mark.asyncio
+    async def test_errors_without_hedge_propagate(self):
+        call, started, _ = attempts(0.001, error=ValueError("boom"))
+        with pytest.raises(ValueError, match="boom"):
+            await hedged(call, 0.05)
+        assert started == [0]
+
+
+class TestGeminiHedging:
+    @pytest.fixture
+    def model(self):
+        """First call hangs, later calls answer at once."""
+        model = MagicMock(calls=0)
+
+        async def generate_content(model_name=None, contents=None, config=None, **kwargs):
+            model.calls += 1
+            if model.calls == 1:
+                await asyncio.sleep(1)
+            return MagicMock(text='{"ok": true}', usage_metadata=None, candidates=[])
+
+        model.generate_content = generate_content
+        return model
+
+    @pytest.fixture
+    def client(self, model):
+        gemini_client = GeminiClient()
+        gemini_client.client = MagicMock()
+        gemini_client.client.aio.models = model
+        return gemini_client
+
+    @pytest.fixture
+    def warm_latencies(self):
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record(0.01)
+        with patch.dict("fcp.services.gemini_base._latencies", {"generate_json": tracker}, clear=True):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_slow_call_hedged_when_enabled(self, client, model, warm_latencies):
+        with (
+            patch("fcp.services.gemini_base.settings.gemini_hedging_enabled", True),
+            patch("fcp.services.gemini_base.record_gemini_hedge") as record,
+        ):
+            assert await asyncio.wait_for(client.generate_json("Pair fennel"), 0.5) == {"ok": True}
+        assert model.calls == 2
+        record.assert_called_once_with("generate_json", "hedge")
+
+    @pytest.mark.asyncio
+    async def test_background_calls_not_hedged(self, client, model, warm_latencies):
+        @gemini_priority(Priority.BACKGROUND)
+        async def job():
+            return await client.generate_json("Pair fennel")
+
+        with patch("fcp.services.gemini_base.settings.gemini_hedging_enabled", True):
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(job(), 0.1)
+        assert model.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, client, model, warm_latencies):
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(client.generate_json("Pair fennel"), 0.1)
+        assert model.calls == 1
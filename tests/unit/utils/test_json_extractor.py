@@ -2,11 +2,7 @@
 
 from typing import Any, cast
 
-from fcp.utils.json_extractor import (
-    _extract_balanced_json,
-    extract_json,
-    extract_json_with_key,
-)
+from fcp.utils.json_extractor import extract_json, extract_json_with_key
 
 
 class TestExtractJson:
@@ -110,49 +106,90 @@ Later: {"actual": "json"}"""
         assert result == {"first": 1}
 
 
-class TestExtractBalancedJson:
-    """Tests for _extract_balanced_json function."""
+class TestBalancedCandidates:
+    """Tests for finding balanced JSON in surrounding text."""
 
     def test_extracts_balanced_object(self) -> None:
-        text = 'prefix {"key": "value"} suffix'
-        result = _extract_balanced_json(text, "{", "}")
-        assert result == '{"key": "value"}'
+        assert extract_json('prefix {"key": "value"} suffix') == {"key": "value"}
 
     def test_extracts_balanced_array(self) -> None:
-        text = "data: [1, 2, 3] end"
-        result = _extract_balanced_json(text, "[", "]")
-        assert result == "[1, 2, 3]"
+        assert extract_json("data: [1, 2, 3] end") == [1, 2, 3]
 
     def test_handles_nested_braces(self) -> None:
-        text = '{"outer": {"inner": "value"}}'
-        result = _extract_balanced_json(text, "{", "}")
-        assert result == '{"outer": {"inner": "value"}}'
+        assert extract_json('Result: {"outer": {"inner": "value"}}.') == {"outer": {"inner": "value"}}
 
     def test_handles_escaped_quotes(self) -> None:
-        text = '{"msg": "say \\"hi\\""}'
-        result = _extract_balanced_json(text, "{", "}")
-        assert result == '{"msg": "say \\"hi\\""}'
+        assert extract_json('Said {"msg": "say \\"hi\\" }"} then') == {"msg": 'say "hi" }'}
 
     def test_handles_backslash_escape(self) -> None:
-        text = '{"path": "C:\\\\Users"}'
-        result = _extract_balanced_json(text, "{", "}")
-        assert result == '{"path": "C:\\\\Users"}'
-
-    def test_returns_none_when_not_found(self) -> None:
-        text = "no json here"
-        result = _extract_balanced_json(text, "{", "}")
-        assert result is None
+        assert extract_json('Path {"path": "C:\\\\Users\\\\"} ok') == {"path": "C:\\Users\\"}
 
     def test_returns_none_for_unbalanced(self) -> None:
-        text = '{"unclosed": "object"'
-        result = _extract_balanced_json(text, "{", "}")
-        assert result is None
+        assert extract_json('Here: {"unclosed": "object"') is None
 
-    def test_handles_braces_in_strings(self) -> None:
-        text = '{"text": "a{b}c", "num": 1}'
-        result = _extract_balanced_json(text, "{", "}")
-        assert result is not None
-        assert '"num": 1' in result
+    def test_handles_brackets_and_fences_in_strings(self) -> None:
+        text = 'Answer: {"text": "a{b]c ``` [", "num": 1} done'
+        assert extract_json(text) == {"text": "a{b]c ``` [", "num": 1}
+
+    def test_quotes_in_prose_ignored(self) -> None:
+        assert extract_json('He said "try this: {"a": 1} and "more') == {"a": 1}
+
+    def test_mismatched_closer_ignored(self) -> None:
+        assert extract_json('note ] } {"a": [1, 2]} end') == {"a": [1, 2]}
+
+    def test_later_candidate_after_nested_invalid(self) -> None:
+        assert extract_json('{"a": [1, 2} then {"ok": true}') == {"ok": True}
+
+    def test_json_fence_preferred(self) -> None:
+        text = 'First {"a": 1}\n```json\n{"b": 2}\n```'
+        assert extract_json(text) == {"b": 2}
+
+    def test_unclosed_bracket_inside_fence(self) -> None:
+        text = '```\n{"a": [1\n```\nthen {"b": 2}'
+        assert extract_json(text) == {"b": 2}
+
+
+class TestRepairTruncated:
+    """Tests for repairing JSON cut off mid-document."""
+
+    def test_not_repaired_by_default(self) -> None:
+        assert extract_json('{"dish_name": "Ramen", "notes": "Rich') is None
+
+    def test_closes_open_string_and_brackets(self) -> None:
+        text = '{"dish_name": "Ramen", "ingredients": ["noodles", "eg'
+        assert extract_json(text, repair=True) == {"dish_name": "Ramen", "ingredients": ["noodles", "eg"]}
+
+    def test_prefers_whole_document_to_its_complete_parts(self) -> None:
+        text = '{"nutrition": {"calories": 650}, "ingredients": ["egg"], "notes": "Rich'
+        assert extract_json(text) == {"calories": 650}
+        assert extract_json(text, repair=True) == {
+            "nutrition": {"calories": 650},
+            "ingredients": ["egg"],
+            "notes": "Rich",
+        }
+
+    def test_trailing_comma_and_whitespace(self) -> None:
+        assert extract_json('[{"a": 1}, {"b": 2},\n  ', repair=True) == [{"a": 1}, {"b": 2}]
+
+    def test_cut_back_to_last_complete_value(self) -> None:
+        assert extract_json('{"a": 1, "b"', repair=True) == {"a": 1}
+        assert extract_json('{"a": [1, 2], "b": tru', repair=True) == {"a": [1, 2]}
+        assert extract_json('{"a": {"b": 1}, "c": {"d":', repair=True) == {"a": {"b": 1}, "c": {}}
+
+    def test_partial_escape_dropped(self) -> None:
+        assert extract_json('{"a": "caf\\u00', repair=True) == {"a": "caf"}
+        assert extract_json('{"a": "x\\', repair=True) == {"a": "x"}
+
+    def test_inside_fence_and_prose(self) -> None:
+        text = 'Here you go:\n```json\n{"items": [{"name": "Pho"}, {"name": "Bu'
+        assert extract_json(text, repair=True) == {"items": [{"name": "Pho"}, {"name": "Bu"}]}
+
+    def test_complete_json_not_repaired(self) -> None:
+        assert extract_json('{"a": 1} and then {"b": ', repair=True) == {"a": 1}
+
+    def test_unrepairable(self) -> None:
+        assert extract_json("{bad", repair=True) is None
+        assert extract_json("no json here", repair=True) is None
 
 
 class TestExtractJsonWithKey:
@@ -0,0 +1,118 @@
+"""Fuzz corpus for utils/json_extractor.py.
+
+Seeded random documents are wrapped, truncated and mangled the way model
+output is; the extractor must find the document, never raise, and only
+ever return a dict or list.
+"""
+
+import json
+import random
+from typing import Any
+
+import pytest
+
+from fcp.utils.json_extractor import extract_json, extract_json_with_key
+
+# Characters that matter to the scanner, weighted into random strings
+NASTY = ['"', "\\", "{", "}", "[", "]", ",", ":", "`", "```", "\n", "é", "🍜", "\\u00e9", " "]
+
+WRAPPERS = [
+    "{doc}",
+    "Here is the analysis:\n{doc}\nHope this helps!",
+    "```json\n{doc}\n```",
+    "```\n{doc}\n```",
+    'Note: values are "estimates" (see [1]).\n```JSON\n{doc}\n```\nDone}',
+    "Sure! ] } {doc} trailing [",
+    'He said "use {doc}',
+]
+
+# Inputs that make backtracking regexes or quadratic scans blow up
+ADVERSARIAL = [
+    ('{"a":' * 4000, None),
+    ("[" * 20000, None),
+    ("{" * 10000 + "}" * 9999, None),
+    ('"' * 20000, None),
+    ("```" * 5000, None),
+    ('{"a": "' + "\\" * 20001, None),
+    ("{} " * 5000, {}),
+    ("[{]" * 5000, None),
+    ('x {"k": 1' + " {" * 5000, None),
+    ("prose " * 5000 + '{"ok": true}', {"ok": True}),
+]
+
+
+def _random_string(rng: random.Random) -> str:
+    return "".join(
+        rng.choice(NASTY) if rng.random() < 0.3 else rng.choice("abc xyz") for _ in range(rng.randint(0, 12))
+    )
+
+
+def _random_value(rng: random.Random, depth: int = 0) -> Any:
+    kind = rng.randint(0, 6 if depth < 3 else 3)
+    if kind == 0:
+        return rng.choice([True, False, None])
+    if kind == 1:
+        return rng.choice([rng.randint(-1000, 1000), round(rng.uniform(-100, 100), 3)])
+    if kind in (2, 3):
+        return _random_string(rng)
+    if kind == 4:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {_random_string(rng): _random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def _random_document(rng: random.Random) -> dict[str, Any] | list[Any]:
+    while True:
+        doc = _random_value(rng)
+        if isinstance(doc, dict | list) and doc:
+            return doc
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_finds_document_in_wrapper(seed):
+    rng = random.Random(seed)
+    doc = _random_document(rng)
+    text = json.dumps(doc, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+    for wrapper in WRAPPERS:
+        assert extract_json(wrapper.replace("{doc}", text)) == doc
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_truncation_repairs_to_a_prefix(seed):
+    rng = random.Random(seed)
+    doc = {f"key{i}": _random_value(rng, 1) for i in range(rng.randint(1, 6))}
+    text = json.dumps(doc)
+    for cut in range(1, len(text)):
+        result = extract_json(text[:cut], repair=True)
+        if isinstance(result, dict):
+            keys = list(result)
+            assert keys == list(doc)[: len(keys)]
+            # Every member but the last was complete before the cut
+            assert all(result[key] == doc[key] for key in keys[:-1])
+        else:
+            assert result is None or isinstance(result, list)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_mangled_text_never_raises(seed):
+    rng = random.Random(seed)
+    chars = list(json.dumps(_random_document(rng)))
+    for _ in range(200):
+        mangled = chars[:]
+        for _ in range(rng.randint(1, 4)):
+            position = rng.randrange(len(mangled) + 1)
+            if rng.random() < 0.5 and position < len(mangled):
+                del mangled[position]
+            else:
+                mangled.insert(position, rng.choice(NASTY))
+        text = "".join(mangled)
+        for repair in (False, True):
+            result = extract_json(text, repair=repair)
+            assert result is None or isinstance(result, dict | list)
+        extract_json_with_key(text, "a")
+
+
+@pytest.mark.parametrize(("text", "expected"), ADVERSARIAL)
+def test_adversarial_inputs(text, expected):
+    assert extract_json(text) == expected
+    result = extract_json(text, repair=True)
+    assert result is None or isinstance(result, dict | list)
@@ -0,0 +1,179 @@
+"""Tests for incremental parsing of streamed JSON."""
+
+import json
+import random
+
+import pytest
+
+from fcp.services.gemini import GeminiClient
+from fcp.utils.json_stream import IncrementalJsonParser, JsonEvent, iter_json_events
+from tests.fakes.fake_gemini import FakeGeminiClient
+
+ANALYSIS = {
+    "dish_name": "Tonkotsu Ramen",
+    "cuisine": "Japanese",
+    "ingredients": ["noodles", "pork belly", "egg"],
+    "nutrition": {"calories": 650, "protein_g": 32.5, "fat_g": 2.1e1},
+    "dietary_tags": [],
+    "allergens": {},
+    "vegetarian": False,
+    "spice_level": None,
+    "notes": 'Rich "paitan" broth\n\tslightly salty / 🍜 é',
+}
+
+
+def parse(text: str, sizes=(7,)) -> tuple[list[JsonEvent], object]:
+    parser = IncrementalJsonParser()
+    events: list[JsonEvent] = []
+    i = 0
+    while i < len(text):
+        size = sizes[len(events) % len(sizes)]
+        events += parser.feed(text[i : i + size])
+        i += size
+    return events, parser.close()
+
+
+class TestIncrementalJsonParser:
+    @pytest.mark.parametrize("ensure_ascii", [True, False])
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_any_chunking_gives_the_same_document(self, ensure_ascii, indent):
+        text = json.dumps(ANALYSIS, ensure_ascii=ensure_ascii, indent=indent)
+        rng = random.Random(7)
+        for _ in range(50):
+            sizes = tuple(rng.randint(1, 16) for _ in range(8))
+            assert parse(text, sizes)[1] == ANALYSIS
+
+    def test_events_in_document_order(self):
+        events, _ = parse(
+            '{"dish_name": "Ramen", "ingredients": ["egg", "nori"], "nutrition": {"calories": 650}}', (200,)
+        )
+        assert events == [
+            JsonEvent("field", ("dish_name",), "Ramen"),
+            JsonEvent("item", ("ingredients", 0), "egg"),
+            JsonEvent("item", ("ingredients", 1), "nori"),
+            JsonEvent("field", ("ingredients",), ["egg", "nori"]),
+            JsonEvent("field", ("nutrition", "calories"), 650),
+            JsonEvent("field", ("nutrition",), {"calories": 650}),
+            JsonEvent(
+                "done",
+                (),
+                {"dish_name": "Ramen", "ingredients": ["egg", "nori"], "nutrition": {"calories": 650}},
+            ),
+        ]
+
+    def test_same_events_whatever_the_chunking(self):
+        text = json.dumps(ANALYSIS, indent=2)
+        whole, _ = parse(text, (len(text),))
+        by_char, _ = parse(text, (1,))
+        assert [e for e in by_char if e.kind != "partial"] == whole
+
+    def test_field_reported_as_soon_as_it_is_complete(self):
+        parser = IncrementalJsonParser()
+        assert parser.feed('{"dish_name": "Tonkotsu') == [JsonEvent("partial", ("dish_name",), "Tonkotsu")]
+        assert parser.feed(' Ramen", "cui') == [JsonEvent("field", ("dish_name",), "Tonkotsu Ramen")]
+        assert parser.feed('sine": "Jap') == [JsonEvent("partial", ("cuisine",), "Jap")]
+        assert parser.feed("anese") == [JsonEvent("partial", ("cuisine",), "anese")]
+
+    def test_number_waits_for_its_delimiter(self):
+        parser = IncrementalJsonParser()
+        assert parser.feed('{"calories": 65') == []
+        assert parser.feed("0") == []
+        assert parser.feed("}") == [
+            JsonEvent("field", ("calories",), 650),
+            JsonEvent("done", (), {"calories": 650}),
+        ]
+
+    def test_escapes_split_across_chunks(self):
+        text = json.dumps({"notes": 'a"b\\c\n🍜é'})
+        for split in range(len(text)):
+            parser = IncrementalJsonParser()
+            events = parser.feed(text[:split]) + parser.feed(text[split:])
+            partial = "".join(e.value for e in events if e.kind == "partial")
+            assert 'a"b\\c\n🍜é'.startswith(partial)
+            assert parser.close() == {"notes": 'a"b\\c\n🍜é'}
+
+    def test_lone_surrogates_kept_as_json_loads_does(self):
+        text = '{"a": "\\ud83cx", "b": "\\ud83c\\u0041", "c": "\\udf5c", "d": "\\ud83c"}'
+        for size in (1, 7, len(text)):
+            assert parse(text, (size,))[1] == json.loads(text)
+
+    def test_done_once_the_root_closes(self):
+        parser = IncrementalJsonParser()
+        parser.feed('{"dish": "Pho"')
+        assert not parser.done
+        parser.feed("} trailing")
+        assert parser.done
+
+    def test_array_root_and_surrounding_text(self):
+        events, document = parse('```json\n[{"dish": "Pho"}, 3, true, null]\n```\n', (5,))
+        assert document == [{"dish": "Pho"}, 3, True, None]
+        assert [e.path for e in events if e.kind == "item"] == [(0,), (1,), (2,), (3,)]
+
+    def test_incomplete_document(self):
+        parser = IncrementalJsonParser()
+        parser.feed('{"dish_name": "Ramen", "cuisine": ')
+        with pytest.raises(ValueError, match="Incomplete"):
+            parser.close()
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            '{"a" 1}',
+            '{"a": 1 "b": 2}',
+            '{"a": tru}',
+            '{"a": "\\x"}',
+            '{"a": "\\u12g4"}',
+            "{1: 2}",
+            '["a",]',
+            '{"a": NaN}',
+            "[-Infinity]",
+        ],
+    )
+    def test_invalid_json(self, text):
+        with pytest.raises(ValueError):
+            parse(text)
+
+
+class TestGeminiJsonEvents:
+    @pytest.mark.asyncio
+    async def test_iter_json_events(self):
+        async def chunks():
+            for piece in ('{"dish_name": "Ra', 'men", "cuisine"', ': "Japanese"}'):
+                yield piece
+
+        events = [event async for event in iter_json_events(chunks())]
+        assert [event.kind for event in events] == ["partial", "field", "field", "done"]
+
+    @pytest.mark.asyncio
+    async def test_stream_ending_early_raises(self):
+        async def chunks():
+            yield '{"dish_name": "Ramen"'
+
+        with pytest.raises(ValueError):
+            _ = [event async for event in iter_json_events(chunks())]
+
+    @pytest.mark.asyncio
+    async def test_generate_json_events_awaits_sdk_stream(self):
+        class Chunk:
+            def __init__(self, text):
+                self.text = text
+
+        async def stream():
+            for text in ('{"dish_name": "Ramen",', ' "cuisine": "Japanese"}'):
+                yield Chunk(text)
+
+        class Models:
+            async def generate_content_stream(self, **kwargs):
+                return stream()
+
+        client = GeminiClient()
+        client.client = type("Client", (), {"aio": type("Aio", (), {"models": Models()})()})()
+        events = [event async for event in client.generate_json_events("Analyze")]
+        assert events[0] == JsonEvent("field", ("dish_name",), "Ramen")
+        assert events[-1].value == {"dish_name": "Ramen", "cuisine": "Japanese"}
+
+    @pytest.mark.asyncio
+    async def test_fake_client(self):
+        fake = FakeGeminiClient(json_response=ANALYSIS)
+        events = [event async for event in fake.generate_json_events("Analyze")]
+        assert events[-1] == JsonEvent("done", (), ANALYSIS)
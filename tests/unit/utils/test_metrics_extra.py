@@ -50,6 +50,10 @@ def test_record_metric_functions():
                 with patch.object(metrics.GEMINI_COST, "inc", return_value=None):
                     metrics.record_gemini_usage("method", 1, 2, 0.01, 0.2, success=False)
 
+    with patch.object(metrics.GEMINI_HEDGED_CALLS, "labels", return_value=MagicMock()) as labels:
+        metrics.record_gemini_hedge("generate_content", "hedge")
+        labels.assert_called_once_with(method="generate_content", winner="hedge")
+
 
 def test_setup_metrics_disabled():
     with patch.dict(os.environ, {"ENABLE_METRICS": "false"}):